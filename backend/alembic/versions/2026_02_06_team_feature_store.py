@@ -0,0 +1,58 @@
+"""Add team feature snapshots (point-in-time feature store)
+
+Revision ID: 2026_02_06_team_feature_store
+Revises: 2026_02_04_add_odds
+Create Date: 2026-02-06 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2026_02_06_team_feature_store'
+down_revision = '2026_02_04_add_odds'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Snapshots de features par (équipe, match terminé)
+    op.create_table('team_feature_snapshots',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('team_id', sa.Integer(), nullable=False),
+    sa.Column('as_of', sa.DateTime(), nullable=False),
+    sa.Column('match_id', sa.Integer(), nullable=False),
+    sa.Column('season', sa.Integer(), nullable=False),
+    sa.Column('league_code', sa.String(length=10), nullable=True),
+    sa.Column('played', sa.Integer(), nullable=True),
+    sa.Column('wins', sa.Integer(), nullable=True),
+    sa.Column('draws', sa.Integer(), nullable=True),
+    sa.Column('losses', sa.Integer(), nullable=True),
+    sa.Column('goals_for', sa.Integer(), nullable=True),
+    sa.Column('goals_against', sa.Integer(), nullable=True),
+    sa.Column('home_played', sa.Integer(), nullable=True),
+    sa.Column('home_points', sa.Integer(), nullable=True),
+    sa.Column('away_played', sa.Integer(), nullable=True),
+    sa.Column('away_points', sa.Integer(), nullable=True),
+    sa.Column('league_played', sa.Integer(), nullable=True),
+    sa.Column('league_points', sa.Integer(), nullable=True),
+    sa.Column('league_goal_diff', sa.Integer(), nullable=True),
+    sa.Column('league_goals_for', sa.Integer(), nullable=True),
+    sa.Column('form', sa.String(length=30), nullable=True),
+    sa.Column('recent_matches', sa.Text(), nullable=True),
+    sa.Column('last_match_date', sa.DateTime(), nullable=True),
+    sa.Column('last_important_date', sa.DateTime(), nullable=True),
+    sa.Column('last_important_match_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('team_id', 'match_id', name='uq_team_feature_match')
+    )
+    op.create_index(op.f('ix_team_feature_snapshots_id'), 'team_feature_snapshots', ['id'], unique=False)
+    op.create_index('ix_team_feature_team_as_of', 'team_feature_snapshots', ['team_id', 'as_of'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_team_feature_team_as_of', table_name='team_feature_snapshots')
+    op.drop_index(op.f('ix_team_feature_snapshots_id'), table_name='team_feature_snapshots')
+    op.drop_table('team_feature_snapshots')
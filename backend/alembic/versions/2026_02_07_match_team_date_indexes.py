@@ -0,0 +1,27 @@
+"""Add composite (team, date) indexes on matches
+
+Revision ID: 2026_02_07_match_team_date_indexes
+Revises: 2026_02_06_team_feature_store
+Create Date: 2026-02-07 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2026_02_07_match_team_date_indexes'
+down_revision = '2026_02_06_team_feature_store'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Fenêtres de calendrier par équipe (matchs importants, historique)
+    op.create_index('ix_matches_home_team_date', 'matches', ['home_team_id', 'match_date'], unique=False)
+    op.create_index('ix_matches_away_team_date', 'matches', ['away_team_id', 'match_date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_matches_away_team_date', table_name='matches')
+    op.drop_index('ix_matches_home_team_date', table_name='matches')
@@ -0,0 +1,27 @@
+"""Add input fingerprint and model version to predictions
+
+Revision ID: 2026_02_08_prediction_fingerprint
+Revises: 2026_02_07_match_team_date_indexes
+Create Date: 2026-02-08 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2026_02_08_prediction_fingerprint'
+down_revision = '2026_02_07_match_team_date_indexes'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Empreinte des entrées: recalcul uniquement si les données ont changé
+    op.add_column('expert_predictions', sa.Column('input_fingerprint', sa.String(length=64), nullable=True))
+    op.add_column('expert_predictions', sa.Column('model_version', sa.String(length=20), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('expert_predictions', 'model_version')
+    op.drop_column('expert_predictions', 'input_fingerprint')
@@ -0,0 +1,40 @@
+"""Add score-matrix market probabilities to predictions
+
+Revision ID: 2026_02_09_score_matrix
+Revises: 2026_02_08_prediction_fingerprint
+Create Date: 2026-02-09 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2026_02_09_score_matrix'
+down_revision = '2026_02_08_prediction_fingerprint'
+branch_labels = None
+depends_on = None
+
+
+PROBABILITY_COLUMNS = (
+    'prob_home_win',
+    'prob_draw',
+    'prob_away_win',
+    'prob_over_2_5',
+    'prob_btts',
+    'expected_home_goals',
+    'expected_away_goals',
+)
+
+
+def upgrade() -> None:
+    # Marchés dérivés de la matrice de scores Poisson / Dixon-Coles
+    for name in PROBABILITY_COLUMNS:
+        op.add_column('expert_predictions', sa.Column(name, sa.Float(), nullable=True))
+    op.add_column('expert_predictions', sa.Column('score_matrix', sa.Text(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('expert_predictions', 'score_matrix')
+    for name in reversed(PROBABILITY_COLUMNS):
+        op.drop_column('expert_predictions', name)
@@ -0,0 +1,41 @@
+"""Add versioned weight sets for the prediction engines
+
+Revision ID: 2026_02_10_weight_sets
+Revises: 2026_02_09_score_matrix
+Create Date: 2026-02-10 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2026_02_10_weight_sets'
+down_revision = '2026_02_09_score_matrix'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'weight_sets',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('engine', sa.String(length=20), nullable=False),
+        sa.Column('version', sa.String(length=40), nullable=False),
+        sa.Column('weights', sa.Text(), nullable=False),
+        sa.Column('objective', sa.String(length=20), nullable=True),
+        sa.Column('metrics', sa.Text(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=False, server_default=sa.false()),
+        sa.Column('created_at', sa.DateTime(), nullable=True),
+        sa.Column('activated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('version')
+    )
+    op.create_index(op.f('ix_weight_sets_id'), 'weight_sets', ['id'], unique=False)
+    op.create_index('ix_weight_sets_engine_active', 'weight_sets', ['engine', 'is_active'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_weight_sets_engine_active', table_name='weight_sets')
+    op.drop_index(op.f('ix_weight_sets_id'), table_name='weight_sets')
+    op.drop_table('weight_sets')
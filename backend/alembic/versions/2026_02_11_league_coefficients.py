@@ -0,0 +1,37 @@
+"""Add league coefficients fitted from cross-league results
+
+Revision ID: 2026_02_11_league_coefficients
+Revises: 2026_02_10_weight_sets
+Create Date: 2026-02-11 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2026_02_11_league_coefficients'
+down_revision = '2026_02_10_weight_sets'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'league_coefficients',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('season', sa.Integer(), nullable=False),
+        sa.Column('league_code', sa.String(length=10), nullable=False),
+        sa.Column('rating', sa.Float(), nullable=False),
+        sa.Column('strength', sa.Float(), nullable=False),
+        sa.Column('matches', sa.Integer(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('season', 'league_code', name='uq_league_coefficient_season')
+    )
+    op.create_index(op.f('ix_league_coefficients_id'), 'league_coefficients', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_league_coefficients_id'), table_name='league_coefficients')
+    op.drop_table('league_coefficients')
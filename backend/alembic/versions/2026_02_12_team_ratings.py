@@ -0,0 +1,56 @@
+"""Add team Elo ratings and their point-in-time history
+
+Revision ID: 2026_02_12_team_ratings
+Revises: 2026_02_11_league_coefficients
+Create Date: 2026-02-12 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2026_02_12_team_ratings'
+down_revision = '2026_02_11_league_coefficients'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'team_ratings',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('team_id', sa.Integer(), nullable=False),
+        sa.Column('rating', sa.Float(), nullable=False),
+        sa.Column('season', sa.Integer(), nullable=False),
+        sa.Column('league_code', sa.String(length=10), nullable=True),
+        sa.Column('matches', sa.Integer(), nullable=True),
+        sa.Column('last_match_id', sa.Integer(), nullable=True),
+        sa.Column('last_match_date', sa.DateTime(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('team_id')
+    )
+    op.create_index(op.f('ix_team_ratings_id'), 'team_ratings', ['id'], unique=False)
+
+    op.create_table(
+        'team_rating_history',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('team_id', sa.Integer(), nullable=False),
+        sa.Column('match_id', sa.Integer(), nullable=False),
+        sa.Column('as_of', sa.DateTime(), nullable=False),
+        sa.Column('rating', sa.Float(), nullable=False),
+        sa.Column('rating_change', sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('team_id', 'match_id', name='uq_team_rating_match')
+    )
+    op.create_index(op.f('ix_team_rating_history_id'), 'team_rating_history', ['id'], unique=False)
+    op.create_index('ix_team_rating_team_as_of', 'team_rating_history', ['team_id', 'as_of'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_team_rating_team_as_of', table_name='team_rating_history')
+    op.drop_index(op.f('ix_team_rating_history_id'), table_name='team_rating_history')
+    op.drop_table('team_rating_history')
+    op.drop_index(op.f('ix_team_ratings_id'), table_name='team_ratings')
+    op.drop_table('team_ratings')
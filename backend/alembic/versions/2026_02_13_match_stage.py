@@ -0,0 +1,27 @@
+"""Add stage and official winner to matches
+
+Revision ID: 2026_02_13_match_stage
+Revises: 2026_02_12_team_ratings
+Create Date: 2026-02-13 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2026_02_13_match_stage'
+down_revision = '2026_02_12_team_ratings'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Phase de la compétition et vainqueur officiel (tirs au but inclus)
+    op.add_column('matches', sa.Column('stage', sa.String(length=30), nullable=True))
+    op.add_column('matches', sa.Column('winner', sa.String(length=10), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('matches', 'winner')
+    op.drop_column('matches', 'stage')
@@ -0,0 +1,36 @@
+"""Add market-implied and blended probabilities to expert predictions
+
+Revision ID: 2026_02_14_market_probabilities
+Revises: 2026_02_13_match_stage
+Create Date: 2026-02-14 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2026_02_14_market_probabilities'
+down_revision = '2026_02_13_match_stage'
+branch_labels = None
+depends_on = None
+
+FLOAT_COLUMNS = (
+    'market_prob_home', 'market_prob_draw', 'market_prob_away', 'market_overround',
+    'blend_prob_home', 'blend_prob_draw', 'blend_prob_away',
+)
+
+
+def upgrade() -> None:
+    # Probabilités du marché (cotes sans marge) et mélange avec le modèle
+    for name in FLOAT_COLUMNS:
+        op.add_column('expert_predictions', sa.Column(name, sa.Float(), nullable=True))
+    op.add_column('expert_predictions', sa.Column('market_method', sa.String(length=10), nullable=True))
+    op.add_column('expert_predictions', sa.Column('market_odds_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('expert_predictions', 'market_odds_at')
+    op.drop_column('expert_predictions', 'market_method')
+    for name in reversed(FLOAT_COLUMNS):
+        op.drop_column('expert_predictions', name)
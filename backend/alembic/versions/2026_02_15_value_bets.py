@@ -0,0 +1,45 @@
+"""Add ranked value-bet table for upcoming matches
+
+Revision ID: 2026_02_15_value_bets
+Revises: 2026_02_14_market_probabilities
+Create Date: 2026-02-15 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2026_02_15_value_bets'
+down_revision = '2026_02_14_market_probabilities'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'value_bets',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('match_id', sa.Integer(), nullable=False),
+        sa.Column('bet_type', sa.String(length=10), nullable=False),
+        sa.Column('odds', sa.Float(), nullable=False),
+        sa.Column('probability', sa.Float(), nullable=False),
+        sa.Column('implied_probability', sa.Float(), nullable=False),
+        sa.Column('market_probability', sa.Float(), nullable=True),
+        sa.Column('expected_value', sa.Float(), nullable=False),
+        sa.Column('value', sa.Float(), nullable=False),
+        sa.Column('is_value_bet', sa.Boolean(), nullable=False),
+        sa.Column('rank', sa.Integer(), nullable=False),
+        sa.Column('computed_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['match_id'], ['matches.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('match_id', 'bet_type', name='uq_value_bet_match_type')
+    )
+    op.create_index(op.f('ix_value_bets_id'), 'value_bets', ['id'], unique=False)
+    op.create_index(op.f('ix_value_bets_rank'), 'value_bets', ['rank'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_value_bets_rank'), table_name='value_bets')
+    op.drop_index(op.f('ix_value_bets_id'), table_name='value_bets')
+    op.drop_table('value_bets')
@@ -0,0 +1,27 @@
+"""Add composite (match_date, id) indexes for cursor pagination
+
+Revision ID: 2026_02_16_match_keyset_index
+Revises: 2026_02_15_value_bets
+Create Date: 2026-02-16 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2026_02_16_match_keyset_index'
+down_revision = '2026_02_15_value_bets'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Pagination par curseur sur (match_date, id), globale et par compétition
+    op.create_index('ix_matches_date_id', 'matches', ['match_date', 'id'], unique=False)
+    op.create_index('ix_matches_competition_date_id', 'matches', ['competition_code', 'match_date', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_matches_competition_date_id', table_name='matches')
+    op.drop_index('ix_matches_date_id', table_name='matches')
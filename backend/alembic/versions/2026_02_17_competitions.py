@@ -0,0 +1,42 @@
+"""Add competitions catalogue table
+
+Revision ID: 2026_02_17_competitions
+Revises: 2026_02_16_match_keyset_index
+Create Date: 2026-02-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2026_02_17_competitions'
+down_revision = '2026_02_16_match_keyset_index'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'competitions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('external_id', sa.Integer(), nullable=True),
+        sa.Column('code', sa.String(length=10), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('area', sa.String(length=100), nullable=True),
+        sa.Column('emblem', sa.String(length=500), nullable=True),
+        sa.Column('type', sa.String(length=20), nullable=True),
+        sa.Column('current_season', sa.Integer(), nullable=True),
+        sa.Column('current_matchday', sa.Integer(), nullable=True),
+        sa.Column('last_synced', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('external_id')
+    )
+    op.create_index(op.f('ix_competitions_id'), 'competitions', ['id'], unique=False)
+    op.create_index(op.f('ix_competitions_code'), 'competitions', ['code'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_competitions_code'), table_name='competitions')
+    op.drop_index(op.f('ix_competitions_id'), table_name='competitions')
+    op.drop_table('competitions')
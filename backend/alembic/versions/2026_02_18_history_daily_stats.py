@@ -0,0 +1,41 @@
+"""Add daily rollup table for history accuracy statistics
+
+Revision ID: 2026_02_18_history_daily_stats
+Revises: 2026_02_17_competitions
+Create Date: 2026-02-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2026_02_18_history_daily_stats'
+down_revision = '2026_02_17_competitions'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'history_daily_stats',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('competition_code', sa.String(length=10), nullable=False),
+        sa.Column('competition_name', sa.String(length=100), nullable=True),
+        sa.Column('total', sa.Integer(), nullable=False),
+        sa.Column('correct_winner', sa.Integer(), nullable=False),
+        sa.Column('correct_score', sa.Integer(), nullable=False),
+        sa.Column('correct_goals', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('day', 'competition_code', name='uq_history_daily_stat_day_competition')
+    )
+    op.create_index(op.f('ix_history_daily_stats_id'), 'history_daily_stats', ['id'], unique=False)
+    op.create_index(op.f('ix_history_daily_stats_day'), 'history_daily_stats', ['day'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_history_daily_stats_day'), table_name='history_daily_stats')
+    op.drop_index(op.f('ix_history_daily_stats_id'), table_name='history_daily_stats')
+    op.drop_table('history_daily_stats')
@@ -8,7 +8,7 @@ from fastapi import APIRouter, Depends, HTTPException, Header
 from sqlalchemy.orm import Session
 from typing import Optional
 
-from core.database import get_db
+from core.database import DatabaseRunner, get_db, get_db_runner
 from services.match_sync import MatchSyncService
 from services.standing_sync import StandingSyncService
 
@@ -119,81 +119,71 @@ async def sync_all(
 async def regenerate_predictions(
     competition: Optional[str] = None,
     limit: int = 50,
-    db: Session = Depends(get_db),
+    runner: DatabaseRunner = Depends(get_db_runner),
 ):
     """
     Régénère les prédictions avec les 3 logiques (Papa, Grand Frère, Ma Logique).
     
-    Supprime les anciennes prédictions et en génère de nouvelles avec
-    les scores individuels de chaque logique.
+    Recalcule les prédictions des prochains matchs: seules celles dont
+    l'empreinte des entrées (classement, forme, H2H, blessures, poids) a
+    changé sont réécrites, les autres sont comptées comme inchangées.
     
     Args:
         competition: Code de la compétition (optionnel, toutes si non spécifié)
         limit: Nombre maximum de matchs à traiter
     
     Returns:
-        Nombre de prédictions régénérées
+        Compteurs du recalcul (recalculées / inchangées), et jusqu'à 5
+        erreurs "domicile vs extérieur: message". Les prédictions sont mises
+        à jour en place: predictions_deleted vaut toujours 0.
     """
     from models.match import Match
-    from models.prediction import ExpertPrediction
     from services.prediction_service import PredictionService
     from datetime import datetime, timezone
     
-    try:
-        # Récupérer les matchs à venir
-        query = db.query(Match).filter(
-            Match.match_date > datetime.now(timezone.utc),
-            Match.status.in_(["SCHEDULED", "TIMED"])
-        )
-        
-        if competition:
-            query = query.filter(Match.competition_code == competition)
-        
-        matches = query.order_by(Match.match_date).limit(limit).all()
-        
-        if not matches:
+    async def regenerate(db: Session):
+        try:
+            # Récupérer les matchs à venir
+            query = db.query(Match).filter(
+                Match.match_date > datetime.now(timezone.utc),
+                Match.status.in_(["SCHEDULED", "TIMED"])
+            )
+            
+            if competition:
+                query = query.filter(Match.competition_code == competition)
+            
+            matches = query.order_by(Match.match_date).limit(limit).all()
+            
+            if not matches:
+                return {
+                    "success": True,
+                    "message": "Aucun match à traiter",
+                    "predictions_regenerated": 0
+                }
+            
+            # Recalculer uniquement les prédictions dont les entrées ont changé
+            pred_service = PredictionService(db)
+            report = await pred_service.recompute_predictions(matches)
+            
             return {
                 "success": True,
-                "message": "Aucun match à traiter",
-                "predictions_regenerated": 0
+                "message": f"Prédictions recalculées avec les 3 logiques",
+                "predictions_deleted": 0,
+                "predictions_regenerated": report["created"] + report["updated"],
+                "predictions_unchanged": report["unchanged"],
+                "total_matches": len(matches),
+                "errors": report["error_messages"][:5] or None
             }
-        
-        # Supprimer les anciennes prédictions pour ces matchs
-        match_ids = [m.id for m in matches]
-        deleted = db.query(ExpertPrediction).filter(
-            ExpertPrediction.match_id.in_(match_ids)
-        ).delete(synchronize_session=False)
-        db.commit()
-        
-        # Régénérer les prédictions avec les 3 logiques
-        pred_service = PredictionService(db)
-        count = 0
-        errors = []
-        
-        for match in matches:
-            try:
-                await pred_service.generate_prediction(match)
-                count += 1
-            except Exception as e:
-                db.rollback()
-                errors.append(f"{match.home_team} vs {match.away_team}: {str(e)}")
-        
-        return {
-            "success": True,
-            "message": f"Prédictions régénérées avec les 3 logiques",
-            "predictions_deleted": deleted,
-            "predictions_regenerated": count,
-            "total_matches": len(matches),
-            "errors": errors[:5] if errors else None
-        }
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Erreur de régénération: {str(e)}")
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Erreur de régénération: {str(e)}")
+    
+    return await runner.run_async(regenerate)
 
 
 @router.post("/regenerate-match/{match_id}")
 async def regenerate_match_prediction(
     match_id: int,
-    db: Session = Depends(get_db),
+    runner: DatabaseRunner = Depends(get_db_runner),
 ):
     """
     Régénère la prédiction pour un match spécifique.
@@ -208,30 +198,233 @@ async def regenerate_match_prediction(
     from models.prediction import ExpertPrediction
     from services.prediction_service import PredictionService
     
+    async def regenerate(db: Session):
+        try:
+            # Récupérer le match
+            match = db.query(Match).filter(Match.id == match_id).first()
+            
+            if not match:
+                raise HTTPException(status_code=404, detail=f"Match {match_id} non trouvé")
+            
+            # Supprimer l'ancienne prédiction si elle existe
+            deleted = db.query(ExpertPrediction).filter(
+                ExpertPrediction.match_id == match_id
+            ).delete(synchronize_session=False)
+            db.commit()
+            
+            # Régénérer la prédiction
+            pred_service = PredictionService(db)
+            await pred_service.generate_prediction(match)
+            
+            return {
+                "success": True,
+                "message": f"Prédiction régénérée pour {match.home_team} vs {match.away_team}",
+                "match_id": match_id,
+                "predictions_deleted": deleted
+            }
+        except HTTPException:
+            raise
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+    
+    return await runner.run_async(regenerate)
+
+
+@router.post("/features/rebuild")
+async def rebuild_feature_store(
+    db: Session = Depends(get_db),
+):
+    """
+    Reconstruit le feature store point-in-time depuis les matchs terminés.
+    
+    À lancer après un import historique massif; en temps normal le store
+    est mis à jour de façon incrémentale par la synchronisation des scores.
+    
+    Returns:
+        Nombre de snapshots écrits
+    """
+    from services.feature_store import FeatureStore
+    
     try:
-        # Récupérer le match
-        match = db.query(Match).filter(Match.id == match_id).first()
-        
-        if not match:
-            raise HTTPException(status_code=404, detail=f"Match {match_id} non trouvé")
-        
-        # Supprimer l'ancienne prédiction si elle existe
-        deleted = db.query(ExpertPrediction).filter(
-            ExpertPrediction.match_id == match_id
-        ).delete(synchronize_session=False)
+        count = FeatureStore(db).rebuild()
+        return {
+            "success": True,
+            "message": "Feature store reconstruit",
+            "snapshots_written": count
+        }
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Erreur de reconstruction: {str(e)}")
+
+
+@router.post("/ratings/rebuild")
+async def rebuild_team_ratings(
+    db: Session = Depends(get_db),
+):
+    """
+    Recalcule le classement Elo des équipes depuis les matchs terminés.
+    
+    À lancer après un import historique massif; en temps normal l'Elo est
+    mis à jour match par match par la synchronisation des scores.
+    
+    Returns:
+        Nombre de lignes d'historique écrites
+    """
+    from services.team_ratings import TeamRatingService
+    
+    try:
+        count = TeamRatingService(db).rebuild()
+        return {
+            "success": True,
+            "message": "Classement Elo reconstruit",
+            "history_written": count
+        }
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Erreur de reconstruction: {str(e)}")
+
+
+@router.get("/weights")
+async def list_weights(
+    engine: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Liste les jeux de poids versionnés (APEX-30, mélange des logiques).
+    
+    Args:
+        engine: Filtrer par moteur (apex30, multi_logic)
+    
+    Returns:
+        Jeux de poids, du plus récent au plus ancien
+    """
+    import json
+    from services.weight_sets import list_weight_sets
+    
+    return [
+        {
+            "id": ws.id,
+            "engine": ws.engine,
+            "version": ws.version,
+            "weights": json.loads(ws.weights),
+            "objective": ws.objective,
+            "metrics": json.loads(ws.metrics) if ws.metrics else None,
+            "is_active": ws.is_active,
+            "created_at": ws.created_at,
+        }
+        for ws in list_weight_sets(db, engine)
+    ]
+
+
+@router.post("/weights/{weight_set_id}/activate")
+async def activate_weights(
+    weight_set_id: int,
+    db: Session = Depends(get_db),
+):
+    """
+    Active un jeu de poids (les moteurs le chargent à la prochaine prédiction).
+    
+    Args:
+        weight_set_id: ID du jeu de poids
+    
+    Returns:
+        Version activée
+    """
+    from models.weight_set import WeightSet
+    from services.weight_sets import activate_weight_set
+    
+    weight_set = db.query(WeightSet).filter(WeightSet.id == weight_set_id).first()
+    if not weight_set:
+        raise HTTPException(status_code=404, detail=f"Jeu de poids {weight_set_id} non trouvé")
+    
+    activate_weight_set(db, weight_set)
+    db.commit()
+    return {
+        "success": True,
+        "message": f"Jeu de poids {weight_set.version} activé",
+        "engine": weight_set.engine,
+        "version": weight_set.version
+    }
+
+
+@router.post("/league-coefficients/refresh")
+async def refresh_league_coefficients(
+    db: Session = Depends(get_db),
+):
+    """
+    Réajuste la force des championnats sur tous les matchs européens terminés.
+    
+    En temps normal les coefficients sont mis à jour par la synchronisation
+    des scores; à lancer après un import historique.
+    
+    Returns:
+        Nombre de coefficients enregistrés
+    """
+    from services.league_coefficients import LeagueCoefficientService
+    
+    try:
+        count = LeagueCoefficientService(db).refresh()
         db.commit()
-        
-        # Régénérer la prédiction
-        pred_service = PredictionService(db)
-        await pred_service.generate_prediction(match)
-        
         return {
             "success": True,
-            "message": f"Prédiction régénérée pour {match.home_team} vs {match.away_team}",
-            "match_id": match_id,
-            "predictions_deleted": deleted
+            "message": "Coefficients des championnats réajustés",
+            "coefficients_written": count
         }
-    except HTTPException:
-        raise
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Erreur: {str(e)}")
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Erreur d'ajustement: {str(e)}")
+
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """
+    Statistiques du cache de réponses des listes de matchs.
+    
+    Returns:
+        Succès (mémoire / Redis), échecs, taux de succès, invalidations, version
+    """
+    from core.cache import response_cache
+    
+    return response_cache.metrics()
+
+
+@router.post("/history-stats/rebuild")
+async def rebuild_history_stats(db: Session = Depends(get_db)):
+    """
+    Reconstruit le cumul quotidien des statistiques de l'historique.
+    
+    À lancer après un import de données hors synchronisation; sinon fait
+    chaque nuit par le scheduler.
+    """
+    from services.history_stats import HistoryStatsService
+    
+    try:
+        rows = HistoryStatsService(db).rebuild()
+        return {"success": True, "rows": rows}
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Erreur de reconstruction: {str(e)}")
+
+
+@router.get("/events/stats")
+async def get_events_stats():
+    """
+    Statistiques du flux en direct des matchs (SSE).
+    
+    Returns:
+        Événements publiés, livrés, ignorés (abonnés lents), reçus via Redis, abonnés
+    """
+    from core.events import match_events
+    
+    return match_events.metrics()
+
+
+@router.post("/cache/invalidate")
+async def invalidate_cache():
+    """
+    Invalide toutes les réponses en cache (nouvelle version des données).
+    """
+    from core.cache import response_cache
+    
+    response_cache.bump_version()
+    return {"success": True, "version": response_cache.version()}
@@ -4,19 +4,29 @@ Routes API pour les matchs, compétitions et prédictions.
 Ces endpoints exposent les données Football-Data.org au frontend.
 La logique métier est dans controllers/.
 """
-from fastapi import APIRouter, Depends, Query
+from datetime import datetime, timedelta, timezone
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import Optional
-
-from core.database import get_db
+from typing import Optional, List
+import asyncio
+
+from core.cache import response_cache
+from core.config import settings
+from core.database import DatabaseRunner, get_db, get_db_runner
+from core.events import format_sse, match_events
+from core.responses import json_response
 from schemas.match import (
     MatchResponse,
     MatchListResponse,
     CompetitionResponse,
     CompetitionListResponse,
     StandingsResponse,
+    SeasonProjectionResponse,
+    KnockoutProjectionResponse,
     PredictionResponse,
     CombinedPredictionResponse,
+    CombinedPredictionListResponse,
     Apex30FullReport
 )
 from schemas.h2h import H2HResponse
@@ -32,90 +42,255 @@ router = APIRouter(prefix="/matches", tags=["Matches & Predictions"])
 # =====================
 
 @router.get("/competitions", response_model=CompetitionListResponse)
-async def get_competitions():
-    """Liste toutes les compétitions disponibles."""
-    return await matches_controller.get_competitions()
+async def get_competitions(runner: DatabaseRunner = Depends(get_db_runner)):
+    """Liste toutes les compétitions disponibles (catalogue en base, réponse en cache)."""
+    return await response_cache.cached_json_async(
+        "matches/competitions", {},
+        lambda: runner.run_async(matches_controller.get_competitions)
+    )
 
 
 @router.get("/competitions/{code}", response_model=CompetitionResponse)
-async def get_competition(code: str):
-    """Détails d'une compétition spécifique."""
-    return await matches_controller.get_competition(code)
+async def get_competition(code: str, runner: DatabaseRunner = Depends(get_db_runner)):
+    """Détails d'une compétition spécifique (catalogue en base, réponse en cache)."""
+    return await response_cache.cached_json_async(
+        "matches/competition", {"code": code.upper()},
+        lambda: runner.run_async(matches_controller.get_competition, code)
+    )
 
 
 @router.get("/competitions/{code}/standings", response_model=StandingsResponse)
 async def get_standings(
     code: str,
     refresh: bool = Query(False, description="Forcer rafraîchissement"),
-    db: Session = Depends(get_db)
+    if_none_match: Optional[str] = Header(None),
+    runner: DatabaseRunner = Depends(get_db_runner)
 ):
     """
     Récupère le classement d'une compétition.
     
     Les données sont mises en cache en DB (rafraîchies toutes les 6h).
-    Utilisez refresh=true pour forcer la mise à jour.
+    Utilisez refresh=true pour forcer la mise à jour. ETag: 304 si le
+    classement n'a pas changé depuis la dernière lecture du client.
+    """
+    if refresh:
+        return await runner.run_async(standings_controller.get_standings, code, True)
+    return await response_cache.conditional_json_async(
+        if_none_match, "matches/standings", {"code": code.upper()},
+        lambda: runner.run_async(standings_controller.get_standings, code)
+    )
+
+
+@router.get("/competitions/{code}/projections", response_model=SeasonProjectionResponse)
+async def get_projections(
+    code: str,
+    simulations: int = Query(
+        20000, ge=1000, le=200000,
+        description="Nombre de saisons simulées (arrondi à 5000, 20000 ou 50000)"
+    ),
+    runner: DatabaseRunner = Depends(get_db_runner)
+):
+    """
+    Projection de fin de saison: probabilités de titre, d'Europe et de relégation.
+    
+    Simulation de Monte Carlo des matchs restants (pool de threads), en cache
+    jusqu'à la prochaine synchronisation du classement.
+    """
+    return await runner.run_blocking(standings_controller.get_projections, code, simulations)
+
+
+@router.get("/competitions/{code}/bracket", response_model=KnockoutProjectionResponse)
+async def get_bracket(
+    code: str,
+    simulations: int = Query(
+        20000, ge=1000, le=200000,
+        description="Nombre de tableaux simulés (arrondi à 5000, 20000 ou 50000)"
+    ),
+    runner: DatabaseRunner = Depends(get_db_runner)
+):
+    """
+    Projection de la phase à élimination directe (CL, EL, ECL, WC, EC).
+    
+    Probabilités de qualification par confrontation (aller-retour,
+    prolongation, tirs au but) et de chaque tour atteint par équipe,
+    simulées dans le pool de threads.
     """
-    return await standings_controller.get_standings(db, code, force_refresh=refresh)
+    return await runner.run_blocking(standings_controller.get_bracket, code, simulations)
 
 
 # =====================
 # Endpoints Matchs
 # =====================
 
+# Projection des listes: schéma allégé et/ou sous-ensemble de champs
+VIEW_QUERY = Query(None, description="full (défaut) ou compact (schéma allégé)")
+FIELDS_QUERY = Query(None, description="Champs servis, séparés par des virgules (ex: home_team,away_team,prediction)")
+
 @router.get("", response_model=MatchListResponse)
 async def get_matches(
     competition: Optional[str] = Query(None, description="Code compétition (PL, FL1...)"),
     status: Optional[str] = Query(None, description="SCHEDULED, FINISHED, LIVE"),
     date: Optional[str] = Query(None, description="Date format YYYY-MM-DD"),
     limit: int = Query(20, ge=1, le=100),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="Curseur de pagination (next_cursor de la page précédente)"),
+    view: Optional[str] = VIEW_QUERY,
+    fields: Optional[str] = FIELDS_QUERY,
+    runner: DatabaseRunner = Depends(get_db_runner)
 ):
-    """Récupère la liste des matchs avec filtres optionnels."""
-    return matches_controller.get_matches(db, competition, status, date, limit)
+    """Récupère la liste des matchs avec filtres optionnels (pagination par curseur)."""
+    return json_response(await runner.run(
+        matches_controller.get_matches, competition, status, date, limit, cursor, view, fields
+    ))
 
 
 @router.get("/upcoming", response_model=MatchListResponse)
 async def get_upcoming_matches(
     limit: int = Query(20, ge=1, le=50),
-    db: Session = Depends(get_db)
+    view: Optional[str] = VIEW_QUERY,
+    fields: Optional[str] = FIELDS_QUERY,
+    runner: DatabaseRunner = Depends(get_db_runner)
 ):
-    """Récupère les prochains matchs programmés."""
-    return matches_controller.get_upcoming_matches(db, limit)
+    """Récupère les prochains matchs programmés (réponse en cache)."""
+    return await response_cache.cached_json_async(
+        "matches/upcoming", {"limit": limit, "view": view, "fields": fields},
+        lambda: runner.run(matches_controller.get_upcoming_matches, limit, view, fields)
+    )
 
 
 @router.get("/today", response_model=MatchListResponse)
-async def get_today_matches(db: Session = Depends(get_db)):
-    """Récupère les matchs du jour."""
-    return matches_controller.get_today_matches(db)
+async def get_today_matches(
+    view: Optional[str] = VIEW_QUERY,
+    fields: Optional[str] = FIELDS_QUERY,
+    if_none_match: Optional[str] = Header(None),
+    runner: DatabaseRunner = Depends(get_db_runner)
+):
+    """Récupère les matchs du jour (réponse en cache, ETag: 304 si inchangés)."""
+    today = datetime.now(timezone.utc).date().isoformat()
+    return await response_cache.conditional_json_async(
+        if_none_match, "matches/today", {"date": today, "view": view, "fields": fields},
+        lambda: runner.run(matches_controller.get_today_matches, view, fields)
+    )
 
 
 @router.get("/history")
 async def get_historical_matches(
     date: Optional[str] = Query(None, description="Date format YYYY-MM-DD (défaut: hier)"),
     competition: Optional[str] = Query(None, description="Code compétition (PL, FL1...)"),
-    db: Session = Depends(get_db)
+    limit: Optional[int] = Query(None, ge=1, le=100, description="Taille de page (sans date: tout l'historique)"),
+    cursor: Optional[str] = Query(None, description="Curseur de pagination (next_cursor de la page précédente)"),
+    date_from: Optional[str] = Query(None, description="Début de période YYYY-MM-DD (semaine, mois, saison...)"),
+    date_to: Optional[str] = Query(None, description="Fin de période YYYY-MM-DD (défaut: aujourd'hui)"),
+    if_none_match: Optional[str] = Header(None),
+    runner: DatabaseRunner = Depends(get_db_runner)
 ):
     """
     Récupère l'historique des matchs terminés avec prédictions vs résultats réels.
     
     Retourne:
-    - Les matchs terminés du jour demandé
+    - Les matchs terminés du jour demandé, ou d'une période (`date_from` /
+      `date_to`, page par page), ou, sans date avec `limit`/`cursor`, de
+      tout l'historique du plus récent au plus ancien
     - Comparaison prédiction / résultat réel
-    - Statistiques de réussite
+    - Statistiques de réussite sur toute la période (agrégats SQL)
+    """
+    # Les dates par défaut (hier, aujourd'hui) font partie de la clé du cache
+    ranged = date is None and (date_from is not None or date_to is not None)
+    scrolling = date is None and not ranged and (limit is not None or cursor is not None)
+    today = datetime.now(timezone.utc).date()
+    day = None if ranged or scrolling else date or (today - timedelta(days=1)).isoformat()
+    return await response_cache.conditional_json_async(
+        if_none_match, "matches/history",
+        {
+            "date": day, "competition": competition, "limit": limit, "cursor": cursor,
+            "date_from": date_from, "date_to": (date_to or today.isoformat()) if ranged else None,
+        },
+        lambda: runner.run(
+            matches_controller.get_historical_matches, date, competition, limit, cursor, date_from, date_to
+        )
+    )
+
+
+@router.get("/predictions/combined", response_model=CombinedPredictionListResponse)
+async def get_combined_predictions(
+    ids: List[int] = Query(..., description="IDs des matchs (?ids=1&ids=2...)"),
+    db: Session = Depends(get_db)
+):
+    """
+    Prédictions combinées (3 logiques) pour plusieurs matchs en une requête.
+    
+    Les IDs inconnus sont listés dans `missing`, ceux sans données
+    suffisantes dans `insufficient`.
+    """
+    return await matches_controller.get_combined_predictions(db, ids)
+
+
+@router.get("/live")
+async def stream_live_matches(
+    request: Request,
+    competition: Optional[str] = Query(None, description="Codes compétition séparés par des virgules (PL,FL1...)"),
+    match_id: Optional[str] = Query(None, description="IDs des matchs séparés par des virgules"),
+):
     """
-    return matches_controller.get_historical_matches(db, date, competition)
+    Flux en direct des changements de matchs (Server-Sent Events).
+    
+    Remplace l'interrogation périodique des listes: le client garde une
+    connexion ouverte et reçoit un événement par changement publié après
+    chaque synchronisation:
+    - `match`: score ou statut modifié;
+    - `odds`: nouvelles cotes;
+    - `prediction`: prédiction créée ou recalculée.
+    
+    Sans filtre, tous les matchs sont diffusés. Un commentaire `: ping` est
+    envoyé à intervalle régulier pour garder la connexion ouverte.
+    """
+    competitions = [code.strip() for code in (competition or "").split(",") if code.strip()]
+    try:
+        match_ids = [int(value) for value in (match_id or "").split(",") if value.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"IDs de matchs invalides: {match_id}")
+    subscription = match_events.subscribe(competitions or None, match_ids or None)
+
+    async def stream():
+        try:
+            yield b"retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(subscription.get(), settings.events_heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield b": ping\n\n"
+                    continue
+                yield format_sse(event)
+        finally:
+            match_events.unsubscribe(subscription)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @router.get("/{match_id}", response_model=MatchResponse)
-async def get_match(match_id: int, db: Session = Depends(get_db)):
-    """Récupère les détails d'un match spécifique."""
-    return matches_controller.get_match_by_id(db, match_id)
+async def get_match(
+    match_id: int,
+    if_none_match: Optional[str] = Header(None),
+    runner: DatabaseRunner = Depends(get_db_runner)
+):
+    """Récupère les détails d'un match spécifique (ETag: 304 si inchangé)."""
+    return await response_cache.conditional_json_async(
+        if_none_match, "matches/detail", {"id": match_id},
+        lambda: runner.run(matches_controller.get_match_by_id, match_id)
+    )
 
 
 @router.get("/{match_id}/prediction", response_model=PredictionResponse)
-async def get_match_prediction(match_id: int, db: Session = Depends(get_db)):
-    """Récupère la prédiction d'un match."""
-    return await matches_controller.get_match_prediction(db, match_id)
+async def get_match_prediction(match_id: int, runner: DatabaseRunner = Depends(get_db_runner)):
+    """Récupère la prédiction d'un match (générée hors de la boucle principale si absente)."""
+    async def predict(db: Session) -> PredictionResponse:
+        prediction = await matches_controller.get_match_prediction(db, match_id)
+        return PredictionResponse.model_validate(prediction)
+    
+    return await runner.run_async(predict)
 
 
 @router.get("/{match_id}/h2h", response_model=H2HResponse)
@@ -153,30 +328,43 @@ async def get_apex30_report(match_id: int, db: Session = Depends(get_db)):
 # =====================
 
 @router.get("/competitions", response_model=CompetitionListResponse)
-async def get_competitions():
-    """Liste toutes les compétitions disponibles."""
-    return await matches_controller.get_competitions()
+async def get_competitions(runner: DatabaseRunner = Depends(get_db_runner)):
+    """Liste toutes les compétitions disponibles (catalogue en base, réponse en cache)."""
+    return await response_cache.cached_json_async(
+        "matches/competitions", {},
+        lambda: runner.run_async(matches_controller.get_competitions)
+    )
 
 
 @router.get("/competitions/{code}", response_model=CompetitionResponse)
-async def get_competition(code: str):
-    """Détails d'une compétition spécifique."""
-    return await matches_controller.get_competition(code)
+async def get_competition(code: str, runner: DatabaseRunner = Depends(get_db_runner)):
+    """Détails d'une compétition spécifique (catalogue en base, réponse en cache)."""
+    return await response_cache.cached_json_async(
+        "matches/competition", {"code": code.upper()},
+        lambda: runner.run_async(matches_controller.get_competition, code)
+    )
 
 
 @router.get("/competitions/{code}/standings", response_model=StandingsResponse)
 async def get_standings(
     code: str,
     refresh: bool = Query(False, description="Forcer rafraîchissement"),
-    db: Session = Depends(get_db)
+    if_none_match: Optional[str] = Header(None),
+    runner: DatabaseRunner = Depends(get_db_runner)
 ):
     """
     Récupère le classement d'une compétition.
     
     Les données sont mises en cache en DB (rafraîchies toutes les 6h).
-    Utilisez refresh=true pour forcer la mise à jour.
+    Utilisez refresh=true pour forcer la mise à jour. ETag: 304 si le
+    classement n'a pas changé depuis la dernière lecture du client.
     """
-    return await standings_controller.get_standings(db, code, force_refresh=refresh)
+    if refresh:
+        return await runner.run_async(standings_controller.get_standings, code, True)
+    return await response_cache.conditional_json_async(
+        if_none_match, "matches/standings", {"code": code.upper()},
+        lambda: runner.run_async(standings_controller.get_standings, code)
+    )
 
 
 # =====================
@@ -189,7 +377,7 @@ async def sync_matches(
     db: Session = Depends(get_db)
 ):
     """Synchronise les matchs depuis Football-Data.org."""
-    return await matches_controller.sync_matches(db, competition)
+    return json_response(await matches_controller.sync_matches(db, competition))
 
 
 @router.post("/standings/sync", tags=["Admin"])
@@ -198,14 +386,20 @@ async def sync_standings(
     db: Session = Depends(get_db)
 ):
     """Synchronise les classements depuis Football-Data.org."""
-    return await standings_controller.sync_standings(db, competition)
+    return json_response(await standings_controller.sync_standings(db, competition))
 
 
 @router.post("/predictions/generate", tags=["Admin"])
 async def generate_predictions(
     limit: int = Query(20, ge=1, le=100),
-    force: bool = Query(False, description="Si True, supprime les anciennes prédictions avant de régénérer"),
-    db: Session = Depends(get_db)
+    force: bool = Query(False, description="Si True, recalcule les prédictions dont les entrées ont changé"),
+    runner: DatabaseRunner = Depends(get_db_runner)
 ):
-    """Génère des prédictions pour les matchs à venir. force=True pour régénérer toutes."""
-    return await matches_controller.generate_predictions(db, limit, force)
+    """
+    Génère des prédictions pour les matchs à venir.
+    
+    force=True recalcule les prochains matchs; les prédictions dont
+    l'empreinte des entrées est inchangée ne sont pas réécrites. La
+    génération s'exécute hors de la boucle principale.
+    """
+    return json_response(await runner.run_async(matches_controller.generate_predictions, limit, force))
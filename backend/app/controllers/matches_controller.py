@@ -3,44 +3,121 @@ Controller pour les matchs, compétitions et prédictions.
 
 Contient toute la logique métier pour les endpoints matches.
 """
-from typing import Optional, List
-from datetime import datetime, timezone, timedelta
+from typing import Any, Optional, List, Dict, Iterable, Tuple, Union
+from datetime import date, datetime, timezone, timedelta
 from sqlalchemy.orm import Session, joinedload
 from fastapi import HTTPException
+from threading import Lock
+import asyncio
 import logging
  
 logger = logging.getLogger(__name__)
 
+from models.competition import Competition
 from models.match import Match
 from models.prediction import ExpertPrediction
+from models.standing import Standing
 from schemas.match import (
     MatchResponse,
     MatchListResponse,
+    MatchCompactResponse,
+    MatchCompactListResponse,
     CompetitionResponse,
     CompetitionListResponse,
-    StandingsResponse,
-    StandingEntry,
     PredictionSummary,
     PredictionResponse,
     CombinedPredictionResponse,
+    CombinedPredictionListResponse,
     LogicPredictionResult,
     LogicEvidenceSchema,
     Apex30FullReport,
     Apex30ModuleReport
 )
-from services.football_api import football_data_service, FootballDataService
+from core.pagination import keyset_page
+from core.projection import ListProjection, list_load_options, parse_projection
+from services.competition_sync import CompetitionSyncService
+from services.football_api import football_data_service
+from services.history_stats import HistoryStatsService
 from services.match_sync import MatchSyncService
 from services.prediction_service import PredictionService
 from services.multi_logic_engine import MultiLogicPredictionEngine
 from schemas.h2h import H2HResponse
 
 
+# Nombre maximum de matchs pour une prédiction combinée groupée
+MAX_COMBINED_BATCH = 50
+
+# Catalogue des compétitions: resynchronisé par une requête seulement s'il est
+# vide ou si le job hebdomadaire a manqué un passage (âge en heures)
+CATALOGUE_MAX_AGE_HOURS = 24 * 14
+# Une seule synchronisation du catalogue à la fois, toutes boucles confondues
+_catalogue_lock = Lock()
+
+# Seules les compétitions VRAIMENT internationales sans classement de ligue
+# CL et EL ont maintenant des classements depuis le nouveau format 2024/2025
+INTERNATIONAL_COMPETITIONS = ['WC', 'EC']  # World Cup, Euro Championship
+
+
 # =====================
 # Helpers
 # =====================
 
-def match_to_response(match: Match, db: Session = None) -> MatchResponse:
-    """Convertit un Match en MatchResponse avec prédiction et classement."""
+StandingLookup = Dict[Tuple[str, int], Tuple[Optional[int], Optional[int]]]
+
+
+def load_standings_lookup(db: Session, matches: Iterable[Match]) -> StandingLookup:
+    """
+    Classement (position, points) de toutes les équipes d'une page de matchs.
+    
+    Une seule requête pour toute la page; pour chaque (compétition, équipe),
+    la ligne la plus récemment synchronisée l'emporte.
+    
+    Args:
+        db: Session SQLAlchemy
+        matches: Matchs de la page
+        
+    Returns:
+        Dictionnaire {(code compétition, team_id): (position, points)}
+    """
+    pairs = {
+        (m.competition_code, team_id)
+        for m in matches
+        if m.competition_code and m.competition_code not in INTERNATIONAL_COMPETITIONS
+        for team_id in (m.home_team_id, m.away_team_id) if team_id
+    }
+    if not pairs:
+        return {}
+    
+    rows = db.query(
+        Standing.competition_code, Standing.team_id, Standing.position, Standing.points
+    ).filter(
+        Standing.competition_code.in_({code for code, _ in pairs}),
+        Standing.team_id.in_({team_id for _, team_id in pairs})
+    ).order_by(Standing.last_synced.asc().nullsfirst(), Standing.id)
+    
+    lookup: StandingLookup = {}
+    for code, team_id, position, points in rows:
+        if (code, team_id) in pairs:
+            lookup[(code, team_id)] = (position, points)  # Tri croissant: la plus récente écrase
+    return lookup
+
+
+def matches_to_responses(db: Session, matches: List[Match]) -> List[MatchResponse]:
+    """Convertit une page de matchs (classements chargés en une requête)."""
+    standings = load_standings_lookup(db, matches)
+    return [match_to_response(m, db, standings) for m in matches]
+
+
+def match_to_response(match: Match, db: Session = None, standings: Optional[StandingLookup] = None) -> MatchResponse:
+    """
+    Convertit un Match en MatchResponse avec prédiction et classement.
+    
+    Args:
+        match: Match à convertir
+        db: Session SQLAlchemy (classements chargés pour ce seul match si
+            `standings` n'est pas fourni)
+        standings: Classements préchargés (voir load_standings_lookup)
+    """
     prediction = None
     if match.expert_prediction:
         pred = match.expert_prediction
@@ -88,41 +165,33 @@ def match_to_response(match: Match, db: Session = None) -> MatchResponse:
             gf_home_league_level=getattr(pred, 'gf_home_league_level', None),
             gf_away_league_level=getattr(pred, 'gf_away_league_level', None),
             gf_home_advantage_bonus=getattr(pred, 'gf_home_advantage_bonus', None),
-            gf_verdict=getattr(pred, 'gf_verdict', None)
+            gf_verdict=getattr(pred, 'gf_verdict', None),
+            # Marchés (matrice de scores)
+            prob_home_win=getattr(pred, 'prob_home_win', None),
+            prob_draw=getattr(pred, 'prob_draw', None),
+            prob_away_win=getattr(pred, 'prob_away_win', None),
+            prob_over_2_5=getattr(pred, 'prob_over_2_5', None),
+            prob_btts=getattr(pred, 'prob_btts', None),
+            expected_home_goals=getattr(pred, 'expected_home_goals', None),
+            expected_away_goals=getattr(pred, 'expected_away_goals', None),
+            # Marché (cotes sans marge)
+            market_prob_home=getattr(pred, 'market_prob_home', None),
+            market_prob_draw=getattr(pred, 'market_prob_draw', None),
+            market_prob_away=getattr(pred, 'market_prob_away', None),
+            blend_prob_home=getattr(pred, 'blend_prob_home', None),
+            blend_prob_draw=getattr(pred, 'blend_prob_draw', None),
+            blend_prob_away=getattr(pred, 'blend_prob_away', None)
         )
     
     # Récupérer les données de classement si DB session fournie
     home_position, home_points = None, None
     away_position, away_points = None, None
     
-    if db and match.home_team_id and match.competition_code:
-        from models.standing import Standing
-        
-        # Seules les compétitions VRAIMENT internationales sans classement de ligue
-        # CL et EL ont maintenant des classements depuis le nouveau format 2024/2025
-        international_competitions = ['WC', 'EC']  # World Cup, Euro Championship
-        
-        if match.competition_code not in international_competitions:
-            # Classement équipe domicile (prendre le plus récent)
-            home_standing = db.query(Standing).filter(
-                Standing.team_id == match.home_team_id,
-                Standing.competition_code == match.competition_code
-            ).order_by(Standing.last_synced.desc()).first()
-            
-            if home_standing:
-                home_position = home_standing.position
-                home_points = home_standing.points
-            
-            # Classement équipe extérieur  
-            if match.away_team_id:
-                away_standing = db.query(Standing).filter(
-                    Standing.team_id == match.away_team_id,
-                    Standing.competition_code == match.competition_code
-                ).order_by(Standing.last_synced.desc()).first()
-                
-                if away_standing:
-                    away_position = away_standing.position
-                    away_points = away_standing.points
+    if standings is None and db is not None:
+        standings = load_standings_lookup(db, [match])
+    if standings:
+        home_position, home_points = standings.get((match.competition_code, match.home_team_id), (None, None))
+        away_position, away_points = standings.get((match.competition_code, match.away_team_id), (None, None))
     
     return MatchResponse(
         id=match.id,
@@ -152,20 +221,98 @@ def match_to_response(match: Match, db: Session = None) -> MatchResponse:
     )
 
 
+def match_to_fields(match: Match, projection: ListProjection, standings: StandingLookup) -> Dict[str, Any]:
+    """
+    Champs d'un match retenus par une projection (colonnes chargées uniquement).
+    
+    Args:
+        match: Match chargé avec list_load_options(projection)
+        projection: Projection de la liste
+        standings: Classements préchargés (vide si non demandés)
+    """
+    selected = projection.selected
+    data = {name: getattr(match, name) for name in selected if name in Match.__table__.columns}
+    if projection.wants_standings:
+        home_position, home_points = standings.get((match.competition_code, match.home_team_id), (None, None))
+        away_position, away_points = standings.get((match.competition_code, match.away_team_id), (None, None))
+        standing_values = {
+            "home_standing_position": home_position, "home_standing_points": home_points,
+            "away_standing_position": away_position, "away_standing_points": away_points,
+        }
+        data.update({name: value for name, value in standing_values.items() if name in selected})
+    if "prediction" in selected:
+        pred = match.expert_prediction
+        data["prediction"] = projection.prediction_schema.model_validate(pred, from_attributes=True) if pred else None
+    return data
+
+
+def project_matches(
+    db: Session,
+    matches: List[Match],
+    projection: ListProjection,
+    next_cursor: Optional[str] = None
+) -> Union[MatchListResponse, MatchCompactListResponse, Dict[str, Any]]:
+    """
+    Réponse d'une liste de matchs selon la projection demandée.
+    
+    Returns:
+        MatchListResponse (défaut), MatchCompactListResponse (view=compact)
+        ou dictionnaire limité aux champs demandés (fields=...)
+    """
+    if projection.is_default:
+        responses = matches_to_responses(db, matches)
+        return MatchListResponse(count=len(responses), matches=responses, next_cursor=next_cursor)
+    
+    standings = load_standings_lookup(db, matches) if projection.wants_standings else {}
+    rows = [match_to_fields(m, projection, standings) for m in matches]
+    if projection.fields is None:
+        return MatchCompactListResponse(
+            count=len(rows), matches=[MatchCompactResponse(**row) for row in rows], next_cursor=next_cursor
+        )
+    return {"count": len(rows), "matches": rows, "next_cursor": next_cursor}
+
+
+def _projection(view: Optional[str], fields: Optional[str]) -> ListProjection:
+    """Projection des paramètres view/fields; valeur inconnue -> 400."""
+    try:
+        return parse_projection(view, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 # =====================
 # Match Controllers
 # =====================
 
+def _page(query, limit: int, cursor: Optional[str], descending: bool = True):
+    """Page keyset (match_date, id); curseur invalide -> 400."""
+    try:
+        return keyset_page(query, limit, cursor, descending)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Curseur de pagination invalide")
+
+
 def get_matches(
     db: Session,
     competition: Optional[str] = None,
     status: Optional[str] = None,
     date: Optional[str] = None,
-    limit: int = 20
-) -> MatchListResponse:
-    """Récupère la liste des matchs avec filtres."""
-    # Optimisation: joinedload pour éviter N+1 sur 'expert_prediction'
-    query = db.query(Match).options(joinedload(Match.expert_prediction))
+    limit: int = 20,
+    cursor: Optional[str] = None,
+    view: Optional[str] = None,
+    fields: Optional[str] = None
+) -> Union[MatchListResponse, MatchCompactListResponse, Dict[str, Any]]:
+    """
+    Récupère la liste des matchs avec filtres, plus récents d'abord.
+    
+    Pagination par curseur: `next_cursor` de la réponse donne la page
+    suivante. Sans date, la première page couvre les 7 derniers jours et les
+    30 prochains; les pages suivantes continuent dans l'historique.
+    `view`/`fields` limitent les colonnes lues et les champs servis.
+    """
+    projection = _projection(view, fields)
+    # Colonnes de la projection; prédiction jointe (pas de N+1)
+    query = db.query(Match).options(*list_load_options(projection))
     
     if competition:
         query = query.filter(Match.competition_code == competition.upper())
@@ -181,7 +328,7 @@ def get_matches(
             query = query.filter(Match.match_date >= start, Match.match_date < end)
         except ValueError:
             raise HTTPException(status_code=400, detail="Format date invalide. Utilisez YYYY-MM-DD")
-    else:
+    elif cursor is None:
         # Par défaut: matchs des 7 derniers jours + 30 prochains jours
         now = datetime.now()
         date_from = now - timedelta(days=7)
@@ -189,188 +336,191 @@ def get_matches(
         query = query.filter(Match.match_date >= date_from, Match.match_date <= date_to)
     
     # Trier par date décroissante (matchs récents/à venir en premier)
-    matches = query.order_by(Match.match_date.desc()).limit(limit).all()
-    match_responses = [match_to_response(m, db) for m in matches]
-    
-    return MatchListResponse(count=len(match_responses), matches=match_responses)
+    matches, next_cursor = _page(query, limit, cursor)
+    return project_matches(db, matches, projection, next_cursor)
 
 
-def get_upcoming_matches(db: Session, limit: int = 20) -> MatchListResponse:
+def get_upcoming_matches(
+    db: Session,
+    limit: int = 20,
+    view: Optional[str] = None,
+    fields: Optional[str] = None
+) -> Union[MatchListResponse, MatchCompactListResponse, Dict[str, Any]]:
     """Récupère les prochains matchs programmés."""
+    projection = _projection(view, fields)
     sync_service = MatchSyncService(db)
-    matches = sync_service.get_upcoming_matches(limit=limit)
-    match_responses = [match_to_response(m, db) for m in matches]
-    
-    return MatchListResponse(count=len(match_responses), matches=match_responses)
+    matches = sync_service.get_upcoming_matches(limit=limit, options=list_load_options(projection))
+    return project_matches(db, matches, projection)
 
 
-def get_today_matches(db: Session) -> MatchListResponse:
+def get_today_matches(
+    db: Session,
+    view: Optional[str] = None,
+    fields: Optional[str] = None
+) -> Union[MatchListResponse, MatchCompactListResponse, Dict[str, Any]]:
     """Récupère les matchs du jour."""
+    projection = _projection(view, fields)
     sync_service = MatchSyncService(db)
-    matches = sync_service.get_matches_by_date()
-    match_responses = [match_to_response(m, db) for m in matches]
+    matches = sync_service.get_matches_by_date(options=list_load_options(projection))
+    return project_matches(db, matches, projection)
+
+
+def _parse_day(value: str) -> date:
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Format de date invalide. Utilisez YYYY-MM-DD")
+
+
+def history_entry(match: Match) -> Dict[str, Any]:
+    """Match terminé de /history: score réel, prédiction et réussite."""
+    pred = match.expert_prediction
+    actual_home = match.score_home
+    actual_away = match.score_away
+    
+    # Résultat réel
+    if actual_home is not None and actual_away is not None:
+        if actual_home > actual_away:
+            actual_winner = "home"
+        elif actual_away > actual_home:
+            actual_winner = "away"
+        else:
+            actual_winner = "draw"
+        actual_goals = actual_home + actual_away
+    else:
+        actual_winner = None
+        actual_goals = None
+    
+    # Prédiction
+    pred_winner = None
+    winner_correct = False
+    score_correct = False
+    goals_correct = False
+    
+    if pred:
+        h = pred.home_score_forecast or 0
+        a = pred.away_score_forecast or 0
+        if h > a:
+            pred_winner = "home"
+        elif a > h:
+            pred_winner = "away"
+        else:
+            pred_winner = "draw"
+        
+        # Vérifier la réussite (mêmes règles que les agrégats SQL de HistoryStatsService)
+        if actual_winner:
+            winner_correct = pred_winner == actual_winner
+            score_correct = (h == actual_home and a == actual_away)
+            goals_correct = (h + a > 2.5) == (actual_goals > 2.5)
     
-    return MatchListResponse(count=len(match_responses), matches=match_responses)
+    return {
+        "id": match.id,
+        "competition_code": match.competition_code,
+        "competition_name": match.competition_name,
+        "home_team": match.home_team,
+        "home_team_short": match.home_team_short,
+        "home_team_crest": match.home_team_crest,
+        "away_team": match.away_team,
+        "away_team_short": match.away_team_short,
+        "away_team_crest": match.away_team_crest,
+        "match_date": match.match_date.isoformat() if match.match_date else None,
+        "actual": {
+            "home": actual_home,
+            "away": actual_away,
+            "winner": actual_winner
+        },
+        "prediction": {
+            "home": pred.home_score_forecast,
+            "away": pred.away_score_forecast,
+            "confidence": pred.confidence,
+            "tip": pred.bet_tip,
+            "winner": pred_winner
+        } if pred else None,
+        "success": {
+            "winner": winner_correct,
+            "score": score_correct,
+            "goals": goals_correct
+        } if pred and actual_winner else None
+    }
 
 
-def get_historical_matches(db: Session, date: Optional[str] = None, competition: Optional[str] = None):
+def get_historical_matches(
+    db: Session,
+    date: Optional[str] = None,
+    competition: Optional[str] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None
+):
     """
     Récupère l'historique des matchs terminés avec comparaison prédiction vs résultat.
     
+    Trois modes:
+    - par jour (défaut: hier), matchs dans l'ordre chronologique;
+    - période (`date_from` / `date_to`, bornes incluses): matchs de la
+      période, plus récents d'abord, page par page via `next_cursor`;
+    - défilement (sans date, avec `limit` ou `cursor`): tous les matchs
+      terminés, plus récents d'abord, page par page.
+    Les statistiques portent sur toute la période demandée (tout l'historique
+    en défilement), pas seulement sur la page: agrégats SQL groupés par
+    compétition (HistoryStatsService), en temps constant pour une semaine,
+    un mois ou une saison.
+    
     Args:
         db: Session de base de données
         date: Date au format YYYY-MM-DD (défaut: hier)
         competition: Code de la compétition (optionnel)
+        limit: Taille de page (pagination par curseur)
+        cursor: Curseur de la page précédente
+        date_from: Premier jour de la période (YYYY-MM-DD)
+        date_to: Dernier jour de la période (YYYY-MM-DD, défaut: aujourd'hui)
     
     Returns:
         Matchs terminés avec prédictions et statistiques de réussite
     """
-    from models.standing import Standing
-    
-    # Date par défaut = hier
-    if date:
-        try:
-            target_date = datetime.strptime(date, "%Y-%m-%d").date()
-        except ValueError:
-            raise HTTPException(status_code=400, detail="Format de date invalide. Utilisez YYYY-MM-DD")
+    ranged = date is None and (date_from is not None or date_to is not None)
+    scrolling = date is None and not ranged and (limit is not None or cursor is not None)
+    
+    # Période couverte (None = sans borne)
+    if ranged:
+        start = _parse_day(date_from) if date_from else None
+        end = _parse_day(date_to) if date_to else datetime.now(timezone.utc).date()
+        if start is not None and start > end:
+            raise HTTPException(status_code=400, detail="date_from doit précéder date_to")
+    elif scrolling:
+        start = end = None
     else:
-        target_date = (datetime.now(timezone.utc) - timedelta(days=1)).date()
+        # Date par défaut = hier
+        start = end = _parse_day(date) if date else (datetime.now(timezone.utc) - timedelta(days=1)).date()
     
-    # Récupérer les matchs terminés du jour
+    # Récupérer les matchs terminés de la période
     query = db.query(Match).options(joinedload(Match.expert_prediction)).filter(
         Match.status == "FINISHED"
     )
-    
-    # Filtrer par date
-    start_of_day = datetime.combine(target_date, datetime.min.time())
-    end_of_day = datetime.combine(target_date, datetime.max.time())
-    query = query.filter(Match.match_date >= start_of_day, Match.match_date <= end_of_day)
+    if start is not None:
+        query = query.filter(Match.match_date >= datetime.combine(start, datetime.min.time()))
+    if end is not None:
+        query = query.filter(Match.match_date <= datetime.combine(end, datetime.max.time()))
     
     # Filtrer par compétition si spécifié
     if competition:
         query = query.filter(Match.competition_code == competition)
     
-    matches = query.order_by(Match.match_date).all()
-    
-    # Construire la réponse avec comparaison prédiction/résultat
-    results = []
-    stats = {
-        "total": 0,
-        "correct_winner": 0,
-        "correct_score": 0,
-        "correct_goals": 0,
-        "by_competition": {}
-    }
-    
-    for match in matches:
-        pred = match.expert_prediction
-        actual_home = match.score_home
-        actual_away = match.score_away
-        
-        # Résultat réel
-        if actual_home is not None and actual_away is not None:
-            if actual_home > actual_away:
-                actual_winner = "home"
-            elif actual_away > actual_home:
-                actual_winner = "away"
-            else:
-                actual_winner = "draw"
-            actual_goals = actual_home + actual_away
-        else:
-            actual_winner = None
-            actual_goals = None
-        
-        # Prédiction
-        pred_winner = None
-        pred_goals = None
-        winner_correct = False
-        score_correct = False
-        goals_correct = False
-        
-        if pred:
-            h = pred.home_score_forecast or 0
-            a = pred.away_score_forecast or 0
-            if h > a:
-                pred_winner = "home"
-            elif a > h:
-                pred_winner = "away"
-            else:
-                pred_winner = "draw"
-            pred_goals = h + a
-            
-            # Vérifier la réussite
-            if actual_winner:
-                winner_correct = pred_winner == actual_winner
-                score_correct = (h == actual_home and a == actual_away)
-                goals_correct = (pred_goals > 2.5) == (actual_goals > 2.5) if actual_goals is not None else False
-                
-                stats["total"] += 1
-                if winner_correct:
-                    stats["correct_winner"] += 1
-                if score_correct:
-                    stats["correct_score"] += 1
-                if goals_correct:
-                    stats["correct_goals"] += 1
-                
-                # Stats par compétition
-                comp = match.competition_code
-                if comp not in stats["by_competition"]:
-                    stats["by_competition"][comp] = {"total": 0, "correct": 0, "name": match.competition_name}
-                stats["by_competition"][comp]["total"] += 1
-                if winner_correct:
-                    stats["by_competition"][comp]["correct"] += 1
-        
-        results.append({
-            "id": match.id,
-            "competition_code": match.competition_code,
-            "competition_name": match.competition_name,
-            "home_team": match.home_team,
-            "home_team_short": match.home_team_short,
-            "home_team_crest": match.home_team_crest,
-            "away_team": match.away_team,
-            "away_team_short": match.away_team_short,
-            "away_team_crest": match.away_team_crest,
-            "match_date": match.match_date.isoformat() if match.match_date else None,
-            "actual": {
-                "home": actual_home,
-                "away": actual_away,
-                "winner": actual_winner
-            },
-            "prediction": {
-                "home": pred.home_score_forecast if pred else None,
-                "away": pred.away_score_forecast if pred else None,
-                "confidence": pred.confidence if pred else None,
-                "tip": pred.bet_tip if pred else None,
-                "winner": pred_winner
-            } if pred else None,
-            "success": {
-                "winner": winner_correct,
-                "score": score_correct,
-                "goals": goals_correct
-            } if pred and actual_winner else None
-        })
-    
-    # Calculer les pourcentages
-    success_rates = {}
-    if stats["total"] > 0:
-        success_rates = {
-            "winner": round(stats["correct_winner"] / stats["total"] * 100, 1),
-            "score": round(stats["correct_score"] / stats["total"] * 100, 1),
-            "goals": round(stats["correct_goals"] / stats["total"] * 100, 1)
-        }
+    next_cursor = None
+    if ranged or limit is not None or cursor is not None:
+        matches, next_cursor = _page(query, limit or 20, cursor, descending=ranged or scrolling)
+    else:
+        matches = query.order_by(Match.match_date, Match.id).all()
     
     return {
-        "date": target_date.isoformat(),
-        "count": len(results),
-        "matches": results,
-        "stats": {
-            "total": stats["total"],
-            "correct_winner": stats["correct_winner"],
-            "correct_score": stats["correct_score"],
-            "correct_goals": stats["correct_goals"],
-            "success_rates": success_rates,
-            "by_competition": stats["by_competition"]
-        }
+        "date": None if ranged or scrolling else start.isoformat(),
+        "date_from": start.isoformat() if ranged and start is not None else None,
+        "date_to": end.isoformat() if ranged else None,
+        "count": len(matches),
+        "matches": [history_entry(match) for match in matches],
+        "next_cursor": next_cursor,
+        "stats": HistoryStatsService(db).stats(start, end, competition)
     }
 
 
@@ -421,21 +571,18 @@ async def get_apex30_report(db: Session, match_id: int) -> Apex30FullReport:
             
             prediction = await prediction_service.generate_prediction(match)
         except Exception as e:
-            print(f"Erreur lors de la regénération auto de la prédiction: {e}")
+            logger.warning(f"Erreur lors de la regénération auto de la prédiction: {e}")
     
     if not prediction or not prediction.ma_logique_analysis:
         raise HTTPException(status_code=404, detail="Analyse APEX-30 non disponible pour ce match malgré une tentative de génération.")
     
-    import json
-    from services.apex30_service import APEX30Service
+    from services.apex30_service import rapport_detaille_depuis_json
     
     try:
-        analysis_data = json.loads(prediction.ma_logique_analysis)
-        apex30 = APEX30Service(db)
-        
-        modules = apex30.generer_rapport_detaille(
-            analysis_data, 
-            match.home_team, 
+        # Rapport textuel construit uniquement ici (à la demande), puis mis en cache
+        modules = rapport_detaille_depuis_json(
+            prediction.ma_logique_analysis,
+            match.home_team,
             match.away_team
         )
         
@@ -452,8 +599,7 @@ async def get_apex30_report(db: Session, match_id: int) -> Apex30FullReport:
             summary=summary
         )
     except Exception as e:
-        import traceback
-        traceback.print_exc()
+        logger.exception("Erreur lors de la génération du rapport APEX-30")
         raise HTTPException(status_code=500, detail=f"Erreur lors de la génération du rapport: {str(e)}")
 
 
@@ -461,93 +607,64 @@ async def get_apex30_report(db: Session, match_id: int) -> Apex30FullReport:
 # Competition Controllers
 # =====================
 
-async def get_competitions() -> CompetitionListResponse:
-    """Liste toutes les compétitions disponibles."""
-    try:
-        result = await football_data_service.get_competitions()
-        competitions = result.get("competitions", [])
-        
-        competition_list = []
-        for comp in competitions:
-            code = comp.get("code")
-            if code in FootballDataService.TIER_ONE_COMPETITIONS:
-                competition_list.append(CompetitionResponse(
-                    id=comp.get("id"),
-                    code=code,
-                    name=comp.get("name"),
-                    area=comp.get("area", {}).get("name", ""),
-                    emblem=comp.get("emblem"),
-                    type=comp.get("type"),
-                    current_season=comp.get("currentSeason", {}).get("id"),
-                    current_matchday=comp.get("currentSeason", {}).get("currentMatchday")
-                ))
-        
-        return CompetitionListResponse(count=len(competition_list), competitions=competition_list)
-    except Exception as e:
-        raise HTTPException(status_code=502, detail=f"Erreur API externe: {str(e)}")
+def competition_to_response(competition: Competition) -> CompetitionResponse:
+    """Convertit une Competition en CompetitionResponse."""
+    return CompetitionResponse(
+        id=competition.external_id,
+        code=competition.code,
+        name=competition.name,
+        area=competition.area or "",
+        emblem=competition.emblem,
+        type=competition.type,
+        current_season=competition.current_season,
+        current_matchday=competition.current_matchday
+    )
 
 
-async def get_competition(code: str) -> CompetitionResponse:
-    """Détails d'une compétition spécifique."""
+async def _competition_catalogue(db: Session) -> CompetitionSyncService:
+    """
+    Catalogue des compétitions en base, synchronisé s'il est vide ou périmé.
+    
+    Le rafraîchissement est fait par le job périodique (sync_competitions_job);
+    une requête ne synchronise que si le catalogue est vide ou plus vieux que
+    CATALOGUE_MAX_AGE_HOURS. Les requêtes concurrentes (chacune dans sa propre
+    boucle, voir DatabaseRunner.run_async) attendent la première synchronisation
+    puis relisent le catalogue, au lieu d'insérer les mêmes codes en parallèle.
+    Un catalogue périmé reste servi si la synchronisation échoue.
+    """
+    service = CompetitionSyncService(db)
+    if not service.is_stale(CATALOGUE_MAX_AGE_HOURS):
+        return service
+    
+    # Attente du verrou hors de la boucle: un autre appel de la même boucle peut le détenir
+    await asyncio.to_thread(_catalogue_lock.acquire)
     try:
-        comp = await football_data_service.get_competition(code.upper())
-        
-        return CompetitionResponse(
-            id=comp.get("id"),
-            code=comp.get("code"),
-            name=comp.get("name"),
-            area=comp.get("area", {}).get("name", ""),
-            emblem=comp.get("emblem"),
-            type=comp.get("type"),
-            current_season=comp.get("currentSeason", {}).get("id"),
-            current_matchday=comp.get("currentSeason", {}).get("currentMatchday")
-        )
-    except Exception:
+        if service.is_stale(CATALOGUE_MAX_AGE_HOURS):
+            try:
+                await service.sync_competitions()
+            except Exception as e:
+                if not service.get_competitions():
+                    raise HTTPException(status_code=502, detail=f"Erreur API externe: {str(e)}")
+                logger.warning(f"⚠️ Catalogue des compétitions périmé servi (synchronisation impossible: {e})")
+    finally:
+        _catalogue_lock.release()
+    return service
+
+
+async def get_competitions(db: Session) -> CompetitionListResponse:
+    """Liste toutes les compétitions disponibles (catalogue en base)."""
+    service = await _competition_catalogue(db)
+    competition_list = [competition_to_response(c) for c in service.get_competitions()]
+    return CompetitionListResponse(count=len(competition_list), competitions=competition_list)
+
+
+async def get_competition(db: Session, code: str) -> CompetitionResponse:
+    """Détails d'une compétition spécifique (catalogue en base)."""
+    service = await _competition_catalogue(db)
+    competition = service.get_competition(code)
+    if competition is None:
         raise HTTPException(status_code=404, detail=f"Compétition non trouvée: {code}")
-
-
-async def get_standings(code: str) -> StandingsResponse:
-    """Récupère le classement d'une compétition."""
-    try:
-        result = await football_data_service.get_standings(code.upper())
-        
-        standings_data = result.get("standings", [])
-        if not standings_data:
-            raise HTTPException(status_code=404, detail="Classement non disponible")
-        
-        table = standings_data[0].get("table", [])
-        
-        standings = []
-        for entry in table:
-            team = entry.get("team", {})
-            standings.append(StandingEntry(
-                position=entry.get("position"),
-                team_id=team.get("id"),
-                team_name=team.get("name"),
-                team_short=team.get("shortName") or team.get("tla"),
-                team_crest=team.get("crest"),
-                played_games=entry.get("playedGames", 0),
-                won=entry.get("won", 0),
-                draw=entry.get("draw", 0),
-                lost=entry.get("lost", 0),
-                points=entry.get("points", 0),
-                goals_for=entry.get("goalsFor", 0),
-                goals_against=entry.get("goalsAgainst", 0),
-                goal_difference=entry.get("goalDifference", 0),
-                form=entry.get("form")
-            ))
-        
-        return StandingsResponse(
-            competition_code=result.get("competition", {}).get("code", code.upper()),
-            competition_name=result.get("competition", {}).get("name", ""),
-            season=result.get("season", {}).get("id", 0),
-            matchday=result.get("season", {}).get("currentMatchday"),
-            standings=standings
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(status_code=502, detail=f"Erreur API: {str(e)}")
+    return competition_to_response(competition)
 
 
 # =====================
@@ -570,22 +687,25 @@ async def sync_matches(db: Session, competition: Optional[str] = None) -> dict:
 
 
 async def generate_predictions(db: Session, limit: int = 20, force: bool = False) -> dict:
-    """Génère des prédictions pour les matchs à venir."""
+    """
+    Génère des prédictions pour les matchs à venir.
+    
+    Avec force=True, les prochains matchs sont recalculés mais seules les
+    prédictions dont les entrées ont changé sont réécrites.
+    """
     prediction_service = PredictionService(db)
     
     try:
-        # Si force=True, supprimer les prédictions existantes
         if force:
-            from models.prediction import ExpertPrediction
-            deleted = db.query(ExpertPrediction).delete()
-            db.commit()
-            logger.info(f"🗑️ {deleted} prédictions supprimées (force=True)")
+            report = await prediction_service.recompute_upcoming(limit=limit)
+            msg = (
+                f"{report['created'] + report['updated']} prédictions recalculées, "
+                f"{report['unchanged']} inchangées"
+            )
+            return {"message": msg, **report}
         
         count = await prediction_service.generate_predictions_for_upcoming(limit=limit)
-        msg = f"{count} prédictions générées"
-        if force:
-            msg += f" (après suppression de {deleted} anciennes)"
-        return {"message": msg}
+        return {"message": f"{count} prédictions générées"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur de génération: {str(e)}")
 
@@ -636,52 +756,107 @@ async def get_combined_prediction(db: Session, match_id: int) -> CombinedPredict
             detail="Impossible de générer une prédiction (données insuffisantes)"
         )
     
-    # Convertir les LogicResult en LogicPredictionResult
-    def logic_to_response(logic_result):
-        if not logic_result:
-            return None
-        
-        # Convertir evidence dataclass en schema
-        evidence_schema = None
-        if logic_result.evidence:
-            ev = logic_result.evidence
-            evidence_schema = LogicEvidenceSchema(
-                home_position=ev.home_position,
-                away_position=ev.away_position,
-                home_points=ev.home_points,
-                away_points=ev.away_points,
-                league_level=ev.league_level,
-                home_advantage=ev.home_advantage,
-                home_strength=ev.home_strength,
-                away_strength=ev.away_strength,
-                h2h_home_wins=ev.h2h_home_wins,
-                h2h_away_wins=ev.h2h_away_wins,
-                h2h_draws=ev.h2h_draws,
-                home_form=ev.home_form,
-                away_form=ev.away_form,
-                home_avg_goals=ev.home_avg_goals,
-                away_avg_goals=ev.away_avg_goals,
-            )
-        
-        return LogicPredictionResult(
-            home_win_prob=logic_result.home_win_prob,
-            draw_prob=logic_result.draw_prob,
-            away_win_prob=logic_result.away_win_prob,
-            predicted_home_goals=logic_result.predicted_home_goals,
-            predicted_away_goals=logic_result.predicted_away_goals,
-            confidence=logic_result.confidence,
-            bet_tip=logic_result.bet_tip,
-            analysis=logic_result.analysis,
-            evidence=evidence_schema
+    return _combined_to_response(match, combined)
+
+
+async def get_combined_predictions(db: Session, match_ids: List[int]) -> CombinedPredictionListResponse:
+    """
+    Prédictions combinées pour plusieurs matchs.
+    
+    Les classements et stats de tous les matchs sont chargés en 2 requêtes,
+    puis les 3 logiques tournent en mémoire pour chaque match.
+    
+    Args:
+        db: Session de base de données
+        match_ids: IDs des matchs (doublons ignorés, ordre conservé)
+    
+    Returns:
+        CombinedPredictionListResponse avec les IDs manquants/insuffisants
+    """
+    match_ids = list(dict.fromkeys(match_ids))
+    if not match_ids:
+        raise HTTPException(status_code=400, detail="Aucun ID de match fourni")
+    if len(match_ids) > MAX_COMBINED_BATCH:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Maximum {MAX_COMBINED_BATCH} matchs par requête"
         )
     
+    matches = db.query(Match).filter(Match.id.in_(match_ids)).all()
+    by_id = {m.id: m for m in matches}
+    
+    engine = MultiLogicPredictionEngine(db)
+    combined_by_id = await engine.generate_combined_predictions(matches)
+    
+    predictions = []
+    missing = []
+    insufficient = []
+    for match_id in match_ids:
+        match = by_id.get(match_id)
+        if match is None:
+            missing.append(match_id)
+        elif combined_by_id.get(match_id) is None:
+            insufficient.append(match_id)
+        else:
+            predictions.append(_combined_to_response(match, combined_by_id[match_id]))
+    
+    return CombinedPredictionListResponse(
+        count=len(predictions),
+        predictions=predictions,
+        missing=missing,
+        insufficient=insufficient
+    )
+
+
+def _logic_to_response(logic_result) -> Optional[LogicPredictionResult]:
+    """Convertit un LogicResult en LogicPredictionResult."""
+    if not logic_result:
+        return None
+    
+    # Convertir evidence dataclass en schema
+    evidence_schema = None
+    if logic_result.evidence:
+        ev = logic_result.evidence
+        evidence_schema = LogicEvidenceSchema(
+            home_position=ev.home_position,
+            away_position=ev.away_position,
+            home_points=ev.home_points,
+            away_points=ev.away_points,
+            league_level=ev.league_level,
+            home_advantage=ev.home_advantage,
+            home_strength=ev.home_strength,
+            away_strength=ev.away_strength,
+            h2h_home_wins=ev.h2h_home_wins,
+            h2h_away_wins=ev.h2h_away_wins,
+            h2h_draws=ev.h2h_draws,
+            home_form=ev.home_form,
+            away_form=ev.away_form,
+            home_avg_goals=ev.home_avg_goals,
+            away_avg_goals=ev.away_avg_goals,
+        )
+    
+    return LogicPredictionResult(
+        home_win_prob=logic_result.home_win_prob,
+        draw_prob=logic_result.draw_prob,
+        away_win_prob=logic_result.away_win_prob,
+        predicted_home_goals=logic_result.predicted_home_goals,
+        predicted_away_goals=logic_result.predicted_away_goals,
+        confidence=logic_result.confidence,
+        bet_tip=logic_result.bet_tip,
+        analysis=logic_result.analysis,
+        evidence=evidence_schema
+    )
+
+
+def _combined_to_response(match: Match, combined) -> CombinedPredictionResponse:
+    """Convertit une CombinedPrediction en CombinedPredictionResponse."""
     return CombinedPredictionResponse(
         match_id=match.id,
         home_team=match.home_team,
         away_team=match.away_team,
-        papa_prediction=logic_to_response(combined.papa_result),
-        grand_frere_prediction=logic_to_response(combined.grand_frere_result),
-        ma_logique_prediction=logic_to_response(combined.ma_logique_result),
+        papa_prediction=_logic_to_response(combined.papa_result),
+        grand_frere_prediction=_logic_to_response(combined.grand_frere_result),
+        ma_logique_prediction=_logic_to_response(combined.ma_logique_result),
         final_home_goals=combined.final_home_goals,
         final_away_goals=combined.final_away_goals,
         final_confidence=combined.final_confidence,
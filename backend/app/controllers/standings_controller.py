@@ -1,14 +1,21 @@
 """
-Controller pour les classements.
+Controller pour les classements et leurs projections.
 
-Contient toute la logique métier pour les endpoints standings.
+Contient toute la logique métier pour les endpoints standings,
+projections de fin de saison et tableaux à élimination directe.
 """
+from dataclasses import asdict
 from typing import List
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 
 from models.standing import Standing
-from schemas.match import StandingsResponse, StandingEntry
+from schemas.match import (
+    StandingsResponse, StandingEntry, SeasonProjectionResponse,
+    KnockoutProjectionResponse, BracketTieEntry, BracketTeamEntry
+)
+from services.knockout_bracket import KnockoutBracketService
+from services.season_projection import SeasonProjectionService
 from services.standing_sync import StandingSyncService
 
 
@@ -84,6 +91,80 @@ async def get_standings(db: Session, competition_code: str, force_refresh: bool
     return standings_to_response(standings, code)
 
 
+def get_projections(db: Session, competition_code: str, simulations: int) -> SeasonProjectionResponse:
+    """
+    Projette la fin de saison d'un championnat (titre, Europe, relégation).
+    
+    La projection est recalculée après chaque synchronisation du classement.
+    Calcul lourd: à exécuter hors de la boucle (DatabaseRunner.run_blocking).
+    
+    Args:
+        db: Session SQLAlchemy
+        competition_code: Code du championnat
+        simulations: Nombre de saisons simulées (arrondi à SIMULATION_LEVELS)
+        
+    Returns:
+        SeasonProjectionResponse avec la distribution des positions finales
+    """
+    projection = SeasonProjectionService(db).project(competition_code.upper(), simulations=simulations)
+    if projection is None:
+        raise HTTPException(status_code=404, detail="Classement non trouvé")
+    return SeasonProjectionResponse(**asdict(projection))
+
+
+def get_bracket(db: Session, competition_code: str, simulations: int) -> KnockoutProjectionResponse:
+    """
+    Projette la phase à élimination directe d'une compétition.
+    
+    Calcul lourd: à exécuter hors de la boucle (DatabaseRunner.run_blocking).
+    
+    Args:
+        db: Session SQLAlchemy
+        competition_code: Code de la compétition (CL, EL, ECL, WC, EC)
+        simulations: Nombre de tableaux simulés (arrondi à SIMULATION_LEVELS)
+        
+    Returns:
+        KnockoutProjectionResponse: qualification par confrontation, tours atteints par équipe
+    """
+    result = KnockoutBracketService(db).project(competition_code, simulations=simulations)
+    if result is None:
+        raise HTTPException(status_code=404, detail="Phase à élimination directe non trouvée")
+    state, simulation, names, season = result
+    
+    ties = [
+        BracketTieEntry(
+            team_a_id=tie.team_a,
+            team_a=names.get(tie.team_a, ""),
+            team_b_id=tie.team_b,
+            team_b=names.get(tie.team_b, ""),
+            probability_a=round(probability, 4),
+            decided=tie.winner is not None
+        )
+        for tie, probability in zip(state.ties, simulation.tie_probabilities)
+    ]
+    rounds = simulation.stages[:-1] if simulation.complete else simulation.stages
+    teams = [
+        BracketTeamEntry(
+            team_id=team_id,
+            team_name=names.get(team_id, ""),
+            reach={stage: round(float(simulation.reach[i, k]), 4) for k, stage in enumerate(rounds)},
+            winner=round(float(simulation.reach[i, -1]), 4) if simulation.complete else None
+        )
+        for i, team_id in enumerate(simulation.team_ids)
+    ]
+    teams.sort(key=lambda t: (-(t.winner or 0), -t.reach[rounds[-1]]))
+    
+    return KnockoutProjectionResponse(
+        competition_code=state.competition_code,
+        season=season,
+        stage=state.stage,
+        simulations=simulation.simulations,
+        stages=list(simulation.stages),
+        ties=ties,
+        teams=teams
+    )
+
+
 async def sync_standings(db: Session, competition_code: str = None) -> dict:
     """
     Synchronise les classements.
@@ -0,0 +1,252 @@
+"""
+Cache de réponses des endpoints de listes de matchs (lecture à travers).
+
+Les réponses sont conservées sérialisées (octets JSON) sous une clé
+route + paramètres + version des données:
+- niveau 1: LRU en mémoire du processus (avec durée de vie);
+- niveau 2 (optionnel): Redis, partagé entre workers (RESPONSE_CACHE_REDIS_URL).
+
+Invalidation par version: chaque écriture des services de synchronisation,
+de prédiction et de cotes appelle bump_data_version(); les clés de l'ancienne
+version ne sont plus lues et sortent du LRU / expirent dans Redis. Avec
+Redis, la version est partagée: une synchronisation faite par un worker
+invalide le cache de tous.
+
+La même clé donne l'ETag des réponses (conditional_json_async): une requête
+If-None-Match dont l'ETag correspond à la version courante reçoit un 304
+sans lecture du cache ni de la base.
+"""
+from collections import OrderedDict
+from hashlib import blake2b
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+import logging
+import time
+
+from fastapi import Response
+
+from core.config import settings
+from core.responses import FastJSONResponse, dumps, json_response
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "pronoscore:data-version"
+KEY_PREFIX = "pronoscore:response"
+
+
+class ResponseCache:
+    """Cache LRU de réponses JSON sérialisées, avec niveau Redis optionnel."""
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: int = 60, redis_url: str = ""):
+        """
+        Initialise le cache.
+
+        Args:
+            max_entries: Taille du LRU en mémoire (0 = cache désactivé)
+            ttl_seconds: Durée de vie d'une réponse
+            redis_url: URL Redis du niveau partagé ("" = mémoire seule)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._lock = Lock()
+        self._local_version = 0
+        self._redis = self._connect(redis_url) if redis_url else None
+        self.stats = {"hits": 0, "redis_hits": 0, "misses": 0, "invalidations": 0, "not_modified": 0}
+
+    @staticmethod
+    def _connect(redis_url: str):
+        """Client Redis, ou None si le paquet ou le serveur est indisponible."""
+        try:
+            import redis
+            client = redis.Redis.from_url(redis_url, socket_timeout=0.2, socket_connect_timeout=0.2)
+            client.ping()
+            return client
+        except Exception as e:
+            logger.warning(f"⚠️ Cache Redis indisponible ({e}): cache mémoire seul")
+            return None
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def version(self) -> int:
+        """Version courante des données (partagée via Redis si disponible)."""
+        if self._redis is not None:
+            try:
+                return int(self._redis.get(VERSION_KEY) or 0)
+            except Exception as e:
+                logger.warning(f"⚠️ Lecture de version Redis impossible: {e}")
+        return self._local_version
+
+    def bump_version(self) -> None:
+        """Invalide toutes les réponses en cache (nouvelle version des données)."""
+        with self._lock:
+            self._local_version += 1
+            self._entries.clear()
+            self.stats["invalidations"] += 1
+        if self._redis is not None:
+            try:
+                self._redis.incr(VERSION_KEY)
+            except Exception as e:
+                logger.warning(f"⚠️ Incrément de version Redis impossible: {e}")
+
+    def key(self, route: str, params: Dict[str, Any]) -> str:
+        """Clé d'une réponse: route, paramètres triés et version des données."""
+        encoded = "&".join(f"{name}={params[name]}" for name in sorted(params) if params[name] is not None)
+        return f"{KEY_PREFIX}:v{self.version()}:{route}?{encoded}"
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Réponse en cache (LRU puis Redis) ou None."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return entry[1]
+        if self._redis is not None:
+            try:
+                body = self._redis.get(key)
+            except Exception as e:
+                logger.warning(f"⚠️ Lecture Redis impossible: {e}")
+                body = None
+            if body is not None:
+                self._store_local(key, body, now)
+                with self._lock:
+                    self.stats["redis_hits"] += 1
+                return body
+        with self._lock:
+            self.stats["misses"] += 1
+        return None
+
+    def set(self, key: str, body: bytes) -> None:
+        """Enregistre une réponse dans les deux niveaux."""
+        self._store_local(key, body, time.monotonic())
+        if self._redis is not None:
+            try:
+                self._redis.set(key, body, ex=self.ttl_seconds)
+            except Exception as e:
+                logger.warning(f"⚠️ Écriture Redis impossible: {e}")
+
+    def _store_local(self, key: str, body: bytes, now: float) -> None:
+        with self._lock:
+            self._entries[key] = (now + self.ttl_seconds, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Vide le niveau mémoire et remet les compteurs à zéro."""
+        with self._lock:
+            self._entries.clear()
+            for name in self.stats:
+                self.stats[name] = 0
+
+    def metrics(self) -> Dict[str, Any]:
+        """Compteurs et taux de succès du cache."""
+        with self._lock:
+            stats = dict(self.stats)
+            entries = len(self._entries)
+        lookups = stats["hits"] + stats["redis_hits"] + stats["misses"]
+        return {
+            **stats,
+            "lookups": lookups,
+            "hit_ratio": round((stats["hits"] + stats["redis_hits"]) / lookups, 4) if lookups else 0.0,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "redis": self._redis is not None,
+            "version": self.version(),
+        }
+
+    def cached_json(self, route: str, params: Dict[str, Any], build: Callable[[], Any]) -> FastJSONResponse:
+        """
+        Réponse JSON servie depuis le cache, sinon construite puis mise en cache.
+
+        Args:
+            route: Nom de la route
+            params: Paramètres de la requête (font partie de la clé)
+            build: Construit la réponse (modèle Pydantic ou données JSON)
+
+        Returns:
+            Réponse JSON (octets pré-sérialisés, servis sans réencodage)
+        """
+        if not self.enabled:
+            return json_response(build())
+        key = self.key(route, params)
+        body = self.get(key)
+        if body is None:
+            body = dumps(build())
+            self.set(key, body)
+        return FastJSONResponse(body)
+
+    async def cached_json_async(
+        self, route: str, params: Dict[str, Any], build: Callable[[], Awaitable[Any]]
+    ) -> FastJSONResponse:
+        """Variante de cached_json dont la construction est une coroutine (voir DatabaseRunner)."""
+        return await self._cached_body_async(self.key(route, params), build)
+
+    async def conditional_json_async(
+        self,
+        if_none_match: Optional[str],
+        route: str,
+        params: Dict[str, Any],
+        build: Callable[[], Awaitable[Any]]
+    ) -> Response:
+        """
+        Réponse en cache avec ETag fort; 304 si le client a déjà cette version.
+
+        Args:
+            if_none_match: En-tête If-None-Match de la requête
+            route: Nom de la route
+            params: Paramètres de la requête (font partie de l'ETag)
+            build: Coroutine construisant la réponse (appelée seulement si nécessaire)
+
+        Returns:
+            304 sans corps, ou réponse JSON avec en-tête ETag
+        """
+        key = self.key(route, params)
+        tag = etag_for_key(key)
+        headers = {"ETag": tag, "Cache-Control": "no-cache"}
+        if etag_matches(if_none_match, tag):
+            with self._lock:
+                self.stats["not_modified"] += 1
+            return Response(status_code=304, headers=headers)
+        response = await self._cached_body_async(key, build)
+        response.headers.update(headers)
+        return response
+
+    async def _cached_body_async(self, key: str, build: Callable[[], Awaitable[Any]]) -> FastJSONResponse:
+        if not self.enabled:
+            return json_response(await build())
+        body = self.get(key)
+        if body is None:
+            body = dumps(await build())
+            self.set(key, body)
+        return FastJSONResponse(body)
+
+
+def etag_for_key(key: str) -> str:
+    """ETag fort d'une clé de cache (route, paramètres, version des données)."""
+    return '"' + blake2b(key.encode("utf-8"), digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], tag: str) -> bool:
+    """Comparaison If-None-Match (liste d'ETags ou "*", préfixe W/ ignoré)."""
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return "*" in candidates or tag in (value[2:] if value.startswith("W/") else value for value in candidates)
+
+
+response_cache = ResponseCache(
+    max_entries=settings.response_cache_size,
+    ttl_seconds=settings.response_cache_ttl,
+    redis_url=settings.response_cache_redis_url,
+)
+
+
+def bump_data_version() -> None:
+    """À appeler après toute écriture visible dans les listes de matchs."""
+    response_cache.bump_version()
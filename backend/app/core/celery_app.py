@@ -46,5 +46,15 @@ celery_app.conf.beat_schedule = {
     "sync-live-scores": {
         "task": "tasks.sync_tasks.sync_daily_matches",
         "schedule": crontab(minute=5), # à xx:05 chaque heure
+    },
+    # 5. Catalogue des compétitions (chaque lundi à 05:45)
+    "update-competitions-weekly": {
+        "task": "tasks.sync_tasks.update_competitions",
+        "schedule": crontab(day_of_week=1, hour=5, minute=45),
+    },
+    # 6. Cumul des statistiques de l'historique (tous les jours à 04:00)
+    "rebuild-history-stats-nightly": {
+        "task": "tasks.sync_tasks.rebuild_history_stats",
+        "schedule": crontab(hour=4, minute=0),
     }
 }
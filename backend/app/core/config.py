@@ -47,6 +47,40 @@ class Settings(BaseSettings):
     # The Odds API pour les cotes de paris
     ODDS_API_KEY: str = os.getenv("ODDS_API_KEY", "")
     
+    # Prédictions: conserver la matrice de scores complète (JSON) par prédiction
+    store_score_matrix: bool = os.getenv("STORE_SCORE_MATRIX", "false").lower() == "true"
+    
+    # Backtest: cache disque des échantillons point-in-time ("" = désactivé)
+    backtest_cache_dir: str = os.getenv("BACKTEST_CACHE_DIR", ".backtest_cache")
+    
+    # Projections de saison: processus de simulation du précalcul après la
+    # synchro des classements (0 = tous les cœurs; l'API simule dans le thread appelant)
+    projection_workers: int = int(os.getenv("PROJECTION_WORKERS", "0"))
+    
+    # Probabilités du marché: retrait de marge ("power" ou "shin") et poids
+    # des cotes dans le mélange avec le modèle (0 = pas de mélange)
+    market_margin_method: str = os.getenv("MARKET_MARGIN_METHOD", "power")
+    market_blend_weight: float = float(os.getenv("MARKET_BLEND_WEIGHT", "0.3"))
+    # Mélange modèle/marché utilisé comme entrée des moteurs en aval (value bets,
+    # portefeuille de Kelly, projections de saison) à la place des seules
+    # probabilités du modèle (false = mélange seulement enregistré et servi)
+    market_blend_model_input: bool = os.getenv("MARKET_BLEND_MODEL_INPUT", "false").lower() == "true"
+    
+    # Cache des réponses des listes de matchs (0 entrée = désactivé, Redis optionnel)
+    response_cache_size: int = int(os.getenv("RESPONSE_CACHE_SIZE", "256"))
+    response_cache_ttl: int = int(os.getenv("RESPONSE_CACHE_TTL", "60"))
+    response_cache_redis_url: str = os.getenv("RESPONSE_CACHE_REDIS_URL", "")
+
+    # Flux en direct des matchs (SSE): file par abonné, battement de cœur,
+    # relais Redis pub/sub entre workers (optionnel)
+    events_queue_size: int = int(os.getenv("EVENTS_QUEUE_SIZE", "100"))
+    events_heartbeat_seconds: float = float(os.getenv("EVENTS_HEARTBEAT_SECONDS", "15"))
+    events_redis_url: str = os.getenv("EVENTS_REDIS_URL", "")
+
+    # Statistiques de l'historique: lecture des jours passés depuis la table
+    # de cumul quotidienne (false = agrégats SQL sur les matchs uniquement)
+    history_rollup_enabled: bool = os.getenv("HISTORY_ROLLUP_ENABLED", "true").lower() == "true"
+
     model_config = SettingsConfigDict(env_file=".env", case_sensitive=False, extra="ignore")
 
 
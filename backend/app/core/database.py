@@ -1,9 +1,15 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import declarative_base
 from sqlalchemy.orm import sessionmaker
+from starlette.concurrency import run_in_threadpool
+from typing import Any, Awaitable, Callable, Optional
+import asyncio
+import logging
 import os
 from dotenv import load_dotenv
 
+logger = logging.getLogger(__name__)
+
 # Charger les variables d'environnement
 load_dotenv()
 
@@ -30,3 +36,133 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+# =====================
+# Accès asynchrone (boucle d'événements non bloquée)
+# =====================
+
+# Pilote asynchrone de chaque pilote synchrone
+ASYNC_DRIVERS = {
+    "postgres": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url: Optional[str]) -> Optional[str]:
+    """URL du pilote asynchrone équivalent (None si pas d'équivalent connu)."""
+    if not url or "://" not in url:
+        return None
+    scheme, rest = url.split("://", 1)
+    driver = ASYNC_DRIVERS.get(scheme)
+    return f"{driver}://{rest}" if driver else None
+
+
+def create_async_session_factory(url: Optional[str]):
+    """
+    Moteur et fabrique de sessions asynchrones.
+
+    Returns:
+        async_sessionmaker, ou None si le pilote asynchrone (asyncpg,
+        aiosqlite) ou greenlet n'est pas installé
+    """
+    async_url = async_database_url(url)
+    if async_url is None:
+        return None
+    try:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+        options = {"pool_pre_ping": True}
+        if not async_url.startswith("sqlite"):
+            options.update(pool_size=10, max_overflow=20)
+        async_engine = create_async_engine(async_url, **options)
+    except ImportError as e:
+        logger.warning(f"⚠️ Base asynchrone indisponible ({e}): requêtes exécutées dans le pool de threads")
+        return None
+    return async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+
+AsyncSessionLocal = create_async_session_factory(DATABASE_URL)
+
+
+async def get_async_db():
+    """Dépendance: session asynchrone (AsyncSession)."""
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Base asynchrone indisponible (pilote asyncpg/aiosqlite ou greenlet manquant)")
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+class DatabaseRunner:
+    """
+    Exécute le code ORM des contrôleurs sans bloquer la boucle d'événements.
+
+    - run(): fonction synchrone fn(db, ...) exécutée par AsyncSession.run_sync
+      (les E/S passent par le pilote asynchrone); sans pilote asynchrone, dans
+      le pool de threads avec une Session synchrone;
+    - run_async(): coroutine fn(db, ...) qui mêle requêtes et appels HTTP
+      (génération de prédictions), exécutée dans sa propre boucle sur un
+      thread de travail avec une Session synchrone;
+    - run_blocking(): fonction synchrone dominée par le calcul, toujours
+      exécutée dans le pool de threads avec une Session synchrone.
+    """
+
+    def __init__(self, session_factory=SessionLocal, async_session_factory=None):
+        """
+        Initialise l'exécuteur.
+
+        Args:
+            session_factory: Fabrique de sessions synchrones
+            async_session_factory: Fabrique de sessions asynchrones (None = pool de threads)
+        """
+        self.session_factory = session_factory
+        self.async_session_factory = async_session_factory
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Exécute fn(db, *args, **kwargs) et retourne son résultat.
+
+        Args:
+            fn: Fonction synchrone prenant une Session en premier argument
+        """
+        if self.async_session_factory is not None:
+            async with self.async_session_factory() as session:
+                return await session.run_sync(lambda db: fn(db, *args, **kwargs))
+        return await run_in_threadpool(self._call, fn, *args, **kwargs)
+
+    async def run_async(self, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """
+        Exécute la coroutine fn(db, *args, **kwargs) hors de la boucle principale.
+
+        Args:
+            fn: Fonction asynchrone prenant une Session en premier argument
+        """
+        return await run_in_threadpool(self._call, lambda db: asyncio.run(fn(db, *args, **kwargs)))
+
+    async def run_blocking(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Exécute fn(db, *args, **kwargs) dans le pool de threads, même avec un pilote asynchrone.
+
+        Pour le calcul lourd (simulations numpy, optimisation): run() passe
+        par AsyncSession.run_sync, qui exécute fn sur le thread de la boucle.
+
+        Args:
+            fn: Fonction synchrone prenant une Session en premier argument
+        """
+        return await run_in_threadpool(self._call, fn, *args, **kwargs)
+
+    def _call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        db = self.session_factory()
+        try:
+            return fn(db, *args, **kwargs)
+        finally:
+            db.close()
+
+
+db_runner = DatabaseRunner(SessionLocal, AsyncSessionLocal)
+
+
+def get_db_runner() -> DatabaseRunner:
+    """Dépendance: exécuteur des requêtes hors de la boucle d'événements."""
+    return db_runner
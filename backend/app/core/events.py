@@ -0,0 +1,294 @@
+"""
+Diffusion en direct des changements de matchs (Server-Sent Events).
+
+Les services de synchronisation, de cotes et de prédiction publient des
+différences au niveau du match (score, statut, cotes, nouvelle prédiction)
+après commit; les clients abonnés à une compétition ou à des matchs les
+reçoivent sur une connexion longue (GET /matches/live) au lieu de
+réinterroger les listes.
+
+- niveau local: une file asyncio par abonné, alimentée depuis n'importe quel
+  thread (les écritures tournent dans le pool de threads ou dans la boucle
+  d'un thread de travail, voir DatabaseRunner);
+- niveau partagé (optionnel): canal Redis pub/sub (EVENTS_REDIS_URL), pour
+  que les événements publiés par un worker (ou une tâche Celery)
+  atteignent les abonnés des autres workers.
+
+Un abonné trop lent ne bloque jamais la publication: au-delà de la taille
+de sa file, les événements sont ignorés (compteur `dropped`).
+"""
+from datetime import datetime, timezone
+from itertools import count
+from threading import Event, Lock, Thread
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional
+import asyncio
+import json
+import logging
+import uuid
+
+from core.config import settings
+from core.responses import dumps
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "pronoscore:match-events"
+
+EVENT_TYPES = ("match", "odds", "prediction")
+
+# Reconnexion au canal Redis: délai initial, doublé à chaque échec (secondes)
+RECONNECT_DELAY = 1.0
+MAX_RECONNECT_DELAY = 30.0
+
+
+class Subscription:
+    """Abonnement d'un client: file d'événements et filtres."""
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        competitions: Optional[FrozenSet[str]] = None,
+        match_ids: Optional[FrozenSet[int]] = None,
+        queue_size: int = 100
+    ):
+        self.loop = loop
+        self.competitions = competitions
+        self.match_ids = match_ids
+        self.queue: "asyncio.Queue[Dict[str, Any]]" = asyncio.Queue(maxsize=queue_size)
+
+    def wants(self, event: Dict[str, Any]) -> bool:
+        """Vrai si l'événement correspond aux filtres (aucun filtre = tout)."""
+        if self.competitions is None and self.match_ids is None:
+            return True
+        return bool(
+            (self.competitions is not None and event.get("competition_code") in self.competitions)
+            or (self.match_ids is not None and event.get("match_id") in self.match_ids)
+        )
+
+    async def get(self) -> Dict[str, Any]:
+        """Prochain événement (attend s'il n'y en a pas)."""
+        return await self.queue.get()
+
+
+class MatchEventBroadcaster:
+    """Diffuseur en mémoire des événements de matchs, avec relais Redis optionnel."""
+
+    def __init__(self, queue_size: int = 100, redis_url: str = ""):
+        """
+        Initialise le diffuseur.
+
+        Args:
+            queue_size: Taille de la file de chaque abonné
+            redis_url: URL Redis du relais entre workers ("" = processus seul)
+        """
+        self.queue_size = queue_size
+        self.origin = uuid.uuid4().hex
+        self._subscribers: List[Subscription] = []
+        self._lock = Lock()
+        self._ids = count(1)
+        self._redis = self._connect(redis_url) if redis_url else None
+        self._listener: Optional[Thread] = None
+        self._stopping = Event()
+        self.stats = {"published": 0, "delivered": 0, "dropped": 0, "remote": 0}
+
+    @staticmethod
+    def _connect(redis_url: str):
+        """Client Redis, ou None si le paquet ou le serveur est indisponible."""
+        try:
+            import redis
+            client = redis.Redis.from_url(redis_url, socket_connect_timeout=0.2)
+            client.ping()
+            return client
+        except Exception as e:
+            logger.warning(f"⚠️ Relais Redis des événements indisponible ({e}): diffusion locale seule")
+            return None
+
+    # ----- Abonnements (depuis la boucle d'événements) -----
+
+    def subscribe(
+        self,
+        competitions: Optional[Iterable[str]] = None,
+        match_ids: Optional[Iterable[int]] = None
+    ) -> Subscription:
+        """
+        Abonne le client courant (à appeler depuis la boucle d'événements).
+
+        Args:
+            competitions: Codes des compétitions suivies (None = pas de filtre)
+            match_ids: IDs des matchs suivis (None = pas de filtre)
+
+        Returns:
+            Subscription à passer à unsubscribe() en fin de connexion
+        """
+        subscription = Subscription(
+            asyncio.get_running_loop(),
+            frozenset(c.upper() for c in competitions) if competitions else None,
+            frozenset(match_ids) if match_ids else None,
+            self.queue_size,
+        )
+        with self._lock:
+            self._subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Retire un abonnement (connexion fermée)."""
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+
+    @property
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    # ----- Publication (depuis n'importe quel thread) -----
+
+    def publish(
+        self,
+        event_type: str,
+        match_id: int,
+        competition_code: Optional[str],
+        changes: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        Publie un changement de match aux abonnés locaux et au relais Redis.
+
+        Args:
+            event_type: "match" (score, statut), "odds" ou "prediction"
+            match_id: ID du match
+            competition_code: Code de la compétition du match
+            changes: Nouvelles valeurs des champs modifiés
+
+        Returns:
+            Événement publié
+        """
+        event = {
+            "id": f"{self.origin[:8]}-{next(self._ids)}",
+            "type": event_type,
+            "match_id": match_id,
+            "competition_code": competition_code,
+            "changes": changes,
+            "at": datetime.now(timezone.utc).isoformat(),
+        }
+        with self._lock:
+            self.stats["published"] += 1
+        self._dispatch(event)
+        if self._redis is not None:
+            try:
+                self._redis.publish(CHANNEL, dumps({"origin": self.origin, "event": event}))
+            except Exception as e:
+                logger.warning(f"⚠️ Publication Redis impossible: {e}")
+        return event
+
+    def _dispatch(self, event: Dict[str, Any]) -> None:
+        """Transmet un événement aux abonnés locaux concernés."""
+        with self._lock:
+            targets = [s for s in self._subscribers if s.wants(event)]
+        for subscription in targets:
+            try:
+                subscription.loop.call_soon_threadsafe(self._offer, subscription, event)
+            except RuntimeError:
+                # Boucle fermée: la connexion n'existe plus
+                self.unsubscribe(subscription)
+
+    def _offer(self, subscription: Subscription, event: Dict[str, Any]) -> None:
+        try:
+            subscription.queue.put_nowait(event)
+            delivered = True
+        except asyncio.QueueFull:
+            delivered = False
+        with self._lock:
+            self.stats["delivered" if delivered else "dropped"] += 1
+
+    # ----- Relais Redis -----
+
+    def start(self) -> None:
+        """Démarre l'écoute du canal Redis (sans effet sans Redis)."""
+        if self._redis is None or self._listener is not None:
+            return
+        self._stopping.clear()
+        self._listener = Thread(target=self._listen, name="match-events-listener", daemon=True)
+        self._listener.start()
+
+    def stop(self) -> None:
+        """Arrête l'écoute du canal Redis."""
+        self._stopping.set()
+        if self._listener is not None:
+            self._listener.join(timeout=2)
+            self._listener = None
+
+    def _listen(self) -> None:
+        """Écoute le canal jusqu'à stop(), en se reconnectant (délai croissant) après une coupure."""
+        delay = RECONNECT_DELAY
+        while not self._stopping.is_set():
+            pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.subscribe(CHANNEL)
+                delay = RECONNECT_DELAY
+                while not self._stopping.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if message is not None:
+                        self._relay(message)
+            except Exception as e:
+                logger.warning(f"⚠️ Écoute Redis des événements interrompue ({e}): reconnexion dans {delay:.0f} s")
+                self._stopping.wait(delay)
+                delay = min(delay * 2, MAX_RECONNECT_DELAY)
+            finally:
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+
+    def _relay(self, message: Dict[str, Any]) -> None:
+        """Diffuse localement un événement reçu d'un autre processus (message invalide ignoré)."""
+        try:
+            payload = json.loads(message["data"])
+            # Événements de ce processus: déjà diffusés localement
+            if payload.get("origin") == self.origin:
+                return
+            event = payload["event"]
+            with self._lock:
+                self.stats["remote"] += 1
+            self._dispatch(event)
+        except Exception as e:
+            logger.warning(f"⚠️ Événement Redis ignoré: {e}")
+
+    def metrics(self) -> Dict[str, Any]:
+        """Compteurs de diffusion et nombre d'abonnés."""
+        with self._lock:
+            stats = dict(self.stats)
+            subscribers = len(self._subscribers)
+        return {
+            **stats,
+            "subscribers": subscribers,
+            "queue_size": self.queue_size,
+            "redis": self._redis is not None,
+        }
+
+
+def format_sse(event: Dict[str, Any]) -> bytes:
+    """Trame Server-Sent Events d'un événement (id, type, données JSON)."""
+    return b"id: %s\nevent: %s\ndata: %s\n\n" % (
+        event["id"].encode("utf-8"), event["type"].encode("utf-8"), dumps(event)
+    )
+
+
+match_events = MatchEventBroadcaster(
+    queue_size=settings.events_queue_size,
+    redis_url=settings.events_redis_url,
+)
+
+
+def publish_match_event(
+    event_type: str,
+    match_id: Optional[int],
+    competition_code: Optional[str],
+    changes: Dict[str, Any]
+) -> None:
+    """À appeler après commit d'un changement visible d'un match (sans effet si rien n'a changé)."""
+    if match_id is None or not changes:
+        return
+    try:
+        match_events.publish(event_type, match_id, competition_code, changes)
+    except Exception as e:
+        # La diffusion ne doit jamais faire échouer une écriture
+        logger.warning(f"⚠️ Événement {event_type} du match {match_id} non diffusé: {e}")
@@ -0,0 +1,76 @@
+"""
+Pagination par curseur (keyset) sur (match_date, id).
+
+Le curseur encode la clé du dernier match de la page; la page suivante
+reprend strictement après cette clé (WHERE (match_date, id) < curseur),
+servie par l'index composite ix_matches_date_id. Le coût d'une page ne
+dépend pas de sa profondeur, contrairement à OFFSET.
+"""
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import tuple_
+from sqlalchemy.orm import Query
+
+from models.match import Match
+
+
+def encode_cursor(match: Match) -> str:
+    """Curseur opaque positionné sur un match."""
+    raw = f"{match.match_date.isoformat()}|{match.id}"
+    return urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Clé (match_date, id) d'un curseur.
+
+    Raises:
+        ValueError: Curseur mal formé
+    """
+    try:
+        raw = urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+        date_part, id_part = raw.rsplit("|", 1)
+        return datetime.fromisoformat(date_part), int(id_part)
+    except Exception as e:
+        raise ValueError(f"Curseur invalide: {cursor}") from e
+
+
+def keyset_page(
+    query: Query,
+    limit: int,
+    cursor: Optional[str] = None,
+    descending: bool = True
+) -> Tuple[List[Match], Optional[str]]:
+    """
+    Page de matchs après un curseur, dans l'ordre (match_date, id).
+
+    Args:
+        query: Requête sur Match (filtres déjà appliqués)
+        limit: Taille de la page
+        cursor: Curseur de la page précédente (None = première page)
+        descending: Plus récents d'abord
+
+    Returns:
+        (matchs de la page, curseur de la page suivante ou None)
+
+    Raises:
+        ValueError: Curseur mal formé
+    """
+    key = tuple_(Match.match_date, Match.id)
+    query = query.filter(Match.match_date.isnot(None))
+    if cursor:
+        position = decode_cursor(cursor)
+        bound = tuple_(*position)
+        query = query.filter(key < bound if descending else key > bound)
+    if descending:
+        query = query.order_by(Match.match_date.desc(), Match.id.desc())
+    else:
+        query = query.order_by(Match.match_date.asc(), Match.id.asc())
+
+    # Une ligne de plus que la page: indique s'il reste des matchs
+    rows = query.limit(limit + 1).all()
+    page = rows[:limit]
+    next_cursor = encode_cursor(page[-1]) if len(rows) > limit else None
+    return page, next_cursor
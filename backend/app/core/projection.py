@@ -0,0 +1,114 @@
+"""
+Projections des listes de matchs (view=compact, fields=...).
+
+Une projection fixe le schéma servi (MatchResponse ou MatchCompactResponse)
+et, avec `fields`, le sous-ensemble de ses champs. Elle se traduit au niveau
+SQL: seules les colonnes de Match et d'ExpertPrediction nécessaires sont
+chargées (load_only), la jointure sur la prédiction n'est faite que si le
+champ `prediction` est demandé, et les colonnes texte volumineuses ne sont
+jamais lues pour une liste.
+"""
+from dataclasses import dataclass
+from typing import FrozenSet, List, Optional
+
+from sqlalchemy.orm import defer, joinedload, load_only
+
+from models.match import Match
+from models.prediction import ExpertPrediction
+from schemas.match import MatchCompactResponse, MatchResponse, PredictionCompact, PredictionSummary
+
+LIST_VIEWS = ("full", "compact")
+
+# Colonnes texte jamais servies dans les listes (détail d'un match uniquement)
+HEAVY_PREDICTION_COLUMNS = ("analysis", "ma_logique_analysis", "score_matrix")
+
+# Champs résolus par la requête groupée des classements
+STANDING_FIELDS = frozenset({
+    "home_standing_position", "home_standing_points",
+    "away_standing_position", "away_standing_points",
+})
+
+# Colonnes toujours chargées: clé de pagination et clés des classements
+REQUIRED_MATCH_COLUMNS = ("id", "match_date", "competition_code", "home_team_id", "away_team_id")
+
+
+@dataclass(frozen=True)
+class ListProjection:
+    """Schéma et champs servis par un endpoint de liste."""
+    view: str = "full"
+    fields: Optional[FrozenSet[str]] = None  # None = tous les champs du schéma
+
+    @property
+    def is_default(self) -> bool:
+        return self.view == "full" and self.fields is None
+
+    @property
+    def schema(self):
+        return MatchCompactResponse if self.view == "compact" else MatchResponse
+
+    @property
+    def prediction_schema(self):
+        return PredictionCompact if self.view == "compact" else PredictionSummary
+
+    @property
+    def selected(self) -> FrozenSet[str]:
+        return self.fields if self.fields is not None else frozenset(self.schema.model_fields)
+
+    @property
+    def wants_standings(self) -> bool:
+        return bool(self.selected & STANDING_FIELDS)
+
+
+def parse_projection(view: Optional[str] = None, fields: Optional[str] = None) -> ListProjection:
+    """
+    Projection demandée par les paramètres `view` et `fields`.
+
+    Args:
+        view: "full" (défaut) ou "compact"
+        fields: Champs du schéma séparés par des virgules (id toujours inclus)
+
+    Returns:
+        ListProjection
+
+    Raises:
+        ValueError: Vue ou champ inconnu
+    """
+    view = (view or "full").lower()
+    if view not in LIST_VIEWS:
+        raise ValueError(f"Vue inconnue: {view} (valeurs: {', '.join(LIST_VIEWS)})")
+    projection = ListProjection(view=view)
+    if fields:
+        names = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = names - set(projection.schema.model_fields)
+        if unknown:
+            raise ValueError(f"Champs inconnus: {', '.join(sorted(unknown))}")
+        projection = ListProjection(view=view, fields=frozenset(names | {"id"}))
+    return projection
+
+
+def list_load_options(projection: ListProjection) -> List:
+    """
+    Options de chargement SQLAlchemy d'une requête de liste sur Match.
+
+    Args:
+        projection: Projection de la liste
+
+    Returns:
+        Options à passer à Query.options()
+    """
+    if projection.is_default:
+        return [joinedload(Match.expert_prediction).options(
+            *[defer(getattr(ExpertPrediction, name)) for name in HEAVY_PREDICTION_COLUMNS]
+        )]
+
+    selected = projection.selected
+    columns = set(REQUIRED_MATCH_COLUMNS) | {
+        name for name in selected if name in Match.__table__.columns
+    }
+    options = [load_only(*[getattr(Match, name) for name in sorted(columns)])]
+    if "prediction" in selected:
+        # Jointure limitée aux colonnes du schéma de prédiction servi
+        options.append(joinedload(Match.expert_prediction).load_only(
+            *[getattr(ExpertPrediction, name) for name in projection.prediction_schema.model_fields]
+        ))
+    return options
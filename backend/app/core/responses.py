@@ -0,0 +1,66 @@
+"""
+Sérialisation JSON rapide des réponses de l'API.
+
+orjson (optionnel) sérialise directement les dict/list, datetime et
+tableaux numpy en octets, sans passer par jsonable_encoder + json.dumps;
+sans orjson, repli sur la bibliothèque standard (même sortie).
+
+- dumps(): octets JSON d'un modèle Pydantic ou de données JSON;
+- FastJSONResponse: réponse construite par la route (contourne l'encodage
+  générique de FastAPI), qui accepte aussi des octets déjà sérialisés
+  (réponses en cache).
+
+Les routes avec response_model n'en ont pas besoin: FastAPI sérialise
+alors directement via Pydantic.
+"""
+from typing import Any
+import json
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dépendance optionnelle
+    orjson = None
+
+ORJSON_OPTIONS = (orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY) if orjson else 0
+
+
+def _default(value: Any) -> Any:
+    """Types non natifs pour orjson (modèles Pydantic imbriqués, Decimal...)."""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    return jsonable_encoder(value)
+
+
+def dumps(payload: Any) -> bytes:
+    """
+    Sérialise une réponse en octets JSON.
+
+    Args:
+        payload: Modèle Pydantic ou données JSON (dict, list, datetime...)
+
+    Returns:
+        Octets JSON (UTF-8, sans espaces)
+    """
+    if isinstance(payload, BaseModel):
+        return payload.model_dump_json().encode("utf-8")
+    if orjson is not None:
+        return orjson.dumps(payload, default=_default, option=ORJSON_OPTIONS)
+    return json.dumps(jsonable_encoder(payload), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """Réponse JSON sérialisée par dumps(); les octets sont servis tels quels."""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
+
+
+def json_response(payload: Any) -> FastJSONResponse:
+    """Réponse JSON d'un modèle Pydantic ou de données JSON (sans revalidation)."""
+    return FastJSONResponse(payload)
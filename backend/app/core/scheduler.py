@@ -7,10 +7,13 @@ et la génération de prédictions.
 import logging
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
-from core.database import SessionLocal
+from core.database import SessionLocal, db_runner
+from services.competition_sync import CompetitionSyncService
+from services.history_stats import HistoryStatsService
 from services.match_sync import MatchSyncService
 from services.standing_sync import StandingSyncService
 from services.prediction_service import PredictionService
+from services.season_projection import SeasonProjectionService
 
 # Configuration du logging pour le scheduler
 logging.basicConfig(level=logging.INFO)
@@ -20,6 +23,19 @@ logger = logging.getLogger("scheduler")
 scheduler = AsyncIOScheduler()
 
 
+async def sync_competitions_job():
+    """Tâche auto: Synchronisation du catalogue des compétitions."""
+    logger.info("🔄 [Job] Démarrage de la synchronisation des compétitions...")
+    db = SessionLocal()
+    try:
+        count = await CompetitionSyncService(db).sync_competitions()
+        logger.info(f"✅ [Job] Terminé: {count} compétitions synchronisées.")
+    except Exception as e:
+        logger.error(f"❌ [Job] Erreur lors de la sync des compétitions: {e}")
+    finally:
+        db.close()
+
+
 async def sync_standings_job():
     """Tâche auto: Synchronisation des classements."""
     logger.info("🔄 [Job] Démarrage de la synchronisation des classements...")
@@ -30,29 +46,46 @@ async def sync_standings_job():
         logger.info(f"✅ [Job] Terminé: {count} entrées de classement synchronisées.")
     except Exception as e:
         logger.error(f"❌ [Job] Erreur lors de la sync des classements: {e}")
+        return
     finally:
         db.close()
+    
+    # Projections de fin de saison du nouveau classement (cache de l'API)
+    try:
+        projected = await db_runner.run_blocking(_precompute_projections)
+        logger.info(f"🎲 [Job] {projected} projections de saison précalculées.")
+    except Exception as e:
+        logger.error(f"❌ [Job] Erreur lors du précalcul des projections: {e}")
+
+
+def _precompute_projections(db) -> int:
+    return SeasonProjectionService(db).precompute()
+
+
+async def _sync_matches_and_predictions(db) -> None:
+    # 1. Sync upcoming matches (7 prochains jours)
+    match_sync = MatchSyncService(db)
+    sync_count = await match_sync.sync_upcoming_matches(days=7)
+    logger.info(f"📥 [Job] {sync_count} matchs synchronisés.")
+    
+    # 2. Générer les prédictions pour les nouveaux matchs
+    prediction_service = PredictionService(db)
+    pred_count = await prediction_service.generate_predictions_for_upcoming(limit=50)
+    logger.info(f"🧠 [Job] {pred_count} prédictions générées.")
 
 
 async def sync_matches_and_predictions_job():
-    """Tâche auto: Synchronisation des matchs et génération des prédictions."""
+    """
+    Tâche auto: Synchronisation des matchs et génération des prédictions.
+    
+    Exécutée hors de la boucle de l'application (le scheduler la partage
+    avec les requêtes HTTP).
+    """
     logger.info("🔄 [Job] Démarrage de la synchronisation des matchs et prédictions...")
-    db = SessionLocal()
     try:
-        # 1. Sync upcoming matches (7 prochains jours)
-        match_sync = MatchSyncService(db)
-        sync_count = await match_sync.sync_upcoming_matches(days=7)
-        logger.info(f"📥 [Job] {sync_count} matchs synchronisés.")
-        
-        # 2. Générer les prédictions pour les nouveaux matchs
-        prediction_service = PredictionService(db)
-        pred_count = await prediction_service.generate_predictions_for_upcoming(limit=50)
-        logger.info(f"🧠 [Job] {pred_count} prédictions générées.")
-        
+        await db_runner.run_async(_sync_matches_and_predictions)
     except Exception as e:
         logger.error(f"❌ [Job] Erreur lors de la sync des matchs/prédictions: {e}")
-    finally:
-        db.close()
 
 
 async def update_scores_job():
@@ -69,6 +102,20 @@ async def update_scores_job():
         db.close()
 
 
+def _rebuild_history_stats(db) -> int:
+    return HistoryStatsService(db).rebuild()
+
+
+async def rebuild_history_stats_job():
+    """Tâche auto: Reconstruction du cumul quotidien des statistiques de l'historique."""
+    logger.info("🔄 [Job] Démarrage de la reconstruction du cumul de l'historique...")
+    try:
+        count = await db_runner.run(_rebuild_history_stats)
+        logger.info(f"✅ [Job] Terminé: {count} lignes de cumul.")
+    except Exception as e:
+        logger.error(f"❌ [Job] Erreur lors du cumul de l'historique: {e}")
+
+
 def start_scheduler():
     """Initialise et démarre le scheduler."""
     if not scheduler.running:
@@ -96,6 +143,22 @@ def start_scheduler():
             replace_existing=True
         )
         
+        # 4. Sync Catalogue des compétitions: Chaque semaine (lundi 03:00)
+        scheduler.add_job(
+            sync_competitions_job,
+            CronTrigger(day_of_week="mon", hour=3),
+            id="sync_competitions",
+            replace_existing=True
+        )
+        
+        # 5. Cumul des statistiques de l'historique: Chaque nuit (04:00)
+        scheduler.add_job(
+            rebuild_history_stats_job,
+            CronTrigger(hour=4),
+            id="rebuild_history_stats",
+            replace_existing=True
+        )
+        
         scheduler.start()
         logger.info("🚀 Scheduler démarré avec succès.")
     else:
@@ -21,6 +21,7 @@ from api.v1.routes.admin import router as admin_router
 from routes.precision import router as precision_router
 from routes.odds import router as odds_router
 from core.scheduler import start_scheduler, stop_scheduler
+from core.events import match_events
 
 # Création des tables au démarrage (pour le développement)
 Base.metadata.create_all(bind=engine)
@@ -111,10 +112,12 @@ async def lifespan(app: FastAPI):
     except Exception as e:
         print(f"⚠️ Auto-migration ignorée: {e}")
     
-    # Startup: Démarrer le scheduler
+    # Startup: Démarrer le scheduler et le relais Redis du flux en direct
     start_scheduler()
+    match_events.start()
     yield
     # Shutdown: Arrêter le scheduler
+    match_events.stop()
     stop_scheduler()
 
 
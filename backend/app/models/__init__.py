@@ -5,3 +5,10 @@ from .prediction import ExpertPrediction
 from .token import RefreshToken, TokenBlacklist
 from .standing import Standing
 from .team_stats import TeamStats
+from .team_feature import TeamFeatureSnapshot
+from .weight_set import WeightSet
+from .league_coefficient import LeagueCoefficient
+from .team_rating import TeamRating, TeamRatingHistory
+from .value_bet import ValueBet
+from .competition import Competition
+from .history_stat import HistoryDailyStat
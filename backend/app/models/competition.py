@@ -0,0 +1,32 @@
+"""Modèle Competition: catalogue des compétitions synchronisé depuis Football-Data.org."""
+from sqlalchemy import Column, Integer, String, DateTime
+from datetime import datetime, timezone
+from .base import Base
+
+
+class Competition(Base):
+    """
+    Compétition suivie (championnat ou coupe).
+    
+    Le catalogue change quelques fois par an: il est servi depuis la base
+    (synchronisation périodique) au lieu d'interroger l'API à chaque requête.
+    La journée courante est rafraîchie par la synchronisation des classements.
+    """
+    __tablename__ = "competitions"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    external_id = Column(Integer, unique=True, nullable=True)  # ID Football-Data.org
+    code = Column(String(10), unique=True, nullable=False, index=True)
+    name = Column(String(100), nullable=False)
+    area = Column(String(100), nullable=True)
+    emblem = Column(String(500), nullable=True)
+    type = Column(String(20), nullable=True)  # LEAGUE, CUP...
+    
+    # Saison en cours
+    current_season = Column(Integer, nullable=True)
+    current_matchday = Column(Integer, nullable=True)
+    
+    last_synced = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    
+    def __repr__(self):
+        return f"<Competition {self.code}: {self.name}>"
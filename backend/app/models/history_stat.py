@@ -0,0 +1,34 @@
+"""Modèle HistoryDailyStat: agrégats quotidiens de réussite des prédictions."""
+from sqlalchemy import Column, Integer, String, DateTime, Date, UniqueConstraint
+from datetime import datetime, timezone
+from .base import Base
+
+
+class HistoryDailyStat(Base):
+    """
+    Réussite des prédictions des matchs terminés, par jour et compétition.
+    
+    Table de cumul de HistoryStatsService: les statistiques d'une période
+    (semaine, mois, saison) se lisent en sommant quelques lignes par jour
+    au lieu de parcourir les matchs.
+    """
+    __tablename__ = "history_daily_stats"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False, index=True)
+    competition_code = Column(String(10), nullable=False)
+    competition_name = Column(String(100), nullable=True)
+    
+    total = Column(Integer, nullable=False, default=0)  # Matchs terminés avec prédiction
+    correct_winner = Column(Integer, nullable=False, default=0)
+    correct_score = Column(Integer, nullable=False, default=0)
+    correct_goals = Column(Integer, nullable=False, default=0)  # Over/Under 2.5
+    
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    
+    __table_args__ = (
+        UniqueConstraint('day', 'competition_code', name='uq_history_daily_stat_day_competition'),
+    )
+    
+    def __repr__(self):
+        return f"<HistoryDailyStat {self.day} {self.competition_code}: {self.correct_winner}/{self.total}>"
@@ -0,0 +1,32 @@
+"""Modèle LeagueCoefficient: force relative des championnats par saison."""
+from sqlalchemy import Column, Integer, String, DateTime, Float, UniqueConstraint
+from datetime import datetime, timezone
+from .base import Base
+
+
+class LeagueCoefficient(Base):
+    """
+    Coefficient d'un championnat pour une saison.
+    
+    Estimé à partir des matchs européens (CL, EL, ECL) entre clubs de
+    championnats différents: un classement Elo des championnats, converti
+    en force 0-1 pour la Logique de Papa.
+    """
+    __tablename__ = "league_coefficients"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    season = Column(Integer, nullable=False)
+    league_code = Column(String(10), nullable=False)
+    
+    rating = Column(Float, nullable=False)  # Elo du championnat en fin de saison (ou à date)
+    strength = Column(Float, nullable=False)  # Force 0.3-1.0 servie à _get_league_strength
+    matches = Column(Integer, default=0)  # Matchs inter-championnats de la saison
+    
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    
+    __table_args__ = (
+        UniqueConstraint('season', 'league_code', name='uq_league_coefficient_season'),
+    )
+    
+    def __repr__(self):
+        return f"<LeagueCoefficient {self.league_code} {self.season}: {self.strength:.2f}>"
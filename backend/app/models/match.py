@@ -1,5 +1,5 @@
 """Modèle Match enrichi pour stocker les données de Football-Data.org."""
-from sqlalchemy import Column, Integer, String, DateTime, Float
+from sqlalchemy import Column, Integer, String, DateTime, Float, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from .base import Base
@@ -48,6 +48,11 @@ class Match(Base):
     # Statut: SCHEDULED, TIMED, IN_PLAY, PAUSED, FINISHED, POSTPONED, CANCELLED
     status = Column(String(20), default="SCHEDULED", index=True)
     
+    # Phase (REGULAR_SEASON, LEAGUE_STAGE, LAST_16, QUARTER_FINALS, ..., FINAL)
+    stage = Column(String(30), nullable=True)
+    # Vainqueur officiel (HOME_TEAM, AWAY_TEAM, DRAW): tirs au but inclus
+    winner = Column(String(10), nullable=True)
+    
     # === Cotes de Paris (The Odds API) ===
     odds_home = Column(Float, nullable=True)    # Cote victoire domicile
     odds_draw = Column(Float, nullable=True)    # Cote match nul
@@ -60,5 +65,14 @@ class Match(Base):
     # Relation avec les prédictions
     expert_prediction = relationship("ExpertPrediction", back_populates="match", uselist=False)
     
+    # Index composites (équipe, date): fenêtres de calendrier par équipe
+    __table_args__ = (
+        Index('ix_matches_home_team_date', 'home_team_id', 'match_date'),
+        Index('ix_matches_away_team_date', 'away_team_id', 'match_date'),
+        # Pagination par curseur (match_date, id), globale et par compétition
+        Index('ix_matches_date_id', 'match_date', 'id'),
+        Index('ix_matches_competition_date_id', 'competition_code', 'match_date', 'id'),
+    )
+    
     def __repr__(self):
         return f"<Match {self.home_team} vs {self.away_team} ({self.match_date.date()})>"
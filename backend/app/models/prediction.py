@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Float, Boolean
+from sqlalchemy import Column, Integer, String, ForeignKey, Float, Boolean, Text, DateTime
 from sqlalchemy.orm import relationship
 from .base import Base
 
@@ -77,6 +77,31 @@ class ExpertPrediction(Base):
     verified = Column(Boolean, default=False)  # True si la prédiction a été vérifiée
     winner_correct = Column(Boolean, nullable=True)  # True si le vainqueur prédit est correct
     score_correct = Column(Boolean, nullable=True)  # True si le score exact est correct
+    
+    # === Invalidation (empreinte des entrées) ===
+    input_fingerprint = Column(String(64), nullable=True)  # sha256 des entrées du calcul
+    model_version = Column(String(20), nullable=True)  # Version du modèle ayant produit la prédiction
+
+    # === Marchés (matrice de scores Poisson / Dixon-Coles) ===
+    prob_home_win = Column(Float, nullable=True)
+    prob_draw = Column(Float, nullable=True)
+    prob_away_win = Column(Float, nullable=True)
+    prob_over_2_5 = Column(Float, nullable=True)
+    prob_btts = Column(Float, nullable=True)  # Les deux équipes marquent
+    expected_home_goals = Column(Float, nullable=True)
+    expected_away_goals = Column(Float, nullable=True)
+    score_matrix = Column(Text, nullable=True)  # Matrice JSON (si STORE_SCORE_MATRIX)
+
+    # === Marché (cotes sans marge, voir services.market_probabilities) ===
+    market_prob_home = Column(Float, nullable=True)
+    market_prob_draw = Column(Float, nullable=True)
+    market_prob_away = Column(Float, nullable=True)
+    market_overround = Column(Float, nullable=True)  # Marge du bookmaker (somme des 1/cote - 1)
+    market_method = Column(String(10), nullable=True)  # "power" ou "shin"
+    market_odds_at = Column(DateTime, nullable=True)  # Cotes utilisées (ligne de clôture après le coup d'envoi)
+    blend_prob_home = Column(Float, nullable=True)  # Mélange modèle / marché (MARKET_BLEND_WEIGHT)
+    blend_prob_draw = Column(Float, nullable=True)
+    blend_prob_away = Column(Float, nullable=True)
 
     match = relationship("Match", back_populates="expert_prediction")
 
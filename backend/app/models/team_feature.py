@@ -0,0 +1,65 @@
+"""Modèle TeamFeatureSnapshot: features d'équipe matérialisées (point-in-time)."""
+from sqlalchemy import Column, Integer, String, DateTime, Text, UniqueConstraint, Index
+from datetime import datetime, timezone
+from .base import Base
+
+
+class TeamFeatureSnapshot(Base):
+    """
+    État des features d'une équipe juste APRÈS un match terminé.
+
+    Une ligne par (équipe, match joué). Pour prédire un match à la date T,
+    on lit le dernier snapshot dont `as_of` < T: aucune donnée future
+    n'est visible (backtests sans fuite).
+    """
+    __tablename__ = "team_feature_snapshots"
+
+    id = Column(Integer, primary_key=True, index=True)
+    team_id = Column(Integer, nullable=False)
+    as_of = Column(DateTime, nullable=False)  # Date du match qui a produit le snapshot
+    match_id = Column(Integer, nullable=False)
+    season = Column(Integer, nullable=False)
+
+    # Championnat de l'équipe (dernière compétition hors coupe jouée)
+    league_code = Column(String(10), nullable=True)
+
+    # Compteurs cumulés de la saison (toutes compétitions)
+    played = Column(Integer, default=0)
+    wins = Column(Integer, default=0)
+    draws = Column(Integer, default=0)
+    losses = Column(Integer, default=0)
+    goals_for = Column(Integer, default=0)
+    goals_against = Column(Integer, default=0)
+
+    # Domicile / extérieur (points cumulés de la saison)
+    home_played = Column(Integer, default=0)
+    home_points = Column(Integer, default=0)
+    away_played = Column(Integer, default=0)
+    away_points = Column(Integer, default=0)
+
+    # Championnat uniquement (pour le classement point-in-time)
+    league_played = Column(Integer, default=0)
+    league_points = Column(Integer, default=0)
+    league_goal_diff = Column(Integer, default=0)
+    league_goals_for = Column(Integer, default=0)
+
+    # Forme: 10 derniers résultats, le plus récent en premier (ex: "W,D,L")
+    form = Column(String(30), nullable=True)
+    # 10 derniers matchs détaillés (JSON compact) pour APEX-30
+    recent_matches = Column(Text, nullable=True)
+
+    # Fatigue / matchs importants
+    last_match_date = Column(DateTime, nullable=True)
+    last_important_date = Column(DateTime, nullable=True)
+    last_important_match_id = Column(Integer, nullable=True)
+
+    # Métadonnées
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        UniqueConstraint('team_id', 'match_id', name='uq_team_feature_match'),
+        Index('ix_team_feature_team_as_of', 'team_id', 'as_of'),
+    )
+
+    def __repr__(self):
+        return f"<TeamFeatureSnapshot Team:{self.team_id} as_of:{self.as_of}>"
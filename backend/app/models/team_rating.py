@@ -0,0 +1,53 @@
+"""Modèles TeamRating / TeamRatingHistory: classement Elo des équipes."""
+from sqlalchemy import Column, Integer, String, DateTime, Float, UniqueConstraint, Index
+from datetime import datetime, timezone
+from .base import Base
+
+
+class TeamRating(Base):
+    """
+    Elo courant d'une équipe (une ligne par équipe).
+    
+    Mis à jour en O(1) à chaque match terminé synchronisé: lecture des
+    deux lignes, calcul, écriture.
+    """
+    __tablename__ = "team_ratings"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    team_id = Column(Integer, nullable=False, unique=True)
+    rating = Column(Float, nullable=False)
+    season = Column(Integer, nullable=False)  # Saison du dernier match (régression en début de saison)
+    league_code = Column(String(10), nullable=True)  # Dernier championnat joué (hors coupe)
+    matches = Column(Integer, default=0)
+    
+    last_match_id = Column(Integer, nullable=True)
+    last_match_date = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    
+    def __repr__(self):
+        return f"<TeamRating Team:{self.team_id} {self.rating:.0f}>"
+
+
+class TeamRatingHistory(Base):
+    """
+    Elo d'une équipe juste APRÈS un match terminé.
+    
+    Une ligne par (équipe, match joué). Lecture point-in-time: pour un
+    match à la date T, dernier Elo dont `as_of` < T.
+    """
+    __tablename__ = "team_rating_history"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    team_id = Column(Integer, nullable=False)
+    match_id = Column(Integer, nullable=False)
+    as_of = Column(DateTime, nullable=False)
+    rating = Column(Float, nullable=False)
+    rating_change = Column(Float, nullable=False)
+    
+    __table_args__ = (
+        UniqueConstraint('team_id', 'match_id', name='uq_team_rating_match'),
+        Index('ix_team_rating_team_as_of', 'team_id', 'as_of'),
+    )
+    
+    def __repr__(self):
+        return f"<TeamRatingHistory Team:{self.team_id} as_of:{self.as_of} {self.rating:.0f}>"
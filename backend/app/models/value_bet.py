@@ -0,0 +1,36 @@
+"""Modèle ValueBet: paris à valeur des matchs à venir (table classée)."""
+from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean, ForeignKey, UniqueConstraint
+from datetime import datetime, timezone
+from .base import Base
+
+
+class ValueBet(Base):
+    """
+    Issue 1X2 d'un match à venir dont l'espérance de gain est positive.
+    
+    Table entièrement reconstruite par ValueBetScanner après chaque mise à
+    jour des cotes ou lot de prédictions; `rank` 1 = meilleure espérance.
+    """
+    __tablename__ = "value_bets"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    match_id = Column(Integer, ForeignKey("matches.id"), nullable=False)
+    bet_type = Column(String(10), nullable=False)  # "home", "draw", "away"
+    
+    odds = Column(Float, nullable=False)
+    probability = Column(Float, nullable=False)  # Probabilité du modèle (matrice de scores)
+    implied_probability = Column(Float, nullable=False)  # 1 / cote (marge incluse)
+    market_probability = Column(Float, nullable=True)  # Probabilité du marché sans marge
+    expected_value = Column(Float, nullable=False)  # Gain espéré pour une mise de 1
+    value = Column(Float, nullable=False)  # probability - implied_probability
+    is_value_bet = Column(Boolean, default=False, nullable=False)
+    
+    rank = Column(Integer, nullable=False, index=True)
+    computed_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    
+    __table_args__ = (
+        UniqueConstraint('match_id', 'bet_type', name='uq_value_bet_match_type'),
+    )
+    
+    def __repr__(self):
+        return f"<ValueBet #{self.rank} Match:{self.match_id} {self.bet_type} EV:{self.expected_value:+.3f}>"
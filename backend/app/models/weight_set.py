@@ -0,0 +1,36 @@
+"""Modèle WeightSet: jeux de poids versionnés des moteurs de prédiction."""
+from sqlalchemy import Column, Integer, String, DateTime, Text, Boolean, Index
+from datetime import datetime, timezone
+from .base import Base
+
+
+class WeightSet(Base):
+    """
+    Jeu de poids d'un moteur (APEX-30 ou mélange des 3 logiques).
+    
+    Produit par l'optimiseur de poids à partir de l'historique; un seul
+    jeu est actif par moteur et il est chargé à l'exécution. Sans jeu
+    actif, les moteurs gardent leurs constantes par défaut.
+    """
+    __tablename__ = "weight_sets"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    engine = Column(String(20), nullable=False)  # "apex30", "multi_logic"
+    version = Column(String(40), nullable=False, unique=True)  # Ex: "apex30-v3-20260210"
+    
+    weights = Column(Text, nullable=False)  # JSON {nom: poids}
+    
+    # Qualité mesurée lors de l'optimisation
+    objective = Column(String(20), nullable=True)  # "log_loss", "brier", "accuracy"
+    metrics = Column(Text, nullable=True)  # JSON {log_loss, brier, accuracy, matches}
+    
+    is_active = Column(Boolean, default=False, nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    activated_at = Column(DateTime, nullable=True)
+    
+    __table_args__ = (
+        Index('ix_weight_sets_engine_active', 'engine', 'is_active'),
+    )
+    
+    def __repr__(self):
+        return f"<WeightSet {self.version} active:{self.is_active}>"
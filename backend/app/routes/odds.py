@@ -1,15 +1,23 @@
 """
 Routes API pour les cotes de paris (The Odds API)
 """
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from typing import Optional
-from pydantic import BaseModel
+from typing import List, Optional
+from pydantic import BaseModel, Field
 from datetime import datetime
 
-from core.database import get_db
+from core.config import settings
+from core.database import DatabaseRunner, get_db, get_db_runner
+from core.responses import json_response
 from services.odds_service import OddsService
+from services.value_bets import ValueBetScanner
+from services.kelly_portfolio import (
+    KellyPortfolioService, DEFAULT_KELLY_FRACTION, DEFAULT_MAX_STAKE, DEFAULT_MAX_EXPOSURE
+)
+from services.market_probabilities import MarketProbabilityService, MARGIN_METHODS
 from models.match import Match
+from models.value_bet import ValueBet
 
 
 router = APIRouter(prefix="/odds", tags=["odds"])
@@ -46,6 +54,206 @@ class UpdateStatsResponse(BaseModel):
     skipped: int
 
 
+class MarketProbabilityStatsResponse(BaseModel):
+    """Stats de l'étape probabilités du marché."""
+    method: str
+    updated: int
+    skipped: int
+
+
+class RankedValueBet(ValueBetResponse):
+    """Issue classée du scanner de value bets."""
+    rank: int
+    match_id: int
+    competition_code: str
+    home_team: str
+    away_team: str
+    match_date: datetime
+    bet_type: str
+    odds: float
+    market_probability: Optional[float] = None  # Probabilité du marché sans marge (%)
+
+
+class ValueBetListResponse(BaseModel):
+    """Page du classement des value bets."""
+    total: int
+    limit: int
+    offset: int
+    computed_at: Optional[datetime] = None
+    items: List[RankedValueBet]
+
+
+@router.get("/value-bets", response_model=ValueBetListResponse)
+async def list_value_bets(
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    value_only: bool = Query(False, description="Uniquement les issues au-dessus du seuil de value"),
+    competition: Optional[str] = Query(None, description="Code de la compétition"),
+    runner: DatabaseRunner = Depends(get_db_runner)
+):
+    """
+    Classement des issues à espérance de gain positive de tous les matchs à venir.
+    
+    Lecture de la table value_bets (recalculée après chaque mise à jour des
+    cotes et lot de prédictions): remplace un appel /{match_id}/value-bet par match.
+    """
+    def load(db: Session) -> ValueBetListResponse:
+        query = db.query(ValueBet, Match).join(Match, ValueBet.match_id == Match.id).filter(
+            Match.match_date >= datetime.now()
+        )
+        if value_only:
+            query = query.filter(ValueBet.is_value_bet.is_(True))
+        if competition:
+            query = query.filter(Match.competition_code == competition.upper())
+        
+        total = query.count()
+        odds_service = OddsService()
+        rows = query.order_by(ValueBet.rank).offset(offset).limit(limit).all()
+        
+        items = [
+            RankedValueBet(
+                rank=bet.rank,
+                match_id=match.id,
+                competition_code=match.competition_code,
+                home_team=match.home_team,
+                away_team=match.away_team,
+                match_date=match.match_date,
+                bet_type=bet.bet_type,
+                odds=bet.odds,
+                market_probability=(
+                    round(bet.market_probability * 100, 1) if bet.market_probability is not None else None
+                ),
+                is_value_bet=bet.is_value_bet,
+                expected_value=round(bet.expected_value, 3),
+                value_percentage=round(bet.value * 100, 1),
+                implied_probability=round(bet.implied_probability * 100, 1),
+                our_probability=round(bet.probability * 100, 1),
+                recommendation=odds_service._get_bet_recommendation(bet.expected_value, bet.value)
+            )
+            for bet, match in rows
+        ]
+        return ValueBetListResponse(
+            total=total,
+            limit=limit,
+            offset=offset,
+            computed_at=rows[0][0].computed_at if rows else None,
+            items=items
+        )
+    
+    return await runner.run(load)
+
+
+@router.post("/value-bets/refresh")
+async def refresh_value_bets(db: Session = Depends(get_db)):
+    """
+    Réévalue immédiatement les value bets de tous les matchs à venir.
+    """
+    return json_response({"value_bets": ValueBetScanner(db).refresh()})
+
+
+class PortfolioRequest(BaseModel):
+    """Paramètres du portefeuille de Kelly."""
+    bankroll: float = Field(100.0, gt=0)
+    kelly_fraction: float = Field(DEFAULT_KELLY_FRACTION, gt=0, le=1)
+    max_stake: float = Field(DEFAULT_MAX_STAKE, gt=0, le=1, description="Mise maximale par pari (part de bankroll)")
+    max_exposure: float = Field(DEFAULT_MAX_EXPOSURE, gt=0, le=1, description="Mise totale maximale (part de bankroll)")
+    min_stake: float = Field(0.0, ge=0, description="Mises inférieures ignorées (montant)")
+    value_only: bool = False
+    competition: Optional[str] = None
+
+
+class PortfolioStake(BaseModel):
+    """Mise conseillée sur une issue."""
+    match_id: int
+    home_team: str
+    away_team: str
+    match_date: datetime
+    bet_type: str
+    odds: float
+    our_probability: float  # %
+    stake: float
+    stake_percentage: float  # % de la bankroll
+
+
+class PortfolioResponse(BaseModel):
+    """Portefeuille de mises (Kelly fractionnaire, paris simultanés)."""
+    bankroll: float
+    total_stake: float
+    exposure_percentage: float
+    expected_profit: float
+    expected_growth: float  # E[log(bankroll finale / bankroll)]
+    candidates: int
+    stakes: List[PortfolioStake]
+
+
+@router.post("/portfolio", response_model=PortfolioResponse)
+async def build_portfolio(request: PortfolioRequest, runner: DatabaseRunner = Depends(get_db_runner)):
+    """
+    Répartit la bankroll sur tous les value bets en cours (critère de Kelly).
+    
+    Les mises sont optimisées ensemble: issues d'un même match exclusives,
+    matchs indépendants, plafonds par pari et d'exposition totale respectés.
+    L'optimisation (scénarios, FISTA) tourne dans le pool de threads.
+    """
+    def build(db: Session) -> PortfolioResponse:
+        rows, result = KellyPortfolioService(db).build(
+            kelly_fraction=request.kelly_fraction,
+            max_stake=request.max_stake,
+            max_exposure=request.max_exposure,
+            value_only=request.value_only,
+            competition=request.competition
+        )
+        
+        stakes = []
+        for (bet, match), fraction in zip(rows, result.fractions):
+            stake = round(float(fraction) * request.bankroll, 2)
+            if stake <= 0 or stake < request.min_stake:
+                continue
+            stakes.append(PortfolioStake(
+                match_id=match.id,
+                home_team=match.home_team,
+                away_team=match.away_team,
+                match_date=match.match_date,
+                bet_type=bet.bet_type,
+                odds=bet.odds,
+                our_probability=round(bet.probability * 100, 1),
+                stake=stake,
+                stake_percentage=round(float(fraction) * 100, 2)
+            ))
+        stakes.sort(key=lambda s: -s.stake)
+        total_stake = round(sum(s.stake for s in stakes), 2)
+        
+        return PortfolioResponse(
+            bankroll=request.bankroll,
+            total_stake=total_stake,
+            exposure_percentage=round(total_stake / request.bankroll * 100, 2),
+            expected_profit=round(sum(s.stake * (s.our_probability / 100 * s.odds - 1) for s in stakes), 2),
+            expected_growth=round(result.expected_growth, 5),
+            candidates=len(rows),
+            stakes=stakes
+        )
+    
+    return await runner.run_blocking(build)
+
+
+@router.post("/market-probabilities", response_model=MarketProbabilityStatsResponse)
+async def refresh_market_probabilities(
+    method: Optional[str] = Query(None, description="Retrait de marge: power ou shin"),
+    db: Session = Depends(get_db)
+):
+    """
+    Recalcule les probabilités du marché (cotes sans marge) et leur mélange
+    avec le modèle pour tous les matchs à venir.
+    
+    Ne consomme aucun crédit API: utilise les cotes déjà stockées.
+    """
+    if method is not None and method not in MARGIN_METHODS:
+        raise HTTPException(status_code=400, detail=f"Méthode inconnue: {method} (power, shin)")
+    
+    report = MarketProbabilityService(db).run(method=method)
+    return MarketProbabilityStatsResponse(method=method or settings.market_margin_method, **report)
+
+
 @router.get("/{match_id}", response_model=OddsResponse)
 async def get_match_odds(match_id: int, db: Session = Depends(get_db)):
     """
@@ -193,7 +401,7 @@ async def get_available_sports():
     """
     odds_service = OddsService()
     
-    return {
+    return json_response({
         "supported_competitions": odds_service.COMPETITION_MAPPING,
         "message": "Ces codes de compétition peuvent avoir leurs cotes mises à jour"
-    }
+    })
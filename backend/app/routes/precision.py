@@ -6,7 +6,8 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import Optional
 
-from core.database import get_db
+from core.database import DatabaseRunner, get_db, get_db_runner
+from core.responses import json_response
 from services.precision_journal import PrecisionJournal
 
 
@@ -21,31 +22,29 @@ async def verify_yesterday(db: Session = Depends(get_db)):
     """
     journal = PrecisionJournal(db)
     results = await journal.verify_yesterday_predictions()
-    return results
+    return json_response(results)
 
 
 @router.get("/stats")
-async def get_precision_stats(days: Optional[int] = 30, db: Session = Depends(get_db)):
+async def get_precision_stats(days: Optional[int] = 30, runner: DatabaseRunner = Depends(get_db_runner)):
     """
     Récupère les statistiques de précision sur les N derniers jours.
     
     Args:
         days: Nombre de jours à analyser (défaut: 30)
     """
-    journal = PrecisionJournal(db)
-    stats = journal.get_overall_stats(days=days)
-    return stats
+    stats = await runner.run(lambda db: PrecisionJournal(db).get_overall_stats(days=days))
+    return json_response(stats)
 
 
 @router.get("/calibration")
-async def get_calibration(days: Optional[int] = 30, db: Session = Depends(get_db)):
+async def get_calibration(days: Optional[int] = 30, runner: DatabaseRunner = Depends(get_db_runner)):
     """
     Récupère les données de calibration du modèle.
     Montre si la confiance prédite correspond à la précision réelle.
     """
-    journal = PrecisionJournal(db)
-    stats = journal.get_overall_stats(days=days)
-    return {
+    stats = await runner.run(lambda db: PrecisionJournal(db).get_overall_stats(days=days))
+    return json_response({
         'calibration': stats.get('calibration', {}),
         'period': stats.get('period', f'{days} jours')
-    }
+    })
@@ -75,6 +75,33 @@ class MatchListResponse(BaseModel):
     """Liste de matchs avec pagination."""
     count: int
     matches: List[MatchResponse]
+    next_cursor: Optional[str] = None  # Page suivante (pagination par curseur)
+
+
+class MatchCompactResponse(BaseModel):
+    """Match allégé pour les listes (view=compact)."""
+    id: int
+    competition_code: Optional[str] = None
+    matchday: Optional[int] = None
+    home_team: str
+    home_team_crest: Optional[str] = None
+    away_team: str
+    away_team_crest: Optional[str] = None
+    match_date: datetime
+    status: str
+    score_home: Optional[int] = None
+    score_away: Optional[int] = None
+    odds_home: Optional[float] = None
+    odds_draw: Optional[float] = None
+    odds_away: Optional[float] = None
+    prediction: Optional["PredictionCompact"] = None
+
+
+class MatchCompactListResponse(BaseModel):
+    """Liste de matchs allégés avec pagination."""
+    count: int
+    matches: List[MatchCompactResponse]
+    next_cursor: Optional[str] = None
 
 
 # =====================
@@ -130,6 +157,59 @@ class StandingsResponse(BaseModel):
     standings: List[StandingEntry]
 
 
+class TeamProjectionEntry(BaseModel):
+    """Projection de fin de saison d'une équipe."""
+    team_id: int
+    team_name: str
+    position: int  # Position actuelle
+    points: int  # Points actuels
+    expected_points: float
+    expected_position: float
+    position_probabilities: List[float]  # [k] = P(finir (k+1)ème)
+    title: float
+    europe: float  # Places européennes
+    relegation: float
+
+
+class SeasonProjectionResponse(BaseModel):
+    """Distribution des classements finaux (simulation de Monte Carlo)."""
+    competition_code: str
+    season: int
+    simulations: int
+    remaining_matches: int
+    generated_at: datetime
+    teams: List[TeamProjectionEntry]
+
+
+class BracketTieEntry(BaseModel):
+    """Confrontation du tour en cours et probabilité de qualification."""
+    team_a_id: int  # Reçoit la dernière manche
+    team_a: str
+    team_b_id: int
+    team_b: str
+    probability_a: float
+    decided: bool
+
+
+class BracketTeamEntry(BaseModel):
+    """Probabilités d'une équipe d'atteindre chaque tour."""
+    team_id: int
+    team_name: str
+    reach: dict  # {tour: probabilité}
+    winner: Optional[float] = None  # None si le tableau ne se résout pas
+
+
+class KnockoutProjectionResponse(BaseModel):
+    """Projection d'une phase à élimination directe (simulation de Monte Carlo)."""
+    competition_code: str
+    season: int
+    stage: str  # Tour en cours
+    simulations: int
+    stages: List[str]
+    ties: List[BracketTieEntry]
+    teams: List[BracketTeamEntry]
+
+
 # =====================
 # Prediction Schemas
 # =====================
@@ -186,6 +266,34 @@ class PredictionSummary(BaseModel):
     gf_away_league_level: Optional[float] = None
     gf_home_advantage_bonus: Optional[float] = None
     gf_verdict: Optional[str] = None
+    
+    # Marchés (matrice de scores Poisson / Dixon-Coles)
+    prob_home_win: Optional[float] = None
+    prob_draw: Optional[float] = None
+    prob_away_win: Optional[float] = None
+    prob_over_2_5: Optional[float] = None
+    prob_btts: Optional[float] = None
+    expected_home_goals: Optional[float] = None
+    expected_away_goals: Optional[float] = None
+    
+    # Marché (cotes sans marge) et mélange modèle / marché
+    market_prob_home: Optional[float] = None
+    market_prob_draw: Optional[float] = None
+    market_prob_away: Optional[float] = None
+    blend_prob_home: Optional[float] = None
+    blend_prob_draw: Optional[float] = None
+    blend_prob_away: Optional[float] = None
+
+
+class PredictionCompact(BaseModel):
+    """Prédiction réduite au score et aux probabilités 1X2 (view=compact)."""
+    home_score_forecast: int
+    away_score_forecast: int
+    confidence: float
+    bet_tip: Optional[str] = None
+    prob_home_win: Optional[float] = None
+    prob_draw: Optional[float] = None
+    prob_away_win: Optional[float] = None
 
 
 class PredictionResponse(BaseModel):
@@ -267,6 +375,14 @@ class CombinedPredictionResponse(BaseModel):
     all_agree: bool
 
 
+class CombinedPredictionListResponse(BaseModel):
+    """Prédictions combinées pour un lot de matchs."""
+    count: int
+    predictions: List[CombinedPredictionResponse]
+    missing: List[int] = []       # IDs de matchs inexistants
+    insufficient: List[int] = []  # IDs sans données suffisantes
+
+
 class Apex30ModuleReport(BaseModel):
     """Un module de l'analyse APEX-30."""
     id: str
@@ -289,3 +405,4 @@ class Apex30FullReport(BaseModel):
 
 # Forward reference resolution
 MatchResponse.model_rebuild()
+MatchCompactResponse.model_rebuild()
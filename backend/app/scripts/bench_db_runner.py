@@ -0,0 +1,108 @@
+"""
+Benchmark des requêtes concurrentes (core.database.DatabaseRunner).
+
+Lance N requêtes concurrentes sur une base SQLite temporaire dont chaque
+requête simule un aller-retour réseau (fonction SQL db_wait), et mesure la
+durée totale et le retard maximal de la boucle d'événements pour:
+- une Session synchrone appelée directement sur la boucle (avant);
+- DatabaseRunner, pool de threads;
+- DatabaseRunner, AsyncSession (aiosqlite + greenlet, si installés).
+
+Exemples:
+    python scripts/bench_db_runner.py
+    python scripts/bench_db_runner.py --requests 16 --latency 50
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmpdir = tempfile.TemporaryDirectory()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_tmpdir.name, 'bench.db')}")
+
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import sessionmaker
+
+from core.database import DatabaseRunner, create_async_session_factory
+
+# Période du sondage de la boucle (secondes)
+TICK = 0.005
+
+
+def _add_wait(conn, record):
+    # Latence d'un aller-retour vers une base distante
+    conn.create_function("db_wait", 1, lambda ms: time.sleep(ms / 1000) or 0)
+
+
+async def _measure(requests, count: int) -> tuple:
+    """Durée totale et retard maximal de la boucle (ms) pendant `count` requêtes concurrentes."""
+    lag = 0.0
+    done = False
+
+    async def probe():
+        nonlocal lag
+        while not done:
+            expected = time.perf_counter() + TICK
+            await asyncio.sleep(TICK)
+            lag = max(lag, time.perf_counter() - expected)
+
+    prober = asyncio.create_task(probe())
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    await asyncio.gather(*[requests() for _ in range(count)])
+    elapsed = time.perf_counter() - started
+    done = True
+    await prober
+    return elapsed * 1000, lag * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des requêtes concurrentes hors de la boucle")
+    parser.add_argument("--requests", type=int, default=8, help="Requêtes concurrentes")
+    parser.add_argument("--latency", type=int, default=100, help="Aller-retour simulé par requête (ms)")
+    args = parser.parse_args()
+
+    url = f"sqlite:///{os.path.join(_tmpdir.name, 'runner.db')}"
+    sync_engine = create_engine(url)
+    event.listen(sync_engine, "connect", _add_wait)
+    session_factory = sessionmaker(bind=sync_engine)
+    query = text(f"SELECT db_wait({args.latency}) + 1")
+
+    def query_fn(db):
+        return db.execute(query).scalar()
+
+    async def on_loop():
+        db = session_factory()
+        try:
+            return query_fn(db)
+        finally:
+            db.close()
+
+    modes = [
+        ("Session synchrone sur la boucle", on_loop),
+        ("DatabaseRunner, pool de threads", lambda: DatabaseRunner(session_factory).run(query_fn)),
+    ]
+    async_factory = create_async_session_factory(url)
+    if async_factory is not None:
+        event.listen(async_factory.kw["bind"].sync_engine, "connect", _add_wait)
+        async_runner = DatabaseRunner(session_factory, async_factory)
+        modes.append(("DatabaseRunner, AsyncSession (aiosqlite)", lambda: async_runner.run(query_fn)))
+
+    print(f"{args.requests} requêtes concurrentes, {args.latency} ms d'aller-retour simulé chacune")
+    print("| Mode | Total | Retard max de la boucle |")
+    print("| --- | --- | --- |")
+    try:
+        for name, requests in modes:
+            total, lag = asyncio.run(_measure(requests, args.requests))
+            print(f"| {name} | {total:.0f} ms | {lag:.0f} ms |")
+    finally:
+        sync_engine.dispose()
+        _tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
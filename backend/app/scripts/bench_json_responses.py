@@ -0,0 +1,98 @@
+"""
+Benchmark de la sérialisation JSON des réponses (core.responses).
+
+Construit une page /matches/history synthétique (entrées history_entry,
+non persistées) et compare jsonable_encoder + json.dumps, l'encodage
+générique de FastAPI, à dumps() (orjson si installé). Vérifie au passage
+que les deux sorties sont identiques.
+
+Exemples:
+    python scripts/bench_json_responses.py
+    python scripts/bench_json_responses.py --matches 2000 --runs 50
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmpdir = tempfile.TemporaryDirectory()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_tmpdir.name, 'bench.db')}")
+
+from fastapi.encoders import jsonable_encoder
+
+from controllers.matches_controller import history_entry
+from core.responses import dumps, orjson
+from models.match import Match
+from models.prediction import ExpertPrediction
+
+
+def _history_payload(matches: int) -> dict:
+    """Page d'historique de `matches` matchs terminés, avec prédictions et statistiques."""
+    start = datetime(2025, 8, 16, 15, 0)
+    entries = []
+    for i in range(matches):
+        match = Match(
+            id=i + 1, competition_code="PL", competition_name="Premier League",
+            home_team=f"Équipe domicile {i}", home_team_short=f"DOM{i % 100}",
+            home_team_crest=f"https://crests.football-data.org/{2 * i}.png",
+            away_team=f"Équipe extérieur {i}", away_team_short=f"EXT{i % 100}",
+            away_team_crest=f"https://crests.football-data.org/{2 * i + 1}.png",
+            match_date=start + timedelta(hours=i), status="FINISHED",
+            score_home=i % 4, score_away=i % 3,
+        )
+        match.expert_prediction = ExpertPrediction(
+            match_id=match.id, home_score_forecast=(i + 1) % 3, away_score_forecast=i % 2,
+            confidence=0.55 + (i % 10) / 50, bet_tip="Victoire domicile",
+        )
+        entries.append(history_entry(match))
+    return {
+        "date": start.date(),
+        "generated_at": datetime(2026, 2, 1, 20, 45),
+        "matches": entries,
+        "stats": {"total": matches, "by_competition": {"PL": {"total": matches, "winner_rate": 0.52}}},
+    }
+
+
+def _standard(payload) -> bytes:
+    return json.dumps(jsonable_encoder(payload)).encode("utf-8")
+
+
+def _median_ms(fn, payload, runs: int) -> float:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn(payload)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la sérialisation JSON des réponses")
+    parser.add_argument("--matches", type=int, default=500, help="Matchs dans la page d'historique")
+    parser.add_argument("--runs", type=int, default=20, help="Répétitions par mesure")
+    args = parser.parse_args()
+
+    try:
+        payload = _history_payload(args.matches)
+        body = dumps(payload)
+        if json.loads(body) != json.loads(_standard(payload)):
+            print("❌ Sorties différentes entre dumps() et jsonable_encoder + json.dumps")
+            sys.exit(1)
+
+        standard = _median_ms(_standard, payload, args.runs)
+        fast = _median_ms(dumps, payload, args.runs)
+        print(f"Page /matches/history de {args.matches} matchs ({len(body) / 1024:.0f} Ko), sorties identiques")
+        print(f"  jsonable_encoder + json.dumps: médiane {standard:.2f} ms")
+        print(f"  dumps() ({'orjson' if orjson else 'stdlib'}): médiane {fast:.2f} ms ({standard / fast:.0f}x)")
+    finally:
+        _tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark de l'étape probabilités du marché (services.market_probabilities).
+
+Crée une base SQLite temporaire avec une journée complète (matchs à venir,
+cotes et prédictions), puis mesure MarketProbabilityService.run et le
+retrait de marge seul sur un grand tableau de cotes. Aucune base existante
+n'est lue ni modifiée.
+
+Exemples:
+    python scripts/bench_market_probabilities.py
+    python scripts/bench_market_probabilities.py --matches 500 --method shin --runs 50
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+_tmpdir = tempfile.TemporaryDirectory()
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_tmpdir.name, 'bench.db')}")
+
+import numpy as np
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from models.base import Base
+from models.match import Match
+from models.prediction import ExpertPrediction
+from services.market_probabilities import MARGIN_METHODS, MarketProbabilityService, implied_probabilities
+
+
+def _seed(db, matches: int) -> None:
+    """Journée de `matches` matchs à venir, cotés et prédits."""
+    rng = np.random.default_rng(0)
+    kickoff = datetime.now() + timedelta(days=2)
+    for i in range(matches):
+        odds = 1 / rng.dirichlet([4, 2.5, 3]) / 1.05
+        db.add(Match(
+            id=i + 1, competition_code="PL", home_team=f"Team {2 * i}", home_team_id=2 * i,
+            away_team=f"Team {2 * i + 1}", away_team_id=2 * i + 1, match_date=kickoff, status="SCHEDULED",
+            odds_home=float(odds[0]), odds_draw=float(odds[1]), odds_away=float(odds[2]), odds_updated_at=kickoff
+        ))
+        db.add(ExpertPrediction(
+            match_id=i + 1, home_score_forecast=1, away_score_forecast=0,
+            prob_home_win=0.5, prob_draw=0.3, prob_away_win=0.2
+        ))
+    db.commit()
+
+
+def _timings(fn, runs: int) -> list:
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark des probabilités du marché")
+    parser.add_argument("--matches", type=int, default=100, help="Matchs de la journée")
+    parser.add_argument("--rows", type=int, default=10000, help="Lignes de cotes pour le retrait de marge seul")
+    parser.add_argument("--method", action="append", choices=MARGIN_METHODS, help="Méthode (répétable, toutes par défaut)")
+    parser.add_argument("--runs", type=int, default=20, help="Répétitions par mesure")
+    args = parser.parse_args()
+
+    engine = create_engine(f"sqlite:///{os.path.join(_tmpdir.name, 'market.db')}")
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda conn, cursor, statement, *a: statements.append(statement))
+    try:
+        _seed(db, args.matches)
+        odds = 1 / np.random.default_rng(1).dirichlet([4, 2.5, 3], size=args.rows) / 1.05
+
+        print(f"Journée de {args.matches} matchs (SQLite), {args.runs} exécutions")
+        for method in args.method or MARGIN_METHODS:
+            service = MarketProbabilityService(db)
+            statements.clear()
+            report = service.run(method=method, market_weight=0.3)
+            queries = sum(s.lstrip().upper().startswith(("SELECT", "UPDATE")) for s in statements)
+
+            run = _timings(lambda: service.run(method=method, market_weight=0.3), args.runs)
+            margin = _timings(lambda: implied_probabilities(odds, method), args.runs)
+            print(
+                f"  {method:<5} run: médiane {statistics.median(run):.2f} ms "
+                f"(max {max(run):.2f} ms), {report['updated']} mises à jour, {queries} requêtes | "
+                f"retrait de marge {args.rows} lignes: médiane {statistics.median(margin):.2f} ms"
+            )
+    finally:
+        db.close()
+        engine.dispose()
+        _tmpdir.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Script d'optimisation des poids APEX-30 et du mélange des 3 logiques.
+
+Construit (ou relit depuis le cache) les scores par match de l'historique,
+cherche les meilleurs poids puis les enregistre comme jeu versionné.
+
+Exemples:
+    python scripts/optimize_weights.py --engine apex30 --samples 20000 --workers 4
+    python scripts/optimize_weights.py --engine multi_logic --objective brier --activate
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("optimize_weights")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.config import settings
+from core.database import SessionLocal
+from services.backtest import Backtester
+from services.weight_optimizer import WeightOptimizer, build_training_set, OBJECTIVES
+from services.weight_sets import WEIGHT_SET_ENGINES, get_active_weights, save_weight_set
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Optimisation des poids des moteurs de prédiction")
+    parser.add_argument("--engine", action="append", choices=WEIGHT_SET_ENGINES, help="Moteur (répétable, tous par défaut)")
+    parser.add_argument("--competition", action="append", help="Code compétition (répétable)")
+    parser.add_argument("--season", action="append", type=int, help="Saison, ex: 2024 (répétable)")
+    parser.add_argument("--objective", choices=OBJECTIVES, default="log_loss")
+    parser.add_argument("--samples", type=int, default=10000, help="Vecteurs tirés au hasard")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Nombre de processus")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--activate", action="store_true", help="Activer le jeu s'il bat les poids actuels")
+    parser.add_argument("--dry-run", action="store_true", help="Ne rien enregistrer")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        backtester = Backtester(db, engines=(), cache_dir=settings.backtest_cache_dir or None)
+        data = build_training_set(backtester, args.competition, args.season)
+        logger.info("Jeu d'entraînement: %d matchs", len(data))
+        if not len(data):
+            return
+
+        for engine in args.engine or WEIGHT_SET_ENGINES:
+            # Référence: le jeu actuellement actif (défauts du moteur s'il n'y en a pas)
+            active = get_active_weights(db, engine)
+            result = WeightOptimizer(data, engine, args.objective, workers=args.workers).optimize(
+                n_random=args.samples, seed=args.seed, baseline=active.weights if active else None
+            )
+            print(json.dumps({
+                "engine": engine,
+                "objective": args.objective,
+                "matches": result.matches,
+                "evaluated": result.evaluated,
+                "per_second": round(result.rate),
+                "baseline_version": active.version if active else "default",
+                "baseline": result.baseline_metrics,
+                "best": result.metrics,
+                "weights": {k: round(v, 4) for k, v in result.weights.items()},
+            }, indent=2))
+
+            if args.dry_run:
+                continue
+            improved = (
+                result.metrics[args.objective] > result.baseline_metrics[args.objective]
+                if args.objective == "accuracy"
+                else result.metrics[args.objective] < result.baseline_metrics[args.objective]
+            )
+            weight_set = save_weight_set(
+                db, engine, result.weights, objective=args.objective,
+                metrics=dict(result.metrics, matches=result.matches),
+                activate=args.activate and improved
+            )
+            logger.info("Jeu de poids %s enregistré (actif: %s)", weight_set.version, weight_set.is_active)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Script de backtest des moteurs de prédiction sur l'historique.
+
+Rejoue les matchs terminés (données point-in-time, sans API externe) et
+affiche précision, Brier, log-loss et ROI par moteur.
+
+Exemples:
+    python scripts/run_backtest.py --competition PL --season 2024 --workers 4
+    python scripts/run_backtest.py --engine apex30 --engine multi_logic --json
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger("run_backtest")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.config import settings
+from core.database import SessionLocal
+from services.backtest import Backtester, ENGINES
+
+
+def _fmt(value, pattern="{:.3f}"):
+    return "-" if value is None else pattern.format(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest des moteurs de prédiction")
+    parser.add_argument("--competition", action="append", help="Code compétition (répétable)")
+    parser.add_argument("--season", action="append", type=int, help="Saison, ex: 2024 (répétable)")
+    parser.add_argument("--engine", action="append", choices=ENGINES, help="Moteur (répétable, tous par défaut)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Nombre de processus")
+    parser.add_argument("--no-cache", action="store_true", help="Ignorer le cache disque des échantillons")
+    parser.add_argument("--json", action="store_true", help="Sortie JSON")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        backtester = Backtester(
+            db,
+            engines=args.engine or ENGINES,
+            cache_dir=None if args.no_cache else (settings.backtest_cache_dir or None)
+        )
+        start = time.time()
+        report = backtester.run(args.competition, args.season, workers=args.workers)
+        elapsed = time.time() - start
+    finally:
+        db.close()
+
+    if args.json:
+        print(json.dumps(report.to_dict(), indent=2))
+        return
+
+    logger.info("Backtest terminé en %.1fs (%d unités)", elapsed, len(report.units))
+    print(f"{'Moteur':<20}{'Matchs':>8}{'Précision':>11}{'Brier':>8}{'LogLoss':>9}{'Exact':>7}{'Paris':>7}{'ROI':>8}")
+    for engine, m in report.totals.items():
+        print(
+            f"{engine:<20}{m.predictions:>8}{_fmt(m.accuracy, '{:.1%}'):>11}{_fmt(m.brier):>8}"
+            f"{_fmt(m.log_loss):>9}{m.exact_scores:>7}{m.bets:>7}{_fmt(m.roi, '{:+.1%}'):>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -9,8 +9,15 @@ from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 from datetime import datetime, timedelta
+from functools import lru_cache
+import json
+import logging
 from sqlalchemy.orm import Session
 
+from services.weight_sets import ENGINE_APEX30, resolve_weights
+
+logger = logging.getLogger(__name__)
+
 
 class FormLevel(Enum):
     """Niveaux de forme d'une équipe"""
@@ -90,7 +97,27 @@ class APEX30Service:
     
     def __init__(self, db: Session):
         self.db = db
-        self.rapport = []
+        # Poids du jeu actif (optimiseur) ou constantes POIDS
+        active = resolve_weights(db, ENGINE_APEX30, self.POIDS)
+        self.poids: Dict[str, float] = active.weights
+        self.poids_version: str = active.version
+        # Journal brut (gabarit, valeurs): formaté seulement si le rapport est lu
+        self._journal: List[Tuple[str, tuple]] = []
+        self._rapport_cache: Optional[str] = None
+    
+    @property
+    def rapport(self) -> str:
+        """
+        Rapport textuel de la dernière analyse.
+        
+        Matérialisé au premier accès puis mis en cache: les analyses en masse
+        (scheduler) ne paient jamais le formatage des messages.
+        """
+        if self._rapport_cache is None:
+            self._rapport_cache = '\n'.join(
+                gabarit.format(*valeurs) for gabarit, valeurs in self._journal
+            )
+        return self._rapport_cache
     
     def analyser_match(
         self,
@@ -111,20 +138,22 @@ class APEX30Service:
             injuries_b: Liste des blessures équipe extérieur
         
         Returns:
-            Dictionnaire avec scores, prédiction et confiance
+            Dictionnaire avec scores, prédiction et confiance (valeurs numériques
+            uniquement, le rapport textuel est disponible via ``self.rapport``)
         """
-        self.rapport = []
+        self._journal = []
+        self._rapport_cache = None
         
         # Phase 1: Analyser équipe A (avec blessures)
-        print(f"DEBUG APEX: Analysing {equipe_a.nom}...")
+        logger.debug("APEX: analyse de %s", equipe_a.nom)
         scores_a = self._analyser_equipe(equipe_a, injuries_a)
         
         # Phase 2: Analyser équipe B (avec blessures)
-        print(f"DEBUG APEX: Analysing {equipe_b.nom}...")
+        logger.debug("APEX: analyse de %s", equipe_b.nom)
         scores_b = self._analyser_equipe(equipe_b, injuries_b)
         
         # Phase 3: Analyser H2H
-        print(f"DEBUG APEX: Analysing H2H...")
+        logger.debug("APEX: analyse H2H")
         h2h_scores = self._analyser_h2h(h2h, equipe_a.nom, equipe_b.nom)
         scores_a['h2h'] = h2h_scores['equipe_a']
         scores_b['h2h'] = h2h_scores['equipe_b']
@@ -132,7 +161,7 @@ class APEX30Service:
         # Phase 4: Calculer scores totaux
         score_total_a = self._calculer_score_total(scores_a)
         score_total_b = self._calculer_score_total(scores_b)
-        print(f"DEBUG APEX: Total scores calculated: {score_total_a} vs {score_total_b}")
+        logger.debug("APEX: scores totaux %.3f vs %.3f", score_total_a, score_total_b)
         
         # Phase 5: Générer décision
         decision = self._generer_decision(
@@ -152,8 +181,7 @@ class APEX30Service:
                 'scores': scores_b,
                 'score_total': score_total_b
             },
-            'decision': decision,
-            'rapport': '\n'.join(self.rapport)
+            'decision': decision
         }
     
     def _analyser_equipe(self, equipe: EquipeAnalyse, injuries: List[Dict] = None) -> Dict[str, float]:
@@ -196,7 +224,7 @@ class APEX30Service:
         Plus il y a de joueurs clés absents, plus le malus est important.
         """
         if not injuries or len(injuries) == 0:
-            self._log(f"Absences {equipe.nom}: 0 (pas de blessures connues)")
+            self._log("Absences {}: 0 (pas de blessures connues)", equipe.nom)
             return 0  # Neutre
         
         malus = 0
@@ -231,7 +259,7 @@ class APEX30Service:
         # Plafonner le malus à -1.5
         malus = max(-1.5, malus)
         
-        self._log(f"Absences {equipe.nom}: {malus:.2f} ({nb_blesses} blessés)")
+        self._log("Absences {}: {:.2f} ({} blessés)", equipe.nom, malus, nb_blesses)
         
         return malus
     
@@ -290,7 +318,7 @@ class APEX30Service:
         else:
             msg = "sous-performe (doit améliorer finition)"
         
-        self._log(f"xG Simulé {equipe.nom}: {score_xg:+.2f} ({msg})")
+        self._log("xG Simulé {}: {:+.2f} ({})", equipe.nom, score_xg, msg)
         
         return score_xg
     
@@ -358,7 +386,7 @@ class APEX30Service:
         # Plafonner
         score_momentum = max(-0.8, min(0.8, score_momentum))
         
-        self._log(f"Tendance Récente {equipe.nom}: {score_momentum:+.2f} ({msg})")
+        self._log("Tendance Récente {}: {:+.2f} ({})", equipe.nom, score_momentum, msg)
         
         return score_momentum
     
@@ -402,7 +430,7 @@ class APEX30Service:
         
         ifp_moyen = total_ifp / len(matchs) if matchs else 1.0
         
-        self._log(f"IFP {equipe.nom}: {ifp_moyen:.2f}")
+        self._log("IFP {}: {:.2f}", equipe.nom, ifp_moyen)
         
         return ifp_moyen
     
@@ -439,7 +467,7 @@ class APEX30Service:
         buts_moy_contre = total_buts_contre / nb_matchs
         sd = max(0, min(10, 10 - (buts_moy_contre * 2)))
         
-        self._log(f"Force Off. {equipe.nom}: {fo:.2f}, Solidité Déf.: {sd:.2f}")
+        self._log("Force Off. {}: {:.2f}, Solidité Déf.: {:.2f}", equipe.nom, fo, sd)
         
         return fo, sd
     
@@ -470,7 +498,7 @@ class APEX30Service:
             else:
                 bonus = 0.3  # Performant à l'extérieur
         
-        self._log(f"Facteur Dom. {equipe.nom}: {bonus:+.2f} (ratio D/E: {ratio:.2f})")
+        self._log("Facteur Dom. {}: {:+.2f} (ratio D/E: {:.2f})", equipe.nom, bonus, ratio)
         
         return bonus
     
@@ -506,7 +534,7 @@ class APEX30Service:
         else:
             impact = 0  # Pas de fatigue
         
-        self._log(f"Fatigue {equipe.nom}: {impact} ({matchs_recents} matchs récents)")
+        self._log("Fatigue {}: {} ({} matchs récents)", equipe.nom, impact, matchs_recents)
         
         return impact
     
@@ -532,7 +560,7 @@ class APEX30Service:
         elif equipe.classement_actuel >= 18:
             score += 1.0  # Zone rouge = survie
         
-        self._log(f"Motivation {equipe.nom}: {score:+.2f} ({equipe.situation})")
+        self._log("Motivation {}: {:+.2f} ({})", equipe.nom, score, equipe.situation)
         
         return score
     
@@ -572,14 +600,14 @@ class APEX30Service:
             elif h2h.victoires_b == 0 and total_matchs >= 5:
                 bonus_a = 1.0  # A invaincu
         
-        self._log(f"H2H: {nom_a} +{bonus_a:.2f}, {nom_b} +{bonus_b:.2f}")
+        self._log("H2H: {} +{:.2f}, {} +{:.2f}", nom_a, bonus_a, nom_b, bonus_b)
         
         return {'equipe_a': bonus_a, 'equipe_b': bonus_b}
     
     def _calculer_score_total(self, scores: Dict[str, float]) -> float:
         """Calcul du score total pondéré"""
         total = 0
-        for module, poids in self.POIDS.items():
+        for module, poids in self.poids.items():
             if module in scores:
                 total += scores[module] * poids
         return total
@@ -649,9 +677,9 @@ class APEX30Service:
         else:
             goals_tip = "Entre 2 et 3 buts"
         
-        self._log(f"APEX-30: {nom_a} {score_a:.2f} vs {nom_b} {score_b:.2f}")
-        self._log(f"Décision: {tip} ({confiance.value})")
-        self._log(f"Score prédit: {home_goals}-{away_goals}")
+        self._log("APEX-30: {} {:.2f} vs {} {:.2f}", nom_a, score_a, nom_b, score_b)
+        self._log("Décision: {} ({})", tip, confiance.value)
+        self._log("Score prédit: {}-{}", home_goals, away_goals)
         
         return {
             'favori': favori,
@@ -670,9 +698,9 @@ class APEX30Service:
             }
         }
     
-    def _log(self, message: str):
-        """Ajouter au rapport"""
-        self.rapport.append(message)
+    def _log(self, gabarit: str, *valeurs):
+        """Ajouter au rapport (formatage différé jusqu'à la lecture de ``rapport``)"""
+        self._journal.append((gabarit, valeurs))
 
     def generer_rapport_detaille(self, analysis_data: Dict, home_name: str, away_name: str) -> List[Dict]:
         """
@@ -833,6 +861,19 @@ class APEX30Service:
         return modules_info
 
 
+@lru_cache(maxsize=512)
+def rapport_detaille_depuis_json(analysis_json: str, home_name: str, away_name: str) -> Tuple[Dict, ...]:
+    """
+    Rapport détaillé APEX-30 matérialisé au premier accès puis mis en cache.
+    
+    La clé est le JSON brut stocké dans ``ma_logique_analysis``: une prédiction
+    régénérée produit un nouveau JSON, donc une nouvelle entrée de cache.
+    Les dictionnaires retournés sont partagés et ne doivent pas être modifiés.
+    """
+    analysis_data = json.loads(analysis_json)
+    return tuple(APEX30Service(None).generer_rapport_detaille(analysis_data, home_name, away_name))
+
+
 # Fonction utilitaire pour créer les données à partir de nos modèles
 def creer_h2h_stats(h2h_data: Dict) -> H2HStats:
     """
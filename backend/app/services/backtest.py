@@ -0,0 +1,683 @@
+"""
+Backtest hors-ligne des moteurs de prédiction.
+
+Rejoue les matchs terminés de la table `matches` dans l'ordre chronologique,
+compétition par compétition et saison par saison. Chaque moteur ne voit que
+les données disponibles AVANT le coup d'envoi (features reconstruites en
+mémoire avec TeamFeatures.apply_match, classement et H2H point-in-time):
+aucun appel aux API externes, aucune fuite de données futures.
+
+Moteurs évalués:
+- prediction_service: consensus Papa / Grand Frère / APEX-30 de PredictionService
+- papa, grand_frere, ma_logique, multi_logic: MultiLogicPredictionEngine
+- apex30: APEX30Service seul
+
+Chaque moteur fournit des buts attendus; les probabilités 1X2 sont dérivées
+de la matrice de scores (services.score_matrix), puis comparées au résultat:
+précision, score de Brier, log-loss, score exact et ROI sur les cotes stockées.
+
+Les unités (compétition, saison) sont indépendantes: elles sont réparties
+sur un pool de processus, et les échantillons point-in-time de chaque unité
+sont mis en cache sur disque (invalidés dès que les matchs changent).
+"""
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from itertools import groupby
+from typing import Dict, Iterable, List, Optional, Tuple
+import hashlib
+import logging
+import os
+import pickle
+
+import numpy as np
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from models.match import Match
+from models.standing import Standing
+from models.team_rating import TeamRatingHistory
+from services.feature_store import TeamFeatures, LOOKBACK_DAYS, naive_utc, season_of
+from services.score_matrix import score_matrices, derive_markets
+from services.team_ratings import TeamRatingService, blend_strength
+
+logger = logging.getLogger(__name__)
+
+# Moteurs disponibles (ordre d'affichage)
+ENGINES = ("prediction_service", "papa", "grand_frere", "ma_logique", "multi_logic", "apex30")
+
+# Version du format des échantillons en cache (à incrémenter si BacktestSample change)
+SAMPLE_CACHE_VERSION = 2
+
+# Borne basse des probabilités pour le log-loss
+_EPSILON = 1e-15
+
+
+def season_bounds(season: int) -> Tuple[datetime, datetime]:
+    """Dates de début (incluse) et de fin (exclue) d'une saison (bascule au 1er juillet)."""
+    return datetime(season, 7, 1), datetime(season + 1, 7, 1)
+
+
+@dataclass(frozen=True)
+class BacktestSample:
+    """Entrées point-in-time d'un match terminé et son résultat réel."""
+    match_id: int
+    match_date: datetime
+    competition_code: str
+    season: int
+    home_team: str
+    away_team: str
+    home_team_id: Optional[int]
+    away_team_id: Optional[int]
+    # État des équipes juste avant le coup d'envoi
+    home_features: Optional[TeamFeatures]
+    away_features: Optional[TeamFeatures]
+    home_position: Optional[int]
+    away_position: Optional[int]
+    total_teams: int
+    # Confrontations directes antérieures (victoires domicile, extérieur, nuls)
+    h2h: Tuple[int, int, int]
+    # Résultat et cotes
+    score_home: int
+    score_away: int
+    odds_home: Optional[float] = None
+    odds_draw: Optional[float] = None
+    odds_away: Optional[float] = None
+    # Elo point-in-time (team_rating_history)
+    home_rating: Optional[float] = None
+    away_rating: Optional[float] = None
+
+    @property
+    def outcome(self) -> int:
+        """Issue réelle: 0 = domicile, 1 = nul, 2 = extérieur."""
+        if self.score_home > self.score_away:
+            return 0
+        return 1 if self.score_home == self.score_away else 2
+
+
+@dataclass
+class EngineMetrics:
+    """Métriques cumulées d'un moteur (additives: fusion entre unités)."""
+    predictions: int = 0
+    correct: int = 0
+    exact_scores: int = 0
+    brier_sum: float = 0.0
+    log_loss_sum: float = 0.0
+    bets: int = 0
+    profit: float = 0.0
+
+    def merge(self, other: "EngineMetrics") -> "EngineMetrics":
+        return EngineMetrics(
+            predictions=self.predictions + other.predictions,
+            correct=self.correct + other.correct,
+            exact_scores=self.exact_scores + other.exact_scores,
+            brier_sum=self.brier_sum + other.brier_sum,
+            log_loss_sum=self.log_loss_sum + other.log_loss_sum,
+            bets=self.bets + other.bets,
+            profit=self.profit + other.profit,
+        )
+
+    @property
+    def accuracy(self) -> Optional[float]:
+        return self.correct / self.predictions if self.predictions else None
+
+    @property
+    def brier(self) -> Optional[float]:
+        return self.brier_sum / self.predictions if self.predictions else None
+
+    @property
+    def log_loss(self) -> Optional[float]:
+        return self.log_loss_sum / self.predictions if self.predictions else None
+
+    @property
+    def roi(self) -> Optional[float]:
+        return self.profit / self.bets if self.bets else None
+
+    def to_dict(self) -> Dict:
+        return {
+            "predictions": self.predictions,
+            "accuracy": self.accuracy,
+            "exact_scores": self.exact_scores,
+            "brier": self.brier,
+            "log_loss": self.log_loss,
+            "bets": self.bets,
+            "roi": self.roi,
+        }
+
+
+@dataclass
+class BacktestReport:
+    """Résultat d'un backtest: métriques par unité et totaux par moteur."""
+    units: Dict[Tuple[str, int], Dict[str, EngineMetrics]] = field(default_factory=dict)
+
+    def add(self, competition: str, season: int, metrics: Dict[str, EngineMetrics]) -> None:
+        self.units[(competition, season)] = metrics
+
+    @property
+    def totals(self) -> Dict[str, EngineMetrics]:
+        totals: Dict[str, EngineMetrics] = {}
+        for metrics in self.units.values():
+            for engine, m in metrics.items():
+                totals[engine] = totals.get(engine, EngineMetrics()).merge(m)
+        return totals
+
+    def to_dict(self) -> Dict:
+        return {
+            "units": [
+                {"competition": code, "season": season,
+                 "engines": {name: m.to_dict() for name, m in metrics.items()}}
+                for (code, season), metrics in sorted(self.units.items())
+            ],
+            "totals": {name: m.to_dict() for name, m in self.totals.items()},
+        }
+
+
+def evaluate(
+    samples: List[BacktestSample],
+    expected_goals: List[Optional[Tuple[float, float]]]
+) -> EngineMetrics:
+    """
+    Calcule les métriques d'un moteur sur un lot de matchs (vectorisé).
+
+    Args:
+        samples: Échantillons rejoués
+        expected_goals: Buts attendus du moteur par échantillon (None = pas de prédiction)
+
+    Returns:
+        EngineMetrics du lot
+    """
+    kept = [(s, xg) for s, xg in zip(samples, expected_goals) if xg is not None]
+    if not kept:
+        return EngineMetrics()
+
+    xg = np.array([xg for _, xg in kept], dtype=float)
+    markets = derive_markets(score_matrices(xg[:, 0], xg[:, 1]))
+    probs = np.stack([markets["home_win"], markets["draw"], markets["away_win"]], axis=1)
+
+    outcomes = np.array([s.outcome for s, _ in kept])
+    actual = np.eye(3)[outcomes]
+    predicted = probs.argmax(axis=1)
+    hits = predicted == outcomes
+    exact = (
+        (markets["home_goals"] == np.array([s.score_home for s, _ in kept])) &
+        (markets["away_goals"] == np.array([s.score_away for s, _ in kept]))
+    )
+
+    # Mise de 1 sur l'issue prédite, quand la cote correspondante est connue
+    odds = np.array([
+        [s.odds_home or np.nan, s.odds_draw or np.nan, s.odds_away or np.nan] for s, _ in kept
+    ])
+    bet_odds = odds[np.arange(len(kept)), predicted]
+    has_odds = ~np.isnan(bet_odds)
+    profit = np.where(hits, bet_odds - 1, -1.0)[has_odds].sum()
+
+    return EngineMetrics(
+        predictions=len(kept),
+        correct=int(hits.sum()),
+        exact_scores=int(exact.sum()),
+        brier_sum=float(((probs - actual) ** 2).sum()),
+        log_loss_sum=float(-np.log(np.clip(probs[np.arange(len(kept)), outcomes], _EPSILON, 1)).sum()),
+        bets=int(has_odds.sum()),
+        profit=float(profit),
+    )
+
+
+class Backtester:
+    """Rejoue l'historique d'une compétition / saison pour chaque moteur."""
+
+    def __init__(
+        self,
+        db: Session,
+        engines: Iterable[str] = ENGINES,
+        cache_dir: Optional[str] = None
+    ):
+        """
+        Initialise le backtester.
+
+        Args:
+            db: Session SQLAlchemy
+            engines: Noms des moteurs à évaluer (voir ENGINES)
+            cache_dir: Dossier du cache des échantillons (None = pas de cache disque)
+        """
+        from services.prediction_service import PredictionService
+        from services.multi_logic_engine import MultiLogicPredictionEngine
+        from services.apex30_service import APEX30Service
+
+        unknown = set(engines) - set(ENGINES)
+        if unknown:
+            raise ValueError(f"Moteurs inconnus: {', '.join(sorted(unknown))}")
+        self.db = db
+        self.engines = tuple(engines)
+        self.cache_dir = cache_dir
+        # Les moteurs sont utilisés comme fonctions pures: aucune requête
+        self.prediction_service = PredictionService(db)
+        self.multi_logic = MultiLogicPredictionEngine(db)
+        self.apex30 = APEX30Service(db)
+
+    # =========================================
+    # UNITÉS ET ÉCHANTILLONS
+    # =========================================
+
+    def units(
+        self,
+        competitions: Optional[Iterable[str]] = None,
+        seasons: Optional[Iterable[int]] = None
+    ) -> List[Tuple[str, int]]:
+        """
+        Liste les couples (compétition, saison) ayant des matchs terminés.
+
+        Args:
+            competitions: Codes à retenir (toutes si None)
+            seasons: Saisons à retenir (toutes si None)
+
+        Returns:
+            Liste triée de (code, saison)
+        """
+        query = self.db.query(Match.competition_code, Match.match_date).filter(
+            Match.status == "FINISHED"
+        )
+        if competitions:
+            query = query.filter(Match.competition_code.in_(list(competitions)))
+        found = {(code, season_of(naive_utc(date))) for code, date in query if code and date}
+        if seasons:
+            seasons = set(seasons)
+            found = {unit for unit in found if unit[1] in seasons}
+        return sorted(found)
+
+    def data_key(self, competition: str, season: int) -> str:
+        """
+        Clé de l'état des matchs rejoués pour une unité (2 requêtes).
+
+        Change dès qu'un match de la fenêtre est ajouté ou resynchronisé,
+        ou que l'Elo est recalculé: sert à invalider les caches dérivés
+        des échantillons.
+        """
+        start, end = season_bounds(season)
+        count, last_synced, last_id = self.db.query(
+            func.count(Match.id), func.max(Match.last_synced), func.max(Match.id)
+        ).filter(
+            Match.status == "FINISHED",
+            Match.match_date >= start - timedelta(days=LOOKBACK_DAYS),
+            Match.match_date < end
+        ).one()
+        ratings_count, ratings_last_id = self.db.query(
+            func.count(TeamRatingHistory.id), func.max(TeamRatingHistory.id)
+        ).one()
+        return hashlib.sha256(
+            f"{SAMPLE_CACHE_VERSION}|{competition}|{season}|{count}|{last_synced}|{last_id}"
+            f"|{ratings_count}|{ratings_last_id}".encode()
+        ).hexdigest()[:16]
+
+    def _cache_path(self, competition: str, season: int) -> Optional[str]:
+        """Chemin du cache des échantillons de l'unité."""
+        if not self.cache_dir:
+            return None
+        key = self.data_key(competition, season)
+        return os.path.join(self.cache_dir, f"samples_{competition}_{season}_{key}.pkl")
+
+    def load_samples(self, competition: str, season: int) -> List[BacktestSample]:
+        """
+        Échantillons point-in-time d'une unité (cache disque si configuré).
+
+        Args:
+            competition: Code de la compétition
+            season: Saison (2025 = 2025/2026)
+
+        Returns:
+            Échantillons dans l'ordre chronologique
+        """
+        path = self._cache_path(competition, season)
+        if path and os.path.exists(path):
+            with open(path, "rb") as f:
+                return pickle.load(f)
+
+        samples = self.build_samples(competition, season)
+
+        if path:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(samples, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        return samples
+
+    def build_samples(self, competition: str, season: int) -> List[BacktestSample]:
+        """
+        Rejoue l'historique des équipes de l'unité et capture l'état avant chaque match.
+
+        Une requête pour les équipes, une pour leur historique (toutes
+        compétitions, fenêtre LOOKBACK_DAYS avant la saison incluse), une
+        pour leur Elo point-in-time.
+
+        Args:
+            competition: Code de la compétition
+            season: Saison
+
+        Returns:
+            Échantillons dans l'ordre chronologique
+        """
+        start, end = season_bounds(season)
+        unit_filter = (
+            (Match.competition_code == competition) &
+            (Match.status == "FINISHED") &
+            (Match.match_date >= start) &
+            (Match.match_date < end)
+        )
+        team_ids = set()
+        for home_id, away_id in self.db.query(Match.home_team_id, Match.away_team_id).filter(unit_filter):
+            team_ids.update((home_id, away_id))
+        team_ids.discard(None)
+        if not team_ids:
+            return []
+
+        history = self.db.query(Match).filter(
+            Match.status == "FINISHED",
+            Match.score_home.isnot(None),
+            Match.score_away.isnot(None),
+            Match.match_date >= start - timedelta(days=LOOKBACK_DAYS),
+            Match.match_date < end,
+            or_(Match.home_team_id.in_(team_ids), Match.away_team_id.in_(team_ids))
+        ).order_by(Match.match_date, Match.id).all()
+        ratings = TeamRatingService(self.db).for_matches(
+            m for m in history
+            if m.competition_code == competition and start <= naive_utc(m.match_date) < end
+        )
+
+        states: Dict[int, TeamFeatures] = {}
+        h2h: Dict[Tuple[int, int], List[int]] = {}  # paire triée -> vainqueurs (team_id, 0 = nul)
+        samples: List[BacktestSample] = []
+
+        # Matchs simultanés: tous capturés avant d'appliquer le moindre résultat
+        for kickoff, group in groupby(history, key=lambda m: naive_utc(m.match_date)):
+            group = list(group)
+            positions = None
+            for m in group:
+                if m.competition_code != competition or not (start <= kickoff < end):
+                    continue
+                if positions is None:
+                    positions = self._positions(states, competition, season)
+                samples.append(self._sample(
+                    m, kickoff, season, states, positions, h2h, len(team_ids), ratings.get(m.id, (None, None))
+                ))
+
+            for m in group:
+                for team_id in (m.home_team_id, m.away_team_id):
+                    if team_id is not None:
+                        states[team_id] = states.get(team_id, TeamFeatures(team_id=team_id)).apply_match(m)
+                if m.home_team_id is not None and m.away_team_id is not None:
+                    winner = 0
+                    if m.score_home != m.score_away:
+                        winner = m.home_team_id if m.score_home > m.score_away else m.away_team_id
+                    h2h.setdefault(tuple(sorted((m.home_team_id, m.away_team_id))), []).append(winner)
+
+        logger.debug("Backtest %s %s: %d échantillons", competition, season, len(samples))
+        return samples
+
+    @staticmethod
+    def _positions(states: Dict[int, TeamFeatures], competition: str, season: int) -> Dict[int, int]:
+        """Classement point-in-time du championnat à partir des états courants."""
+        table = [
+            f for f in states.values()
+            if f.league_code == competition and f.season == season and f.league_played
+        ]
+        table.sort(key=lambda f: (-f.league_points, -f.league_goal_diff, -f.league_goals_for))
+        return {f.team_id: position for position, f in enumerate(table, start=1)}
+
+    @staticmethod
+    def _sample(
+        match: Match,
+        kickoff: datetime,
+        season: int,
+        states: Dict[int, TeamFeatures],
+        positions: Dict[int, int],
+        h2h: Dict[Tuple[int, int], List[int]],
+        total_teams: int,
+        ratings: Tuple[Optional[float], Optional[float]]
+    ) -> BacktestSample:
+        winners = h2h.get(tuple(sorted((match.home_team_id or 0, match.away_team_id or 0))), [])
+        return BacktestSample(
+            match_id=match.id,
+            match_date=kickoff,
+            competition_code=match.competition_code,
+            season=season,
+            home_team=match.home_team,
+            away_team=match.away_team,
+            home_team_id=match.home_team_id,
+            away_team_id=match.away_team_id,
+            home_features=states.get(match.home_team_id),
+            away_features=states.get(match.away_team_id),
+            home_position=positions.get(match.home_team_id),
+            away_position=positions.get(match.away_team_id),
+            total_teams=total_teams,
+            h2h=(
+                sum(1 for w in winners if w and w == match.home_team_id),
+                sum(1 for w in winners if w and w == match.away_team_id),
+                sum(1 for w in winners if w == 0),
+            ),
+            score_home=match.score_home,
+            score_away=match.score_away,
+            odds_home=match.odds_home,
+            odds_draw=match.odds_draw,
+            odds_away=match.odds_away,
+            home_rating=ratings[0],
+            away_rating=ratings[1],
+        )
+
+    # =========================================
+    # ADAPTATEURS DES MOTEURS
+    # =========================================
+
+    @staticmethod
+    def _match_of(sample: BacktestSample) -> Match:
+        """Match transitoire (non persisté) pour les moteurs qui attendent un ORM."""
+        return Match(
+            id=sample.match_id,
+            competition_code=sample.competition_code,
+            home_team=sample.home_team,
+            away_team=sample.away_team,
+            home_team_id=sample.home_team_id,
+            away_team_id=sample.away_team_id,
+            match_date=sample.match_date,
+            status="SCHEDULED",
+        )
+
+    @staticmethod
+    def _standing_of(sample: BacktestSample, features: Optional[TeamFeatures], position: Optional[int]):
+        """Classement transitoire point-in-time (None si l'équipe n'a pas encore joué)."""
+        if features is None or position is None:
+            return None
+        return Standing(
+            competition_code=sample.competition_code,
+            season=sample.season,
+            position=position,
+            team_id=features.team_id,
+            team_name="",
+            played_games=features.league_played,
+            points=features.league_points,
+            goal_difference=features.league_goal_diff,
+            form=features.form,
+        )
+
+    def _multi_logic_context(self, sample: BacktestSample):
+        from services.multi_logic_engine import MatchContext
+
+        return MatchContext(
+            home_standing=self._standing_of(sample, sample.home_features, sample.home_position),
+            away_standing=self._standing_of(sample, sample.away_features, sample.away_position),
+            home_features=sample.home_features,
+            away_features=sample.away_features,
+            home_rating=sample.home_rating,
+            away_rating=sample.away_rating,
+            league_season=sample.season - 1,
+        )
+
+    def logic_expected_goals(self, sample: BacktestSample, logic: str) -> Optional[Tuple[float, float]]:
+        """Buts attendus d'une logique ("papa", "grand_frere", "ma_logique") sur un échantillon."""
+        result = getattr(self.multi_logic, f"{logic}_from_context")(
+            self._match_of(sample), self._multi_logic_context(sample)
+        )
+        return (result.expected_home_goals, result.expected_away_goals) if result else None
+
+    def _engine_papa(self, sample: BacktestSample) -> Optional[Tuple[float, float]]:
+        return self.logic_expected_goals(sample, "papa")
+
+    def _engine_grand_frere(self, sample: BacktestSample) -> Optional[Tuple[float, float]]:
+        return self.logic_expected_goals(sample, "grand_frere")
+
+    def _engine_ma_logique(self, sample: BacktestSample) -> Optional[Tuple[float, float]]:
+        return self.logic_expected_goals(sample, "ma_logique")
+
+    def _engine_multi_logic(self, sample: BacktestSample) -> Optional[Tuple[float, float]]:
+        combined = self.multi_logic.combine_from_context(
+            self._match_of(sample), self._multi_logic_context(sample)
+        )
+        if not combined or not combined.markets:
+            return None
+        return combined.markets.expected_home_goals, combined.markets.expected_away_goals
+
+    def apex_result(self, sample: BacktestSample) -> Optional[Dict]:
+        """Analyse APEX-30 complète (scores par module et décision) sur données point-in-time."""
+        from services.apex30_service import creer_equipe_analyse, creer_h2h_stats
+
+        if not sample.home_features or not sample.away_features:
+            return None
+
+        def equipe(name, features, position, est_domicile):
+            return creer_equipe_analyse(
+                nom=name,
+                matchs_recents=features.to_apex_matches(),
+                classement=position or 10,
+                est_domicile=est_domicile,
+                points_domicile=features.home_ppg if features.home_ppg is not None else 2.0,
+                points_exterieur=features.away_ppg if features.away_ppg is not None else 1.5,
+            )
+
+        return self.apex30.analyser_match(
+            equipe(sample.home_team, sample.home_features, sample.home_position, True),
+            equipe(sample.away_team, sample.away_features, sample.away_position, False),
+            creer_h2h_stats({
+                'home_wins': sample.h2h[0],
+                'away_wins': sample.h2h[1],
+                'draws': sample.h2h[2],
+            })
+        )
+
+    def _apex_decision(self, sample: BacktestSample) -> Optional[Dict]:
+        result = self.apex_result(sample)
+        return result['decision'] if result else None
+
+    def _engine_apex30(self, sample: BacktestSample) -> Optional[Tuple[float, float]]:
+        decision = self._apex_decision(sample)
+        if decision is None:
+            return None
+        return float(decision['home_goals']), float(decision['away_goals'])
+
+    def _engine_prediction_service(self, sample: BacktestSample) -> Optional[Tuple[float, float]]:
+        """
+        Consensus de PredictionService sur données point-in-time.
+
+        Mêmes formules que _generate_prediction (PredictionService.logic_forecast),
+        sans les blessures ni les ajustements de calendrier, qui ne sont pas historisés.
+        """
+        service = self.prediction_service
+        home, away = sample.home_features, sample.away_features
+        total = max(sample.total_teams, 1)
+
+        home_wins, away_wins, draws = sample.h2h
+        h2h_total = home_wins + away_wins + draws
+
+        return service.logic_forecast(
+            home_strength=blend_strength(
+                1 - sample.home_position / total if sample.home_position else None,
+                sample.home_rating, home.league_played if home else 0
+            ),
+            away_strength=blend_strength(
+                1 - sample.away_position / total if sample.away_position else None,
+                sample.away_rating, away.league_played if away else 0
+            ),
+            # Coefficients de la saison précédente: pas de fuite des résultats européens à venir
+            league_level=service._get_league_strength(sample.competition_code, sample.season - 1),
+            home_form=home.form_score if home else 0.5,
+            away_form=away.form_score if away else 0.5,
+            home_goals_avg=home.avg_goals_scored if home and home.played else 1.3,
+            away_goals_avg=away.avg_goals_scored if away and away.played else 1.2,
+            home_h2h=(home_wins * 3 + draws) / (h2h_total * 3) if h2h_total else 0.5,
+            away_h2h=(away_wins * 3 + draws) / (h2h_total * 3) if h2h_total else 0.5,
+            apex_decision=self._apex_decision(sample),
+        ).expected_goals
+
+    # =========================================
+    # EXÉCUTION
+    # =========================================
+
+    def run_unit(self, competition: str, season: int) -> Dict[str, EngineMetrics]:
+        """
+        Évalue tous les moteurs sur une unité.
+
+        Args:
+            competition: Code de la compétition
+            season: Saison
+
+        Returns:
+            Dictionnaire {moteur: EngineMetrics}
+        """
+        samples = self.load_samples(competition, season)
+        metrics = {}
+        for engine in self.engines:
+            predict = getattr(self, f"_engine_{engine}")
+            expected_goals = []
+            for sample in samples:
+                try:
+                    expected_goals.append(predict(sample))
+                except Exception as e:
+                    logger.warning("Backtest %s match %s: %s", engine, sample.match_id, e)
+                    expected_goals.append(None)
+            metrics[engine] = evaluate(samples, expected_goals)
+        return metrics
+
+    def run(
+        self,
+        competitions: Optional[Iterable[str]] = None,
+        seasons: Optional[Iterable[int]] = None,
+        workers: int = 1
+    ) -> BacktestReport:
+        """
+        Backtest complet, réparti sur `workers` processus.
+
+        Avec workers > 1, chaque processus ouvre sa propre session
+        (core.database.SessionLocal): la base doit être accessible hors
+        de ce processus (pas de SQLite en mémoire).
+
+        Args:
+            competitions: Codes des compétitions (toutes si None)
+            seasons: Saisons (toutes si None)
+            workers: Nombre de processus
+
+        Returns:
+            BacktestReport
+        """
+        units = self.units(competitions, seasons)
+        report = BacktestReport()
+
+        if workers <= 1 or len(units) <= 1:
+            for competition, season in units:
+                report.add(competition, season, self.run_unit(competition, season))
+            return report
+
+        jobs = [(competition, season, self.engines, self.cache_dir) for competition, season in units]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for (competition, season, _, _), metrics in zip(jobs, pool.map(_run_unit_in_process, jobs)):
+                report.add(competition, season, metrics)
+        return report
+
+
+def _run_unit_in_process(job: Tuple[str, int, Tuple[str, ...], Optional[str]]) -> Dict[str, EngineMetrics]:
+    """Point d'entrée d'un processus du pool: une session par unité."""
+    from core.database import SessionLocal
+
+    competition, season, engines, cache_dir = job
+    db = SessionLocal()
+    try:
+        return Backtester(db, engines, cache_dir).run_unit(competition, season)
+    finally:
+        db.close()
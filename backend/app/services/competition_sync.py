@@ -0,0 +1,158 @@
+"""
+Service de synchronisation du catalogue des compétitions.
+
+Le catalogue (nom, zone, emblème, saison en cours) change quelques fois par
+an: il est synchronisé par un job périodique et les endpoints le servent
+depuis la base, sans consommer le quota de l'API externe.
+"""
+import logging
+from datetime import datetime, timezone
+from typing import List, Optional
+from sqlalchemy.orm import Session
+
+from core.cache import bump_data_version
+from models.competition import Competition
+from services.football_api import FootballDataService, football_data_service
+
+logger = logging.getLogger(__name__)
+
+
+class CompetitionSyncService:
+    """Service pour synchroniser les compétitions avec Football-Data.org."""
+
+    def __init__(self, db: Session):
+        """
+        Initialise le service de synchronisation.
+
+        Args:
+            db: Session SQLAlchemy
+        """
+        self.db = db
+
+    def _parse_competition_data(self, comp: dict) -> dict:
+        """
+        Parse les données d'une compétition depuis l'API vers le format DB.
+
+        Args:
+            comp: Données brutes de l'API
+
+        Returns:
+            Dict formaté pour le modèle Competition
+        """
+        season = comp.get("currentSeason") or {}
+        return {
+            "external_id": comp.get("id"),
+            "code": comp.get("code"),
+            "name": comp.get("name", ""),
+            "area": (comp.get("area") or {}).get("name", ""),
+            "emblem": comp.get("emblem"),
+            "type": comp.get("type"),
+            "current_season": season.get("id"),
+            "current_matchday": season.get("currentMatchday"),
+            "last_synced": datetime.now(timezone.utc)
+        }
+
+    def _upsert_competition(self, competition_data: dict) -> Competition:
+        """
+        Insert ou update une compétition dans la DB.
+
+        Args:
+            competition_data: Données de la compétition formatées
+
+        Returns:
+            Instance Competition créée ou mise à jour
+        """
+        existing = self.get_competition(competition_data["code"])
+        if existing:
+            for key, value in competition_data.items():
+                setattr(existing, key, value)
+            return existing
+        new_competition = Competition(**competition_data)
+        self.db.add(new_competition)
+        return new_competition
+
+    async def sync_competitions(self) -> int:
+        """
+        Synchronise le catalogue (un seul appel API pour toutes les compétitions).
+
+        Returns:
+            Nombre de compétitions synchronisées
+        """
+        try:
+            result = await football_data_service.get_competitions()
+            count = 0
+            for comp in result.get("competitions", []):
+                if comp.get("code") in FootballDataService.TIER_ONE_COMPETITIONS:
+                    self._upsert_competition(self._parse_competition_data(comp))
+                    count += 1
+
+            self.db.commit()
+            bump_data_version()
+            logger.info(f"Catalogue des compétitions synchronisé: {count} compétitions")
+            return count
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error syncing competitions: {e}")
+            raise e
+
+    def update_current_season(self, code: str, season: Optional[int], matchday: Optional[int]) -> None:
+        """
+        Met à jour la saison et la journée en cours (sans appel API).
+
+        Appelé par la synchronisation des classements, dont la réponse
+        contient déjà ces informations; le commit est laissé à l'appelant.
+
+        Args:
+            code: Code de la compétition
+            season: ID de la saison en cours
+            matchday: Journée en cours
+        """
+        competition = self.get_competition(code)
+        if competition is None:
+            return
+        if season:
+            competition.current_season = season
+        if matchday is not None:
+            competition.current_matchday = matchday
+
+    def get_competitions(self) -> List[Competition]:
+        """
+        Récupère le catalogue depuis la DB.
+
+        Returns:
+            Compétitions ordonnées par code
+        """
+        return self.db.query(Competition).order_by(Competition.code).all()
+
+    def get_competition(self, code: str) -> Optional[Competition]:
+        """
+        Récupère une compétition depuis la DB.
+
+        Args:
+            code: Code de la compétition
+
+        Returns:
+            Competition ou None
+        """
+        return self.db.query(Competition).filter(Competition.code == code.upper()).first()
+
+    def is_stale(self, max_age_hours: int = 24 * 7) -> bool:
+        """
+        Vérifie si le catalogue est vide ou périmé.
+
+        Args:
+            max_age_hours: Âge maximum en heures avant péremption
+
+        Returns:
+            True si le catalogue doit être rafraîchi
+        """
+        oldest = self.db.query(Competition).order_by(Competition.last_synced.asc()).first()
+        if not oldest or not oldest.last_synced:
+            return True
+
+        last_synced = oldest.last_synced
+        if last_synced.tzinfo is None:
+            last_synced = last_synced.replace(tzinfo=timezone.utc)
+        age = datetime.now(timezone.utc) - last_synced
+        return age.total_seconds() > (max_age_hours * 3600)
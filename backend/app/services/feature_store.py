@@ -0,0 +1,520 @@
+"""
+Feature store point-in-time des équipes.
+
+Les features d'équipe (forme, moyennes de buts, points domicile/extérieur,
+classement, fatigue, matchs importants récents) sont matérialisées dans
+`team_feature_snapshots`: un snapshot par (équipe, match terminé), calculé
+de façon incrémentale à partir du snapshot précédent.
+
+Lecture point-in-time: pour un match joué à la date T, on lit le dernier
+snapshot strictement antérieur à T. Les backtests historiques ne voient donc
+jamais de données futures et n'ont rien à recalculer.
+"""
+import json
+import logging
+from bisect import bisect_left
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from models.match import Match
+from models.team_feature import TeamFeatureSnapshot
+
+logger = logging.getLogger(__name__)
+
+
+# Compétitions considérées comme importantes (rotation / fatigue)
+IMPORTANT_COMPETITIONS = ('CL', 'EL', 'FAC', 'FLC')
+
+# Compétitions à élimination / internationales (exclues du championnat)
+CUP_COMPETITIONS = IMPORTANT_COMPETITIONS + ('EC', 'WC', 'CLI', 'ECL', 'DFB', 'CDR', 'CIT', 'CDF')
+
+# Nombre de matchs conservés pour la forme
+FORM_LENGTH = 10
+
+# Fenêtre de lecture d'un lot: au-delà, une équipe n'a plus de features "actuelles"
+LOOKBACK_DAYS = 365
+
+_POINTS = {'W': 3, 'D': 1, 'L': 0}
+
+
+def naive_utc(dt: Optional[datetime]) -> Optional[datetime]:
+    """Normalise une date en UTC naïf (format stocké en base)."""
+    if dt is not None and dt.tzinfo is not None:
+        return dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return dt
+
+
+def season_of(dt: datetime) -> int:
+    """Saison européenne d'une date (2025 = saison 2025/2026, bascule au 1er juillet)."""
+    return dt.year if dt.month >= 7 else dt.year - 1
+
+
+def season_window(season: int) -> Tuple[datetime, datetime]:
+    """Bornes [début, fin) d'une saison, cohérentes avec season_of (1er juillet)."""
+    return datetime(season, 7, 1), datetime(season + 1, 7, 1)
+
+
+@dataclass(frozen=True)
+class TeamFeatures:
+    """Features d'une équipe à un instant donné (valeur immuable)."""
+    team_id: int
+    season: int = 0
+    as_of: Optional[datetime] = None
+    match_id: Optional[int] = None
+    league_code: Optional[str] = None
+    played: int = 0
+    wins: int = 0
+    draws: int = 0
+    losses: int = 0
+    goals_for: int = 0
+    goals_against: int = 0
+    home_played: int = 0
+    home_points: int = 0
+    away_played: int = 0
+    away_points: int = 0
+    league_played: int = 0
+    league_points: int = 0
+    league_goal_diff: int = 0
+    league_goals_for: int = 0
+    form: str = ""
+    # (date ISO, domicile, résultat W/D/L, buts pour, buts contre, compétition)
+    recent: Tuple[tuple, ...] = field(default_factory=tuple)
+    last_match_date: Optional[datetime] = None
+    last_important_date: Optional[datetime] = None
+    last_important_match_id: Optional[int] = None
+
+    # -------------------------
+    # Mise à jour incrémentale
+    # -------------------------
+
+    def apply_match(self, match: Match) -> "TeamFeatures":
+        """
+        Retourne les features après un match terminé (fonction pure).
+
+        Args:
+            match: Match terminé impliquant l'équipe (scores renseignés)
+
+        Returns:
+            Nouvelle instance TeamFeatures
+        """
+        is_home = match.home_team_id == self.team_id
+        home_goals = match.score_home or 0
+        away_goals = match.score_away or 0
+        goals_for, goals_against = (home_goals, away_goals) if is_home else (away_goals, home_goals)
+
+        if goals_for > goals_against:
+            result = 'W'
+        elif goals_for < goals_against:
+            result = 'L'
+        else:
+            result = 'D'
+        points = _POINTS[result]
+
+        match_date = naive_utc(match.match_date)
+        season = season_of(match_date)
+        # Nouvelle saison: compteurs remis à zéro, la forme continue
+        base = self if season == self.season else TeamFeatures(
+            team_id=self.team_id,
+            season=season,
+            league_code=self.league_code,
+            form=self.form,
+            recent=self.recent,
+            last_match_date=self.last_match_date,
+            last_important_date=self.last_important_date,
+            last_important_match_id=self.last_important_match_id,
+        )
+
+        is_league = match.competition_code not in CUP_COMPETITIONS
+        is_important = match.competition_code in IMPORTANT_COMPETITIONS
+        form = ",".join(([result] + (base.form.split(",") if base.form else []))[:FORM_LENGTH])
+        recent = ((match_date.isoformat(), is_home, result, goals_for, goals_against,
+                   match.competition_code),) + base.recent[:FORM_LENGTH - 1]
+
+        return replace(
+            base,
+            as_of=match_date,
+            match_id=match.id,
+            league_code=match.competition_code if is_league else base.league_code,
+            played=base.played + 1,
+            wins=base.wins + (result == 'W'),
+            draws=base.draws + (result == 'D'),
+            losses=base.losses + (result == 'L'),
+            goals_for=base.goals_for + goals_for,
+            goals_against=base.goals_against + goals_against,
+            home_played=base.home_played + is_home,
+            home_points=base.home_points + (points if is_home else 0),
+            away_played=base.away_played + (not is_home),
+            away_points=base.away_points + (0 if is_home else points),
+            league_played=base.league_played + is_league,
+            league_points=base.league_points + (points if is_league else 0),
+            league_goal_diff=base.league_goal_diff + ((goals_for - goals_against) if is_league else 0),
+            league_goals_for=base.league_goals_for + (goals_for if is_league else 0),
+            form=form,
+            recent=recent,
+            last_match_date=match_date,
+            last_important_date=match_date if is_important else base.last_important_date,
+            last_important_match_id=match.id if is_important else base.last_important_match_id,
+        )
+
+    # -------------------------
+    # Features dérivées
+    # -------------------------
+
+    @property
+    def form_score(self) -> float:
+        """Score de forme entre 0 et 1 (même barème que PredictionService)."""
+        results = self.form.split(",") if self.form else []
+        if not results:
+            return 0.5
+        return sum(_POINTS[r] for r in results) / (3 * len(results))
+
+    @property
+    def avg_goals_scored(self) -> Optional[float]:
+        return self.goals_for / self.played if self.played else None
+
+    @property
+    def avg_goals_conceded(self) -> Optional[float]:
+        return self.goals_against / self.played if self.played else None
+
+    @property
+    def home_ppg(self) -> Optional[float]:
+        return self.home_points / self.home_played if self.home_played else None
+
+    @property
+    def away_ppg(self) -> Optional[float]:
+        return self.away_points / self.away_played if self.away_played else None
+
+    def days_since_last_match(self, at: datetime) -> Optional[int]:
+        """Jours de repos avant `at` (fenêtre de fatigue)."""
+        if self.last_match_date is None:
+            return None
+        return (naive_utc(at) - self.last_match_date).days
+
+    def to_apex_matches(self) -> List[Dict]:
+        """10 derniers matchs au format attendu par creer_equipe_analyse (APEX-30)."""
+        result_map = {'W': 'V', 'D': 'N', 'L': 'D'}
+        return [
+            {
+                'date': date,
+                'domicile': domicile,
+                'resultat': result_map[resultat],
+                'buts_pour': buts_pour,
+                'buts_contre': buts_contre,
+                'adversaire_classement': 10,
+                'competition': 'Coupe' if competition in CUP_COMPETITIONS else 'Championnat',
+            }
+            for date, domicile, resultat, buts_pour, buts_contre, competition in self.recent
+        ]
+
+    # -------------------------
+    # Conversion ORM
+    # -------------------------
+
+    @classmethod
+    def from_snapshot(cls, row: TeamFeatureSnapshot) -> "TeamFeatures":
+        return cls(
+            team_id=row.team_id,
+            season=row.season,
+            as_of=row.as_of,
+            match_id=row.match_id,
+            league_code=row.league_code,
+            played=row.played or 0,
+            wins=row.wins or 0,
+            draws=row.draws or 0,
+            losses=row.losses or 0,
+            goals_for=row.goals_for or 0,
+            goals_against=row.goals_against or 0,
+            home_played=row.home_played or 0,
+            home_points=row.home_points or 0,
+            away_played=row.away_played or 0,
+            away_points=row.away_points or 0,
+            league_played=row.league_played or 0,
+            league_points=row.league_points or 0,
+            league_goal_diff=row.league_goal_diff or 0,
+            league_goals_for=row.league_goals_for or 0,
+            form=row.form or "",
+            recent=tuple(tuple(m) for m in json.loads(row.recent_matches or "[]")),
+            last_match_date=row.last_match_date,
+            last_important_date=row.last_important_date,
+            last_important_match_id=row.last_important_match_id,
+        )
+
+    def to_snapshot(self) -> TeamFeatureSnapshot:
+        return TeamFeatureSnapshot(
+            team_id=self.team_id,
+            as_of=self.as_of,
+            match_id=self.match_id,
+            season=self.season,
+            league_code=self.league_code,
+            played=self.played,
+            wins=self.wins,
+            draws=self.draws,
+            losses=self.losses,
+            goals_for=self.goals_for,
+            goals_against=self.goals_against,
+            home_played=self.home_played,
+            home_points=self.home_points,
+            away_played=self.away_played,
+            away_points=self.away_points,
+            league_played=self.league_played,
+            league_points=self.league_points,
+            league_goal_diff=self.league_goal_diff,
+            league_goals_for=self.league_goals_for,
+            form=self.form,
+            recent_matches=json.dumps(self.recent, separators=(',', ':')),
+            last_match_date=self.last_match_date,
+            last_important_date=self.last_important_date,
+            last_important_match_id=self.last_important_match_id,
+        )
+
+
+class FeatureStore:
+    """Lecture / écriture des snapshots de features d'équipe."""
+
+    def __init__(self, db: Session):
+        """
+        Initialise le feature store.
+
+        Args:
+            db: Session SQLAlchemy
+        """
+        self.db = db
+
+    # =========================================
+    # LECTURE POINT-IN-TIME
+    # =========================================
+
+    def latest_before(self, team_ids: Iterable[int], at: datetime) -> Dict[int, TeamFeatures]:
+        """
+        Features de plusieurs équipes à une même date (1 requête).
+
+        Args:
+            team_ids: IDs des équipes
+            at: Date de lecture (exclue)
+
+        Returns:
+            Dictionnaire {team_id: TeamFeatures} (équipes sans historique absentes)
+        """
+        team_ids = {t for t in team_ids if t is not None}
+        if not team_ids:
+            return {}
+        at = naive_utc(at)
+
+        latest = self.db.query(
+            TeamFeatureSnapshot.team_id,
+            func.max(TeamFeatureSnapshot.as_of).label("as_of")
+        ).filter(
+            TeamFeatureSnapshot.team_id.in_(team_ids),
+            TeamFeatureSnapshot.as_of < at
+        ).group_by(TeamFeatureSnapshot.team_id).subquery()
+
+        rows = self.db.query(TeamFeatureSnapshot).join(
+            latest,
+            (TeamFeatureSnapshot.team_id == latest.c.team_id) &
+            (TeamFeatureSnapshot.as_of == latest.c.as_of)
+        ).all()
+        return {row.team_id: TeamFeatures.from_snapshot(row) for row in rows}
+
+    def for_matches(
+        self, matches: Iterable[Match]
+    ) -> Dict[int, Tuple[Optional[TeamFeatures], Optional[TeamFeatures]]]:
+        """
+        Features domicile/extérieur de chaque match d'un lot (1 requête).
+
+        Chaque match lit l'état de ses équipes à sa propre date de coup
+        d'envoi: le lot peut mélanger passé (backtest) et futur.
+
+        Args:
+            matches: Matchs à préparer
+
+        Returns:
+            Dictionnaire {match_id: (features_domicile, features_exterieur)}
+        """
+        matches = [m for m in matches if m.match_date is not None]
+        if not matches:
+            return {}
+
+        team_ids = set()
+        for m in matches:
+            team_ids.update((m.home_team_id, m.away_team_id))
+        team_ids.discard(None)
+        dates = [naive_utc(m.match_date) for m in matches]
+
+        by_team: Dict[int, List[TeamFeatureSnapshot]] = {}
+        if team_ids:
+            rows = self.db.query(TeamFeatureSnapshot).filter(
+                TeamFeatureSnapshot.team_id.in_(team_ids),
+                TeamFeatureSnapshot.as_of >= min(dates) - timedelta(days=LOOKBACK_DAYS),
+                TeamFeatureSnapshot.as_of < max(dates)
+            ).order_by(TeamFeatureSnapshot.team_id, TeamFeatureSnapshot.as_of)
+            for row in rows:
+                by_team.setdefault(row.team_id, []).append(row)
+        as_of_index = {team_id: [r.as_of for r in rows] for team_id, rows in by_team.items()}
+        decoded: Dict[int, TeamFeatures] = {}
+
+        def lookup(team_id: Optional[int], at: datetime) -> Optional[TeamFeatures]:
+            if team_id not in by_team:
+                return None
+            i = bisect_left(as_of_index[team_id], at)
+            if i == 0:
+                return None
+            row = by_team[team_id][i - 1]
+            if row.id not in decoded:
+                decoded[row.id] = TeamFeatures.from_snapshot(row)
+            return decoded[row.id]
+
+        return {
+            m.id: (lookup(m.home_team_id, at), lookup(m.away_team_id, at))
+            for m, at in zip(matches, dates)
+        }
+
+    def league_positions(self, league_code: str, at: datetime) -> Dict[int, int]:
+        """
+        Classement point-in-time d'un championnat (1 requête).
+
+        Args:
+            league_code: Code du championnat
+            at: Date de lecture (exclue)
+
+        Returns:
+            Dictionnaire {team_id: position}
+        """
+        at = naive_utc(at)
+        latest = self.db.query(
+            TeamFeatureSnapshot.team_id,
+            func.max(TeamFeatureSnapshot.as_of).label("as_of")
+        ).filter(
+            TeamFeatureSnapshot.league_code == league_code,
+            TeamFeatureSnapshot.season == season_of(at),
+            TeamFeatureSnapshot.as_of < at
+        ).group_by(TeamFeatureSnapshot.team_id).subquery()
+
+        rows = self.db.query(TeamFeatureSnapshot).join(
+            latest,
+            (TeamFeatureSnapshot.team_id == latest.c.team_id) &
+            (TeamFeatureSnapshot.as_of == latest.c.as_of)
+        ).all()
+        rows.sort(key=lambda r: (-(r.league_points or 0), -(r.league_goal_diff or 0), -(r.league_goals_for or 0)))
+        return {row.team_id: position for position, row in enumerate(rows, start=1)}
+
+    # =========================================
+    # ÉCRITURE INCRÉMENTALE
+    # =========================================
+
+    def record_match(self, match: Match) -> int:
+        """
+        Ajoute les snapshots des deux équipes d'un match terminé.
+
+        Idempotent. Si le match arrive en retard (snapshots plus récents déjà
+        présents), l'historique de l'équipe est reconstruit.
+
+        Args:
+            match: Match au statut FINISHED
+
+        Returns:
+            Nombre de snapshots écrits
+        """
+        if match.status != "FINISHED" or match.score_home is None or match.score_away is None:
+            return 0
+        self.db.flush()  # S'assurer que le match a un id et est visible
+
+        written = 0
+        match_date = naive_utc(match.match_date)
+        for team_id in (match.home_team_id, match.away_team_id):
+            if team_id is None:
+                continue
+            exists = self.db.query(TeamFeatureSnapshot.id).filter(
+                TeamFeatureSnapshot.team_id == team_id,
+                TeamFeatureSnapshot.match_id == match.id
+            ).first()
+            if exists:
+                continue
+
+            newer = self.db.query(TeamFeatureSnapshot.id).filter(
+                TeamFeatureSnapshot.team_id == team_id,
+                TeamFeatureSnapshot.as_of > match_date
+            ).first()
+            if newer:
+                written += self.rebuild_team(team_id)
+                continue
+
+            previous = self.latest_before([team_id], match_date).get(team_id)
+            features = (previous or TeamFeatures(team_id=team_id)).apply_match(match)
+            self.db.add(features.to_snapshot())
+            written += 1
+
+        self.db.flush()
+        return written
+
+    def rebuild_team(self, team_id: int) -> int:
+        """
+        Reconstruit tous les snapshots d'une équipe.
+
+        Args:
+            team_id: ID de l'équipe
+
+        Returns:
+            Nombre de snapshots écrits
+        """
+        self.db.query(TeamFeatureSnapshot).filter(
+            TeamFeatureSnapshot.team_id == team_id
+        ).delete(synchronize_session=False)
+
+        matches = self.db.query(Match).filter(
+            Match.status == "FINISHED",
+            Match.score_home.isnot(None),
+            Match.score_away.isnot(None),
+            (Match.home_team_id == team_id) | (Match.away_team_id == team_id)
+        ).order_by(Match.match_date, Match.id)
+
+        features = TeamFeatures(team_id=team_id)
+        count = 0
+        for match in matches:
+            features = features.apply_match(match)
+            self.db.add(features.to_snapshot())
+            count += 1
+        self.db.flush()
+        return count
+
+    def rebuild(self, batch_size: int = 1000) -> int:
+        """
+        Reconstruit tout le feature store en un passage chronologique.
+
+        Args:
+            batch_size: Taille des lots lus et écrits
+
+        Returns:
+            Nombre de snapshots écrits
+        """
+        self.db.query(TeamFeatureSnapshot).delete(synchronize_session=False)
+
+        matches = self.db.query(Match).filter(
+            Match.status == "FINISHED",
+            Match.score_home.isnot(None),
+            Match.score_away.isnot(None)
+        ).order_by(Match.match_date, Match.id).yield_per(batch_size)
+
+        state: Dict[int, TeamFeatures] = {}
+        pending: List[TeamFeatureSnapshot] = []
+        count = 0
+        for match in matches:
+            for team_id in (match.home_team_id, match.away_team_id):
+                if team_id is None:
+                    continue
+                state[team_id] = state.get(team_id, TeamFeatures(team_id=team_id)).apply_match(match)
+                pending.append(state[team_id].to_snapshot())
+            if len(pending) >= batch_size:
+                self.db.add_all(pending)
+                self.db.flush()
+                count += len(pending)
+                pending = []
+
+        self.db.add_all(pending)
+        count += len(pending)
+        self.db.commit()
+        logger.info(f"🧮 Feature store reconstruit: {count} snapshots")
+        return count
@@ -8,6 +8,7 @@ Documentation API: https://docs.football-data.org
 """
 import httpx
 import asyncio
+import threading
 import time
 import logging
 from typing import Optional, Any, List
@@ -31,30 +32,31 @@ class RateLimiter:
         self.max_calls = max_calls
         self.period = period
         self.calls: List[float] = []
-        self._lock = asyncio.Lock()
+        # Verrou de thread: le limiteur est partagé entre la boucle principale
+        # et celles des threads de travail (génération de prédictions)
+        self._lock = threading.Lock()
     
     async def acquire(self):
         """Attend si nécessaire avant de permettre un nouvel appel."""
-        async with self._lock:
+        wait_time = self._reserve()
+        if wait_time > 0:
+            logger.warning(f"⏳ Rate limit atteint. Attente de {wait_time:.1f}s...")
+            await asyncio.sleep(wait_time)
+    
+    def _reserve(self) -> float:
+        """Réserve le prochain créneau d'appel et retourne l'attente en secondes."""
+        with self._lock:
             now = time.time()
             
-            # Nettoyer les appels expirés
+            # Nettoyer les appels expirés (les créneaux réservés à venir restent)
             self.calls = [t for t in self.calls if now - t < self.period]
             
+            # Créneau: une période après le max_calls-ième appel précédent
+            slot = now
             if len(self.calls) >= self.max_calls:
-                # Calculer le temps d'attente
-                oldest = self.calls[0]
-                wait_time = self.period - (now - oldest)
-                
-                if wait_time > 0:
-                    logger.warning(f"⏳ Rate limit atteint. Attente de {wait_time:.1f}s...")
-                    await asyncio.sleep(wait_time)
-                    # Nettoyer à nouveau après l'attente
-                    now = time.time()
-                    self.calls = [t for t in self.calls if now - t < self.period]
-            
-            # Enregistrer cet appel
-            self.calls.append(time.time())
+                slot = max(now, self.calls[-self.max_calls] + self.period)
+            self.calls.append(slot)
+            return slot - now
     
     @property
     def remaining_calls(self) -> int:
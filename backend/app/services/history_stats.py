@@ -0,0 +1,275 @@
+"""
+Statistiques de réussite des prédictions sur les matchs terminés.
+
+Vainqueur, score exact et over/under 2.5 sont calculés par des agrégats SQL
+groupés par compétition (CASE + SUM): seules quelques lignes par compétition
+remontent de la base, quelle que soit la longueur de la période.
+
+Table de cumul (optionnelle, HISTORY_ROLLUP_ENABLED): history_daily_stats
+contient les mêmes agrégats par jour et compétition. Elle est reconstruite
+chaque nuit (rebuild) et rafraîchie jour par jour quand la synchronisation
+termine un match ou qu'une prédiction de match terminé change
+(refresh_days). Les jours jusqu'au plus récent jour cumulé sont lus dans la
+table; les jours suivants sont agrégés sur les matchs.
+"""
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import logging
+
+from sqlalchemy import and_, case, delete, func, insert, or_
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from models.history_stat import HistoryDailyStat
+from models.match import Match
+from models.prediction import ExpertPrediction
+
+logger = logging.getLogger(__name__)
+
+# (code, nom, total, vainqueur, score exact, over/under 2.5)
+CompetitionTotals = Tuple[str, Optional[str], int, int, int, int]
+
+
+def _outcome(home, away):
+    """Issue 1X2 d'un score en SQL: 1 domicile, 0 nul, -1 extérieur."""
+    return case((home > away, 1), (home < away, -1), else_=0)
+
+
+def _over_2_5(home, away):
+    return case((home + away > 2, 1), else_=0)
+
+
+def accuracy_columns() -> List:
+    """Colonnes SUM() de réussite (vainqueur, score exact, over/under 2.5)."""
+    pred_home, pred_away = ExpertPrediction.home_score_forecast, ExpertPrediction.away_score_forecast
+    actual_home, actual_away = Match.score_home, Match.score_away
+    return [
+        func.count(Match.id),
+        func.sum(case((_outcome(pred_home, pred_away) == _outcome(actual_home, actual_away), 1), else_=0)),
+        func.sum(case((and_(pred_home == actual_home, pred_away == actual_away), 1), else_=0)),
+        func.sum(case((_over_2_5(pred_home, pred_away) == _over_2_5(actual_home, actual_away), 1), else_=0)),
+    ]
+
+
+def _as_date(value: Any) -> date:
+    """Jour renvoyé par func.date() (date, ou texte ISO sous SQLite)."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def format_stats(rows: Iterable[CompetitionTotals]) -> Dict[str, Any]:
+    """
+    Statistiques de la réponse /history à partir des totaux par compétition.
+
+    Args:
+        rows: Totaux par compétition
+
+    Returns:
+        Dict {total, correct_winner, correct_score, correct_goals, success_rates, by_competition}
+    """
+    stats = {"total": 0, "correct_winner": 0, "correct_score": 0, "correct_goals": 0}
+    by_competition = {}
+    for code, name, total, winner, score, goals in rows:
+        stats["total"] += total
+        stats["correct_winner"] += winner
+        stats["correct_score"] += score
+        stats["correct_goals"] += goals
+        by_competition[code] = {"total": total, "correct": winner, "name": name}
+
+    success_rates = {}
+    if stats["total"] > 0:
+        success_rates = {
+            "winner": round(stats["correct_winner"] / stats["total"] * 100, 1),
+            "score": round(stats["correct_score"] / stats["total"] * 100, 1),
+            "goals": round(stats["correct_goals"] / stats["total"] * 100, 1)
+        }
+    return {**stats, "success_rates": success_rates, "by_competition": by_competition}
+
+
+class HistoryStatsService:
+    """Agrégats SQL de réussite des prédictions et table de cumul quotidienne."""
+
+    def __init__(self, db: Session):
+        """
+        Initialise le service.
+
+        Args:
+            db: Session SQLAlchemy
+        """
+        self.db = db
+
+    def _finished_query(self, *columns):
+        """Matchs terminés avec score et prédiction."""
+        return self.db.query(*columns).join(
+            ExpertPrediction, ExpertPrediction.match_id == Match.id
+        ).filter(
+            Match.status == "FINISHED",
+            Match.score_home.isnot(None),
+            Match.score_away.isnot(None)
+        )
+
+    @staticmethod
+    def _day_bounds(query, column, start: Optional[date], end: Optional[date]):
+        if start is not None:
+            query = query.filter(column >= datetime.combine(start, datetime.min.time()))
+        if end is not None:
+            query = query.filter(column <= datetime.combine(end, datetime.max.time()))
+        return query
+
+    def live_totals(
+        self,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        competition: Optional[str] = None
+    ) -> List[CompetitionTotals]:
+        """
+        Totaux par compétition agrégés directement sur les matchs.
+
+        Args:
+            start: Premier jour inclus (None = sans borne)
+            end: Dernier jour inclus (None = sans borne)
+            competition: Code de la compétition (optionnel)
+
+        Returns:
+            Totaux par compétition
+        """
+        query = self._finished_query(
+            Match.competition_code, func.max(Match.competition_name), *accuracy_columns()
+        )
+        query = self._day_bounds(query, Match.match_date, start, end)
+        if competition:
+            query = query.filter(Match.competition_code == competition)
+        rows = query.group_by(Match.competition_code).all()
+        return [(code, name, int(total), int(w or 0), int(s or 0), int(g or 0)) for code, name, total, w, s, g in rows]
+
+    def rollup_totals(
+        self,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        competition: Optional[str] = None
+    ) -> List[CompetitionTotals]:
+        """Totaux par compétition lus dans la table de cumul (mêmes arguments que live_totals)."""
+        query = self.db.query(
+            HistoryDailyStat.competition_code,
+            func.max(HistoryDailyStat.competition_name),
+            func.sum(HistoryDailyStat.total),
+            func.sum(HistoryDailyStat.correct_winner),
+            func.sum(HistoryDailyStat.correct_score),
+            func.sum(HistoryDailyStat.correct_goals),
+        )
+        if start is not None:
+            query = query.filter(HistoryDailyStat.day >= start)
+        if end is not None:
+            query = query.filter(HistoryDailyStat.day <= end)
+        if competition:
+            query = query.filter(HistoryDailyStat.competition_code == competition)
+        rows = query.group_by(HistoryDailyStat.competition_code).all()
+        return [(code, name, int(total), int(w), int(s), int(g)) for code, name, total, w, s, g in rows]
+
+    def rolled_until(self) -> Optional[date]:
+        """Dernier jour couvert par la table de cumul (None si vide)."""
+        latest = self.db.query(func.max(HistoryDailyStat.day)).scalar()
+        return _as_date(latest) if latest is not None else None
+
+    def stats(
+        self,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        competition: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Statistiques de réussite d'une période.
+
+        Args:
+            start: Premier jour inclus (None = tout l'historique)
+            end: Dernier jour inclus (None = jusqu'à aujourd'hui)
+            competition: Code de la compétition (optionnel)
+
+        Returns:
+            Statistiques au format de la réponse /history
+        """
+        rolled = self.rolled_until() if settings.history_rollup_enabled else None
+        if rolled is None or (start is not None and start > rolled):
+            return format_stats(self.live_totals(start, end, competition))
+
+        rollup_end = rolled if end is None else min(end, rolled)
+        parts = self.rollup_totals(start, rollup_end, competition)
+        if end is None or end > rolled:
+            parts += self.live_totals(rolled + timedelta(days=1), end, competition)
+
+        merged: Dict[str, list] = {}
+        for code, name, *counts in parts:
+            entry = merged.setdefault(code, [code, name, 0, 0, 0, 0])
+            entry[1] = entry[1] or name
+            for i, value in enumerate(counts):
+                entry[2 + i] += value
+        return format_stats(tuple(entry) for entry in merged.values())
+
+    def _daily_rows(self, days: Optional[List[date]] = None) -> List[Dict[str, Any]]:
+        """Lignes de cumul (jour, compétition) agrégées sur les matchs."""
+        day = func.date(Match.match_date)
+        query = self._finished_query(
+            day, Match.competition_code, func.max(Match.competition_name), *accuracy_columns()
+        )
+        if days is not None:
+            # Bornes sur match_date (index) plutôt que sur date(match_date)
+            query = query.filter(or_(*[
+                and_(
+                    Match.match_date >= datetime.combine(d, datetime.min.time()),
+                    Match.match_date <= datetime.combine(d, datetime.max.time())
+                )
+                for d in days
+            ]))
+        rows = query.group_by(day, Match.competition_code).all()
+        now = datetime.now(timezone.utc)
+        return [
+            {
+                "day": _as_date(row_day), "competition_code": code, "competition_name": name,
+                "total": int(total), "correct_winner": int(w or 0), "correct_score": int(s or 0),
+                "correct_goals": int(g or 0), "updated_at": now,
+            }
+            for row_day, code, name, total, w, s, g in rows
+        ]
+
+    def rebuild(self) -> int:
+        """
+        Reconstruit toute la table de cumul (une requête groupée).
+
+        Returns:
+            Nombre de lignes (jour, compétition) écrites
+        """
+        rows = self._daily_rows()
+        self.db.execute(delete(HistoryDailyStat))
+        if rows:
+            self.db.execute(insert(HistoryDailyStat), rows)
+        self.db.commit()
+        logger.info(f"📊 Cumul de l'historique reconstruit: {len(rows)} lignes")
+        return len(rows)
+
+    def refresh_days(self, days: Iterable[date], commit: bool = True) -> int:
+        """
+        Recalcule la table de cumul pour quelques jours.
+
+        Sans effet tant que la table n'a pas été construite (rebuild): les
+        jours déjà couverts ne doivent jamais être partiellement cumulés.
+
+        Args:
+            days: Jours à recalculer
+            commit: Valider la transaction (False dans un savepoint de l'appelant)
+
+        Returns:
+            Nombre de lignes (jour, compétition) écrites
+        """
+        days = sorted({_as_date(d) for d in days})
+        if not days or not settings.history_rollup_enabled or self.rolled_until() is None:
+            return 0
+        rows = self._daily_rows(days)
+        self.db.execute(delete(HistoryDailyStat).where(HistoryDailyStat.day.in_(days)))
+        if rows:
+            self.db.execute(insert(HistoryDailyStat), rows)
+        if commit:
+            self.db.commit()
+        return len(rows)
@@ -0,0 +1,129 @@
+"""
+Index en mémoire des matchs importants (CL, EL, FAC, FLC).
+
+Utilisé par la logique de Papa pour détecter la congestion du calendrier:
+match important juste avant (fatigue) ou juste après (rotation).
+
+Une seule requête par lot charge tous les matchs importants de la fenêtre
+[premier match - N jours, dernier match + N jours]; chaque vérification
+devient ensuite une recherche dichotomique dans la liste de l'équipe.
+"""
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from models.match import Match
+from services.feature_store import IMPORTANT_COMPETITIONS, naive_utc
+
+
+class ImportantMatchIndex:
+    """Matchs importants d'une fenêtre de dates, indexés par équipe."""
+
+    def __init__(self, start: datetime, end: datetime, matches: Iterable[Match]):
+        """
+        Args:
+            start: Début de la fenêtre couverte (inclus)
+            end: Fin de la fenêtre couverte (incluse)
+            matches: Matchs importants de la fenêtre
+        """
+        self.start = naive_utc(start)
+        self.end = naive_utc(end)
+        self._by_team: Dict[int, List[Match]] = {}
+        for match in sorted(matches, key=lambda m: m.match_date):
+            for team_id in (match.home_team_id, match.away_team_id):
+                if team_id is not None:
+                    self._by_team.setdefault(team_id, []).append(match)
+        self._dates = {
+            team_id: [naive_utc(m.match_date) for m in team_matches]
+            for team_id, team_matches in self._by_team.items()
+        }
+
+    @classmethod
+    def load(cls, db: Session, dates: Iterable[datetime], days: int = 3) -> "ImportantMatchIndex":
+        """
+        Charge l'index couvrant toutes les dates données ± `days` (1 requête).
+
+        Args:
+            db: Session SQLAlchemy
+            dates: Dates des matchs à analyser
+            days: Demi-largeur de la fenêtre en jours
+
+        Returns:
+            ImportantMatchIndex prêt à l'emploi
+        """
+        dates = [naive_utc(d) for d in dates if d is not None]
+        if not dates:
+            return cls(datetime.min, datetime.min, [])
+        start = min(dates) - timedelta(days=days)
+        end = max(dates) + timedelta(days=days)
+
+        matches = db.query(Match).filter(
+            Match.competition_code.in_(IMPORTANT_COMPETITIONS),
+            Match.match_date >= start,
+            Match.match_date <= end
+        ).all()
+        return cls(start, end, matches)
+
+    def covers(self, match_date: datetime, days: int) -> bool:
+        """True si la fenêtre ±`days` autour de `match_date` est chargée."""
+        match_date = naive_utc(match_date)
+        return self.start <= match_date - timedelta(days=days) and match_date + timedelta(days=days) <= self.end
+
+    def upcoming(self, team_id: int, match_date: datetime, days: int = 3) -> Optional[dict]:
+        """
+        Premier match important de l'équipe dans les N jours suivants.
+
+        Args:
+            team_id: ID de l'équipe
+            match_date: Date du match actuel
+            days: Nombre de jours à vérifier
+
+        Returns:
+            Dict avec infos du match important ou None
+        """
+        dates = self._dates.get(team_id)
+        if not dates:
+            return None
+        match_date = naive_utc(match_date)
+        i = bisect_right(dates, match_date)
+        if i == len(dates) or dates[i] > match_date + timedelta(days=days):
+            return None
+        found = self._by_team[team_id][i]
+        return {
+            'competition': found.competition_name,
+            'opponent': found.away_team if found.home_team_id == team_id else found.home_team,
+            'date': found.match_date,
+            'days_until': (dates[i] - match_date).days
+        }
+
+    def recent(self, team_id: int, match_date: datetime, days: int = 3) -> Optional[dict]:
+        """
+        Dernier match important terminé de l'équipe dans les N jours précédents.
+
+        Args:
+            team_id: ID de l'équipe
+            match_date: Date du match actuel
+            days: Nombre de jours à vérifier
+
+        Returns:
+            Dict avec infos du match important ou None
+        """
+        dates = self._dates.get(team_id)
+        if not dates:
+            return None
+        match_date = naive_utc(match_date)
+        lo = bisect_left(dates, match_date - timedelta(days=days))
+        hi = bisect_left(dates, match_date)
+        for i in range(hi - 1, lo - 1, -1):
+            found = self._by_team[team_id][i]
+            if found.status == 'FINISHED':
+                return {
+                    'competition': found.competition_name,
+                    'opponent': found.away_team if found.home_team_id == team_id else found.home_team,
+                    'date': found.match_date,
+                    'days_ago': (match_date - dates[i]).days,
+                    'score': f"{found.score_home}-{found.score_away}"
+                }
+        return None
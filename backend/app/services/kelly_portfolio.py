@@ -0,0 +1,271 @@
+"""
+Portefeuille de mises au critère de Kelly (paris simultanés).
+
+Le critère de Kelly maximise la croissance logarithmique espérée de la
+bankroll. Pour des paris joués en même temps, les mises se choisissent
+ensemble:
+- issues d'un même match: exclusives (une seule gagne);
+- matchs différents: indépendants.
+
+L'espérance est estimée sur des scénarios tirés des probabilités du modèle
+(nombres aléatoires communs, graine fixe), puis maximisée par pas de Newton
+projetés: modèle quadratique résolu sous contraintes (gradient projeté
+accéléré, en dimension du nombre de paris), puis recherche linéaire.
+Contraintes: mises positives, plafond par pari et exposition totale. Le Kelly fractionnaire (f = k * g) est résolu
+exactement: g est optimisé sous les plafonds divisés par k.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+import logging
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from models.match import Match
+from models.value_bet import ValueBet
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_KELLY_FRACTION = 0.25
+DEFAULT_MAX_STAKE = 0.05       # Part de bankroll maximale par pari
+DEFAULT_MAX_EXPOSURE = 0.25    # Part de bankroll maximale engagée au total
+DEFAULT_SCENARIOS = 10000
+
+# Solveur (pas de Newton projetés)
+MAX_ITERATIONS = 50
+QUADRATIC_ITERATIONS = 500
+TOLERANCE = 1e-7
+# Bankroll jamais entièrement engagée (log de la richesse défini)
+MAX_FULL_KELLY_EXPOSURE = 0.999
+
+
+@dataclass(frozen=True)
+class PortfolioBet:
+    """Pari candidat."""
+    match_id: int
+    bet_type: str
+    odds: float
+    probability: float
+
+
+@dataclass
+class PortfolioResult:
+    """Mises optimales (fractions de bankroll, dans l'ordre des paris)."""
+    fractions: np.ndarray
+    expected_growth: float     # E[log(richesse finale / bankroll)]
+    expected_return: float     # Gain espéré / bankroll
+    iterations: int
+
+
+def scenario_returns(bets: Sequence[PortfolioBet], scenarios: int = DEFAULT_SCENARIOS, seed: int = 0) -> np.ndarray:
+    """
+    Rendement de chaque pari dans des scénarios tirés du modèle.
+
+    Un tirage uniforme par match et par scénario: les issues pariées du match
+    se partagent [0, 1) selon leurs probabilités, le reste est "autre issue".
+
+    Args:
+        bets: Paris candidats
+        scenarios: Nombre de scénarios
+        seed: Graine
+
+    Returns:
+        Matrice (scénarios, paris): cote - 1 si gagné, -1 sinon
+    """
+    rng = np.random.default_rng(seed)
+    match_ids = sorted({bet.match_id for bet in bets})
+    column = {match_id: i for i, match_id in enumerate(match_ids)}
+    draws = rng.random((scenarios, len(match_ids)))
+
+    returns = np.empty((scenarios, len(bets)))
+    lower = {match_id: 0.0 for match_id in match_ids}
+    for i, bet in enumerate(bets):
+        start = lower[bet.match_id]
+        lower[bet.match_id] = start + bet.probability
+        u = draws[:, column[bet.match_id]]
+        returns[:, i] = np.where((u >= start) & (u < start + bet.probability), bet.odds - 1.0, -1.0)
+    return returns
+
+
+def project_capped_simplex(x: np.ndarray, cap: float, budget: float) -> np.ndarray:
+    """
+    Projection euclidienne sur {0 <= x_i <= cap, somme(x) <= budget}.
+
+    Args:
+        x: Point à projeter
+        cap: Plafond par composante
+        budget: Plafond de la somme
+
+    Returns:
+        Point projeté
+    """
+    clipped = np.clip(x, 0.0, cap)
+    if clipped.sum() <= budget:
+        return clipped
+    # Décalage lambda tel que somme(clip(x - lambda)) = budget: la somme est
+    # affine par morceaux en lambda, de points de rupture x_i et x_i - cap
+    # (évaluée à chaque point de rupture par sommes cumulées sur x trié)
+    ordered = np.sort(x)
+    prefix = np.concatenate([[0.0], np.cumsum(ordered)])
+    breakpoints = np.unique(np.concatenate([x, x - cap]))
+    low_index = np.searchsorted(ordered, breakpoints, side="right")
+    high_index = np.searchsorted(ordered, breakpoints + cap, side="right")
+    sums = (
+        prefix[high_index] - prefix[low_index] - breakpoints * (high_index - low_index)
+        + cap * (len(x) - high_index)
+    )  # Décroissante
+    k = int(np.searchsorted(-sums, -budget))  # Premier point de rupture où somme <= budget
+    if k == 0:
+        return np.clip(x - breakpoints[0], 0.0, cap)
+    low, high = breakpoints[k - 1], breakpoints[k]
+    shift = low + (sums[k - 1] - budget) * (high - low) / (sums[k - 1] - sums[k])
+    return np.clip(x - shift, 0.0, cap)
+
+
+def _solve_quadratic_step(
+    g: np.ndarray, gradient: np.ndarray, curvature: np.ndarray, cap: float, budget: float
+) -> np.ndarray:
+    """Maximise gradient.(x - g) - (x - g)'C(x - g)/2 sur le domaine (FISTA, pas 1/L)."""
+    lipschitz = float(np.linalg.eigvalsh(curvature)[-1]) + 1e-12
+    x = y = g.copy()
+    momentum = 1.0
+    for _ in range(QUADRATIC_ITERATIONS):
+        x_next = project_capped_simplex(y + (gradient - curvature @ (y - g)) / lipschitz, cap, budget)
+        if np.abs(x_next - x).max() < TOLERANCE / 10:
+            return x_next
+        momentum_next = (1 + np.sqrt(1 + 4 * momentum ** 2)) / 2
+        y = x_next + (momentum - 1) / momentum_next * (x_next - x)
+        x, momentum = x_next, momentum_next
+    return x
+
+
+def optimize_kelly(
+    returns: np.ndarray,
+    kelly_fraction: float = DEFAULT_KELLY_FRACTION,
+    max_stake: float = DEFAULT_MAX_STAKE,
+    max_exposure: float = DEFAULT_MAX_EXPOSURE
+) -> PortfolioResult:
+    """
+    Mises de Kelly fractionnaire sous contraintes de bankroll.
+
+    Args:
+        returns: Matrice (scénarios, paris) de scenario_returns
+        kelly_fraction: Fraction de Kelly k (0-1]
+        max_stake: Mise maximale par pari (part de bankroll)
+        max_exposure: Mise totale maximale (part de bankroll)
+
+    Returns:
+        PortfolioResult
+    """
+    n_bets = returns.shape[1]
+    if n_bets == 0:
+        return PortfolioResult(np.zeros(0), 0.0, 0.0, 0)
+
+    cap = max_stake / kelly_fraction
+    budget = min(max_exposure / kelly_fraction, MAX_FULL_KELLY_EXPOSURE)
+
+    def growth(g: np.ndarray) -> float:
+        return float(np.log1p(returns @ g).mean())
+
+    g = np.zeros(n_bets)
+    value = growth(g)
+    iterations = 0
+    for iterations in range(1, MAX_ITERATIONS + 1):
+        weighted = returns / (1.0 + returns @ g)[:, None]
+        gradient = weighted.mean(axis=0)
+        curvature = weighted.T @ weighted / len(returns)  # -Hessien (semi-défini positif)
+
+        # Pas de Newton sous contraintes: modèle quadratique maximisé par gradient projeté accéléré
+        target = _solve_quadratic_step(g, gradient, curvature, cap, budget)
+        direction = target - g
+        if np.abs(direction).max() < TOLERANCE:
+            break
+
+        # Recherche linéaire (le domaine est convexe: tout point du segment est admissible)
+        step, slope = 1.0, gradient @ direction
+        while True:
+            candidate = g + step * direction
+            candidate_value = growth(candidate)
+            if candidate_value >= value + 1e-4 * step * slope or step < 1e-6:
+                break
+            step /= 2
+        g, value = candidate, candidate_value
+        if step * np.abs(direction).max() < TOLERANCE:
+            break
+
+    fractions = kelly_fraction * g
+    return PortfolioResult(
+        fractions=fractions,
+        expected_growth=float(np.log1p(returns @ fractions).mean()),
+        expected_return=float((returns @ fractions).mean()),
+        iterations=iterations,
+    )
+
+
+class KellyPortfolioService:
+    """Mises de Kelly sur les value bets en cours."""
+
+    def __init__(self, db: Session):
+        """
+        Initialise le service.
+
+        Args:
+            db: Session SQLAlchemy
+        """
+        self.db = db
+
+    def candidates(self, value_only: bool = False, competition: Optional[str] = None) -> List[Tuple[ValueBet, Match]]:
+        """
+        Value bets des matchs à venir (table value_bets), dans l'ordre du classement.
+
+        Args:
+            value_only: Uniquement les issues au-dessus du seuil de value
+            competition: Code de la compétition (toutes si None)
+
+        Returns:
+            Liste de (ValueBet, Match)
+        """
+        query = self.db.query(ValueBet, Match).join(Match, ValueBet.match_id == Match.id).filter(
+            Match.match_date >= datetime.now()
+        )
+        if value_only:
+            query = query.filter(ValueBet.is_value_bet.is_(True))
+        if competition:
+            query = query.filter(Match.competition_code == competition.upper())
+        return query.order_by(ValueBet.rank).all()
+
+    def build(
+        self,
+        kelly_fraction: float = DEFAULT_KELLY_FRACTION,
+        max_stake: float = DEFAULT_MAX_STAKE,
+        max_exposure: float = DEFAULT_MAX_EXPOSURE,
+        value_only: bool = False,
+        competition: Optional[str] = None,
+        scenarios: int = DEFAULT_SCENARIOS
+    ) -> Tuple[List[Tuple[ValueBet, Match]], PortfolioResult]:
+        """
+        Optimise les mises de tous les value bets en cours.
+
+        Args:
+            kelly_fraction: Fraction de Kelly
+            max_stake: Mise maximale par pari (part de bankroll)
+            max_exposure: Mise totale maximale (part de bankroll)
+            value_only: Uniquement les issues au-dessus du seuil de value
+            competition: Code de la compétition (toutes si None)
+            scenarios: Nombre de scénarios simulés
+
+        Returns:
+            (paris candidats, PortfolioResult dans le même ordre)
+        """
+        rows = self.candidates(value_only, competition)
+        bets = [
+            PortfolioBet(match_id=bet.match_id, bet_type=bet.bet_type, odds=bet.odds, probability=bet.probability)
+            for bet, _ in rows
+        ]
+        result = optimize_kelly(scenario_returns(bets, scenarios), kelly_fraction, max_stake, max_exposure)
+        logger.info(
+            f"🎯 Portefeuille Kelly: {int((result.fractions > 0).sum())}/{len(bets)} paris misés, "
+            f"exposition {result.fractions.sum():.1%} ({result.iterations} itérations)"
+        )
+        return rows, result
@@ -0,0 +1,383 @@
+"""
+Simulation des phases à élimination directe (CL, EL, ECL, WC, EC).
+
+L'état du tableau (confrontations du tour en cours, manches jouées et à
+jouer, Elo des équipes en lice) est une valeur immuable: la simulation est
+mémoïsée par état et ne se relance qu'après un nouveau résultat ou une
+nouvelle prédiction. Le nombre de simulations demandé est arrondi aux
+niveaux des projections de saison (SIMULATION_LEVELS): la clé du cache est
+l'état du tableau, pas un nombre choisi par le client.
+
+Modèle d'une confrontation:
+- buts de chaque manche tirés selon une loi de Poisson (buts attendus de la
+  prédiction enregistrée, sinon de l'Elo);
+- aller-retour: score cumulé (sans règle des buts à l'extérieur);
+- égalité: prolongation (un tiers des buts attendus, chez l'équipe qui
+  reçoit la dernière manche), puis tirs au but à 50/50.
+
+Les tours suivants sont tirés au sort dans chaque simulation (tirage
+intégral); la finale se joue sur terrain neutre.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+import logging
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from models.match import Match
+from models.prediction import ExpertPrediction
+from services.feature_store import naive_utc, season_of
+from services.season_projection import normalize_simulations
+from services.team_ratings import TeamRatingService, initial_rating, rating_expected_goals
+
+logger = logging.getLogger(__name__)
+
+# Tours à élimination directe, dans l'ordre
+KNOCKOUT_STAGES = ("PLAYOFFS", "LAST_32", "LAST_16", "QUARTER_FINALS", "SEMI_FINALS", "FINAL")
+
+# Nom d'un tour selon son nombre de confrontations
+STAGE_BY_TIES = {16: "LAST_32", 8: "LAST_16", 4: "QUARTER_FINALS", 2: "SEMI_FINALS", 1: "FINAL"}
+
+# Compétitions en aller-retour (sauf la finale) et compétitions sur terrain neutre
+TWO_LEGGED_COMPETITIONS = ("CL", "EL", "ECL")
+NEUTRAL_COMPETITIONS = ("WC", "EC")
+KNOCKOUT_COMPETITIONS = TWO_LEGGED_COMPETITIONS + NEUTRAL_COMPETITIONS
+
+# Prolongation: part des buts attendus d'un match (30 min sur 90)
+EXTRA_TIME_SHARE = 1 / 3
+
+DEFAULT_SIMULATIONS = 20000
+
+
+@dataclass(frozen=True)
+class Leg:
+    """Manche d'une confrontation (scores None = à jouer)."""
+    host: int
+    guest: int
+    host_goals: Optional[int] = None
+    guest_goals: Optional[int] = None
+    expected_host: float = 0.0
+    expected_guest: float = 0.0
+
+    @property
+    def played(self) -> bool:
+        return self.host_goals is not None and self.guest_goals is not None
+
+
+@dataclass(frozen=True)
+class Tie:
+    """Confrontation du tour en cours (team_a reçoit la dernière manche)."""
+    team_a: int
+    team_b: int
+    legs: Tuple[Leg, ...]
+    winner: Optional[int] = None  # Qualifié connu (confrontation terminée)
+
+
+@dataclass(frozen=True)
+class BracketState:
+    """État du tableau: clé de mémoïsation de la simulation."""
+    competition_code: str
+    stage: str
+    ties: Tuple[Tie, ...]
+    ratings: Tuple[Tuple[int, float], ...]
+    two_legged: bool
+    neutral: bool
+
+
+@dataclass(frozen=True)
+class BracketSimulation:
+    """Résultat d'une simulation (partagé par le cache: ne pas modifier)."""
+    stages: Tuple[str, ...]            # Tours simulés puis "WINNER"
+    team_ids: Tuple[int, ...]
+    reach: np.ndarray                  # [équipe, k] = P(atteindre stages[k])
+    tie_probabilities: Tuple[float, ...]  # P(team_a qualifiée) par confrontation
+    complete: bool                     # False si le tableau ne se résout pas jusqu'au vainqueur
+    simulations: int                   # Nombre de tableaux simulés
+
+
+def _resolve(
+    rng: np.random.Generator,
+    goals_a: np.ndarray,
+    goals_b: np.ndarray,
+    extra_a: np.ndarray,
+    extra_b: np.ndarray
+) -> np.ndarray:
+    """Qualification de team_a: score cumulé, puis prolongation, puis tirs au but."""
+    level = goals_a == goals_b
+    extra_goals_a = np.where(level, rng.poisson(extra_a), 0)
+    extra_goals_b = np.where(level, rng.poisson(extra_b), 0)
+    penalties = rng.random(goals_a.shape) < 0.5
+    total_a, total_b = goals_a + extra_goals_a, goals_b + extra_goals_b
+    return np.where(total_a == total_b, penalties, total_a > total_b)
+
+
+@lru_cache(maxsize=32)
+def simulate_bracket(state: BracketState, simulations: int = DEFAULT_SIMULATIONS, seed: Optional[int] = None) -> BracketSimulation:
+    """
+    Simule la fin du tableau (mémoïsé par état, nombre de simulations et graine).
+
+    Args:
+        state: État du tableau
+        simulations: Nombre de tableaux simulés
+        seed: Graine (reproductibilité)
+
+    Returns:
+        BracketSimulation
+    """
+    rng = np.random.default_rng(seed)
+    ratings = dict(state.ratings)
+    team_ids = tuple(sorted(ratings))
+    index = {team_id: i for i, team_id in enumerate(team_ids)}
+    n_teams = len(team_ids)
+
+    # Buts attendus de toute affiche possible: [i, j] = buts de i quand i reçoit j
+    host_xg = np.zeros((n_teams, n_teams))
+    guest_xg = np.zeros((n_teams, n_teams))
+    neutral_xg = np.zeros((n_teams, n_teams))
+    for i, ti in enumerate(team_ids):
+        for j, tj in enumerate(team_ids):
+            if i != j:
+                host_xg[i, j], guest_xg[i, j] = rating_expected_goals(ratings[ti], ratings[tj])
+                neutral_xg[i, j] = rating_expected_goals(ratings[ti], ratings[tj], neutral=True)[0]
+
+    # Tour en cours: manches jouées fixes, manches à jouer tirées
+    n_ties = len(state.ties)
+    a = np.array([index[t.team_a] for t in state.ties])
+    b = np.array([index[t.team_b] for t in state.ties])
+    goals_a = np.zeros((simulations, n_ties), dtype=int)
+    goals_b = np.zeros((simulations, n_ties), dtype=int)
+    for k, tie in enumerate(state.ties):
+        for leg in tie.legs:
+            if leg.played:
+                host_goals, guest_goals = leg.host_goals, leg.guest_goals
+            else:
+                host_goals = rng.poisson(leg.expected_host, simulations)
+                guest_goals = rng.poisson(leg.expected_guest, simulations)
+            if leg.host == tie.team_a:
+                goals_a[:, k] += host_goals
+                goals_b[:, k] += guest_goals
+            else:
+                goals_a[:, k] += guest_goals
+                goals_b[:, k] += host_goals
+
+    neutral_venue = state.neutral or state.stage == "FINAL"
+    venue_xg_a = neutral_xg[a, b] if neutral_venue else host_xg[a, b]
+    venue_xg_b = neutral_xg[b, a] if neutral_venue else guest_xg[a, b]
+    a_through = _resolve(
+        rng, goals_a, goals_b,
+        np.broadcast_to(venue_xg_a * EXTRA_TIME_SHARE, goals_a.shape),
+        np.broadcast_to(venue_xg_b * EXTRA_TIME_SHARE, goals_a.shape)
+    )
+    for k, tie in enumerate(state.ties):
+        if tie.winner is not None:
+            a_through[:, k] = tie.winner == tie.team_a
+    alive = np.where(a_through, a, b)
+
+    stages = [state.stage]
+    reached = [np.bincount(np.concatenate([a, b]), minlength=n_teams) * simulations]
+
+    # Tours suivants: tirage intégral dans chaque simulation (après les barrages,
+    # les têtes de série rejoignent le tableau: seul le tour en cours est projeté)
+    while state.stage != "PLAYOFFS" and alive.shape[1] > 1 and alive.shape[1] % 2 == 0:
+        reached.append(np.bincount(alive.ravel(), minlength=n_teams))
+        n_ties = alive.shape[1] // 2
+        stages.append(STAGE_BY_TIES.get(n_ties, f"LAST_{2 * n_ties}"))
+
+        draw = np.argsort(rng.random(alive.shape), axis=1)
+        alive = np.take_along_axis(alive, draw, axis=1)
+        home, away = alive[:, 0::2], alive[:, 1::2]
+        if n_ties == 1 or state.neutral:
+            goals_home = rng.poisson(neutral_xg[home, away])
+            goals_away = rng.poisson(neutral_xg[away, home])
+            extra_home, extra_away = neutral_xg[home, away], neutral_xg[away, home]
+        elif state.two_legged:
+            # Aller chez away, retour (et prolongation) chez home
+            goals_home = rng.poisson(guest_xg[away, home]) + rng.poisson(host_xg[home, away])
+            goals_away = rng.poisson(host_xg[away, home]) + rng.poisson(guest_xg[home, away])
+            extra_home, extra_away = host_xg[home, away], guest_xg[home, away]
+        else:
+            goals_home = rng.poisson(host_xg[home, away])
+            goals_away = rng.poisson(guest_xg[home, away])
+            extra_home, extra_away = host_xg[home, away], guest_xg[home, away]
+        home_through = _resolve(
+            rng, goals_home, goals_away, extra_home * EXTRA_TIME_SHARE, extra_away * EXTRA_TIME_SHARE
+        )
+        alive = np.where(home_through, home, away)
+
+    complete = alive.shape[1] == 1
+    if complete:
+        stages.append("WINNER")
+        reached.append(np.bincount(alive.ravel(), minlength=n_teams))
+
+    return BracketSimulation(
+        stages=tuple(stages),
+        team_ids=team_ids,
+        reach=np.stack(reached, axis=1) / simulations,
+        tie_probabilities=tuple(float(p) for p in a_through.mean(axis=0)),
+        complete=complete,
+        simulations=simulations,
+    )
+
+
+class KnockoutBracketService:
+    """Construction de l'état du tableau depuis la base et projection."""
+
+    def __init__(self, db: Session):
+        """
+        Initialise le service.
+
+        Args:
+            db: Session SQLAlchemy
+        """
+        self.db = db
+
+    def _knockout_matches(self, code: str) -> List[Match]:
+        """Matchs à élimination directe de la dernière saison de la compétition."""
+        last_date = self.db.query(func.max(Match.match_date)).filter(
+            Match.competition_code == code,
+            Match.stage.in_(KNOCKOUT_STAGES)
+        ).scalar()
+        if last_date is None:
+            return []
+        season = season_of(naive_utc(last_date))
+        start = datetime(season, 7, 1) if code in TWO_LEGGED_COMPETITIONS else datetime(season, 1, 1)
+        return self.db.query(Match).filter(
+            Match.competition_code == code,
+            Match.stage.in_(KNOCKOUT_STAGES),
+            Match.match_date >= start,
+            Match.home_team_id.isnot(None),
+            Match.away_team_id.isnot(None),
+            Match.status.notin_(("CANCELLED", "POSTPONED"))
+        ).order_by(Match.match_date, Match.id).all()
+
+    def current_state(self, competition_code: str) -> Optional[Tuple[BracketState, Dict[int, str], int]]:
+        """
+        État du tableau: premier tour non terminé (ou la finale jouée).
+
+        Args:
+            competition_code: Code de la compétition
+
+        Returns:
+            (BracketState, {team_id: nom}, saison) ou None sans phase finale
+        """
+        code = competition_code.upper()
+        matches = self._knockout_matches(code)
+        if not matches:
+            return None
+        two_legged = code in TWO_LEGGED_COMPETITIONS
+        neutral = code in NEUTRAL_COMPETITIONS
+
+        names: Dict[int, str] = {}
+        by_stage: Dict[str, Dict[frozenset, List[Match]]] = {}
+        for m in matches:
+            names[m.home_team_id], names[m.away_team_id] = m.home_team, m.away_team
+            pair = frozenset((m.home_team_id, m.away_team_id))
+            by_stage.setdefault(m.stage, {}).setdefault(pair, []).append(m)
+
+        stages = [s for s in KNOCKOUT_STAGES if s in by_stage]
+        team_ids = set(names)
+        ratings = TeamRatingService(self.db).current(team_ids)
+        ratings = {t: round(ratings.get(t, initial_rating(None)), 1) for t in team_ids}
+        predictions = {
+            p.match_id: p for p in self.db.query(ExpertPrediction).filter(
+                ExpertPrediction.match_id.in_([m.id for m in matches if m.status != "FINISHED"]),
+                ExpertPrediction.expected_home_goals.isnot(None)
+            )
+        }
+
+        stage, ties = stages[-1], ()
+        for candidate in stages:
+            single_leg = not two_legged or candidate == "FINAL"
+            candidate_ties = tuple(
+                self._tie(legs, predictions, ratings, single_leg, neutral or candidate == "FINAL")
+                for legs in by_stage[candidate].values()
+            )
+            stage, ties = candidate, candidate_ties
+            if any(t.winner is None for t in candidate_ties):
+                break
+
+        in_play = {t for tie in ties for t in (tie.team_a, tie.team_b)}
+        state = BracketState(
+            competition_code=code,
+            stage=stage,
+            ties=ties,
+            ratings=tuple(sorted((t, r) for t, r in ratings.items() if t in in_play)),
+            two_legged=two_legged,
+            neutral=neutral,
+        )
+        season = season_of(naive_utc(matches[-1].match_date))
+        return state, names, season
+
+    @staticmethod
+    def _tie(
+        legs: List[Match],
+        predictions: Dict[int, ExpertPrediction],
+        ratings: Dict[int, float],
+        single_leg: bool,
+        neutral: bool
+    ) -> Tie:
+        """Confrontation à partir de ses manches (la manche retour manquante est ajoutée)."""
+        built = []
+        for m in legs:
+            played = m.status == "FINISHED" and m.score_home is not None and m.score_away is not None
+            prediction = predictions.get(m.id)
+            if played:
+                expected = (0.0, 0.0)
+            elif prediction is not None:
+                expected = (prediction.expected_home_goals, prediction.expected_away_goals)
+            else:
+                expected = rating_expected_goals(ratings[m.home_team_id], ratings[m.away_team_id], neutral)
+            built.append(Leg(
+                host=m.home_team_id,
+                guest=m.away_team_id,
+                host_goals=m.score_home if played else None,
+                guest_goals=m.score_away if played else None,
+                expected_host=round(float(expected[0]), 3),
+                expected_guest=round(float(expected[1]), 3),
+            ))
+        if not single_leg and len(built) == 1:
+            first = built[0]
+            built.append(Leg(
+                host=first.guest,
+                guest=first.host,
+                expected_host=round(rating_expected_goals(ratings[first.guest], ratings[first.host])[0], 3),
+                expected_guest=round(rating_expected_goals(ratings[first.guest], ratings[first.host])[1], 3),
+            ))
+
+        last = built[-1]
+        team_a, team_b = last.host, last.guest
+        winner = None
+        if all(leg.played for leg in built):
+            goals_a = sum(l.host_goals if l.host == team_a else l.guest_goals for l in built)
+            goals_b = sum(l.guest_goals if l.host == team_a else l.host_goals for l in built)
+            if goals_a != goals_b:
+                winner = team_a if goals_a > goals_b else team_b
+            else:
+                # Tirs au but: vainqueur officiel de la dernière manche
+                official = legs[-1].winner
+                winner = {"HOME_TEAM": legs[-1].home_team_id, "AWAY_TEAM": legs[-1].away_team_id}.get(official)
+        return Tie(team_a=team_a, team_b=team_b, legs=tuple(built), winner=winner)
+
+    def project(
+        self, competition_code: str, simulations: int = DEFAULT_SIMULATIONS
+    ) -> Optional[Tuple[BracketState, BracketSimulation, Dict[int, str], int]]:
+        """
+        Projette la fin du tableau (simulation mémoïsée par état).
+
+        Args:
+            competition_code: Code de la compétition
+            simulations: Nombre de tableaux simulés (arrondi à SIMULATION_LEVELS)
+
+        Returns:
+            (état, simulation, {team_id: nom}, saison) ou None sans phase finale
+        """
+        current = self.current_state(competition_code)
+        if current is None:
+            return None
+        state, names, season = current
+        simulation = simulate_bracket(state, normalize_simulations(simulations))
+        return state, simulation, names, season
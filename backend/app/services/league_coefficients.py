@@ -0,0 +1,314 @@
+"""
+Coefficients de force des championnats (Logique de Papa).
+
+La force relative des championnats est estimée à partir des résultats
+européens (CL, EL, ECL) entre clubs de championnats différents: chaque
+championnat a un classement Elo, mis à jour match après match dans l'ordre
+chronologique (ajustement incrémental). Les valeurs a priori de
+DEFAULT_LEAGUE_STRENGTH servent de point de départ et de repli.
+
+Les coefficients sont stockés par saison (table league_coefficients) et
+servis depuis la mémoire du processus à PredictionService._get_league_strength.
+"""
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional, Tuple
+import logging
+import time
+
+from sqlalchemy.orm import Session
+
+from models.league_coefficient import LeagueCoefficient
+from models.match import Match
+from services.feature_store import CUP_COMPETITIONS, naive_utc, season_of
+
+logger = logging.getLogger(__name__)
+
+# Ranking a priori des championnats (coefficients UEFA et qualité générale).
+# Codes Football-Data quand ils existent; les autres sont propres à l'application.
+DEFAULT_LEAGUE_STRENGTH = {
+    # Top Tier (95-100%)
+    "PL": 1.00,   # Premier League (Angleterre)
+    "PD": 0.98,   # La Liga (Espagne)
+    "CL": 1.00,   # Champions League
+    "WC": 1.00,   # World Cup
+
+    # Tier 1 (85-94%)
+    "BL1": 0.92,  # Bundesliga (Allemagne)
+    "SA": 0.90,   # Serie A (Italie)
+    "FL1": 0.85,  # Ligue 1 (France)
+    "EL": 0.90,   # Europa League (moyenne)
+
+    # Tier 2 (70-84%)
+    "PPL": 0.80,  # Primeira Liga (Portugal)
+    "DED": 0.78,  # Eredivisie (Pays-Bas)
+    "BSA": 0.75,  # Jupiler Pro League (Belgique)
+    "ELC": 0.72,  # Championship (Angleterre)
+
+    # Tier 3 (55-69%)
+    "TSL": 0.68,  # Super Lig (Turquie)
+    "EKS": 0.65,  # Ekstraklasa (Pologne)
+    "ASL": 0.62,  # Austrian Bundesliga (Autriche)
+    "SFL": 0.60,  # Scottish Premiership (Écosse)
+    "GSL": 0.58,  # Super League (Grèce)
+
+    # Tier 4 (40-54%)
+    "ELI": 0.52,  # Eliteserien (Norvège)
+    "SSL": 0.50,  # Allsvenskan (Suède)
+    "HNL": 0.50,  # Croatian First League (Croatie)
+    "DSL": 0.48,  # Superligaen (Danemark)
+    "RSL": 0.45,  # Super League (Suisse)
+    "CFL": 0.42,  # Czech First League (Tchéquie)
+
+    # Tier 5 (25-39%) - Autres ligues
+    "BFL": 0.38,  # Bulgarian First League (Bulgarie)
+    "UPL": 0.35,  # Ukrainian Premier League
+    "RPL": 0.30,  # Russian Premier League
+}
+
+# Force d'un championnat inconnu: niveau moyen-bas, pour ne pas surestimer
+UNKNOWN_LEAGUE_STRENGTH = 0.50
+
+# Compétitions européennes servant à comparer les championnats
+EUROPEAN_COMPETITIONS = ("CL", "EL", "ECL")
+
+# Paramètres Elo des championnats
+BASE_RATING = 1500.0
+RATING_SCALE = 600.0        # Écart Elo pour 1.0 de force
+K_FACTOR = 16.0
+HOME_ADVANTAGE_ELO = 60.0
+SEASON_CARRY_OVER = 0.8     # Part de l'écart à l'a priori conservée d'une saison à l'autre
+MIN_STRENGTH, MAX_STRENGTH = 0.30, 1.00
+
+# Durée de vie du cache mémoire (secondes)
+CACHE_TTL_SECONDS = 600
+
+_cache: Dict[str, object] = {"expires": 0.0, "by_season": {}}
+
+
+def prior_strength(league_code: str) -> float:
+    """Force a priori d'un championnat (DEFAULT_LEAGUE_STRENGTH, sinon niveau inconnu)."""
+    return DEFAULT_LEAGUE_STRENGTH.get(league_code, UNKNOWN_LEAGUE_STRENGTH)
+
+
+def rating_from_strength(strength: float) -> float:
+    return BASE_RATING + (strength - 0.75) * RATING_SCALE
+
+
+def strength_from_rating(rating: float) -> float:
+    return round(min(MAX_STRENGTH, max(MIN_STRENGTH, 0.75 + (rating - BASE_RATING) / RATING_SCALE)), 4)
+
+
+def invalidate_league_cache() -> None:
+    """Vide le cache mémoire (après un nouvel ajustement)."""
+    _cache["expires"] = 0.0
+    _cache["by_season"] = {}
+
+
+def fitted_league_strength(db: Optional[Session], league_code: str, season: int) -> Optional[float]:
+    """
+    Force ajustée d'un championnat: saison demandée, sinon dernière saison antérieure.
+
+    Tous les coefficients sont chargés en une requête puis servis depuis la
+    mémoire pendant CACHE_TTL_SECONDS.
+
+    Args:
+        db: Session SQLAlchemy (None = pas de coefficients ajustés)
+        league_code: Code du championnat
+        season: Saison (2025 = 2025/2026)
+
+    Returns:
+        Force 0.3-1.0 ou None si le championnat n'a jamais été ajusté
+    """
+    if db is None:
+        return None
+    if _cache["expires"] < time.monotonic():
+        by_season: Dict[int, Dict[str, float]] = {}
+        try:
+            # Savepoint: un échec n'annule que la lecture, pas le travail en cours de l'appelant
+            with db.begin_nested():
+                rows = db.query(
+                    LeagueCoefficient.season, LeagueCoefficient.league_code, LeagueCoefficient.strength
+                ).all()
+            for row in rows:
+                by_season.setdefault(row.season, {})[row.league_code] = row.strength
+        except Exception as e:
+            # Table absente (migration non appliquée): valeurs a priori
+            logger.warning("Coefficients des championnats indisponibles: %s", e)
+        _cache["by_season"] = by_season
+        _cache["expires"] = time.monotonic() + CACHE_TTL_SECONDS
+
+    by_season = _cache["by_season"]
+    for known in sorted((s for s in by_season if s <= season), reverse=True):
+        if league_code in by_season[known]:
+            return by_season[known][league_code]
+    return None
+
+
+class LeagueCoefficientService:
+    """Ajustement Elo des championnats sur les matchs européens."""
+
+    def __init__(self, db: Session):
+        """
+        Initialise le service.
+
+        Args:
+            db: Session SQLAlchemy
+        """
+        self.db = db
+
+    def _season_window(self, season: int) -> Tuple[datetime, datetime]:
+        return datetime(season, 7, 1), datetime(season + 1, 7, 1)
+
+    def team_leagues(self, season: int) -> Dict[int, str]:
+        """
+        Championnat de chaque club sur la saison (compétition hors coupe la plus jouée).
+
+        Args:
+            season: Saison
+
+        Returns:
+            Dictionnaire {team_id: code championnat}
+        """
+        start, end = self._season_window(season)
+        counts: Dict[int, Counter] = {}
+        rows = self.db.query(Match.home_team_id, Match.away_team_id, Match.competition_code).filter(
+            Match.match_date >= start,
+            Match.match_date < end,
+            Match.competition_code.notin_(CUP_COMPETITIONS + EUROPEAN_COMPETITIONS)
+        )
+        for home_id, away_id, code in rows:
+            for team_id in (home_id, away_id):
+                if team_id is not None and code:
+                    counts.setdefault(team_id, Counter())[code] += 1
+        return {team_id: c.most_common(1)[0][0] for team_id, c in counts.items()}
+
+    def initial_ratings(self, season: int) -> Dict[str, float]:
+        """
+        Elo de départ: saison précédente ramenée vers l'a priori, sinon l'a priori.
+
+        Args:
+            season: Saison à ajuster
+
+        Returns:
+            Dictionnaire {code: Elo} des championnats déjà ajustés
+        """
+        ratings = {}
+        for row in self.db.query(LeagueCoefficient).filter(LeagueCoefficient.season == season - 1):
+            prior = rating_from_strength(prior_strength(row.league_code))
+            ratings[row.league_code] = prior + SEASON_CARRY_OVER * (row.rating - prior)
+        return ratings
+
+    def fit_season(self, season: int) -> Dict[str, Tuple[float, int]]:
+        """
+        Ajuste les Elo des championnats sur les matchs européens d'une saison.
+
+        Args:
+            season: Saison
+
+        Returns:
+            Dictionnaire {code: (Elo, matchs inter-championnats)}
+        """
+        leagues = self.team_leagues(season)
+        ratings = self.initial_ratings(season)
+        played: Counter = Counter()
+
+        start, end = self._season_window(season)
+        matches = self.db.query(Match).filter(
+            Match.competition_code.in_(EUROPEAN_COMPETITIONS),
+            Match.status == "FINISHED",
+            Match.score_home.isnot(None),
+            Match.score_away.isnot(None),
+            Match.match_date >= start,
+            Match.match_date < end
+        ).order_by(Match.match_date, Match.id)
+
+        for match in matches:
+            home_league = leagues.get(match.home_team_id)
+            away_league = leagues.get(match.away_team_id)
+            if not home_league or not away_league or home_league == away_league:
+                continue
+            for code in (home_league, away_league):
+                ratings.setdefault(code, rating_from_strength(prior_strength(code)))
+
+            expected = 1 / (1 + 10 ** ((ratings[away_league] - ratings[home_league] - HOME_ADVANTAGE_ELO) / 400))
+            if match.score_home > match.score_away:
+                actual = 1.0
+            elif match.score_home < match.score_away:
+                actual = 0.0
+            else:
+                actual = 0.5
+            delta = K_FACTOR * (actual - expected)
+            ratings[home_league] += delta
+            ratings[away_league] -= delta
+            played[home_league] += 1
+            played[away_league] += 1
+
+        return {code: (rating, played[code]) for code, rating in ratings.items()}
+
+    def refresh_season(self, season: int) -> int:
+        """
+        Réajuste une saison et enregistre ses coefficients (upsert, non commité).
+
+        Args:
+            season: Saison
+
+        Returns:
+            Nombre de championnats enregistrés
+        """
+        fitted = self.fit_season(season)
+        existing = {
+            row.league_code: row
+            for row in self.db.query(LeagueCoefficient).filter(LeagueCoefficient.season == season)
+        }
+        now = datetime.now(timezone.utc)
+        for code, (rating, matches) in fitted.items():
+            row = existing.get(code)
+            if row is None:
+                row = LeagueCoefficient(season=season, league_code=code)
+                self.db.add(row)
+            row.rating = round(rating, 2)
+            row.strength = strength_from_rating(rating)
+            row.matches = matches
+            row.updated_at = now
+        self.db.flush()
+        invalidate_league_cache()
+        logger.info("Coefficients championnats %s: %d ajustés", season, len(fitted))
+        return len(fitted)
+
+    def refresh(self, seasons: Optional[Iterable[int]] = None) -> int:
+        """
+        Réajuste toutes les saisons ayant des matchs européens, dans l'ordre.
+
+        Chaque saison part des Elo de la précédente: un réajustement complet
+        reproduit exactement la chaîne incrémentale.
+
+        Args:
+            seasons: Saisons à réajuster (toutes si None)
+
+        Returns:
+            Nombre de coefficients enregistrés
+        """
+        if seasons is None:
+            dates = self.db.query(Match.match_date).filter(
+                Match.competition_code.in_(EUROPEAN_COMPETITIONS),
+                Match.status == "FINISHED"
+            )
+            seasons = {season_of(naive_utc(date)) for (date,) in dates if date}
+        return sum(self.refresh_season(season) for season in sorted(seasons))
+
+    def refresh_for_matches(self, matches: Iterable[Match]) -> int:
+        """
+        Réajuste les saisons concernées par des matchs européens fraîchement terminés.
+
+        Args:
+            matches: Matchs terminés de la synchronisation
+
+        Returns:
+            Nombre de coefficients enregistrés
+        """
+        seasons = {
+            season_of(naive_utc(m.match_date)) for m in matches
+            if m.competition_code in EUROPEAN_COMPETITIONS and m.match_date
+        }
+        return sum(self.refresh_season(season) for season in sorted(seasons))
@@ -0,0 +1,245 @@
+"""
+Probabilités implicites du marché (cotes 1X2 sans marge).
+
+Les cotes stockées sur Match (odds_home/draw/away) contiennent la marge du
+bookmaker (somme des 1/cote > 1). Deux méthodes la retirent:
+- power: p_i = (1/cote_i)^k, k tel que la somme vaille 1 (marge plus forte
+  sur les outsiders, biais favori-outsider);
+- shin: modèle de Shin (part z de parieurs initiés), résolu par point fixe.
+
+L'étape MarketProbabilityService traite tous les matchs à venir d'un coup
+(tableaux numpy, une requête de lecture et une mise à jour groupée) et
+enregistre dans la prédiction les probabilités du marché et leur mélange
+avec celles du modèle. Elle ne touche que les matchs pas encore commencés:
+la dernière valeur enregistrée avant le coup d'envoi est la ligne de clôture.
+
+Avec MARKET_BLEND_MODEL_INPUT, le mélange remplace les probabilités du
+modèle en entrée des moteurs en aval (value bets et portefeuille de Kelly,
+projections de saison) quand il est disponible (input_probabilities).
+"""
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+import logging
+
+import numpy as np
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from core.cache import bump_data_version
+from core.config import settings
+from models.match import Match
+from models.prediction import ExpertPrediction
+
+logger = logging.getLogger(__name__)
+
+MARGIN_METHODS = ("power", "shin")
+
+# Statuts des matchs dont les probabilités du marché sont mises à jour
+UPCOMING_STATUSES = ("SCHEDULED", "TIMED")
+
+# Résolution numérique (les deux méthodes convergent en quelques itérations)
+MAX_ITERATIONS = 50
+TOLERANCE = 1e-10
+
+
+def power_probabilities(odds: np.ndarray) -> np.ndarray:
+    """
+    Retire la marge par la méthode power (Newton vectorisé sur k).
+
+    Args:
+        odds: Cotes décimales, tableau (n, issues)
+
+    Returns:
+        Probabilités (n, issues), chaque ligne somme à 1
+    """
+    inverse = 1.0 / odds
+    log_inverse = np.log(inverse)
+    k = np.ones((len(odds), 1))
+    for _ in range(MAX_ITERATIONS):
+        powered = inverse ** k
+        excess = powered.sum(axis=1, keepdims=True) - 1.0
+        if np.all(np.abs(excess) < TOLERANCE):
+            break
+        k -= excess / (powered * log_inverse).sum(axis=1, keepdims=True)
+    probabilities = inverse ** k
+    return probabilities / probabilities.sum(axis=1, keepdims=True)
+
+
+def shin_probabilities(odds: np.ndarray) -> np.ndarray:
+    """
+    Retire la marge par la méthode de Shin (point fixe vectorisé sur z).
+
+    Args:
+        odds: Cotes décimales, tableau (n, issues)
+
+    Returns:
+        Probabilités (n, issues), chaque ligne somme à 1
+    """
+    inverse = 1.0 / odds
+    booksum = inverse.sum(axis=1, keepdims=True)
+    n_outcomes = odds.shape[1]
+    z = np.zeros((len(odds), 1))
+    for _ in range(MAX_ITERATIONS):
+        roots = np.sqrt(z ** 2 + 4 * (1 - z) * inverse ** 2 / booksum)
+        updated = np.clip((roots.sum(axis=1, keepdims=True) - 2) / (n_outcomes - 2), 0.0, 0.99)
+        converged = np.all(np.abs(updated - z) < TOLERANCE)
+        z = updated
+        if converged:
+            break
+    probabilities = (np.sqrt(z ** 2 + 4 * (1 - z) * inverse ** 2 / booksum) - z) / (2 * (1 - z))
+    return probabilities / probabilities.sum(axis=1, keepdims=True)
+
+
+def implied_probabilities(odds: np.ndarray, method: str = "power") -> np.ndarray:
+    """
+    Probabilités du marché sans marge.
+
+    Args:
+        odds: Cotes décimales, tableau (n, issues)
+        method: "power" ou "shin"
+
+    Returns:
+        Probabilités (n, issues)
+    """
+    if method == "shin":
+        return shin_probabilities(odds)
+    if method == "power":
+        return power_probabilities(odds)
+    raise ValueError(f"Méthode de retrait de marge inconnue: {method}")
+
+
+def blend_probabilities(model: np.ndarray, market: np.ndarray, market_weight: float) -> np.ndarray:
+    """
+    Mélange linéaire modèle / marché (lignes sans modèle: NaN).
+
+    Args:
+        model: Probabilités du modèle (n, issues), NaN si absentes
+        market: Probabilités du marché (n, issues)
+        market_weight: Poids du marché (0-1)
+
+    Returns:
+        Probabilités mélangées (n, issues)
+    """
+    blended = (1 - market_weight) * model + market_weight * market
+    return blended / blended.sum(axis=1, keepdims=True)
+
+
+def input_probabilities(model: np.ndarray, blended: np.ndarray) -> np.ndarray:
+    """
+    Probabilités 1X2 en entrée des moteurs: mélange si activé et disponible, sinon modèle.
+
+    Args:
+        model: Probabilités du modèle (n, issues)
+        blended: Mélange modèle/marché enregistré (n, issues), NaN si absent
+
+    Returns:
+        Probabilités (n, issues)
+    """
+    if not settings.market_blend_model_input:
+        return model
+    available = ~np.isnan(blended).any(axis=1)
+    return np.where(available[:, None], blended, model)
+
+
+def prediction_input_probabilities(prediction: ExpertPrediction) -> Tuple[float, float, float]:
+    """input_probabilities() pour une prédiction chargée."""
+    blended = (prediction.blend_prob_home, prediction.blend_prob_draw, prediction.blend_prob_away)
+    if settings.market_blend_model_input and None not in blended:
+        return blended
+    return prediction.prob_home_win, prediction.prob_draw, prediction.prob_away_win
+
+
+class MarketProbabilityService:
+    """Étape de pipeline: cotes stockées → probabilités du marché et mélange."""
+
+    def __init__(self, db: Session):
+        """
+        Initialise le service.
+
+        Args:
+            db: Session SQLAlchemy
+        """
+        self.db = db
+
+    def run(
+        self,
+        match_ids: Optional[Iterable[int]] = None,
+        method: Optional[str] = None,
+        market_weight: Optional[float] = None
+    ) -> Dict[str, int]:
+        """
+        Met à jour les probabilités du marché des prédictions des matchs à venir.
+
+        Args:
+            match_ids: Matchs à traiter (tous les matchs à venir si None)
+            method: "power" ou "shin" (MARKET_MARGIN_METHOD par défaut)
+            market_weight: Poids du marché dans le mélange (MARKET_BLEND_WEIGHT par
+                défaut, 0 = pas de mélange)
+
+        Returns:
+            Compteurs {"updated", "skipped"}
+        """
+        method = method or settings.market_margin_method
+        if method not in MARGIN_METHODS:
+            raise ValueError(f"Méthode de retrait de marge inconnue: {method}")
+        market_weight = settings.market_blend_weight if market_weight is None else market_weight
+
+        query = self.db.query(
+            ExpertPrediction.id,
+            Match.odds_home, Match.odds_draw, Match.odds_away, Match.odds_updated_at,
+            ExpertPrediction.prob_home_win, ExpertPrediction.prob_draw, ExpertPrediction.prob_away_win
+        ).join(Match, ExpertPrediction.match_id == Match.id).filter(
+            Match.status.in_(UPCOMING_STATUSES),
+            Match.match_date >= datetime.now(),
+            Match.odds_home.isnot(None),
+            Match.odds_draw.isnot(None),
+            Match.odds_away.isnot(None)
+        )
+        if match_ids is not None:
+            query = query.filter(Match.id.in_(list(match_ids)))
+        rows = query.all()
+        if not rows:
+            return {"updated": 0, "skipped": 0}
+
+        odds = np.array([row[1:4] for row in rows], dtype=float)
+        model = np.array([
+            [np.nan if p is None else p for p in row[5:8]] for row in rows
+        ], dtype=float)
+
+        # Cotes inexploitables (cote ≤ 1: pas de probabilité implicite)
+        valid = np.all(odds > 1.0, axis=1)
+        market = np.full(odds.shape, np.nan)
+        market[valid] = implied_probabilities(odds[valid], method)
+        overround = (1.0 / odds).sum(axis=1) - 1.0
+        blended = (
+            blend_probabilities(model, market, market_weight) if market_weight > 0
+            else np.full(odds.shape, np.nan)
+        )
+
+        def value(x: float) -> Optional[float]:
+            return None if np.isnan(x) else round(float(x), 4)
+
+        updates = [
+            {
+                "id": row[0],
+                "market_prob_home": value(market[i, 0]),
+                "market_prob_draw": value(market[i, 1]),
+                "market_prob_away": value(market[i, 2]),
+                "market_overround": value(overround[i]),
+                "market_method": method,
+                "market_odds_at": row[4],
+                "blend_prob_home": value(blended[i, 0]),
+                "blend_prob_draw": value(blended[i, 1]),
+                "blend_prob_away": value(blended[i, 2]),
+            }
+            for i, row in enumerate(rows) if valid[i]
+        ]
+        if updates:
+            # UPDATE groupé par clé primaire (un seul executemany)
+            self.db.execute(update(ExpertPrediction), updates)
+            self.db.commit()
+            bump_data_version()
+
+        report = {"updated": len(updates), "skipped": len(rows) - len(updates)}
+        logger.info(f"📈 Probabilités marché ({method}): {report['updated']} mises à jour, {report['skipped']} ignorées")
+        return report
@@ -5,15 +5,28 @@ Ce service permet de synchroniser les matchs depuis l'API externe
 vers la base de données locale.
 """
 import logging
-from datetime import datetime, timezone, timedelta
-from typing import Optional, List
-from sqlalchemy.orm import Session
+from datetime import date, datetime, timezone, timedelta
+from typing import Optional, List, Set
+from sqlalchemy.orm import Session, joinedload
 
+from core.cache import bump_data_version
+from core.events import publish_match_event
 from models.match import Match
 from services.football_api import football_data_service
+from services.feature_store import FeatureStore, naive_utc
+from services.history_stats import HistoryStatsService
+from services.league_coefficients import LeagueCoefficientService
+from services.team_ratings import TeamRatingService
 
 logger = logging.getLogger(__name__)
 
+# Champs diffusés en direct quand ils changent (score et statut)
+LIVE_FIELDS = (
+    "status", "winner",
+    "score_home", "score_away",
+    "score_home_halftime", "score_away_halftime",
+)
+
 
 class MatchSyncService:
     """Service pour synchroniser les matchs avec Football-Data.org."""
@@ -29,6 +42,12 @@ class MatchSyncService:
             db: Session SQLAlchemy
         """
         self.db = db
+        # Matchs passés à FINISHED pendant la synchro (feature store)
+        self._newly_finished: List[Match] = []
+        # Changements de score/statut à diffuser après commit
+        self._live_changes: List[tuple] = []
+        # Jours dont le cumul des statistiques de l'historique change
+        self._rollup_days: Set[date] = set()
     
     def _parse_match_data(self, match_data: dict) -> dict:
         """
@@ -65,6 +84,8 @@ class MatchSyncService:
             
             "match_date": datetime.fromisoformat(match_data["utcDate"].replace("Z", "+00:00")),
             "status": match_data.get("status", "SCHEDULED"),
+            "stage": match_data.get("stage"),
+            "winner": score.get("winner"),
             
             "score_home": full_time.get("home"),
             "score_away": full_time.get("away"),
@@ -91,15 +112,81 @@ class MatchSyncService:
         
         if existing:
             # Update
+            was_finished = existing.status == "FINISHED"
+            changes = {
+                key: match_data[key] for key in LIVE_FIELDS
+                if key in match_data and getattr(existing, key) != match_data[key]
+            }
             for key, value in match_data.items():
                 setattr(existing, key, value)
+            if changes:
+                self._live_changes.append((existing.id, existing.competition_code, changes))
+                if was_finished or existing.status == "FINISHED":
+                    self._rollup_days.add(existing.match_date.date())
+            if not was_finished and existing.status == "FINISHED":
+                self._newly_finished.append(existing)
             return existing
         else:
             # Insert
             new_match = Match(**match_data)
             self.db.add(new_match)
+            if new_match.status == "FINISHED":
+                self._newly_finished.append(new_match)
+                self._rollup_days.add(new_match.match_date.date())
             return new_match
     
+    def _publish_live_changes(self) -> None:
+        """Diffuse les changements de score/statut de la synchro (après commit)."""
+        changes, self._live_changes = self._live_changes, []
+        for match_id, competition_code, fields in changes:
+            publish_match_event("match", match_id, competition_code, fields)
+    
+    def _refresh_history_rollup(self) -> None:
+        """Recalcule le cumul quotidien des statistiques pour les jours touchés par la synchro."""
+        days, self._rollup_days = self._rollup_days, set()
+        if not days:
+            return
+        self.db.flush()
+        try:
+            with self.db.begin_nested():
+                HistoryStatsService(self.db).refresh_days(days, commit=False)
+        except Exception as e:
+            logger.warning(f"⚠️ Cumul de l'historique non mis à jour ({e})")
+    
+    def _update_feature_store(self) -> None:
+        """
+        Met à jour le feature store et l'Elo pour les matchs terminés de la synchro.
+        
+        Chaque match est isolé dans un savepoint: une erreur de features
+        ne bloque jamais la synchronisation des matchs.
+        """
+        finished = sorted(self._newly_finished, key=lambda m: (m.match_date, m.external_id or 0))
+        self._newly_finished = []
+        if not finished:
+            return
+        
+        self.db.flush()
+        store = FeatureStore(self.db)
+        ratings = TeamRatingService(self.db)
+        for match in finished:
+            try:
+                with self.db.begin_nested():
+                    store.record_match(match)
+            except Exception as e:
+                logger.warning(f"⚠️ Feature store: match {match.id} ignoré ({e})")
+            try:
+                with self.db.begin_nested():
+                    ratings.record_match(match)
+            except Exception as e:
+                logger.warning(f"⚠️ Elo: match {match.id} ignoré ({e})")
+        
+        # Nouveaux résultats européens: réajuster la force des championnats
+        try:
+            with self.db.begin_nested():
+                LeagueCoefficientService(self.db).refresh_for_matches(finished)
+        except Exception as e:
+            logger.warning(f"⚠️ Coefficients championnats non mis à jour ({e})")
+    
     async def sync_competition_matches(
         self, 
         competition_code: str,
@@ -140,11 +227,17 @@ class MatchSyncService:
                 self._upsert_match(parsed)
                 count += 1
             
+            self._update_feature_store()
+            self._refresh_history_rollup()
             self.db.commit()
+            bump_data_version()
+            self._publish_live_changes()
             return count
             
         except Exception as e:
             self.db.rollback()
+            self._live_changes = []
+            self._rollup_days = set()
             raise e
     
     async def sync_upcoming_matches(self, days: int = 7) -> int:
@@ -176,11 +269,17 @@ class MatchSyncService:
                     self._upsert_match(parsed)
                     count += 1
             
+            self._update_feature_store()
+            self._refresh_history_rollup()
             self.db.commit()
+            bump_data_version()
+            self._publish_live_changes()
             return count
             
         except Exception as e:
             self.db.rollback()
+            self._live_changes = []
+            self._rollup_days = set()
             raise e
     
     async def sync_finished_matches(self) -> int:
@@ -203,7 +302,8 @@ class MatchSyncService:
     def get_matches_by_date(
         self, 
         date: Optional[datetime] = None,
-        competition_code: Optional[str] = None
+        competition_code: Optional[str] = None,
+        options: Optional[list] = None
     ) -> List[Match]:
         """
         Récupère les matchs pour une date donnée.
@@ -211,17 +311,20 @@ class MatchSyncService:
         Args:
             date: Date des matchs (défaut: aujourd'hui)
             competition_code: Filtre par compétition
+            options: Options de chargement (défaut: prédiction jointe)
             
         Returns:
             Liste des matchs
         """
-        if date is None:
-            date = datetime.now(timezone.utc)
+        # Colonne match_date en UTC naïf (asyncpg refuse une date avec fuseau)
+        date = naive_utc(date) if date is not None else naive_utc(datetime.now(timezone.utc))
         
         start_of_day = date.replace(hour=0, minute=0, second=0, microsecond=0)
         end_of_day = start_of_day + timedelta(days=1)
         
-        query = self.db.query(Match).filter(
+        query = self.db.query(Match).options(
+            *(options or [joinedload(Match.expert_prediction)])
+        ).filter(
             Match.match_date >= start_of_day,
             Match.match_date < end_of_day
         )
@@ -231,19 +334,22 @@ class MatchSyncService:
         
         return query.order_by(Match.match_date).all()
     
-    def get_upcoming_matches(self, limit: int = 20) -> List[Match]:
+    def get_upcoming_matches(self, limit: int = 20, options: Optional[list] = None) -> List[Match]:
         """
         Récupère les prochains matchs programmés.
         
         Args:
             limit: Nombre maximum de matchs
+            options: Options de chargement (défaut: prédiction jointe)
             
         Returns:
             Liste des matchs à venir
         """
-        now = datetime.now(timezone.utc)
+        now = naive_utc(datetime.now(timezone.utc))
         
-        return self.db.query(Match).filter(
+        return self.db.query(Match).options(
+            *(options or [joinedload(Match.expert_prediction)])
+        ).filter(
             Match.match_date > now,
             Match.status.in_(["SCHEDULED", "TIMED"])
         ).order_by(Match.match_date).limit(limit).all()
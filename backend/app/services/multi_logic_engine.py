@@ -7,8 +7,16 @@ Ce service combine les 3 logiques de prédiction:
 - Ma Logique: Double validation, consensus, 10 derniers matchs
 
 Pondération: Papa (35%) + Grand Frère (35%) + Ma Logique (30%)
+
+Chaque logique produit des buts attendus (λ); le score retenu et les marchés
+du consensus sont dérivés de la matrice de scores Poisson / Dixon-Coles.
+
+Les données (classements + stats d'équipe) sont chargées une seule fois par
+match via un MatchContext (classements, stats et features point-in-time en
+3 requêtes groupées, pour un match ou tout un lot), puis les 3 logiques
+s'exécutent comme des fonctions pures.
 """
-from typing import Optional, Dict, List, Tuple, NamedTuple
+from typing import Optional, Dict, List, Tuple, NamedTuple, Iterable
 from dataclasses import dataclass
 from sqlalchemy.orm import Session
 import logging
@@ -17,6 +25,10 @@ from models.match import Match
 from models.standing import Standing
 from models.team_stats import TeamStats
 from services.prediction_service import PredictionService
+from services.feature_store import FeatureStore, TeamFeatures, naive_utc, season_of
+from services.score_matrix import match_markets, MatchMarkets
+from services.team_ratings import TeamRatingService, blend_strength
+from services.weight_sets import ENGINE_MULTI_LOGIC, resolve_weights
 
 logger = logging.getLogger(__name__)
 
@@ -56,6 +68,25 @@ class LogicResult:
     bet_tip: str              # Conseil de pari
     analysis: str             # Analyse textuelle
     evidence: LogicEvidence = None  # Preuves utilisées
+    expected_home_goals: float = 0.0  # Buts attendus (λ) domicile
+    expected_away_goals: float = 0.0  # Buts attendus (λ) extérieur
+
+
+@dataclass
+class MatchContext:
+    """Données partagées par les 3 logiques pour un match."""
+    home_standing: Optional[Standing] = None
+    away_standing: Optional[Standing] = None
+    home_stats: Optional[TeamStats] = None
+    away_stats: Optional[TeamStats] = None
+    # Features point-in-time (feature store) à la date du match
+    home_features: Optional[TeamFeatures] = None
+    away_features: Optional[TeamFeatures] = None
+    # Elo point-in-time (classement Elo des équipes)
+    home_rating: Optional[float] = None
+    away_rating: Optional[float] = None
+    # Saison des coefficients de championnat (None = saison du match)
+    league_season: Optional[int] = None
 
 
 @dataclass
@@ -75,6 +106,9 @@ class CombinedPrediction:
     # Indicateur de consensus
     consensus_level: str  # "FORT", "MOYEN", "FAIBLE"
     all_agree: bool       # Les 3 logiques sont d'accord?
+    
+    # Marchés (1X2, +2.5, BTTS) issus de la matrice de scores du consensus
+    markets: Optional[MatchMarkets] = None
 
 
 class MultiLogicPredictionEngine:
@@ -87,7 +121,7 @@ class MultiLogicPredictionEngine:
     - Ma Logique: 30% (double validation + consensus)
     """
     
-    # Pondérations des logiques
+    # Pondérations des logiques (par défaut, sans jeu de poids actif)
     WEIGHT_PAPA = 0.35
     WEIGHT_GRAND_FRERE = 0.35
     WEIGHT_MA_LOGIQUE = 0.30
@@ -96,12 +130,109 @@ class MultiLogicPredictionEngine:
         """Initialise le moteur multi-logique."""
         self.db = db
         self.prediction_service = PredictionService(db)
+        active = resolve_weights(db, ENGINE_MULTI_LOGIC, self.default_weights())
+        self.weights: Dict[str, float] = active.weights
+        self.weights_version: str = active.version
+    
+    @classmethod
+    def default_weights(cls) -> Dict[str, float]:
+        """Pondérations par défaut des logiques {papa, grand_frere, ma_logique}."""
+        return {
+            "papa": cls.WEIGHT_PAPA,
+            "grand_frere": cls.WEIGHT_GRAND_FRERE,
+            "ma_logique": cls.WEIGHT_MA_LOGIQUE,
+        }
+    
+    # =========================================
+    # CHARGEMENT DES DONNÉES
+    # =========================================
+    
+    def load_context(self, match: Match) -> MatchContext:
+        """
+        Charge le contexte d'un match (classements, stats, features).
+        
+        Args:
+            match: Match à analyser
+        
+        Returns:
+            MatchContext partagé par les 3 logiques
+        """
+        return self.load_contexts([match])[match.id]
+    
+    def load_contexts(self, matches: Iterable[Match]) -> Dict[int, MatchContext]:
+        """
+        Charge les contextes de plusieurs matchs avec 4 requêtes au total.
+        
+        Args:
+            matches: Matchs à analyser
+        
+        Returns:
+            Dictionnaire {match_id: MatchContext}
+        """
+        matches = list(matches)
+        if not matches:
+            return {}
+        
+        codes = {m.competition_code for m in matches}
+        team_ids = set()
+        for m in matches:
+            team_ids.update((m.home_team_id, m.away_team_id))
+        team_ids.discard(None)
+        
+        # Saison la plus récente en premier: on garde la première ligne par clé
+        standings: Dict[Tuple[str, int], Standing] = {}
+        for row in self.db.query(Standing).filter(
+            Standing.competition_code.in_(codes),
+            Standing.team_id.in_(team_ids)
+        ).order_by(Standing.season.desc()):
+            standings.setdefault((row.competition_code, row.team_id), row)
+        
+        stats: Dict[Tuple[str, int], TeamStats] = {}
+        for row in self.db.query(TeamStats).filter(
+            TeamStats.competition_code.in_(codes),
+            TeamStats.team_id.in_(team_ids)
+        ).order_by(TeamStats.season.desc()):
+            stats.setdefault((row.competition_code, row.team_id), row)
+        
+        features = FeatureStore(self.db).for_matches(matches)
+        ratings = TeamRatingService(self.db).for_matches(matches)
+        
+        return {
+            m.id: MatchContext(
+                home_standing=standings.get((m.competition_code, m.home_team_id)),
+                away_standing=standings.get((m.competition_code, m.away_team_id)),
+                home_stats=stats.get((m.competition_code, m.home_team_id)),
+                away_stats=stats.get((m.competition_code, m.away_team_id)),
+                home_features=features.get(m.id, (None, None))[0],
+                away_features=features.get(m.id, (None, None))[1],
+                home_rating=ratings.get(m.id, (None, None))[0],
+                away_rating=ratings.get(m.id, (None, None))[1],
+            )
+            for m in matches
+        }
+    
+    @staticmethod
+    def _goals_avg(
+        stats: Optional[TeamStats], features: Optional[TeamFeatures], default: float
+    ) -> float:
+        """Moyenne de buts marqués: stats d'équipe, sinon feature store, sinon défaut."""
+        if stats:
+            return stats.avg_goals_scored
+        if features and features.played:
+            return features.avg_goals_scored
+        return default
     
     # =========================================
     # LOGIQUE DE PAPA
     # =========================================
     
-    async def logic_papa(self, match: Match) -> Optional[LogicResult]:
+    async def logic_papa(
+        self, match: Match, ctx: Optional[MatchContext] = None
+    ) -> Optional[LogicResult]:
+        """Logique de Papa (charge le contexte si non fourni)."""
+        return self.papa_from_context(match, ctx or self.load_context(match))
+    
+    def papa_from_context(self, match: Match, ctx: MatchContext) -> Optional[LogicResult]:
         """
         Logique de Papa: Focus sur les performances et championnats.
         
@@ -115,46 +246,40 @@ class MultiLogicPredictionEngine:
         + H2H: équipe dominante
         """
         try:
-            # 1. Récupérer les standings
-            home_standing = self.db.query(Standing).filter(
-                Standing.team_id == match.home_team_id,
-                Standing.competition_code == match.competition_code
-            ).first()
-            
-            away_standing = self.db.query(Standing).filter(
-                Standing.team_id == match.away_team_id,
-                Standing.competition_code == match.competition_code
-            ).first()
+            # 1. Standings du contexte
+            home_standing = ctx.home_standing
+            away_standing = ctx.away_standing
             
             if not home_standing or not away_standing:
                 return None
             
             # 2. Niveau du championnat
+            league_season = ctx.league_season
+            if league_season is None and match.match_date:
+                league_season = season_of(naive_utc(match.match_date))
             league_strength = self.prediction_service._get_league_strength(
-                match.competition_code
+                match.competition_code, league_season
             )
             
             # 3. Position relative (plus basse = meilleure)
-            home_position_score = 1 - (home_standing.position / 20)
-            away_position_score = 1 - (away_standing.position / 20)
+            #    mélangée à l'Elo, qui pèse plus en début de saison
+            home_position_score = blend_strength(
+                1 - (home_standing.position / 20), ctx.home_rating, home_standing.played_games
+            )
+            away_position_score = blend_strength(
+                1 - (away_standing.position / 20), ctx.away_rating, away_standing.played_games
+            )
             
             # 4. Différence de points
             points_diff = home_standing.points - away_standing.points
             points_advantage = min(max(points_diff / 30, -1), 1) * 0.5 + 0.5
             
-            # 5. Moyenne de buts (récupérer stats si dispo)
-            home_stats = self.db.query(TeamStats).filter(
-                TeamStats.team_id == match.home_team_id,
-                TeamStats.competition_code == match.competition_code
-            ).first()
-            
-            away_stats = self.db.query(TeamStats).filter(
-                TeamStats.team_id == match.away_team_id,
-                TeamStats.competition_code == match.competition_code
-            ).first()
+            # 5. Moyenne de buts (stats si dispo)
+            home_stats = ctx.home_stats
+            away_stats = ctx.away_stats
             
-            home_goals_avg = home_stats.avg_goals_scored if home_stats else 1.2
-            away_goals_avg = away_stats.avg_goals_scored if away_stats else 1.0
+            home_goals_avg = self._goals_avg(home_stats, ctx.home_features, 1.2)
+            away_goals_avg = self._goals_avg(away_stats, ctx.away_features, 1.0)
             
             # Calculer les forces
             home_strength = (
@@ -170,8 +295,9 @@ class MultiLogicPredictionEngine:
             )
             
             # Prédire le score
-            home_goals = round(home_strength * home_goals_avg * 1.5)
-            away_goals = round(away_strength * away_goals_avg * 1.2)
+            home_xg = home_strength * home_goals_avg * 1.5
+            away_xg = away_strength * away_goals_avg * 1.2
+            home_goals, away_goals = match_markets(home_xg, away_xg).score
             
             # Probabilités
             total_strength = home_strength + away_strength
@@ -222,7 +348,9 @@ class MultiLogicPredictionEngine:
                 confidence=confidence,
                 bet_tip=bet_tip,
                 analysis=analysis,
-                evidence=evidence
+                evidence=evidence,
+                expected_home_goals=home_xg,
+                expected_away_goals=away_xg
             )
             
         except Exception as e:
@@ -233,7 +361,13 @@ class MultiLogicPredictionEngine:
     # LOGIQUE DE GRAND FRÈRE
     # =========================================
     
-    async def logic_grand_frere(self, match: Match) -> Optional[LogicResult]:
+    async def logic_grand_frere(
+        self, match: Match, ctx: Optional[MatchContext] = None
+    ) -> Optional[LogicResult]:
+        """Logique de Grand Frère (charge le contexte si non fourni)."""
+        return self.grand_frere_from_context(match, ctx or self.load_context(match))
+    
+    def grand_frere_from_context(self, match: Match, ctx: MatchContext) -> Optional[LogicResult]:
         """
         Logique de Grand Frère: Focus H2H et domicile.
         
@@ -246,23 +380,20 @@ class MultiLogicPredictionEngine:
         + Loi du domicile (Fort @ Moyen = Nul possible)
         """
         try:
-            # 1. Récupérer les standings pour la force
-            home_standing = self.db.query(Standing).filter(
-                Standing.team_id == match.home_team_id,
-                Standing.competition_code == match.competition_code
-            ).first()
-            
-            away_standing = self.db.query(Standing).filter(
-                Standing.team_id == match.away_team_id,
-                Standing.competition_code == match.competition_code
-            ).first()
+            # 1. Standings du contexte pour la force
+            home_standing = ctx.home_standing
+            away_standing = ctx.away_standing
             
             if not home_standing or not away_standing:
                 return None
             
-            # 2. Calculer les forces relatives
-            home_strength = 1 - (home_standing.position / 20)
-            away_strength = 1 - (away_standing.position / 20)
+            # 2. Calculer les forces relatives (classement + Elo)
+            home_strength = blend_strength(
+                1 - (home_standing.position / 20), ctx.home_rating, home_standing.played_games
+            )
+            away_strength = blend_strength(
+                1 - (away_standing.position / 20), ctx.away_rating, away_standing.played_games
+            )
             
             is_home_stronger = home_strength > away_strength
             strength_diff = abs(home_strength - away_strength)
@@ -290,21 +421,15 @@ class MultiLogicPredictionEngine:
             away_win_prob /= total
             
             # 5. Prédire les buts
-            home_stats = self.db.query(TeamStats).filter(
-                TeamStats.team_id == match.home_team_id,
-                TeamStats.competition_code == match.competition_code
-            ).first()
+            home_stats = ctx.home_stats
+            away_stats = ctx.away_stats
             
-            away_stats = self.db.query(TeamStats).filter(
-                TeamStats.team_id == match.away_team_id,
-                TeamStats.competition_code == match.competition_code
-            ).first()
+            home_goals_avg = self._goals_avg(home_stats, ctx.home_features, 1.3)
+            away_goals_avg = self._goals_avg(away_stats, ctx.away_features, 1.0)
             
-            home_goals_avg = home_stats.avg_goals_scored if home_stats else 1.3
-            away_goals_avg = away_stats.avg_goals_scored if away_stats else 1.0
-            
-            home_goals = round(home_goals_avg * (1 + home_advantage))
-            away_goals = round(away_goals_avg * 0.9)
+            home_xg = home_goals_avg * (1 + home_advantage)
+            away_xg = away_goals_avg * 0.9
+            home_goals, away_goals = match_markets(home_xg, away_xg).score
             
             # Confiance basée sur H2H et position
             confidence = 0.5 + (strength_diff * 0.5)
@@ -350,7 +475,9 @@ class MultiLogicPredictionEngine:
                 confidence=confidence,
                 bet_tip=bet_tip,
                 analysis=analysis,
-                evidence=evidence
+                evidence=evidence,
+                expected_home_goals=home_xg,
+                expected_away_goals=away_xg
             )
             
         except Exception as e:
@@ -361,7 +488,13 @@ class MultiLogicPredictionEngine:
     # MA LOGIQUE
     # =========================================
     
-    async def logic_ma_logique(self, match: Match) -> Optional[LogicResult]:
+    async def logic_ma_logique(
+        self, match: Match, ctx: Optional[MatchContext] = None
+    ) -> Optional[LogicResult]:
+        """Ma Logique (charge le contexte si non fourni)."""
+        return self.ma_logique_from_context(match, ctx or self.load_context(match))
+    
+    def ma_logique_from_context(self, match: Match, ctx: MatchContext) -> Optional[LogicResult]:
         """
         Ma Logique: Double validation et consensus.
         
@@ -374,22 +507,16 @@ class MultiLogicPredictionEngine:
         Note: Sans API externe, on utilise les stats locales.
         """
         try:
-            # 1. Récupérer les stats d'équipe (10 derniers matchs)
-            home_stats = self.db.query(TeamStats).filter(
-                TeamStats.team_id == match.home_team_id,
-                TeamStats.competition_code == match.competition_code
-            ).first()
-            
-            away_stats = self.db.query(TeamStats).filter(
-                TeamStats.team_id == match.away_team_id,
-                TeamStats.competition_code == match.competition_code
-            ).first()
-            
-            # 2. Construire la forme V/N/D sur 10 matchs
-            home_form = ""
-            away_form = ""
-            
-            if home_stats:
+            # 1. Stats d'équipe du contexte (10 derniers matchs)
+            home_stats = ctx.home_stats
+            away_stats = ctx.away_stats
+            
+            # 2. Forme V/N/D sur 10 matchs: vraie séquence du feature store,
+            #    sinon reconstruite depuis les stats agrégées
+            home_form = ctx.home_features.form if ctx.home_features else ""
+            away_form = ctx.away_features.form if ctx.away_features else ""
+            
+            if home_stats and not home_form:
                 wins = home_stats.wins or 0
                 draws = home_stats.draws or 0
                 losses = home_stats.losses or 0
@@ -397,7 +524,7 @@ class MultiLogicPredictionEngine:
                 if total > 0:
                     home_form = ",".join(["W"] * wins + ["D"] * draws + ["L"] * losses)
             
-            if away_stats:
+            if away_stats and not away_form:
                 wins = away_stats.wins or 0
                 draws = away_stats.draws or 0
                 losses = away_stats.losses or 0
@@ -410,8 +537,8 @@ class MultiLogicPredictionEngine:
             away_form_score = self.prediction_service._calculate_form_score(away_form, 10)
             
             # 4. Moyenne de buts
-            home_goals_avg = home_stats.avg_goals_scored if home_stats else 1.2
-            away_goals_avg = away_stats.avg_goals_scored if away_stats else 1.0
+            home_goals_avg = self._goals_avg(home_stats, ctx.home_features, 1.2)
+            away_goals_avg = self._goals_avg(away_stats, ctx.away_features, 1.0)
             
             # 5. Calculer les probabilités basées sur la forme
             total_form = home_form_score + away_form_score
@@ -431,8 +558,9 @@ class MultiLogicPredictionEngine:
             away_win_prob /= total
             
             # 6. Prédire les buts
-            home_goals = round(home_goals_avg * (1 + home_form_score * 0.3))
-            away_goals = round(away_goals_avg * (1 + away_form_score * 0.3))
+            home_xg = home_goals_avg * (1 + home_form_score * 0.3)
+            away_xg = away_goals_avg * (1 + away_form_score * 0.3)
+            home_goals, away_goals = match_markets(home_xg, away_xg).score
             
             # 7. Confiance basée sur la différence de forme
             confidence = min(abs(home_form_score - away_form_score) * 2 + 0.3, 0.85)
@@ -468,7 +596,9 @@ class MultiLogicPredictionEngine:
                 confidence=confidence,
                 bet_tip=bet_tip,
                 analysis=analysis,
-                evidence=evidence
+                evidence=evidence,
+                expected_home_goals=home_xg,
+                expected_away_goals=away_xg
             )
             
         except Exception as e:
@@ -479,16 +609,48 @@ class MultiLogicPredictionEngine:
     # COMBINAISON DES 3 LOGIQUES
     # =========================================
     
-    async def generate_combined_prediction(self, match: Match) -> Optional[CombinedPrediction]:
+    async def generate_combined_prediction(
+        self, match: Match, ctx: Optional[MatchContext] = None
+    ) -> Optional[CombinedPrediction]:
         """
         Génère une prédiction combinée des 3 logiques.
         
         Pondération: Papa (35%) + Grand Frère (35%) + Ma Logique (30%)
+        
+        Args:
+            match: Match à analyser
+            ctx: Contexte déjà chargé (sinon 2 requêtes)
+        
+        Returns:
+            CombinedPrediction ou None si aucune logique n'aboutit
         """
-        # Exécuter les 3 logiques
-        papa_result = await self.logic_papa(match)
-        gf_result = await self.logic_grand_frere(match)
-        ma_result = await self.logic_ma_logique(match)
+        return self.combine_from_context(match, ctx or self.load_context(match))
+    
+    async def generate_combined_predictions(
+        self, matches: List[Match]
+    ) -> Dict[int, Optional[CombinedPrediction]]:
+        """
+        Prédictions combinées pour un lot de matchs (2 requêtes au total).
+        
+        Args:
+            matches: Matchs à analyser
+        
+        Returns:
+            Dictionnaire {match_id: CombinedPrediction ou None}
+        """
+        contexts = self.load_contexts(matches)
+        return {m.id: self.combine_from_context(m, contexts[m.id]) for m in matches}
+    
+    def combine_from_context(self, match: Match, ctx: MatchContext) -> Optional[CombinedPrediction]:
+        """
+        Combine les 3 logiques sur un contexte déjà chargé (sans accès DB).
+        
+        Les logiques sont de simples calculs en mémoire: les exécuter en
+        parallèle coûterait plus cher (threads/tâches) que de les enchaîner.
+        """
+        papa_result = self.papa_from_context(match, ctx)
+        gf_result = self.grand_frere_from_context(match, ctx)
+        ma_result = self.ma_logique_from_context(match, ctx)
         
         # Collecter les résultats valides
         results = []
@@ -496,15 +658,15 @@ class MultiLogicPredictionEngine:
         
         if papa_result:
             results.append(papa_result)
-            weights.append(self.WEIGHT_PAPA)
+            weights.append(self.weights["papa"])
         
         if gf_result:
             results.append(gf_result)
-            weights.append(self.WEIGHT_GRAND_FRERE)
+            weights.append(self.weights["grand_frere"])
         
         if ma_result:
             results.append(ma_result)
-            weights.append(self.WEIGHT_MA_LOGIQUE)
+            weights.append(self.weights["ma_logique"])
         
         if not results:
             return None
@@ -513,13 +675,12 @@ class MultiLogicPredictionEngine:
         total_weight = sum(weights)
         weights = [w / total_weight for w in weights]
         
-        # Moyenne pondérée des buts
-        final_home_goals = round(sum(
-            r.predicted_home_goals * w for r, w in zip(results, weights)
-        ))
-        final_away_goals = round(sum(
-            r.predicted_away_goals * w for r, w in zip(results, weights)
-        ))
+        # Moyenne pondérée des buts attendus, puis matrice de scores
+        markets = match_markets(
+            sum(r.expected_home_goals * w for r, w in zip(results, weights)),
+            sum(r.expected_away_goals * w for r, w in zip(results, weights))
+        )
+        final_home_goals, final_away_goals = markets.score
         
         # Moyenne pondérée de la confiance
         final_confidence = sum(
@@ -557,5 +718,6 @@ class MultiLogicPredictionEngine:
             final_confidence=final_confidence,
             final_bet_tip=final_bet_tip,
             consensus_level=consensus_level,
-            all_agree=all_agree
+            all_agree=all_agree,
+            markets=markets
         )
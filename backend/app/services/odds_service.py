@@ -10,12 +10,25 @@ from datetime import datetime, timedelta
 import logging
 from sqlalchemy.orm import Session
 
+from core.cache import bump_data_version
 from core.config import settings
+from core.events import publish_match_event
 from models.match import Match
+from services.value_bets import refresh_market_and_value_bets
 
 logger = logging.getLogger(__name__)
 
 
+def odds_changes(match: Match) -> Dict[str, Any]:
+    """Cotes d'un match diffusées en direct (événement "odds")."""
+    return {
+        "odds_home": match.odds_home,
+        "odds_draw": match.odds_draw,
+        "odds_away": match.odds_away,
+        "odds_updated_at": match.odds_updated_at,
+    }
+
+
 class OddsService:
     """Service pour récupérer et gérer les cotes de paris."""
     
@@ -264,6 +277,9 @@ class OddsService:
             match.odds_updated_at = datetime.utcnow()
             
             db.commit()
+            bump_data_version()
+            publish_match_event("odds", match.id, match.competition_code, odds_changes(match))
+            refresh_market_and_value_bets(db, [match.id])
             logger.info(f"Cotes mises à jour pour {match.home_team} vs {match.away_team}: "
                        f"1={match_odds['odds_home']:.2f} X={match_odds['odds_draw']:.2f} 2={match_odds['odds_away']:.2f}")
             return True
@@ -279,6 +295,7 @@ class OddsService:
             Stats de mise à jour
         """
         stats = {'updated': 0, 'failed': 0, 'skipped': 0}
+        updated: List[Match] = []
         
         # Récupérer les matchs à venir
         upcoming_matches = db.query(Match).filter(
@@ -316,11 +333,16 @@ class OddsService:
                     match.odds_draw = match_odds['odds_draw']
                     match.odds_away = match_odds['odds_away']
                     match.odds_updated_at = datetime.utcnow()
+                    updated.append(match)
                     stats['updated'] += 1
                 else:
                     stats['failed'] += 1
         
         db.commit()
+        bump_data_version()
+        for match in updated:
+            publish_match_event("odds", match.id, match.competition_code, odds_changes(match))
+        refresh_market_and_value_bets(db, [m.id for m in upcoming_matches])
         logger.info(f"Mise à jour cotes terminée: {stats}")
         
         return stats
@@ -4,19 +4,50 @@ Service de génération de prédictions automatiques.
 Ce service génère des pronostics basés sur les données du classement
 et la forme récente des équipes.
 """
-from typing import Optional, Dict, List, Tuple
+from dataclasses import dataclass
+from typing import Any, Optional, Dict, List, Tuple
 from datetime import datetime, timedelta, timezone
+import hashlib
+import json
 from sqlalchemy.orm import Session
 
 from models.match import Match
 from models.prediction import ExpertPrediction
+from schemas.match import PredictionCompact
+from services.history_stats import HistoryStatsService
 from services.football_api import football_data_service
 from services.api_football import api_football_service
+from services.feature_store import FeatureStore, TeamFeatures, naive_utc, season_of
+from services.league_coefficients import (
+    DEFAULT_LEAGUE_STRENGTH, EUROPEAN_COMPETITIONS, UNKNOWN_LEAGUE_STRENGTH, fitted_league_strength
+)
+from services.important_matches import ImportantMatchIndex
+from services.value_bets import refresh_market_and_value_bets
+from services.score_matrix import match_markets, MatchMarkets
+from services.team_ratings import TeamRatingService, blend_strength
+from services.weight_sets import ENGINE_APEX30, resolve_weights
+from core.cache import bump_data_version
+from core.events import publish_match_event
+from core.config import settings
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass(frozen=True)
+class LogicForecast:
+    """Buts attendus et confiance des 3 logiques, et leur consensus."""
+    papa_xg: Tuple[float, float]
+    papa_confidence: float
+    grand_frere_xg: Tuple[float, float]
+    grand_frere_confidence: float
+    home_advantage: float
+    ma_logique_xg: Tuple[float, float]
+    ma_logique_confidence: float
+    expected_goals: Tuple[float, float]
+    confidence: float
+
+
 class PredictionService:
     """
     Service pour générer des prédictions automatiques.
@@ -34,46 +65,9 @@ class PredictionService:
     - Niveau relatif des championnats
     """
     
-    # Ranking des championnats (Logique de Papa)
-    # Basé sur les coefficients UEFA et la qualité générale
-    LEAGUE_STRENGTH = {
-        # Top Tier (95-100%)
-        "PL": 1.00,   # Premier League (Angleterre)
-        "PD": 0.98,   # La Liga (Espagne)
-        "CL": 1.00,   # Champions League
-        "WC": 1.00,   # World Cup
-        
-        # Tier 1 (85-94%)
-        "BL1": 0.92,  # Bundesliga (Allemagne)
-        "SA": 0.90,   # Serie A (Italie)
-        "FL1": 0.85,  # Ligue 1 (France)
-        
-        # Tier 2 (70-84%)
-        "PPL": 0.80,  # Primeira Liga (Portugal)
-        "DED": 0.78,  # Eredivisie (Pays-Bas)
-        "BSA": 0.75,  # Jupiler Pro League (Belgique)
-        "EL": 0.90,   # Europa League (moyenne)
-        
-        # Tier 3 (55-69%)
-        "SL": 0.68,   # Super Lig (Turquie)
-        "PL": 0.65,   # Ekstraklasa (Pologne)
-        "ASL": 0.62,  # Austrian Bundesliga (Autriche)
-        "SFL": 0.60,  # Scottish Premiership (Écosse)
-        "GSL": 0.58,  # Super League (Grèce)
-        
-        # Tier 4 (40-54%)
-        "EL": 0.52,   # Eliteserien (Norvège)
-        "SSL": 0.50,  # Allsvenskan (Suède)
-        "HNL": 0.50,  # Croatian First League (Croatie)
-        "SL": 0.48,   # Superligaen (Danemark)
-        "RSL": 0.45,  # Super League (Suisse)
-        "CL": 0.42,   # Czech First League (Tchéquie)
-        
-        # Tier 5 (25-39%) - Autres ligues
-        "BFL": 0.38,  # Bulgarian First League (Bulgarie)
-        "UPL": 0.35,  # Ukrainian Premier League
-        "RPL": 0.30,  # Russian Premier League
-    }
+    # Ranking a priori des championnats (Logique de Papa), affiné par
+    # services.league_coefficients à partir des résultats européens
+    LEAGUE_STRENGTH = DEFAULT_LEAGUE_STRENGTH
     
     # Bonus domicile de base (en % de probabilité)
     HOME_ADVANTAGE = 0.12
@@ -84,6 +78,19 @@ class PredictionService:
     WEIGHT_FORM = 0.25        # Forme récente (10 matchs)
     WEIGHT_H2H = 0.25         # Confrontations directes (Grand Frère)
     
+    # Statuts des matchs pour lesquels on génère des prédictions
+    PREDICTABLE_STATUSES = ["SCHEDULED", "TIMED", "CALENDAR", "IN_PLAY", "PAUSED"]
+    
+    # Version du modèle: à incrémenter à chaque changement de calcul
+    # (invalide toutes les empreintes lors du prochain recalcul)
+    MODEL_VERSION = "2026.02.3"
+    
+    # Champs du classement qui influencent la prédiction
+    STANDING_FINGERPRINT_FIELDS = (
+        "position", "points", "playedGames", "won", "draw", "lost",
+        "goalsFor", "goalsAgainst", "form"
+    )
+    
     def __init__(self, db: Session):
         """
         Initialise le service de prédictions.
@@ -93,6 +100,60 @@ class PredictionService:
         """
         self.db = db
         self._standings_cache: Dict[str, List[dict]] = {}
+        # Features point-in-time par match: {match_id: (domicile, extérieur)}
+        self._features_cache: Dict[int, Tuple[Optional[TeamFeatures], Optional[TeamFeatures]]] = {}
+        # Elo point-in-time par match: {match_id: (domicile, extérieur)}
+        self._ratings_cache: Dict[int, Tuple[Optional[float], Optional[float]]] = {}
+        # Matchs importants de la fenêtre courante (congestion du calendrier)
+        self._important_index: Optional[ImportantMatchIndex] = None
+    
+    def prefetch_features(self, matches: List[Match]) -> None:
+        """
+        Charge les features et l'Elo de tout un lot de matchs (2 requêtes).
+        
+        Args:
+            matches: Matchs qui vont être prédits
+        """
+        missing = [m for m in matches if m.id not in self._features_cache]
+        if missing:
+            self._features_cache.update(FeatureStore(self.db).for_matches(missing))
+            self._ratings_cache.update(TeamRatingService(self.db).for_matches(missing))
+    
+    def _get_match_features(self, match: Match) -> Tuple[Optional[TeamFeatures], Optional[TeamFeatures]]:
+        """
+        Features des deux équipes à la date du match (feature store).
+        
+        Args:
+            match: Match à prédire
+            
+        Returns:
+            Tuple (features_domicile, features_extérieur), None si inconnues
+        """
+        self.prefetch_features([match])
+        return self._features_cache.get(match.id, (None, None))
+    
+    def _get_match_ratings(self, match: Match) -> Tuple[Optional[float], Optional[float]]:
+        """Elo des deux équipes à la date du match (None si inconnu)."""
+        self.prefetch_features([match])
+        return self._ratings_cache.get(match.id, (None, None))
+    
+    def prefetch_important_matches(self, matches: List[Match], days: int = 3) -> None:
+        """
+        Charge en une requête les matchs importants autour de tout un lot.
+        
+        Args:
+            matches: Matchs qui vont être prédits
+            days: Fenêtre de congestion en jours
+        """
+        self._important_index = ImportantMatchIndex.load(
+            self.db, [m.match_date for m in matches], days=days
+        )
+    
+    def _get_important_index(self, match_date: datetime, days: int) -> ImportantMatchIndex:
+        """Index couvrant la date ± days (rechargé si hors fenêtre: 1 requête)."""
+        if self._important_index is None or not self._important_index.covers(match_date, days):
+            self._important_index = ImportantMatchIndex.load(self.db, [match_date], days=days)
+        return self._important_index
     
     def _check_upcoming_important_match(self, team_id: int, match_date: datetime, days: int = 3) -> Optional[dict]:
         """
@@ -106,32 +167,7 @@ class PredictionService:
         Returns:
             Dict avec infos du match important ou None
         """
-        from models.match import Match
-        from datetime import timedelta
-        
-        # Compétitions considérées comme importantes
-        important_competitions = ['CL', 'EL', 'FAC', 'FLC']  # CL, Europa League, FA Cup, League Cup
-        
-        # Chercher matchs de l'équipe dans les N jours suivants
-        start_date = match_date
-        end_date = match_date + timedelta(days=days)
-        
-        upcoming_match = self.db.query(Match).filter(
-            Match.match_date > start_date,
-            Match.match_date <= end_date,
-            Match.competition_code.in_(important_competitions)
-        ).filter(
-            (Match.home_team_id == team_id) | (Match.away_team_id == team_id)
-        ).order_by(Match.match_date.asc()).first()
-        
-        if upcoming_match:
-            return {
-                'competition': upcoming_match.competition_name,
-                'opponent': upcoming_match.away_team if upcoming_match.home_team_id == team_id else upcoming_match.home_team,
-                'date': upcoming_match.match_date,
-                'days_until': (upcoming_match.match_date - match_date).days
-            }
-        return None
+        return self._get_important_index(match_date, days).upcoming(team_id, match_date, days)
     
     def _check_recent_important_match(self, team_id: int, match_date: datetime, days: int = 3) -> Optional[dict]:
         """
@@ -145,34 +181,7 @@ class PredictionService:
         Returns:
             Dict avec infos du match important ou None
         """
-        from models.match import Match
-        from datetime import timedelta
-        
-        # Compétitions considérées comme importantes
-        important_competitions = ['CL', 'EL', 'FAC', 'FLC']
-        
-        # Chercher matchs de l'équipe dans les N jours précédents
-        start_date = match_date - timedelta(days=days)
-        end_date = match_date
-        
-        recent_match = self.db.query(Match).filter(
-            Match.match_date >= start_date,
-            Match.match_date < end_date,
-            Match.competition_code.in_(important_competitions),
-            Match.status == 'FINISHED'  # Match déjà joué
-        ).filter(
-            (Match.home_team_id == team_id) | (Match.away_team_id == team_id)
-        ).order_by(Match.match_date.desc()).first()
-        
-        if recent_match:
-            return {
-                'competition': recent_match.competition_name,
-                'opponent': recent_match.away_team if recent_match.home_team_id == team_id else recent_match.home_team,
-                'date': recent_match.match_date,
-                'days_ago': (match_date - recent_match.match_date).days,
-                'score': f"{recent_match.score_home}-{recent_match.score_away}"
-            }
-        return None
+        return self._get_important_index(match_date, days).recent(team_id, match_date, days)
     
     async def _get_standings(self, competition_code: str) -> List[dict]:
         """
@@ -246,7 +255,7 @@ class PredictionService:
         return score / max_score
     
     
-    def _get_league_strength(self, competition_code: str) -> float:
+    def _get_league_strength(self, competition_code: str, season: Optional[int] = None) -> float:
         """
         Retourne la force relative d'un championnat (Logique de Papa).
         
@@ -256,15 +265,23 @@ class PredictionService:
         Même si Bodø est 1er en Norvège et PSG 5ème en Ligue 1,
         PSG aura un avantage car la Ligue 1 est un championnat plus relevé.
         
+        La force ajustée sur les matchs européens (league_coefficients) est
+        utilisée quand elle existe pour la saison, sinon la valeur a priori.
+        
         Args:
             competition_code: Code de la compétition (PL, FL1, etc.)
+            season: Saison du match (None = pas de coefficient ajusté)
             
         Returns:
             Force entre 0.3 et 1.0 (1 = top niveau européen)
         """
+        if season is not None and competition_code not in EUROPEAN_COMPETITIONS:
+            fitted = fitted_league_strength(self.db, competition_code, season)
+            if fitted is not None:
+                return fitted
         # Si championnat inconnu, on estime à un niveau moyen-bas (50%)
         # Pour éviter de surestimer des championnats mineurs
-        return self.LEAGUE_STRENGTH.get(competition_code, 0.50)
+        return self.LEAGUE_STRENGTH.get(competition_code, UNKNOWN_LEAGUE_STRENGTH)
     
     def _calculate_home_advantage(
         self, 
@@ -301,6 +318,29 @@ class PredictionService:
         return min(base_advantage, 0.20)  # Cap à 20%
 
     
+    def _expected_goals(
+        self, 
+        home_strength: float, 
+        away_strength: float,
+        home_goals_avg: float,
+        away_goals_avg: float
+    ) -> Tuple[float, float]:
+        """
+        Buts attendus (λ) de chaque équipe selon les forces et moyennes de buts.
+        
+        Args:
+            home_strength: Force équipe domicile (0-1)
+            away_strength: Force équipe extérieur (0-1)
+            home_goals_avg: Moyenne buts marqués domicile
+            away_goals_avg: Moyenne buts marqués extérieur
+            
+        Returns:
+            Tuple (λ_domicile, λ_exterieur)
+        """
+        home_expected = (home_strength + self.HOME_ADVANTAGE) * home_goals_avg
+        away_expected = away_strength * away_goals_avg * 0.9  # Malus extérieur
+        return max(0.0, home_expected), max(0.0, away_expected)
+    
     def _predict_score(
         self, 
         home_strength: float, 
@@ -311,6 +351,9 @@ class PredictionService:
         """
         Prédit le score basé sur les forces des équipes.
         
+        Le score retenu est le plus probable de la matrice Poisson /
+        Dixon-Coles (et non l'arrondi des buts attendus).
+        
         Args:
             home_strength: Force équipe domicile (0-1)
             away_strength: Force équipe extérieur (0-1)
@@ -320,15 +363,89 @@ class PredictionService:
         Returns:
             Tuple (buts_domicile, buts_exterieur)
         """
-        # Score prédit basé sur la force relative et moyenne de buts
-        home_expected = (home_strength + self.HOME_ADVANTAGE) * home_goals_avg
-        away_expected = away_strength * away_goals_avg * 0.9  # Malus extérieur
+        return match_markets(*self._expected_goals(
+            home_strength, away_strength, home_goals_avg, away_goals_avg
+        )).score
+    
+    def logic_forecast(
+        self,
+        home_strength: float,
+        away_strength: float,
+        league_level: float,
+        home_form: float,
+        away_form: float,
+        home_goals_avg: float,
+        away_goals_avg: float,
+        home_h2h: float = 0.5,
+        away_h2h: float = 0.5,
+        apex_decision: Optional[dict] = None,
+        rotation: Tuple[float, float] = (1.0, 1.0),
+        papa_confidence_factor: float = 1.0
+    ) -> LogicForecast:
+        """
+        Buts attendus des 3 logiques et consensus pondéré par la confiance.
         
-        # Arrondir aux entiers
-        home_goals = max(0, round(home_expected))
-        away_goals = max(0, round(away_expected))
+        Calcul pur (aucun accès base ni API): utilisé par _generate_prediction
+        et par le backtest sur données point-in-time.
         
-        return home_goals, away_goals
+        Args:
+            home_strength: Force équipe domicile (0-1)
+            away_strength: Force équipe extérieur (0-1)
+            league_level: Niveau du championnat (Papa)
+            home_form: Score de forme domicile (0-1)
+            away_form: Score de forme extérieur (0-1)
+            home_goals_avg: Moyenne buts marqués domicile
+            away_goals_avg: Moyenne buts marqués extérieur
+            home_h2h: Part des points H2H du domicile (0-1)
+            away_h2h: Part des points H2H de l'extérieur (0-1)
+            apex_decision: Décision APEX-30 (None = repli Ma Logique sur la forme)
+            rotation: Facteurs de force (domicile, extérieur) liés aux matchs importants
+            papa_confidence_factor: Facteur de confiance Papa lié aux matchs importants
+            
+        Returns:
+            LogicForecast
+        """
+        # Logique de Papa: classement et niveau du championnat
+        papa_xg = self._expected_goals(
+            home_strength * league_level * rotation[0],
+            away_strength * league_level * rotation[1],
+            home_goals_avg, away_goals_avg
+        )
+        papa_confidence = min(0.9, 0.5 + abs(home_strength - away_strength) * 0.5) * papa_confidence_factor
+        
+        # Logique Grand Frère: H2H et loi du domicile
+        home_adv = self._calculate_home_advantage(home_strength, away_strength, home_strength > away_strength)
+        gf_xg = self._expected_goals(home_h2h + home_adv, away_h2h, home_goals_avg, away_goals_avg)
+        gf_confidence = min(0.8, 0.4 + abs(home_h2h - away_h2h))
+        
+        # Ma Logique: APEX-30 (qui ne fournit qu'un score), repli sur la forme
+        if apex_decision is not None:
+            ml_xg = (float(apex_decision['home_goals']), float(apex_decision['away_goals']))
+            ml_confidence = apex_decision['confiance_pct']
+        else:
+            ml_xg = self._expected_goals(home_form, away_form, home_goals_avg, away_goals_avg)
+            ml_confidence = min(0.7, 0.3 + abs(home_form - away_form))
+        
+        total_weight = papa_confidence + gf_confidence + ml_confidence
+        if total_weight > 0:
+            expected_goals = tuple(
+                (papa_xg[i] * papa_confidence + gf_xg[i] * gf_confidence + ml_xg[i] * ml_confidence) / total_weight
+                for i in (0, 1)
+            )
+        else:
+            expected_goals = (1.0, 1.0)
+        
+        return LogicForecast(
+            papa_xg=papa_xg,
+            papa_confidence=papa_confidence,
+            grand_frere_xg=gf_xg,
+            grand_frere_confidence=gf_confidence,
+            home_advantage=home_adv,
+            ma_logique_xg=ml_xg,
+            ma_logique_confidence=ml_confidence,
+            expected_goals=expected_goals,
+            confidence=total_weight / 3,
+        )
     
     def _generate_bet_tip(
         self, 
@@ -641,70 +758,332 @@ class PredictionService:
         
         return " ".join(analysis_parts)
     
-    async def generate_prediction(self, match: Match) -> Optional[ExpertPrediction]:
+    def _markets_fields(self, markets: MatchMarkets) -> dict:
+        """
+        Colonnes de la prédiction issues de la matrice de scores.
+        
+        La matrice complète n'est conservée que si STORE_SCORE_MATRIX est actif.
+        
+        Args:
+            markets: Marchés du consensus
+            
+        Returns:
+            Dict des champs ExpertPrediction
+        """
+        return dict(
+            prob_home_win=round(markets.home_win, 4),
+            prob_draw=round(markets.draw, 4),
+            prob_away_win=round(markets.away_win, 4),
+            prob_over_2_5=round(markets.over_2_5, 4),
+            prob_btts=round(markets.btts, 4),
+            expected_home_goals=round(markets.expected_home_goals, 2),
+            expected_away_goals=round(markets.expected_away_goals, 2),
+            score_matrix=(
+                json.dumps(markets.matrix_as_list()) if settings.store_score_matrix else None
+            ),
+        )
+    
+    async def _get_recent_matches(
+        self,
+        match: Match,
+        home_entry: Optional[dict],
+        away_entry: Optional[dict],
+        home_features: Optional[TeamFeatures],
+        away_features: Optional[TeamFeatures]
+    ) -> Tuple[List[dict], List[dict]]:
+        """
+        Récupère les 10 derniers matchs des deux équipes au format APEX-30.
+        
+        Sources par ordre de priorité: API-Football, Football-Data.org,
+        feature store (matchs terminés en base), forme du classement.
+        
+        Returns:
+            Tuple (matchs domicile, matchs extérieur)
+        """
+        try:
+            home_last_matches = await api_football_service.get_team_last_matches(match.home_team, last=10)
+            away_last_matches = await api_football_service.get_team_last_matches(match.away_team, last=10)
+        except Exception as e:
+            logger.warning("⚠️ API-Football derniers matchs: %s", e)
+            home_last_matches, away_last_matches = {}, {}
+        
+        # Convertir les matchs API-Football au format APEX-30
+        home_matchs_data = home_last_matches.get("matches", []) if home_last_matches.get("success") else []
+        away_matchs_data = away_last_matches.get("matches", []) if away_last_matches.get("success") else []
+        
+        # === FALLBACK 1: Si API-Football échoue, essayer Football-Data.org ===
+        if not home_matchs_data and match.home_team_id:
+            try:
+                fd_matches = await football_data_service.get_team_matches(
+                    match.home_team_id, status="FINISHED", limit=10
+                )
+                for fd_match in fd_matches.get("matches", [])[:10]:
+                    is_home = fd_match.get("homeTeam", {}).get("id") == match.home_team_id
+                    h_score = fd_match.get("score", {}).get("fullTime", {}).get("home", 0) or 0
+                    a_score = fd_match.get("score", {}).get("fullTime", {}).get("away", 0) or 0
+                    
+                    if is_home:
+                        buts_pour, buts_contre = h_score, a_score
+                    else:
+                        buts_pour, buts_contre = a_score, h_score
+                    
+                    if buts_pour > buts_contre:
+                        resultat = 'V'
+                    elif buts_pour < buts_contre:
+                        resultat = 'D'
+                    else:
+                        resultat = 'N'
+                    
+                    home_matchs_data.append({
+                        'date': fd_match.get("utcDate", ""),
+                        'domicile': is_home,
+                        'resultat': resultat,
+                        'buts_pour': buts_pour,
+                        'buts_contre': buts_contre,
+                        'adversaire_classement': 10,
+                        'competition': fd_match.get("competition", {}).get("name", "Championnat")
+                    })
+                if home_matchs_data:
+                    logger.debug("APEX-30 Fallback FD: %s - %d matchs", match.home_team, len(home_matchs_data))
+            except Exception as e:
+                logger.warning("Football-Data.org fallback error for %s: %s", match.home_team, e)
+        
+        if not away_matchs_data and match.away_team_id:
+            try:
+                fd_matches = await football_data_service.get_team_matches(
+                    match.away_team_id, status="FINISHED", limit=10
+                )
+                for fd_match in fd_matches.get("matches", [])[:10]:
+                    is_home = fd_match.get("homeTeam", {}).get("id") == match.away_team_id
+                    h_score = fd_match.get("score", {}).get("fullTime", {}).get("home", 0) or 0
+                    a_score = fd_match.get("score", {}).get("fullTime", {}).get("away", 0) or 0
+                    
+                    if is_home:
+                        buts_pour, buts_contre = h_score, a_score
+                    else:
+                        buts_pour, buts_contre = a_score, h_score
+                    
+                    if buts_pour > buts_contre:
+                        resultat = 'V'
+                    elif buts_pour < buts_contre:
+                        resultat = 'D'
+                    else:
+                        resultat = 'N'
+                    
+                    away_matchs_data.append({
+                        'date': fd_match.get("utcDate", ""),
+                        'domicile': is_home,
+                        'resultat': resultat,
+                        'buts_pour': buts_pour,
+                        'buts_contre': buts_contre,
+                        'adversaire_classement': 10,
+                        'competition': fd_match.get("competition", {}).get("name", "Championnat")
+                    })
+                if away_matchs_data:
+                    logger.debug("APEX-30 Fallback FD: %s - %d matchs", match.away_team, len(away_matchs_data))
+            except Exception as e:
+                logger.warning("Football-Data.org fallback error for %s: %s", match.away_team, e)
+        
+        # === FALLBACK 2: Feature store (matchs terminés en base, sans appel API) ===
+        if not home_matchs_data and home_features and home_features.recent:
+            home_matchs_data = home_features.to_apex_matches()
+        
+        if not away_matchs_data and away_features and away_features.recent:
+            away_matchs_data = away_features.to_apex_matches()
+        
+        # === FALLBACK 3: Si toujours vide, utiliser les données de forme ===
+        if not home_matchs_data and home_entry:
+            # Générer un historique simulé à partir de la forme (VVNDD)
+            form_str = home_entry.get("form", "NNNNN") or "NNNNN"
+            logger.debug("APEX-30 Fallback: %s - utilisation forme %s", match.home_team, form_str)
+            for i, res in enumerate(form_str[:10]):
+                result_map = {'W': 'V', 'D': 'N', 'L': 'D', 'V': 'V', 'N': 'N'}
+                home_matchs_data.append({
+                    'date': (datetime.now() - timedelta(days=(i+1)*7)).isoformat(),
+                    'domicile': (i % 2 == 0),
+                    'resultat': result_map.get(res, 'N'),
+                    'buts_pour': 2 if res in ['W', 'V'] else (1 if res in ['D', 'N'] else 0),
+                    'buts_contre': 0 if res in ['W', 'V'] else (1 if res in ['D', 'N'] else 2),
+                    'adversaire_classement': 10,
+                    'competition': 'Championnat'
+                })
+        
+        if not away_matchs_data and away_entry:
+            form_str = away_entry.get("form", "NNNNN") or "NNNNN"
+            logger.debug("APEX-30 Fallback: %s - utilisation forme %s", match.away_team, form_str)
+            for i, res in enumerate(form_str[:10]):
+                result_map = {'W': 'V', 'D': 'N', 'L': 'D', 'V': 'V', 'N': 'N'}
+                away_matchs_data.append({
+                    'date': (datetime.now() - timedelta(days=(i+1)*7)).isoformat(),
+                    'domicile': (i % 2 == 1),
+                    'resultat': result_map.get(res, 'N'),
+                    'buts_pour': 2 if res in ['W', 'V'] else (1 if res in ['D', 'N'] else 0),
+                    'buts_contre': 0 if res in ['W', 'V'] else (1 if res in ['D', 'N'] else 2),
+                    'adversaire_classement': 10,
+                    'competition': 'Championnat'
+                })
+        
+        return home_matchs_data, away_matchs_data
+    
+    def compute_input_fingerprint(self, inputs: dict) -> str:
+        """
+        Empreinte sha256 des entrées d'une prédiction et de la version du modèle.
+        
+        Args:
+            inputs: Entrées du calcul (sérialisables en JSON)
+            
+        Returns:
+            Empreinte hexadécimale (64 caractères)
+        """
+        payload = json.dumps(
+            {"model_version": self.MODEL_VERSION, "inputs": inputs},
+            sort_keys=True, default=str, separators=(",", ":")
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    
+    def _standing_fingerprint(self, entry: Optional[dict]) -> Optional[list]:
+        """Champs significatifs d'une ligne de classement (sans écussons, URLs...)."""
+        if not entry:
+            return None
+        return [entry.get(key) for key in self.STANDING_FINGERPRINT_FIELDS]
+    
+    def _is_unchanged(self, existing: Optional[ExpertPrediction], fingerprint: str) -> bool:
+        """Vrai si la prédiction en base a été calculée sur les mêmes entrées et le même modèle."""
+        return (existing is not None
+                and existing.input_fingerprint == fingerprint
+                and existing.model_version == self.MODEL_VERSION)
+    
+    def _save_prediction(
+        self,
+        match: Match,
+        existing: Optional[ExpertPrediction],
+        fingerprint: str,
+        fields: dict
+    ) -> Tuple[ExpertPrediction, str]:
+        """
+        Enregistre une prédiction sauf si ses entrées n'ont pas changé.
+        
+        Args:
+            match: Match prédit
+            existing: Prédiction déjà en base (ou None)
+            fingerprint: Empreinte des entrées du calcul
+            fields: Colonnes de la prédiction
+            
+        Returns:
+            Tuple (prédiction, statut) avec statut "created", "updated" ou "unchanged"
+        """
+        if self._is_unchanged(existing, fingerprint):
+            return existing, "unchanged"
+        
+        fields = dict(fields, input_fingerprint=fingerprint, model_version=self.MODEL_VERSION)
+        if existing is not None:
+            # Mise à jour en place: l'id et l'historique de la ligne sont conservés
+            for key, value in fields.items():
+                setattr(existing, key, value)
+            prediction, status = existing, "updated"
+        else:
+            prediction, status = ExpertPrediction(match_id=match.id, **fields), "created"
+            self.db.add(prediction)
+        
+        self.db.commit()
+        bump_data_version()
+        self.db.refresh(prediction)
+        publish_match_event("prediction", match.id, match.competition_code, dict(
+            {name: getattr(prediction, name) for name in PredictionCompact.model_fields},
+            status=status
+        ))
+        if match.status == "FINISHED" and match.match_date:
+            # Prédiction d'un match terminé: cumul de l'historique à jour
+            try:
+                HistoryStatsService(self.db).refresh_days([match.match_date])
+            except Exception as e:
+                self.db.rollback()
+                logger.warning(f"⚠️ Cumul de l'historique non mis à jour ({e})")
+        return prediction, status
+    
+    async def generate_prediction(self, match: Match, refresh: bool = False) -> Optional[ExpertPrediction]:
         """
         Génère une prédiction pour un match.
         
         Args:
             match: Instance Match
+            refresh: Si True, recalcule une prédiction existante; elle n'est
+                réécrite que si l'empreinte de ses entrées a changé
             
         Returns:
             ExpertPrediction générée ou None si impossible
         """
+        prediction, _ = await self._generate_prediction(match, refresh)
+        return prediction
+    
+    async def _generate_prediction(
+        self, match: Match, refresh: bool = False
+    ) -> Tuple[Optional[ExpertPrediction], str]:
+        """
+        Génère une prédiction et indique ce qui a été fait.
+        
+        Returns:
+            Tuple (prédiction, statut): "existing", "created", "updated",
+            "unchanged" ou "skipped" (impossible de prédire)
+        """
         # Vérifier si prédiction existe déjà
         existing = self.db.query(ExpertPrediction).filter(
             ExpertPrediction.match_id == match.id
         ).first()
         
-        if existing:
-            return existing
+        if existing and not refresh:
+            return existing, "existing"
         
         # Récupérer le classement
         if not match.competition_code:
-            return None
+            return None, "skipped"
         
         standings = await self._get_standings(match.competition_code)
         
         if not standings:
             # Prédiction par défaut sans données
-            prediction = ExpertPrediction(
-                match_id=match.id,
+            fingerprint = self.compute_input_fingerprint({
+                "match": [match.home_team_id, match.away_team_id, match.competition_code],
+                "standings": None,
+            })
+            return self._save_prediction(match, existing, fingerprint, dict(
                 home_score_forecast=1,
                 away_score_forecast=1,
                 confidence=0.3,
                 analysis=f"Match entre {match.home_team} et {match.away_team}. Données insuffisantes pour une analyse détaillée.",
                 bet_tip="Match nul"
-            )
-            self.db.add(prediction)
-            self.db.commit()
-            return prediction
+            ))
         
         # Trouver les équipes dans le classement
         home_entry = self._get_team_position(standings, match.home_team_id) if match.home_team_id else None
         away_entry = self._get_team_position(standings, match.away_team_id) if match.away_team_id else None
         
-        # Calculer les forces
+        # Features point-in-time: repli si une équipe est absente du classement
+        home_features, away_features = self._get_match_features(match)
+        home_rating, away_rating = self._get_match_ratings(match)
+        
+        # Calculer les forces: classement mélangé à l'Elo (qui pèse plus en début de saison)
         total_teams = len(standings)
         
         if home_entry:
             home_pos = home_entry.get("position", total_teams // 2)
-            home_strength = 1 - (home_pos / total_teams)
+            home_strength = blend_strength(1 - (home_pos / total_teams), home_rating, home_entry.get("playedGames", 0))
             home_form = self._calculate_form_score(home_entry.get("form", ""))
             home_goals_avg = home_entry.get("goalsFor", 20) / max(1, home_entry.get("playedGames", 1))
         else:
-            home_strength = 0.5
-            home_form = 0.5
-            home_goals_avg = 1.3
+            home_strength = blend_strength(None, home_rating)
+            home_form = home_features.form_score if home_features else 0.5
+            home_goals_avg = home_features.avg_goals_scored if home_features and home_features.played else 1.3
         
         if away_entry:
             away_pos = away_entry.get("position", total_teams // 2)
-            away_strength = 1 - (away_pos / total_teams)
+            away_strength = blend_strength(1 - (away_pos / total_teams), away_rating, away_entry.get("playedGames", 0))
             away_form = self._calculate_form_score(away_entry.get("form", ""))
             away_goals_avg = away_entry.get("goalsFor", 20) / max(1, away_entry.get("playedGames", 1))
         else:
-            away_strength = 0.5
-            away_form = 0.5
-            away_goals_avg = 1.2
+            away_strength = blend_strength(None, away_rating)
+            away_form = away_features.form_score if away_features else 0.5
+            away_goals_avg = away_features.avg_goals_scored if away_features and away_features.played else 1.2
         
         # Récupérer H2H avec stats détaillées pour Grand Frère
         # Priorité: API-Football (historique complet) > Football-Data.org (fallback)
@@ -744,9 +1123,9 @@ class PredictionService:
                         home_h2h = (h_wins * 3 + draws * 1) / (total * 3)
                         away_h2h = (a_wins * 3 + draws * 1) / (total * 3)
                     
-                    print(f"✅ H2H API-Football: {match.home_team} vs {match.away_team} = {h_wins}-{draws}-{a_wins}")
+                    logger.debug("✅ H2H API-Football: %s vs %s = %s-%s-%s", match.home_team, match.away_team, h_wins, draws, a_wins)
             except Exception as e:
-                print(f"⚠️ API-Football H2H error: {e}")
+                logger.warning("⚠️ API-Football H2H error: %s", e)
         
         # Fallback: Football-Data.org (si API-Football n'a rien retourné)
         if h2h_stats is None and match.external_id and match.home_team_id and match.away_team_id:
@@ -769,24 +1148,16 @@ class PredictionService:
                         home_h2h = (h_wins * 3 + draws * 1) / (total * 3)
                         away_h2h = (a_wins * 3 + draws * 1) / (total * 3)
                     
-                    print(f"✅ H2H Football-Data: {match.home_team} vs {match.away_team} = {h_wins}-{draws}-{a_wins}")
+                    logger.debug("✅ H2H Football-Data: %s vs %s = %s-%s-%s", match.home_team, match.away_team, h_wins, draws, a_wins)
             except Exception as e:
-                print(f"⚠️ Football-Data H2H error: {e}")
+                logger.warning("⚠️ Football-Data H2H error: %s", e)
 
-        # === LOGIQUE DE PAPA (Classement + Niveau Championnat) ===
-        # Basé sur: Position au classement, moyenne de buts, niveau du championnat
-        league_level = self._get_league_strength(match.competition_code)
-        papa_home_strength = home_strength * league_level
-        papa_away_strength = away_strength * league_level
-        
-        papa_home_score, papa_away_score = self._predict_score(
-            papa_home_strength, papa_away_strength,
-            home_goals_avg, away_goals_avg
+        # === ENTRÉES DU CALCUL (empreinte avant tout calcul des logiques) ===
+        league_level = self._get_league_strength(
+            match.competition_code, season_of(naive_utc(match.match_date)) if match.match_date else None
         )
-        papa_confidence = min(0.9, 0.5 + abs(home_strength - away_strength) * 0.5)
         
-        # === AJUSTEMENT PAPA : Matchs importants ===
-        # Vérifier si les équipes ont des matchs importants proches
+        # Matchs importants proches (rotation, fatigue: ajustement Papa)
         home_upcoming = None
         home_recent = None
         away_upcoming = None
@@ -800,46 +1171,93 @@ class PredictionService:
             away_upcoming = self._check_upcoming_important_match(match.away_team_id, match.match_date)
             away_recent = self._check_recent_important_match(match.away_team_id, match.match_date)
         
+        # Récupérer les blessures des deux équipes (Module Absences d'APEX-30)
+        injuries_home = []
+        injuries_away = []
+        try:
+            home_injuries_data = await api_football_service.get_team_injuries(match.home_team)
+            if home_injuries_data.get('success'):
+                injuries_home = home_injuries_data.get('injuries', [])
+                logger.debug("🏥 %s: %d blessés", match.home_team, len(injuries_home))
+            
+            away_injuries_data = await api_football_service.get_team_injuries(match.away_team)
+            if away_injuries_data.get('success'):
+                injuries_away = away_injuries_data.get('injuries', [])
+                logger.debug("🏥 %s: %d blessés", match.away_team, len(injuries_away))
+        except Exception as e:
+            logger.warning("⚠️ Impossible de récupérer les blessures: %s", e)
+        
+        # 10 derniers matchs de chaque équipe (APEX-30)
+        home_matchs_data, away_matchs_data = await self._get_recent_matches(
+            match, home_entry, away_entry, home_features, away_features
+        )
+        
+        from services.apex30_service import APEX30Service, creer_equipe_analyse, creer_h2h_stats, MatchHistorique
+        
+        # Empreinte des entrées: classement, forme, H2H, blessures, calendrier, poids
+        def matchs_fingerprint(matchs: List[dict]) -> list:
+            return [
+                [m.get('resultat'), m.get('buts_pour'), m.get('buts_contre'), m.get('domicile'), m.get('competition')]
+                for m in matchs
+            ]
+        
+        def injuries_fingerprint(injuries: List[dict]) -> list:
+            return sorted(json.dumps(i, sort_keys=True, default=str) for i in injuries)
+        
+        fingerprint = self.compute_input_fingerprint({
+            "match": [match.home_team_id, match.away_team_id, match.competition_code],
+            "standings": [
+                self._standing_fingerprint(home_entry),
+                self._standing_fingerprint(away_entry),
+                total_teams
+            ],
+            "ratings": [home_rating, away_rating],
+            "form": [
+                home_features.form if home_features else None,
+                away_features.form if away_features else None,
+                matchs_fingerprint(home_matchs_data),
+                matchs_fingerprint(away_matchs_data),
+            ],
+            "h2h": [h2h_stats, h2h_detailed],
+            "injuries": [injuries_fingerprint(injuries_home), injuries_fingerprint(injuries_away)],
+            "important": [home_upcoming, home_recent, away_upcoming, away_recent],
+            "weights": [
+                league_level, self.HOME_ADVANTAGE, self.WEIGHT_STANDINGS,
+                self.WEIGHT_LEAGUE, self.WEIGHT_FORM, self.WEIGHT_H2H,
+                resolve_weights(self.db, ENGINE_APEX30, APEX30Service.POIDS).version
+            ],
+        })
+        # Entrées et modèle inchangés: rien à recalculer ni à réécrire
+        if self._is_unchanged(existing, fingerprint):
+            return existing, "unchanged"
+        
+        # === AJUSTEMENT PAPA : Matchs importants ===
         # Ajuster la force et la confiance selon les matchs importants
+        papa_confidence_factor = 1.0
         rotation_factor_home = 1.0
         rotation_factor_away = 1.0
         
         if home_upcoming:
             # Équipe domicile a un match important à venir → risque de rotation
-            papa_confidence *= 0.85  # Réduire confiance de 15%
+            papa_confidence_factor *= 0.85  # Réduire confiance de 15%
             rotation_factor_home = 0.90  # Réduire force de 10%
             
         if home_recent:
             # Équipe domicile vient de jouer un match important → fatigue possible
-            papa_confidence *= 0.90  # Réduire confiance de 10%
+            papa_confidence_factor *= 0.90  # Réduire confiance de 10%
             rotation_factor_home *=0.92  # Réduire force de 8%
             
         if away_upcoming:
             # Équipe extérieur a un match important à venir
-            papa_confidence *= 0.85
+            papa_confidence_factor *= 0.85
             rotation_factor_away = 0.90
             
         if away_recent:
             # Équipe extérieur vient de jouer un match important
-            papa_confidence *= 0.90
+            papa_confidence_factor *= 0.90
             rotation_factor_away *= 0.92
         
-        # Recalculer le score avec les facteurs d'ajustement
-        if rotation_factor_home != 1.0 or rotation_factor_away != 1.0:
-            papa_home_score, papa_away_score = self._predict_score(
-                papa_home_strength * rotation_factor_home,
-                papa_away_strength * rotation_factor_away,
-                home_goals_avg, away_goals_avg
-            )
-        
-        papa_tip = self._generate_bet_tip(papa_home_score, papa_away_score, papa_confidence)
-        
         # === LOGIQUE GRAND FRÈRE (H2H + Loi Domicile + Analyse combinée Papa) ===
-        # Basé sur: Confrontations directes, avantage domicile, niveau de ligue
-        home_adv = self._calculate_home_advantage(home_strength, away_strength, home_strength > away_strength)
-        gf_home_strength = home_h2h + home_adv
-        gf_away_strength = away_h2h
-        
         # Récupérer les niveaux de ligue pour l'analyse combinée
         # (On utilise le même niveau pour les deux si même championnat)
         gf_home_league = league_level
@@ -860,25 +1278,13 @@ class PredictionService:
             away_team=match.away_team
         )
         
-        gf_home_score, gf_away_score = self._predict_score(
-            gf_home_strength, gf_away_strength,
-            home_goals_avg, away_goals_avg
-        )
-        gf_confidence = min(0.8, 0.4 + abs(home_h2h - away_h2h))
-        gf_tip = self._generate_bet_tip(gf_home_score, gf_away_score, gf_confidence)
-        
         # === MA LOGIQUE (APEX-30 v2.0: Système 10 modules) ===
         # Remplacé par APEX-30: IFP, Force Off/Def, Domicile, Fatigue, Motivation, Absences, H2H
-        from services.apex30_service import APEX30Service, creer_equipe_analyse, creer_h2h_stats, MatchHistorique
-        
+        apex_decision = None
+        ml_analysis = None
         try:
             apex30 = APEX30Service(self.db)
             
-            # Préparer les données pour APEX-30
-            # Créer l'historique de matchs (simplifié à partir des données de forme)
-            home_matchs_data = []
-            away_matchs_data = []
-            
             # Calculer les points domicile/extérieur à partir des standings
             home_pts_dom = 2.0  # Default
             home_pts_ext = 1.5
@@ -892,6 +1298,9 @@ class PredictionService:
                     avg_pts = total_pts / total_matchs
                     home_pts_dom = avg_pts * 1.2  # Bonus domicile estimé
                     home_pts_ext = avg_pts * 0.8
+            elif home_features and home_features.home_ppg is not None:
+                home_pts_dom = home_features.home_ppg
+                home_pts_ext = home_features.away_ppg if home_features.away_ppg is not None else home_pts_ext
             
             if away_entry:
                 total_pts = away_entry.get('points', 30)
@@ -900,11 +1309,9 @@ class PredictionService:
                     avg_pts = total_pts / total_matchs
                     away_pts_dom = avg_pts * 1.2
                     away_pts_ext = avg_pts * 0.8
-            
-            # Créer les équipes pour APEX-30 avec les vrais 10 derniers matchs
-            # Récupérer les 10 derniers matchs via API-Football
-            home_last_matches = await api_football_service.get_team_last_matches(match.home_team, last=10)
-            away_last_matches = await api_football_service.get_team_last_matches(match.away_team, last=10)
+            elif away_features and away_features.home_ppg is not None:
+                away_pts_dom = away_features.home_ppg
+                away_pts_ext = away_features.away_ppg if away_features.away_ppg is not None else away_pts_ext
             
             # Récupérer les positions au classement avec stats domicile/extérieur
             home_standings_api = await api_football_service.get_team_standings_position(match.home_team)
@@ -927,117 +1334,6 @@ class PredictionService:
                 away_pts_dom = (home_data.get("win", 0) * 3 + home_data.get("draw", 0)) / home_played
                 away_pts_ext = (away_data.get("win", 0) * 3 + away_data.get("draw", 0)) / away_played
             
-            # Convertir les matchs API-Football au format APEX-30
-            home_matchs_data = home_last_matches.get("matches", []) if home_last_matches.get("success") else []
-            away_matchs_data = away_last_matches.get("matches", []) if away_last_matches.get("success") else []
-            
-            # === FALLBACK 1: Si API-Football échoue, essayer Football-Data.org ===
-            if not home_matchs_data and match.home_team_id:
-                try:
-                    fd_matches = await football_data_service.get_team_matches(
-                        match.home_team_id, status="FINISHED", limit=10
-                    )
-                    for fd_match in fd_matches.get("matches", [])[:10]:
-                        is_home = fd_match.get("homeTeam", {}).get("id") == match.home_team_id
-                        h_score = fd_match.get("score", {}).get("fullTime", {}).get("home", 0) or 0
-                        a_score = fd_match.get("score", {}).get("fullTime", {}).get("away", 0) or 0
-                        
-                        if is_home:
-                            buts_pour, buts_contre = h_score, a_score
-                        else:
-                            buts_pour, buts_contre = a_score, h_score
-                        
-                        if buts_pour > buts_contre:
-                            resultat = 'V'
-                        elif buts_pour < buts_contre:
-                            resultat = 'D'
-                        else:
-                            resultat = 'N'
-                        
-                        home_matchs_data.append({
-                            'date': fd_match.get("utcDate", ""),
-                            'domicile': is_home,
-                            'resultat': resultat,
-                            'buts_pour': buts_pour,
-                            'buts_contre': buts_contre,
-                            'adversaire_classement': 10,
-                            'competition': fd_match.get("competition", {}).get("name", "Championnat")
-                        })
-                    if home_matchs_data:
-                        print(f"APEX-30 Fallback FD: {match.home_team} - {len(home_matchs_data)} matchs")
-                except Exception as e:
-                    print(f"Football-Data.org fallback error for {match.home_team}: {e}")
-            
-            if not away_matchs_data and match.away_team_id:
-                try:
-                    fd_matches = await football_data_service.get_team_matches(
-                        match.away_team_id, status="FINISHED", limit=10
-                    )
-                    for fd_match in fd_matches.get("matches", [])[:10]:
-                        is_home = fd_match.get("homeTeam", {}).get("id") == match.away_team_id
-                        h_score = fd_match.get("score", {}).get("fullTime", {}).get("home", 0) or 0
-                        a_score = fd_match.get("score", {}).get("fullTime", {}).get("away", 0) or 0
-                        
-                        if is_home:
-                            buts_pour, buts_contre = h_score, a_score
-                        else:
-                            buts_pour, buts_contre = a_score, h_score
-                        
-                        if buts_pour > buts_contre:
-                            resultat = 'V'
-                        elif buts_pour < buts_contre:
-                            resultat = 'D'
-                        else:
-                            resultat = 'N'
-                        
-                        away_matchs_data.append({
-                            'date': fd_match.get("utcDate", ""),
-                            'domicile': is_home,
-                            'resultat': resultat,
-                            'buts_pour': buts_pour,
-                            'buts_contre': buts_contre,
-                            'adversaire_classement': 10,
-                            'competition': fd_match.get("competition", {}).get("name", "Championnat")
-                        })
-                    if away_matchs_data:
-                        print(f"APEX-30 Fallback FD: {match.away_team} - {len(away_matchs_data)} matchs")
-                except Exception as e:
-                    print(f"Football-Data.org fallback error for {match.away_team}: {e}")
-            
-            # === FALLBACK 2: Si toujours vide, utiliser les données de forme ===
-            from datetime import datetime, timedelta
-            
-            if not home_matchs_data and home_entry:
-                # Générer un historique simulé à partir de la forme (VVNDD)
-                form_str = home_entry.get("form", "NNNNN") or "NNNNN"
-                print(f"APEX-30 Fallback: {match.home_team} - utilisation forme {form_str}")
-                for i, res in enumerate(form_str[:10]):
-                    result_map = {'W': 'V', 'D': 'N', 'L': 'D', 'V': 'V', 'N': 'N'}
-                    home_matchs_data.append({
-                        'date': (datetime.now() - timedelta(days=(i+1)*7)).isoformat(),
-                        'domicile': (i % 2 == 0),
-                        'resultat': result_map.get(res, 'N'),
-                        'buts_pour': 2 if res in ['W', 'V'] else (1 if res in ['D', 'N'] else 0),
-                        'buts_contre': 0 if res in ['W', 'V'] else (1 if res in ['D', 'N'] else 2),
-                        'adversaire_classement': 10,
-                        'competition': 'Championnat'
-                    })
-            
-            if not away_matchs_data and away_entry:
-                form_str = away_entry.get("form", "NNNNN") or "NNNNN"
-                print(f"APEX-30 Fallback: {match.away_team} - utilisation forme {form_str}")
-                for i, res in enumerate(form_str[:10]):
-                    result_map = {'W': 'V', 'D': 'N', 'L': 'D', 'V': 'V', 'N': 'N'}
-                    away_matchs_data.append({
-                        'date': (datetime.now() - timedelta(days=(i+1)*7)).isoformat(),
-                        'domicile': (i % 2 == 1),
-                        'resultat': result_map.get(res, 'N'),
-                        'buts_pour': 2 if res in ['W', 'V'] else (1 if res in ['D', 'N'] else 0),
-                        'buts_contre': 0 if res in ['W', 'V'] else (1 if res in ['D', 'N'] else 2),
-                        'adversaire_classement': 10,
-                        'competition': 'Championnat'
-                    })
-            
             equipe_home = creer_equipe_analyse(
                 nom=match.home_team,
                 matchs_recents=home_matchs_data,
@@ -1065,23 +1361,6 @@ class PredictionService:
                 'recent_winners': h2h_data_apex.get('recent_winners', [])
             })
             
-            # Récupérer les blessures des deux équipes (Module Absences)
-            injuries_home = []
-            injuries_away = []
-            try:
-                from services.api_football import api_football_service
-                home_injuries_data = await api_football_service.get_team_injuries(match.home_team)
-                if home_injuries_data.get('success'):
-                    injuries_home = home_injuries_data.get('injuries', [])
-                    print(f"🏥 {match.home_team}: {len(injuries_home)} blessés")
-                
-                away_injuries_data = await api_football_service.get_team_injuries(match.away_team)
-                if away_injuries_data.get('success'):
-                    injuries_away = away_injuries_data.get('injuries', [])
-                    print(f"🏥 {match.away_team}: {len(injuries_away)} blessés")
-            except Exception as e:
-                print(f"⚠️ Impossible de récupérer les blessures: {e}")
-            
             # Lancer l'analyse APEX-30 (avec blessures)
             try:
                 apex_result = apex30.analyser_match(
@@ -1090,12 +1369,7 @@ class PredictionService:
                     injuries_b=injuries_away
                 )
                 
-                # Extraire les résultats
-                decision = apex_result['decision']
-                ml_home_score = decision['home_goals']
-                ml_away_score = decision['away_goals']
-                ml_confidence = decision['confiance_pct']
-                ml_tip = decision['pronostic']
+                apex_decision = apex_result['decision']
                 
                 # Sauvegarder les scores détaillés pour le frontend
                 import json
@@ -1104,59 +1378,56 @@ class PredictionService:
                     'equipe_away': apex_result['equipe_b']['scores']
                 })
                 
-                print(f"APEX-30 SUCCESS: {match.home_team} vs {match.away_team} -> {ml_home_score}-{ml_away_score}")
+                logger.debug(
+                    "APEX-30 SUCCESS: %s vs %s -> %s-%s", match.home_team, match.away_team,
+                    apex_decision['home_goals'], apex_decision['away_goals']
+                )
                 
             except Exception as e:
                 # Fallback si APEX-30 échoue
-                print(f"❌ APEX-30 ERROR for {match.home_team} vs {match.away_team}: {str(e)}")
-                import traceback
-                traceback.print_exc()
-                ml_home_strength = home_form
-                ml_away_strength = away_form
-                ml_home_score, ml_away_score = self._predict_score(
-                    ml_home_strength, ml_away_strength,
-                    home_goals_avg, away_goals_avg
+                logger.warning(
+                    "❌ APEX-30 ERROR for %s vs %s: %s",
+                    match.home_team, match.away_team, e, exc_info=True
                 )
-                ml_confidence = min(0.7, 0.3 + abs(home_form - away_form))
-                ml_tip = self._generate_bet_tip(ml_home_score, ml_away_score, ml_confidence)
+                apex_decision = None
                 ml_analysis = None
             
         except Exception as e:
-            # Fallback si APEX-30 échoue
-            print(f"APEX-30 fallback: {e}")
-            import traceback
-            traceback.print_exc()
-            ml_home_strength = home_form
-            ml_away_strength = away_form
-            ml_home_score, ml_away_score = self._predict_score(
-                ml_home_strength, ml_away_strength,
-                home_goals_avg, away_goals_avg
-            )
-            ml_confidence = min(0.7, 0.3 + abs(home_form - away_form))
-            ml_tip = self._generate_bet_tip(ml_home_score, ml_away_score, ml_confidence)
-            ml_analysis = None
+            # Fallback si APEX-30 échoue: Ma Logique repliée sur la forme
+            logger.warning("APEX-30 fallback: %s", e, exc_info=True)
+        
+        # === 3 LOGIQUES + CONSENSUS FINAL ===
+        # Buts attendus des 3 logiques, pondérés par la confiance, puis
+        # une seule matrice de scores dont dérivent score et marchés
+        forecast = self.logic_forecast(
+            home_strength, away_strength, league_level,
+            home_form, away_form, home_goals_avg, away_goals_avg,
+            home_h2h=home_h2h, away_h2h=away_h2h,
+            apex_decision=apex_decision,
+            rotation=(rotation_factor_home, rotation_factor_away),
+            papa_confidence_factor=papa_confidence_factor
+        )
+        papa_confidence = forecast.papa_confidence
+        papa_home_score, papa_away_score = match_markets(*forecast.papa_xg).score
+        papa_tip = self._generate_bet_tip(papa_home_score, papa_away_score, papa_confidence)
         
-        # === CONSENSUS FINAL ===
-        # Moyenne des 3 logiques, pondérée par la confiance
-        total_weight = papa_confidence + gf_confidence + ml_confidence
+        gf_confidence = forecast.grand_frere_confidence
+        gf_home_score, gf_away_score = match_markets(*forecast.grand_frere_xg).score
+        gf_tip = self._generate_bet_tip(gf_home_score, gf_away_score, gf_confidence)
         
-        if total_weight > 0:
-            home_goals = round(
-                (papa_home_score * papa_confidence + 
-                 gf_home_score * gf_confidence + 
-                 ml_home_score * ml_confidence) / total_weight
-            )
-            away_goals = round(
-                (papa_away_score * papa_confidence + 
-                 gf_away_score * gf_confidence + 
-                 ml_away_score * ml_confidence) / total_weight
-            )
+        ml_confidence = forecast.ma_logique_confidence
+        if apex_decision is not None:
+            ml_home_score, ml_away_score = apex_decision['home_goals'], apex_decision['away_goals']
+            ml_tip = apex_decision['pronostic']
         else:
-            home_goals = 1
-            away_goals = 1
+            ml_home_score, ml_away_score = match_markets(*forecast.ma_logique_xg).score
+            ml_tip = self._generate_bet_tip(ml_home_score, ml_away_score, ml_confidence)
+        
+        markets = match_markets(*forecast.expected_goals)
+        home_goals, away_goals = markets.score
         
         # Confiance finale = moyenne des confiances
-        confidence = round((papa_confidence + gf_confidence + ml_confidence) / 3, 2)
+        confidence = round(forecast.confidence, 2)
         
         # Générer conseil et analyse
         bet_tip = self._generate_bet_tip(home_goals, away_goals, confidence)
@@ -1175,9 +1446,8 @@ class PredictionService:
         away_upcoming_json = json.dumps(away_upcoming, default=str) if away_upcoming else None
         away_recent_json = json.dumps(away_recent, default=str) if away_recent else None
         
-        # Créer la prédiction avec les 3 logiques
-        prediction = ExpertPrediction(
-            match_id=match.id,
+        # Créer (ou mettre à jour) la prédiction avec les 3 logiques
+        return self._save_prediction(match, existing, fingerprint, dict(
             # Score final (consensus)
             home_score_forecast=home_goals,
             away_score_forecast=away_goals,
@@ -1186,6 +1456,7 @@ class PredictionService:
             away_goals_avg=round(away_goals_avg, 2),
             analysis=analysis,
             bet_tip=bet_tip,
+            **self._markets_fields(markets),
             # Logique de Papa
             papa_home_score=papa_home_score,
             papa_away_score=papa_away_score,
@@ -1222,15 +1493,9 @@ class PredictionService:
             # Grand Frère : Analyse combinée
             gf_home_league_level=round(gf_home_league, 2) if gf_home_league else 0.5,
             gf_away_league_level=round(gf_away_league, 2) if gf_away_league else 0.5,
-            gf_home_advantage_bonus=round(home_adv, 3) if home_adv else 0.1,
+            gf_home_advantage_bonus=round(forecast.home_advantage, 3) if forecast.home_advantage else 0.1,
             gf_verdict=gf_verdict
-        )
-        
-        self.db.add(prediction)
-        self.db.commit()
-        self.db.refresh(prediction)
-        
-        return prediction
+        ))
     
     async def generate_predictions_for_upcoming(self, limit: int = 20) -> int:
         """
@@ -1260,7 +1525,7 @@ class PredictionService:
         
         # Étape 3: Trouver TOUS les matchs sans prédiction (pas de filtre de date!)
         # On filtre seulement par statut et on exclut ceux déjà prédits
-        valid_statuses = ["SCHEDULED", "TIMED", "CALENDAR", "IN_PLAY", "PAUSED"]
+        valid_statuses = self.PREDICTABLE_STATUSES
         
         if existing_prediction_ids:
             matches_query = self.db.query(Match).filter(
@@ -1287,7 +1552,9 @@ class PredictionService:
             sample = self.db.query(Match).first()
             logger.warning(f"⚠️ Aucun match éligible. Exemple en base: {sample.home_team} vs {sample.away_team}, Status={sample.status}")
         
-        # Étape 4: Générer les prédictions
+        # Étape 4: Générer les prédictions (features et calendrier du lot en 2 requêtes)
+        self.prefetch_features(matches)
+        self.prefetch_important_matches(matches)
         count = 0
         for match in matches:
             try:
@@ -1296,4 +1563,60 @@ class PredictionService:
             except Exception:
                 continue
         
+        if count:
+            refresh_market_and_value_bets(self.db, [m.id for m in matches])
         return count
+    
+    async def recompute_predictions(self, matches: List[Match]) -> Dict[str, Any]:
+        """
+        Recalcule les prédictions d'un lot de matchs.
+        
+        Seules les prédictions dont l'empreinte des entrées (ou la version du
+        modèle) a changé sont réécrites; les autres sont comptées "unchanged".
+        
+        Args:
+            matches: Matchs à recalculer
+            
+        Returns:
+            Compteurs {"created", "updated", "unchanged", "skipped", "errors"}
+            et "error_messages" ("domicile vs extérieur: erreur" par échec)
+        """
+        self.prefetch_features(matches)
+        self.prefetch_important_matches(matches)
+        
+        report = {"created": 0, "updated": 0, "unchanged": 0, "skipped": 0, "errors": 0}
+        error_messages = []
+        for match in matches:
+            try:
+                _, status = await self._generate_prediction(match, refresh=True)
+                report[status] += 1
+            except Exception as e:
+                self.db.rollback()
+                report["errors"] += 1
+                error_messages.append(f"{match.home_team} vs {match.away_team}: {e}")
+                logger.warning(f"⚠️ Recalcul impossible pour le match {match.id}: {e}")
+        
+        if report["created"] or report["updated"]:
+            # Probabilités du modèle changées: mélange et value bets à refaire
+            refresh_market_and_value_bets(self.db, [m.id for m in matches])
+        
+        logger.info(
+            f"♻️ Recalcul: {report['created']} créées, {report['updated']} mises à jour, "
+            f"{report['unchanged']} inchangées, {report['skipped']} ignorées, {report['errors']} erreurs"
+        )
+        return {**report, "error_messages": error_messages}
+    
+    async def recompute_upcoming(self, limit: int = 20) -> Dict[str, Any]:
+        """
+        Recalcule les prédictions des prochains matchs (prédits ou non).
+        
+        Args:
+            limit: Nombre maximum de matchs à traiter
+            
+        Returns:
+            Compteurs du recalcul (voir recompute_predictions)
+        """
+        matches = self.db.query(Match).filter(
+            Match.status.in_(self.PREDICTABLE_STATUSES)
+        ).order_by(Match.match_date).limit(limit).all()
+        return await self.recompute_predictions(matches)
@@ -0,0 +1,163 @@
+"""
+Modèle de matrice de scores (Poisson / Dixon-Coles), vectorisé.
+
+À partir des buts attendus (λ domicile, λ extérieur) d'un match, on construit
+la matrice N×N des probabilités de chaque score exact. Tous les marchés
+(1X2, plus/moins de 2.5 buts, les deux équipes marquent, score le plus
+probable) sont dérivés de cette seule matrice, en une passe.
+
+Les fonctions acceptent des tableaux de λ: un lot de milliers de matchs est
+traité en quelques opérations numpy (tenseur M×N×N).
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Tuple, Union
+
+import numpy as np
+
+# Score maximum modélisé par équipe (matrice 11×11: 0 à 10 buts)
+MAX_GOALS = 10
+
+# Corrélation Dixon-Coles des scores faibles (0-0, 1-0, 0-1, 1-1)
+DIXON_COLES_RHO = -0.13
+
+# Bornes des buts attendus (évite les λ nuls ou aberrants)
+MIN_EXPECTED_GOALS = 0.05
+MAX_EXPECTED_GOALS = 6.0
+
+ArrayLike = Union[float, List[float], np.ndarray]
+
+
+def _poisson_pmf(lam: np.ndarray, max_goals: int) -> np.ndarray:
+    """Probabilités de Poisson P(k), k = 0..max_goals, pour chaque λ (M×N)."""
+    k = np.arange(max_goals + 1)
+    log_factorial = np.concatenate(([0.0], np.cumsum(np.log(np.arange(1, max_goals + 1)))))
+    return np.exp(-lam[:, None] + k[None, :] * np.log(lam[:, None]) - log_factorial[None, :])
+
+
+def score_matrices(
+    home_expected: ArrayLike,
+    away_expected: ArrayLike,
+    rho: float = DIXON_COLES_RHO,
+    max_goals: int = MAX_GOALS
+) -> np.ndarray:
+    """
+    Matrices de probabilités des scores pour un lot de matchs.
+
+    Args:
+        home_expected: Buts attendus domicile (scalaire ou tableau de M valeurs)
+        away_expected: Buts attendus extérieur (même forme)
+        rho: Paramètre Dixon-Coles (0 = Poisson indépendant)
+        max_goals: Score maximum modélisé par équipe
+
+    Returns:
+        Tableau M×N×N: [m, i, j] = P(domicile marque i, extérieur marque j)
+    """
+    lam_home = np.clip(np.atleast_1d(np.asarray(home_expected, dtype=float)), MIN_EXPECTED_GOALS, MAX_EXPECTED_GOALS)
+    lam_away = np.clip(np.atleast_1d(np.asarray(away_expected, dtype=float)), MIN_EXPECTED_GOALS, MAX_EXPECTED_GOALS)
+
+    matrices = _poisson_pmf(lam_home, max_goals)[:, :, None] * _poisson_pmf(lam_away, max_goals)[:, None, :]
+
+    if rho:
+        # Correction Dixon-Coles des scores faibles
+        matrices[:, 0, 0] *= np.maximum(0.0, 1 - lam_home * lam_away * rho)
+        matrices[:, 0, 1] *= 1 + lam_home * rho
+        matrices[:, 1, 0] *= 1 + lam_away * rho
+        matrices[:, 1, 1] *= 1 - rho
+
+    # Renormaliser (troncature à max_goals + correction)
+    matrices /= matrices.sum(axis=(1, 2), keepdims=True)
+    return matrices
+
+
+def derive_markets(matrices: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Dérive tous les marchés d'un lot de matrices en une passe.
+
+    Le score retenu est le plus probable PARMI les scores de l'issue 1X2 la
+    plus probable: il reste cohérent avec le pronostic 1/N/2.
+
+    Args:
+        matrices: Tableau M×N×N issu de score_matrices
+
+    Returns:
+        Dictionnaire de tableaux de M valeurs: home_win, draw, away_win,
+        over_2_5, btts, expected_home_goals, expected_away_goals,
+        home_goals, away_goals (score retenu)
+    """
+    n = matrices.shape[1]
+    goals = np.arange(n)
+    i, j = np.meshgrid(goals, goals, indexing="ij")
+    home_mask = i > j
+    draw_mask = i == j
+    away_mask = i < j
+
+    home_win = matrices[:, home_mask].sum(axis=1)
+    draw = matrices[:, draw_mask].sum(axis=1)
+    away_win = matrices[:, away_mask].sum(axis=1)
+
+    # Score le plus probable dans l'issue la plus probable
+    outcome = np.argmax(np.stack([home_win, draw, away_win], axis=1), axis=1)
+    masks = np.stack([home_mask, draw_mask, away_mask])[outcome]
+    best = np.where(masks, matrices, -1.0).reshape(len(matrices), -1).argmax(axis=1)
+
+    return {
+        "home_win": home_win,
+        "draw": draw,
+        "away_win": away_win,
+        "over_2_5": matrices[:, (i + j) > 2].sum(axis=1),
+        "btts": matrices[:, 1:, 1:].sum(axis=(1, 2)),
+        "expected_home_goals": (matrices.sum(axis=2) * goals).sum(axis=1),
+        "expected_away_goals": (matrices.sum(axis=1) * goals).sum(axis=1),
+        "home_goals": best // n,
+        "away_goals": best % n,
+    }
+
+
+@dataclass
+class MatchMarkets:
+    """Marchés d'un match dérivés de sa matrice de scores."""
+    home_win: float
+    draw: float
+    away_win: float
+    over_2_5: float
+    btts: float
+    expected_home_goals: float
+    expected_away_goals: float
+    home_goals: int
+    away_goals: int
+    matrix: np.ndarray
+
+    @property
+    def score(self) -> Tuple[int, int]:
+        return self.home_goals, self.away_goals
+
+    def matrix_as_list(self, decimals: int = 5) -> List[List[float]]:
+        """Matrice arrondie, sérialisable en JSON (cache par prédiction)."""
+        return np.round(self.matrix, decimals).tolist()
+
+
+def match_markets(
+    home_expected: float,
+    away_expected: float,
+    rho: float = DIXON_COLES_RHO,
+    max_goals: int = MAX_GOALS
+) -> MatchMarkets:
+    """
+    Matrice et marchés d'un seul match.
+
+    Args:
+        home_expected: Buts attendus domicile
+        away_expected: Buts attendus extérieur
+        rho: Paramètre Dixon-Coles
+        max_goals: Score maximum modélisé par équipe
+
+    Returns:
+        MatchMarkets
+    """
+    matrices = score_matrices(home_expected, away_expected, rho=rho, max_goals=max_goals)
+    markets = derive_markets(matrices)
+    return MatchMarkets(
+        **{key: (int(value[0]) if key in ("home_goals", "away_goals") else float(value[0]))
+           for key, value in markets.items()},
+        matrix=matrices[0]
+    )
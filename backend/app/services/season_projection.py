@@ -0,0 +1,436 @@
+"""
+Projections de fin de saison par simulation de Monte Carlo.
+
+À partir du classement actuel (`standings`), des matchs restants du
+championnat et des probabilités 1X2 de chaque match, la fin de saison est
+simulée des dizaines de milliers de fois (numpy vectorisé, par lots). On
+en tire la distribution des positions finales de chaque équipe: titre,
+places européennes, relégation.
+
+Probabilités d'un match restant, par ordre de priorité:
+1. Prédiction enregistrée (matrice de scores des moteurs, ou mélange
+   modèle/marché avec MARKET_BLEND_MODEL_INPUT)
+2. Elo courant des deux équipes (services.team_ratings)
+3. Fréquences moyennes des championnats
+
+Une projection est gardée en mémoire (LRU borné) jusqu'à la prochaine
+synchronisation du classement (clé: dernier `Standing.last_synced`). Le
+nombre de simulations demandé est arrondi à quelques niveaux fixes: la clé
+du cache ne dépend pas d'un nombre arbitraire choisi par le client.
+
+Les projections demandées par l'API sont simulées lot par lot dans le
+thread appelant. Après chaque synchronisation des classements, le
+scheduler précalcule les projections des championnats (precompute) en
+répartissant les lots sur le pool de processus, créé une fois (contexte
+spawn: pas de fork d'un processus dont des threads tournent): l'API sert
+alors le cache.
+"""
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+import logging
+import multiprocessing
+import os
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from models.match import Match
+from models.prediction import ExpertPrediction
+from models.standing import Standing
+from services.feature_store import season_window
+from services.market_probabilities import prediction_input_probabilities
+from services.score_matrix import derive_markets, score_matrices
+from services.team_ratings import TeamRatingService, rating_expected_goals
+
+logger = logging.getLogger(__name__)
+
+# Statuts des matchs restant à jouer
+REMAINING_STATUSES = ("SCHEDULED", "TIMED")
+
+# Zones du classement: (places européennes, places de relégation)
+PROJECTION_ZONES = {
+    "PL": (5, 3),
+    "PD": (5, 3),
+    "BL1": (4, 2),
+    "SA": (4, 3),
+    "FL1": (3, 3),
+    "PPL": (2, 2),
+    "DED": (2, 2),
+    "ELC": (2, 3),
+}
+DEFAULT_ZONES = (4, 3)
+
+# Issues moyennes d'un match de championnat (domicile, nul, extérieur)
+BASE_RATES = (0.45, 0.27, 0.28)
+
+# Nombre de simulations par défaut et taille d'un lot (mémoire: lot × matchs)
+DEFAULT_SIMULATIONS = 20000
+SHARD_SIZE = 5000
+
+# Niveaux de simulation servis (le nombre demandé est arrondi au niveau supérieur)
+SIMULATION_LEVELS = (5000, 20000, 50000)
+
+# Projections gardées en mémoire (compétitions × niveaux)
+PROJECTION_CACHE_SIZE = 32
+
+
+def normalize_simulations(requested: int) -> int:
+    """Niveau de simulation servi pour un nombre demandé (plafonné au plus haut niveau)."""
+    for level in SIMULATION_LEVELS:
+        if requested <= level:
+            return level
+    return SIMULATION_LEVELS[-1]
+
+
+@dataclass
+class TeamProjection:
+    """Projection de fin de saison d'une équipe."""
+    team_id: int
+    team_name: str
+    position: int
+    points: int
+    expected_points: float
+    expected_position: float
+    # position_probabilities[k] = P(finir (k+1)ème)
+    position_probabilities: List[float]
+    title: float
+    europe: float
+    relegation: float
+
+
+@dataclass
+class SeasonProjection:
+    """Distribution des classements finaux d'un championnat."""
+    competition_code: str
+    season: int
+    simulations: int
+    remaining_matches: int
+    generated_at: datetime
+    teams: List[TeamProjection] = field(default_factory=list)
+
+
+def simulate_positions(
+    points: np.ndarray,
+    goal_diff: np.ndarray,
+    home_idx: np.ndarray,
+    away_idx: np.ndarray,
+    probabilities: np.ndarray,
+    simulations: int,
+    seed
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Simule un lot de fins de saison (fonction pure, exécutable dans un processus).
+
+    L'écart de buts évolue de ±1 par victoire simulée; les égalités restantes
+    sont départagées au hasard.
+
+    Args:
+        points: Points actuels (T)
+        goal_diff: Différence de buts actuelle (T)
+        home_idx: Index de l'équipe à domicile de chaque match restant (F)
+        away_idx: Index de l'équipe à l'extérieur (F)
+        probabilities: Probabilités (domicile, nul, extérieur) de chaque match (F×3)
+        simulations: Nombre de saisons simulées
+        seed: Graine (ou SeedSequence) du générateur
+
+    Returns:
+        (comptes T×T des positions finales [équipe, position], somme des points finaux par équipe)
+    """
+    rng = np.random.default_rng(seed)
+    n_teams = len(points)
+    sim_points = np.broadcast_to(points.astype(float), (simulations, n_teams)).copy()
+    sim_goal_diff = np.broadcast_to(goal_diff.astype(float), (simulations, n_teams)).copy()
+
+    if len(home_idx):
+        draws = rng.random((simulations, len(home_idx)))
+        home_win = draws < probabilities[:, 0]
+        away_win = draws >= probabilities[:, 0] + probabilities[:, 1]
+        draw = ~home_win & ~away_win
+
+        # Matrices d'incidence match -> équipe: une multiplication par côté
+        home_incidence = np.zeros((len(home_idx), n_teams))
+        home_incidence[np.arange(len(home_idx)), home_idx] = 1
+        away_incidence = np.zeros((len(away_idx), n_teams))
+        away_incidence[np.arange(len(away_idx)), away_idx] = 1
+
+        margin = home_win.astype(float) - away_win
+        sim_points += (3 * home_win + draw) @ home_incidence + (3 * away_win + draw) @ away_incidence
+        sim_goal_diff += margin @ home_incidence - margin @ away_incidence
+
+    # Points, puis différence de buts, puis tirage au sort (< 1)
+    keys = sim_points * 1000 + np.clip(sim_goal_diff, -499, 499) + rng.random((simulations, n_teams))
+    order = np.argsort(-keys, axis=1)
+    ranks = np.empty_like(order)
+    np.put_along_axis(ranks, order, np.arange(n_teams)[None, :].repeat(simulations, axis=0), axis=1)
+
+    counts = np.bincount(
+        (np.arange(n_teams)[None, :] * n_teams + ranks).ravel(), minlength=n_teams * n_teams
+    ).reshape(n_teams, n_teams)
+    return counts, sim_points.sum(axis=0)
+
+
+def _simulate_shard(args) -> Tuple[np.ndarray, np.ndarray]:
+    """Point d'entrée d'un processus du pool."""
+    return simulate_positions(*args)
+
+
+_projection_cache: "OrderedDict[Tuple[str, int], Tuple[tuple, SeasonProjection]]" = OrderedDict()
+_cache_lock = Lock()
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = Lock()
+
+
+def invalidate_projection_cache() -> None:
+    """Vide le cache des projections du processus."""
+    with _cache_lock:
+        _projection_cache.clear()
+
+
+def _cached_projection(key: Tuple[str, int], version: tuple) -> Optional[SeasonProjection]:
+    with _cache_lock:
+        cached = _projection_cache.get(key)
+        if cached is None or cached[0] != version:
+            return None
+        _projection_cache.move_to_end(key)
+        return cached[1]
+
+
+def _store_projection(key: Tuple[str, int], version: tuple, projection: SeasonProjection) -> None:
+    with _cache_lock:
+        _projection_cache[key] = (version, projection)
+        _projection_cache.move_to_end(key)
+        while len(_projection_cache) > PROJECTION_CACHE_SIZE:
+            _projection_cache.popitem(last=False)
+
+
+def offline_workers() -> int:
+    """Processus de simulation des traitements hors requête (settings.projection_workers, 0 = tous les cœurs)."""
+    return settings.projection_workers or os.cpu_count() or 1
+
+
+def _get_process_pool(workers: int) -> ProcessPoolExecutor:
+    """Pool de processus partagé (créé au premier traitement hors requête, jamais recréé)."""
+    global _process_pool
+    with _pool_lock:
+        if _process_pool is None:
+            _process_pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _process_pool
+
+
+class SeasonProjectionService:
+    """Projection des classements de fin de saison."""
+
+    def __init__(self, db: Session):
+        """
+        Initialise le service.
+
+        Args:
+            db: Session SQLAlchemy
+        """
+        self.db = db
+
+    def _latest_standings(self, competition_code: str) -> List[Standing]:
+        """Classement de la saison la plus récente, par position."""
+        season = self.db.query(func.max(Standing.season)).filter(
+            Standing.competition_code == competition_code
+        ).scalar()
+        if season is None:
+            return []
+        return self.db.query(Standing).filter(
+            Standing.competition_code == competition_code,
+            Standing.season == season
+        ).order_by(Standing.position).all()
+
+    def remaining_matches(self, competition_code: str, season: int, team_ids) -> List[Match]:
+        """Matchs restants du championnat (saison du classement) entre équipes du classement."""
+        team_ids = list(team_ids)
+        season_start, season_end = season_window(season)
+        return self.db.query(Match).filter(
+            Match.competition_code == competition_code,
+            Match.status.in_(REMAINING_STATUSES),
+            Match.match_date >= season_start,
+            Match.match_date < season_end,
+            Match.home_team_id.in_(team_ids),
+            Match.away_team_id.in_(team_ids)
+        ).order_by(Match.match_date, Match.id).all()
+
+    def match_probabilities(self, matches: List[Match]) -> np.ndarray:
+        """
+        Probabilités (domicile, nul, extérieur) de chaque match (2 requêtes).
+
+        Args:
+            matches: Matchs restants
+
+        Returns:
+            Tableau F×3
+        """
+        probabilities = np.tile(np.array(BASE_RATES), (len(matches), 1))
+        if not matches:
+            return probabilities
+
+        predictions = {
+            p.match_id: p for p in self.db.query(ExpertPrediction).filter(
+                ExpertPrediction.match_id.in_([m.id for m in matches]),
+                ExpertPrediction.prob_home_win.isnot(None)
+            )
+        }
+        team_ids = {t for m in matches for t in (m.home_team_id, m.away_team_id)}
+        ratings = TeamRatingService(self.db).current(team_ids)
+
+        from_ratings = []
+        for i, m in enumerate(matches):
+            prediction = predictions.get(m.id)
+            if prediction is not None:
+                probabilities[i] = prediction_input_probabilities(prediction)
+            elif m.home_team_id in ratings and m.away_team_id in ratings:
+                from_ratings.append(i)
+
+        if from_ratings:
+            expected = np.array([
+                rating_expected_goals(ratings[matches[i].home_team_id], ratings[matches[i].away_team_id])
+                for i in from_ratings
+            ])
+            markets = derive_markets(score_matrices(expected[:, 0], expected[:, 1]))
+            probabilities[from_ratings] = np.stack(
+                [markets["home_win"], markets["draw"], markets["away_win"]], axis=1
+            )
+        return probabilities / probabilities.sum(axis=1, keepdims=True)
+
+    def project(
+        self,
+        competition_code: str,
+        simulations: int = DEFAULT_SIMULATIONS,
+        workers: Optional[int] = None,
+        seed: Optional[int] = None
+    ) -> Optional[SeasonProjection]:
+        """
+        Projette la fin de saison d'un championnat (mise en cache jusqu'à la prochaine synchro).
+
+        Args:
+            competition_code: Code du championnat
+            simulations: Nombre de saisons simulées (arrondi à SIMULATION_LEVELS)
+            workers: Processus de simulation (défaut: 1, dans le thread appelant; > 1 pour
+                les traitements hors requête, voir offline_workers())
+            seed: Graine (reproductibilité)
+
+        Returns:
+            SeasonProjection, ou None sans classement
+        """
+        code = competition_code.upper()
+        last_synced = self.db.query(func.max(Standing.last_synced)).filter(
+            Standing.competition_code == code
+        ).scalar()
+        if last_synced is None:
+            return None
+        simulations = normalize_simulations(simulations)
+        version = (last_synced, seed)
+        cached = _cached_projection((code, simulations), version)
+        if cached is not None:
+            return cached
+
+        standings = self._latest_standings(code)
+        season = standings[0].season
+        index = {s.team_id: i for i, s in enumerate(standings)}
+        matches = self.remaining_matches(code, season, index)
+        probabilities = self.match_probabilities(matches)
+
+        args = (
+            np.array([s.points or 0 for s in standings]),
+            np.array([s.goal_difference or 0 for s in standings]),
+            np.array([index[m.home_team_id] for m in matches], dtype=int),
+            np.array([index[m.away_team_id] for m in matches], dtype=int),
+            probabilities,
+        )
+        counts, points_sum = self._simulate(args, simulations, workers, seed)
+
+        projection = self._to_projection(code, season, standings, len(matches), simulations, counts, points_sum)
+        _store_projection((code, simulations), version, projection)
+        logger.info(f"🎲 Projection {code} {season}: {simulations} simulations, {len(matches)} matchs restants")
+        return projection
+
+    def precompute(self, simulations: int = DEFAULT_SIMULATIONS) -> int:
+        """
+        Précalcule la projection de chaque championnat (remplit le cache).
+
+        Traitement hors requête: les lots sont répartis sur le pool de
+        processus (offline_workers()).
+
+        Args:
+            simulations: Nombre de saisons simulées
+
+        Returns:
+            Nombre de projections calculées
+        """
+        workers = offline_workers()
+        count = 0
+        for code in PROJECTION_ZONES:
+            try:
+                if self.project(code, simulations=simulations, workers=workers) is not None:
+                    count += 1
+            except Exception as e:
+                logger.warning(f"⚠️ Projection {code} non précalculée: {e}")
+        return count
+
+    def _simulate(self, args: tuple, simulations: int, workers: Optional[int], seed: Optional[int]):
+        """Répartit les simulations en lots (pool de processus partagé si workers > 1)."""
+        sizes = [SHARD_SIZE] * (simulations // SHARD_SIZE)
+        if simulations % SHARD_SIZE:
+            sizes.append(simulations % SHARD_SIZE)
+        seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+        shards = [args + (size, shard_seed) for size, shard_seed in zip(sizes, seeds)]
+
+        if workers is not None and workers > 1 and len(shards) > 1:
+            results = list(_get_process_pool(workers).map(_simulate_shard, shards))
+        else:
+            results = [_simulate_shard(shard) for shard in shards]
+
+        counts = sum(r[0] for r in results)
+        points_sum = sum(r[1] for r in results)
+        return counts, points_sum
+
+    @staticmethod
+    def _to_projection(
+        code: str,
+        season: int,
+        standings: List[Standing],
+        remaining: int,
+        simulations: int,
+        counts: np.ndarray,
+        points_sum: np.ndarray
+    ) -> SeasonProjection:
+        n_teams = len(standings)
+        europe, relegation = PROJECTION_ZONES.get(code, DEFAULT_ZONES)
+        distribution = counts / simulations
+        positions = np.arange(1, n_teams + 1)
+        teams = [
+            TeamProjection(
+                team_id=s.team_id,
+                team_name=s.team_name,
+                position=s.position,
+                points=s.points or 0,
+                expected_points=round(float(points_sum[i] / simulations), 2),
+                expected_position=round(float(distribution[i] @ positions), 2),
+                position_probabilities=[round(float(p), 4) for p in distribution[i]],
+                title=round(float(distribution[i, 0]), 4),
+                europe=round(float(distribution[i, :europe].sum()), 4),
+                relegation=round(float(distribution[i, n_teams - relegation:].sum()), 4) if relegation < n_teams else 0.0,
+            )
+            for i, s in enumerate(standings)
+        ]
+        return SeasonProjection(
+            competition_code=code,
+            season=season,
+            simulations=simulations,
+            remaining_matches=remaining,
+            generated_at=datetime.now(timezone.utc),
+            teams=teams,
+        )
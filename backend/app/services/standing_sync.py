@@ -9,7 +9,9 @@ from datetime import datetime, timezone
 from typing import Optional, List
 from sqlalchemy.orm import Session
 
+from core.cache import bump_data_version
 from models.standing import Standing
+from services.competition_sync import CompetitionSyncService
 from services.football_api import football_data_service
 
 logger = logging.getLogger(__name__)
@@ -146,7 +148,12 @@ class StandingSyncService:
                     self._upsert_standing(parsed)
                     count += 1
             
+            # Journée en cours du catalogue, sans appel API supplémentaire
+            CompetitionSyncService(self.db).update_current_season(
+                competition.get("code", competition_code), season.get("id"), season.get("currentMatchday")
+            )
             self.db.commit()
+            bump_data_version()
             if count > 0:
                 logger.info(f"Successfully synced {count} entries for {competition_code}")
             return count
@@ -0,0 +1,488 @@
+"""
+Classement Elo des équipes.
+
+Une force d'équipe précalculée, comparable d'un championnat à l'autre et
+disponible dès la première journée (contrairement à `1 - position/total`):
+- `team_ratings`: Elo courant, mis à jour en O(1) par match terminé
+  pendant la synchronisation (un match arrivé en retard fait recalculer
+  les équipes touchées à partir de sa date);
+- `team_rating_history`: Elo après chaque match, pour les lectures
+  point-in-time (prédictions, backtests).
+
+Une équipe nouvelle part de l'Elo a priori de son championnat
+(DEFAULT_LEAGUE_STRENGTH); en début de saison l'Elo est ramené en partie
+vers cette valeur. La reconstruction complète est un seul passage
+chronologique sur `matches`.
+"""
+import logging
+from bisect import bisect_left
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from models.match import Match
+from models.team_rating import TeamRating, TeamRatingHistory
+from services.feature_store import CUP_COMPETITIONS, LOOKBACK_DAYS, naive_utc, season_of
+from services.league_coefficients import prior_strength
+
+logger = logging.getLogger(__name__)
+
+# Paramètres Elo
+BASE_RATING = 1500.0
+K_FACTOR = 20.0
+HOME_ADVANTAGE_ELO = 65.0
+LEAGUE_RATING_SPREAD = 400.0   # Écart Elo de départ pour 1.0 de force de championnat
+SEASON_REGRESSION = 0.2        # Part de l'écart à l'a priori effacée à chaque nouvelle saison
+AVERAGE_MATCH_GOALS = 2.7      # Buts par match (conversion Elo -> buts attendus)
+
+# Mélange avec la force issue du classement: l'Elo pèse tout en début de
+# saison, puis MIN_RATING_WEIGHT une fois EARLY_SEASON_MATCHES joués
+EARLY_SEASON_MATCHES = 10
+MIN_RATING_WEIGHT = 0.3
+
+
+def initial_rating(league_code: Optional[str]) -> float:
+    """Elo de départ d'une équipe selon la force a priori de son championnat."""
+    if not league_code:
+        return BASE_RATING
+    return BASE_RATING + (prior_strength(league_code) - 0.75) * LEAGUE_RATING_SPREAD
+
+
+def expected_home_score(home_rating: float, away_rating: float, neutral: bool = False) -> float:
+    """Score attendu de l'équipe à domicile (victoire = 1, nul = 0.5), sans avantage si terrain neutre."""
+    advantage = 0.0 if neutral else HOME_ADVANTAGE_ELO
+    return 1 / (1 + 10 ** ((away_rating - home_rating - advantage) / 400))
+
+
+def goal_difference_multiplier(goal_diff: int) -> float:
+    """Multiplicateur du K selon l'écart de buts (barème World Football Elo)."""
+    goal_diff = abs(goal_diff)
+    if goal_diff <= 1:
+        return 1.0
+    if goal_diff == 2:
+        return 1.5
+    return (11 + goal_diff) / 8
+
+
+def rating_expected_goals(home_rating: float, away_rating: float, neutral: bool = False) -> Tuple[float, float]:
+    """Buts attendus (domicile, extérieur): buts moyens d'un match répartis selon le score attendu."""
+    share = expected_home_score(home_rating, away_rating, neutral)
+    return AVERAGE_MATCH_GOALS * share, AVERAGE_MATCH_GOALS * (1 - share)
+
+
+def rating_strength(rating: float) -> float:
+    """Force 0-1: score attendu face à une équipe moyenne (BASE_RATING) sur terrain neutre."""
+    return 1 / (1 + 10 ** ((BASE_RATING - rating) / 400))
+
+
+def blend_strength(position_strength: Optional[float], rating: Optional[float], played: int = 0) -> float:
+    """
+    Force d'une équipe: classement et Elo, l'Elo pesant plus en début de saison.
+
+    Args:
+        position_strength: `1 - position/total` (None si hors classement)
+        rating: Elo point-in-time (None si inconnu)
+        played: Matchs de championnat joués cette saison
+
+    Returns:
+        Force entre 0 et 1 (0.5 sans aucune donnée)
+    """
+    if rating is None:
+        return position_strength if position_strength is not None else 0.5
+    if position_strength is None:
+        return rating_strength(rating)
+    weight = max(MIN_RATING_WEIGHT, 1 - (played or 0) / EARLY_SEASON_MATCHES)
+    return weight * rating_strength(rating) + (1 - weight) * position_strength
+
+
+@dataclass(frozen=True)
+class RatingState:
+    """Elo d'une équipe à un instant donné (valeur immuable)."""
+    team_id: int
+    rating: float
+    season: int
+    league_code: Optional[str] = None
+    matches: int = 0
+    last_match_id: Optional[int] = None
+    last_match_date: Optional[datetime] = None
+
+    @classmethod
+    def initial(cls, team_id: int, match: Match) -> "RatingState":
+        """État de départ d'une équipe jamais notée, à la date de son premier match."""
+        league_code = match.competition_code if match.competition_code not in CUP_COMPETITIONS else None
+        return cls(
+            team_id=team_id,
+            rating=initial_rating(league_code),
+            season=season_of(naive_utc(match.match_date)),
+            league_code=league_code,
+        )
+
+    def for_match(self, match: Match) -> "RatingState":
+        """État au coup d'envoi: régression vers l'a priori si la saison a changé."""
+        season = season_of(naive_utc(match.match_date))
+        if season == self.season:
+            return self
+        prior = initial_rating(self.league_code)
+        return replace(self, season=season, rating=self.rating - SEASON_REGRESSION * (self.rating - prior))
+
+    def played(self, match: Match, change: float) -> "RatingState":
+        """État après le match (variation d'Elo déjà calculée)."""
+        is_league = match.competition_code not in CUP_COMPETITIONS
+        return replace(
+            self,
+            rating=self.rating + change,
+            league_code=match.competition_code if is_league else self.league_code,
+            matches=self.matches + 1,
+            last_match_id=match.id,
+            last_match_date=naive_utc(match.match_date),
+        )
+
+    @classmethod
+    def from_row(cls, row: TeamRating) -> "RatingState":
+        return cls(
+            team_id=row.team_id,
+            rating=row.rating,
+            season=row.season,
+            league_code=row.league_code,
+            matches=row.matches or 0,
+            last_match_id=row.last_match_id,
+            last_match_date=row.last_match_date,
+        )
+
+    def to_row(self, row: Optional[TeamRating] = None) -> TeamRating:
+        row = row or TeamRating(team_id=self.team_id)
+        row.rating = self.rating
+        row.season = self.season
+        row.league_code = self.league_code
+        row.matches = self.matches
+        row.last_match_id = self.last_match_id
+        row.last_match_date = self.last_match_date
+        row.updated_at = datetime.now(timezone.utc)
+        return row
+
+
+def rate_match(
+    home: RatingState, away: RatingState, match: Match
+) -> Tuple[RatingState, RatingState, float]:
+    """
+    Applique un match terminé aux deux équipes (fonction pure, somme nulle).
+
+    Args:
+        home: État de l'équipe à domicile avant le match
+        away: État de l'équipe à l'extérieur avant le match
+        match: Match terminé (scores renseignés)
+
+    Returns:
+        (état domicile, état extérieur, variation d'Elo de l'équipe à domicile)
+    """
+    home, away = home.for_match(match), away.for_match(match)
+    goal_diff = match.score_home - match.score_away
+    actual = 1.0 if goal_diff > 0 else 0.0 if goal_diff < 0 else 0.5
+    change = K_FACTOR * goal_difference_multiplier(goal_diff) * (
+        actual - expected_home_score(home.rating, away.rating)
+    )
+    return home.played(match, change), away.played(match, -change), change
+
+
+class TeamRatingService:
+    """Lecture / écriture du classement Elo des équipes."""
+
+    def __init__(self, db: Session):
+        """
+        Initialise le service.
+
+        Args:
+            db: Session SQLAlchemy
+        """
+        self.db = db
+
+    # =========================================
+    # LECTURE
+    # =========================================
+
+    def current(self, team_ids: Iterable[int]) -> Dict[int, float]:
+        """Elo courant de plusieurs équipes (1 requête)."""
+        team_ids = {t for t in team_ids if t is not None}
+        if not team_ids:
+            return {}
+        rows = self.db.query(TeamRating.team_id, TeamRating.rating).filter(TeamRating.team_id.in_(team_ids))
+        return {team_id: rating for team_id, rating in rows}
+
+    def ratings_before(self, team_ids: Iterable[int], at: datetime) -> Dict[int, float]:
+        """
+        Elo de plusieurs équipes à une même date (1 requête).
+
+        Args:
+            team_ids: IDs des équipes
+            at: Date de lecture (exclue)
+
+        Returns:
+            Dictionnaire {team_id: Elo} (équipes sans historique absentes)
+        """
+        team_ids = {t for t in team_ids if t is not None}
+        if not team_ids:
+            return {}
+
+        latest = self.db.query(
+            TeamRatingHistory.team_id,
+            func.max(TeamRatingHistory.as_of).label("as_of")
+        ).filter(
+            TeamRatingHistory.team_id.in_(team_ids),
+            TeamRatingHistory.as_of < naive_utc(at)
+        ).group_by(TeamRatingHistory.team_id).subquery()
+
+        rows = self.db.query(TeamRatingHistory.team_id, TeamRatingHistory.rating).join(
+            latest,
+            (TeamRatingHistory.team_id == latest.c.team_id) &
+            (TeamRatingHistory.as_of == latest.c.as_of)
+        )
+        return {team_id: rating for team_id, rating in rows}
+
+    def for_matches(
+        self, matches: Iterable[Match]
+    ) -> Dict[int, Tuple[Optional[float], Optional[float]]]:
+        """
+        Elo domicile/extérieur de chaque match d'un lot, à sa date (1 requête).
+
+        Args:
+            matches: Matchs à préparer
+
+        Returns:
+            Dictionnaire {match_id: (elo_domicile, elo_exterieur)}
+        """
+        matches = [m for m in matches if m.match_date is not None]
+        if not matches:
+            return {}
+
+        team_ids = set()
+        for m in matches:
+            team_ids.update((m.home_team_id, m.away_team_id))
+        team_ids.discard(None)
+        dates = [naive_utc(m.match_date) for m in matches]
+
+        history: Dict[int, Tuple[List[datetime], List[float]]] = {}
+        if team_ids:
+            rows = self.db.query(
+                TeamRatingHistory.team_id, TeamRatingHistory.as_of, TeamRatingHistory.rating
+            ).filter(
+                TeamRatingHistory.team_id.in_(team_ids),
+                TeamRatingHistory.as_of >= min(dates) - timedelta(days=LOOKBACK_DAYS),
+                TeamRatingHistory.as_of < max(dates)
+            ).order_by(TeamRatingHistory.team_id, TeamRatingHistory.as_of)
+            for team_id, as_of, rating in rows:
+                as_ofs, ratings = history.setdefault(team_id, ([], []))
+                as_ofs.append(as_of)
+                ratings.append(rating)
+
+        def lookup(team_id: Optional[int], at: datetime) -> Optional[float]:
+            if team_id not in history:
+                return None
+            as_ofs, ratings = history[team_id]
+            i = bisect_left(as_ofs, at)
+            return ratings[i - 1] if i else None
+
+        return {
+            m.id: (lookup(m.home_team_id, at), lookup(m.away_team_id, at))
+            for m, at in zip(matches, dates)
+        }
+
+    # =========================================
+    # ÉCRITURE INCRÉMENTALE
+    # =========================================
+
+    def record_match(self, match: Match) -> int:
+        """
+        Met à jour l'Elo des deux équipes d'un match terminé (O(1), idempotent).
+
+        Si le match arrive en retard (Elo plus récent déjà calculé pour une des
+        équipes), les équipes touchées sont recalculées à partir de sa date
+        (voir _replay_from).
+
+        Args:
+            match: Match au statut FINISHED
+
+        Returns:
+            Nombre de lignes d'historique écrites
+        """
+        if (match.status != "FINISHED" or match.score_home is None or match.score_away is None
+                or match.home_team_id is None or match.away_team_id is None):
+            return 0
+        self.db.flush()  # S'assurer que le match a un id
+
+        exists = self.db.query(TeamRatingHistory.id).filter(
+            TeamRatingHistory.team_id == match.home_team_id,
+            TeamRatingHistory.match_id == match.id
+        ).first()
+        if exists:
+            return 0
+
+        rows = {
+            row.team_id: row
+            for row in self.db.query(TeamRating).filter(
+                TeamRating.team_id.in_((match.home_team_id, match.away_team_id))
+            )
+        }
+        home, away = (
+            RatingState.from_row(rows[team_id]) if team_id in rows else RatingState.initial(team_id, match)
+            for team_id in (match.home_team_id, match.away_team_id)
+        )
+        match_date = naive_utc(match.match_date)
+        if any(s.last_match_date and s.last_match_date > match_date for s in (home, away)):
+            return self._replay_from(match)
+
+        home, away, change = rate_match(home, away, match)
+        for state, delta in ((home, change), (away, -change)):
+            row = state.to_row(rows.get(state.team_id))
+            if state.team_id not in rows:
+                self.db.add(row)
+            self.db.add(TeamRatingHistory(
+                team_id=state.team_id, match_id=match.id, as_of=match_date,
+                rating=state.rating, rating_change=delta
+            ))
+        self.db.flush()
+        return 2
+
+    def _state_before(self, team_id: int, at: datetime) -> Optional[RatingState]:
+        """État Elo d'une équipe juste avant une date, relu depuis l'historique (None si jamais notée)."""
+        last = self.db.query(TeamRatingHistory).filter(
+            TeamRatingHistory.team_id == team_id,
+            TeamRatingHistory.as_of < at
+        ).order_by(TeamRatingHistory.as_of.desc(), TeamRatingHistory.id.desc()).first()
+        if last is None:
+            return None
+
+        played = self.db.query(func.count(TeamRatingHistory.id)).filter(
+            TeamRatingHistory.team_id == team_id,
+            TeamRatingHistory.as_of < at
+        ).scalar()
+        league = self.db.query(Match.competition_code).filter(
+            (Match.home_team_id == team_id) | (Match.away_team_id == team_id),
+            Match.status == "FINISHED",
+            Match.match_date < at,
+            Match.competition_code.notin_(CUP_COMPETITIONS) | Match.competition_code.is_(None)
+        ).order_by(Match.match_date.desc(), Match.id.desc()).first()
+        return RatingState(
+            team_id=team_id,
+            rating=last.rating,
+            season=season_of(last.as_of),
+            league_code=league[0] if league else None,
+            matches=played,
+            last_match_id=last.match_id,
+            last_match_date=last.as_of,
+        )
+
+    def _replay_from(self, late: Match) -> int:
+        """
+        Recalcule l'Elo des équipes touchées par un match arrivé en retard.
+
+        Les deux équipes du match sont rejouées à partir de sa date; une équipe
+        qui affronte ensuite une équipe rejouée l'est à son tour à partir de ce
+        match. Les autres équipes et l'historique antérieur ne changent pas.
+
+        Args:
+            late: Match terminé plus ancien que le dernier Elo d'une de ses équipes
+
+        Returns:
+            Nombre de lignes d'historique écrites
+        """
+        start = naive_utc(late.match_date)
+        matches = self.db.query(Match).filter(
+            Match.status == "FINISHED",
+            Match.score_home.isnot(None),
+            Match.score_away.isnot(None),
+            Match.home_team_id.isnot(None),
+            Match.away_team_id.isnot(None),
+            Match.match_date >= start
+        ).order_by(Match.match_date, Match.id).all()
+
+        states: Dict[int, RatingState] = {}
+        count = 0
+        for match in matches:
+            teams = (match.home_team_id, match.away_team_id)
+            if match.id != late.id and not any(t in states for t in teams):
+                continue
+            match_date = naive_utc(match.match_date)
+            for team_id in teams:
+                if team_id in states:
+                    continue
+                # Première fois touchée: historique conservé avant ce match, réécrit ensuite
+                self.db.query(TeamRatingHistory).filter(
+                    TeamRatingHistory.team_id == team_id,
+                    TeamRatingHistory.as_of >= match_date
+                ).delete(synchronize_session=False)
+                states[team_id] = self._state_before(team_id, match_date) or RatingState.initial(team_id, match)
+
+            home, away, change = rate_match(states[teams[0]], states[teams[1]], match)
+            states[home.team_id], states[away.team_id] = home, away
+            for state, delta in ((home, change), (away, -change)):
+                self.db.add(TeamRatingHistory(
+                    team_id=state.team_id, match_id=match.id, as_of=match_date,
+                    rating=state.rating, rating_change=delta
+                ))
+                count += 1
+
+        rows = {
+            row.team_id: row
+            for row in self.db.query(TeamRating).filter(TeamRating.team_id.in_(states))
+        }
+        for team_id, state in states.items():
+            row = state.to_row(rows.get(team_id))
+            if team_id not in rows:
+                self.db.add(row)
+        self.db.flush()
+        logger.info(f"🧮 Elo: match {late.id} arrivé en retard, {len(states)} équipes recalculées")
+        return count
+
+    def rebuild(self, batch_size: int = 1000) -> int:
+        """
+        Recalcule tout le classement Elo en un passage chronologique.
+
+        Args:
+            batch_size: Taille des lots lus et écrits
+
+        Returns:
+            Nombre de lignes d'historique écrites
+        """
+        self.db.query(TeamRatingHistory).delete(synchronize_session=False)
+        self.db.query(TeamRating).delete(synchronize_session=False)
+
+        matches = self.db.query(Match).filter(
+            Match.status == "FINISHED",
+            Match.score_home.isnot(None),
+            Match.score_away.isnot(None),
+            Match.home_team_id.isnot(None),
+            Match.away_team_id.isnot(None)
+        ).order_by(Match.match_date, Match.id).yield_per(batch_size)
+
+        states: Dict[int, RatingState] = {}
+        pending: List[TeamRatingHistory] = []
+        count = 0
+        for match in matches:
+            home = states.get(match.home_team_id) or RatingState.initial(match.home_team_id, match)
+            away = states.get(match.away_team_id) or RatingState.initial(match.away_team_id, match)
+            home, away, change = rate_match(home, away, match)
+            states[home.team_id], states[away.team_id] = home, away
+            match_date = naive_utc(match.match_date)
+            pending.append(TeamRatingHistory(
+                team_id=home.team_id, match_id=match.id, as_of=match_date,
+                rating=home.rating, rating_change=change
+            ))
+            pending.append(TeamRatingHistory(
+                team_id=away.team_id, match_id=match.id, as_of=match_date,
+                rating=away.rating, rating_change=-change
+            ))
+            if len(pending) >= batch_size:
+                self.db.add_all(pending)
+                self.db.flush()
+                count += len(pending)
+                pending = []
+
+        pending.extend(state.to_row() for state in states.values())
+        self.db.add_all(pending)
+        count += sum(isinstance(p, TeamRatingHistory) for p in pending)
+        self.db.commit()
+        logger.info(f"🧮 Elo reconstruit: {len(states)} équipes, {count} lignes d'historique")
+        return count
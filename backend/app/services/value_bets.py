@@ -0,0 +1,134 @@
+"""
+Scanner de paris à valeur sur tous les matchs à venir.
+
+Une seule passe vectorisée (numpy) évalue chaque issue 1X2 de chaque match
+à venir ayant des cotes et une prédiction: espérance de gain (EV) et value
+(probabilité du modèle - probabilité implicite de la cote). Les issues à EV
+positive sont classées et enregistrées dans la table value_bets, servie
+telle quelle par GET /odds/value-bets.
+"""
+from datetime import datetime, timezone
+from typing import Iterable, Tuple
+import logging
+
+import numpy as np
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from models.match import Match
+from models.prediction import ExpertPrediction
+from models.value_bet import ValueBet
+from services.market_probabilities import UPCOMING_STATUSES, MarketProbabilityService, input_probabilities
+
+logger = logging.getLogger(__name__)
+
+BET_TYPES = ("home", "draw", "away")
+
+# Value minimale d'un "value bet" (même seuil que OddsService.calculate_value_bet)
+VALUE_THRESHOLD = 0.05
+
+
+def evaluate_bets(odds: np.ndarray, probabilities: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Espérance de gain et value de chaque issue.
+
+    Args:
+        odds: Cotes décimales (n, issues)
+        probabilities: Probabilités du modèle (n, issues)
+
+    Returns:
+        (EV pour une mise de 1, value) de forme (n, issues)
+    """
+    return probabilities * odds - 1.0, probabilities - 1.0 / odds
+
+
+class ValueBetScanner:
+    """Reconstruction de la table classée des paris à valeur."""
+
+    def __init__(self, db: Session):
+        """
+        Initialise le service.
+
+        Args:
+            db: Session SQLAlchemy
+        """
+        self.db = db
+
+    def refresh(self) -> int:
+        """
+        Réévalue tous les matchs à venir et remplace la table value_bets.
+
+        Returns:
+            Nombre d'issues à EV positive enregistrées
+        """
+        rows = self.db.query(
+            Match.id,
+            Match.odds_home, Match.odds_draw, Match.odds_away,
+            ExpertPrediction.prob_home_win, ExpertPrediction.prob_draw, ExpertPrediction.prob_away_win,
+            ExpertPrediction.market_prob_home, ExpertPrediction.market_prob_draw, ExpertPrediction.market_prob_away,
+            ExpertPrediction.blend_prob_home, ExpertPrediction.blend_prob_draw, ExpertPrediction.blend_prob_away
+        ).join(ExpertPrediction, ExpertPrediction.match_id == Match.id).filter(
+            Match.status.in_(UPCOMING_STATUSES),
+            Match.match_date >= datetime.now(),
+            Match.odds_home.isnot(None),
+            Match.odds_draw.isnot(None),
+            Match.odds_away.isnot(None),
+            ExpertPrediction.prob_home_win.isnot(None)
+        ).all()
+
+        values = []
+        if rows:
+            odds = np.array([row[1:4] for row in rows], dtype=float)
+            market = np.array([[np.nan if p is None else p for p in row[7:10]] for row in rows], dtype=float)
+            blended = np.array([[np.nan if p is None else p for p in row[10:13]] for row in rows], dtype=float)
+            probabilities = input_probabilities(np.array([row[4:7] for row in rows], dtype=float), blended)
+
+            with np.errstate(divide="ignore", invalid="ignore"):
+                ev, value = evaluate_bets(odds, probabilities)
+            positive = (odds > 1.0) & (ev > 0)
+            match_index, outcome = np.nonzero(positive)
+            order = np.argsort(-ev[match_index, outcome], kind="stable")
+
+            now = datetime.now(timezone.utc)
+            for rank, k in enumerate(order, start=1):
+                i, j = match_index[k], outcome[k]
+                values.append({
+                    "match_id": rows[i][0],
+                    "bet_type": BET_TYPES[j],
+                    "odds": float(odds[i, j]),
+                    "probability": round(float(probabilities[i, j]), 4),
+                    "implied_probability": round(float(1.0 / odds[i, j]), 4),
+                    "market_probability": None if np.isnan(market[i, j]) else float(market[i, j]),
+                    "expected_value": round(float(ev[i, j]), 4),
+                    "value": round(float(value[i, j]), 4),
+                    "is_value_bet": bool(value[i, j] > VALUE_THRESHOLD),
+                    "rank": rank,
+                    "computed_at": now,
+                })
+
+        # Remplacement complet dans une seule transaction
+        self.db.execute(delete(ValueBet))
+        if values:
+            self.db.execute(insert(ValueBet), values)
+        self.db.commit()
+        logger.info(f"💰 Value bets: {len(values)} issues à EV positive sur {len(rows)} matchs")
+        return len(values)
+
+
+def refresh_market_and_value_bets(db: Session, match_ids: Iterable[int]) -> None:
+    """
+    Recalcule les probabilités du marché puis les value bets, après commit d'un lot.
+
+    Données dérivées: un échec est journalisé sans faire échouer la mise à
+    jour des cotes ou le lot de prédictions déjà validé.
+
+    Args:
+        db: Session SQLAlchemy
+        match_ids: IDs des matchs dont les cotes ou la prédiction ont changé
+    """
+    try:
+        MarketProbabilityService(db).run(list(match_ids))
+        ValueBetScanner(db).refresh()
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"⚠️ Probabilités du marché / value bets non recalculées ({e})")
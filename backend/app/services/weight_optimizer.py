@@ -0,0 +1,505 @@
+"""
+Optimiseur des poids des moteurs de prédiction.
+
+Cherche sur l'historique les meilleurs poids pour:
+- APEX-30: les 10 coefficients POIDS des modules
+- multi_logic: le mélange Papa / Grand Frère / Ma Logique (35/35/30 par défaut)
+
+Les scores par module (APEX-30) et les buts attendus de chaque logique sont
+calculés une fois par match à partir des échantillons point-in-time du
+backtest, puis mis en cache (npz). Évaluer un vecteur de poids se réduit
+alors à des produits matriciels: des milliers de vecteurs sont notés par
+seconde, en lots répartis sur plusieurs processus.
+
+Recherche: échantillonnage aléatoire (Dirichlet) puis descente par
+coordonnées autour du meilleur point. Le résultat est enregistré comme
+jeu de poids versionné (services.weight_sets).
+"""
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple
+import hashlib
+import logging
+import os
+import time
+
+import numpy as np
+
+from services.apex30_service import APEX30Service
+from services.backtest import Backtester
+from services.score_matrix import score_matrices, derive_markets, MAX_EXPECTED_GOALS
+from services.weight_sets import ENGINE_APEX30, ENGINE_MULTI_LOGIC, WEIGHT_SET_ENGINES
+
+logger = logging.getLogger(__name__)
+
+# Modules APEX-30 (ordre des colonnes des matrices de scores)
+APEX_MODULES = tuple(APEX30Service.POIDS)
+
+# Logiques mélangées par MultiLogicPredictionEngine
+LOGICS = ("papa", "grand_frere", "ma_logique")
+
+# Critères d'optimisation (tous minimisés; la précision est négée)
+OBJECTIVES = ("log_loss", "brier", "accuracy")
+
+_EPSILON = 1e-15
+
+# Version du format du jeu d'entraînement en cache
+TRAINING_CACHE_VERSION = 1
+
+
+@dataclass
+class TrainingSet:
+    """Entrées pré-calculées par match (NaN = moteur indisponible pour ce match)."""
+    apex_home: np.ndarray   # n×10 scores des modules APEX-30 de l'équipe domicile
+    apex_away: np.ndarray   # n×10 scores des modules APEX-30 de l'équipe extérieur
+    logic_xg: np.ndarray    # n×3×2 buts attendus (domicile, extérieur) de chaque logique
+    outcomes: np.ndarray    # n issues réelles (0 = domicile, 1 = nul, 2 = extérieur)
+
+    def __len__(self) -> int:
+        return len(self.outcomes)
+
+    def save(self, path: str) -> None:
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez_compressed(
+            tmp_path, apex_home=self.apex_home, apex_away=self.apex_away,
+            logic_xg=self.logic_xg, outcomes=self.outcomes
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> "TrainingSet":
+        with np.load(path) as data:
+            return cls(**{name: data[name] for name in data.files})
+
+    @classmethod
+    def concatenate(cls, parts: List["TrainingSet"]) -> "TrainingSet":
+        if not parts:
+            return cls(
+                apex_home=np.empty((0, len(APEX_MODULES))), apex_away=np.empty((0, len(APEX_MODULES))),
+                logic_xg=np.empty((0, len(LOGICS), 2)), outcomes=np.empty(0, dtype=int)
+            )
+        return cls(
+            apex_home=np.concatenate([p.apex_home for p in parts]),
+            apex_away=np.concatenate([p.apex_away for p in parts]),
+            logic_xg=np.concatenate([p.logic_xg for p in parts]),
+            outcomes=np.concatenate([p.outcomes for p in parts]),
+        )
+
+
+def unit_training_set(backtester: Backtester, competition: str, season: int) -> TrainingSet:
+    """
+    Jeu d'entraînement d'une unité (compétition, saison) à partir du backtest.
+
+    Args:
+        backtester: Backtester (fournit échantillons et moteurs)
+        competition: Code de la compétition
+        season: Saison
+
+    Returns:
+        TrainingSet de l'unité
+    """
+    samples = backtester.load_samples(competition, season)
+    n = len(samples)
+    apex_home = np.full((n, len(APEX_MODULES)), np.nan)
+    apex_away = np.full((n, len(APEX_MODULES)), np.nan)
+    logic_xg = np.full((n, len(LOGICS), 2), np.nan)
+
+    for i, sample in enumerate(samples):
+        try:
+            result = backtester.apex_result(sample)
+            if result:
+                apex_home[i] = [result['equipe_a']['scores'].get(m, 0.0) for m in APEX_MODULES]
+                apex_away[i] = [result['equipe_b']['scores'].get(m, 0.0) for m in APEX_MODULES]
+        except Exception as e:
+            logger.warning("Scores APEX-30 match %s: %s", sample.match_id, e)
+        for j, logic in enumerate(LOGICS):
+            try:
+                xg = backtester.logic_expected_goals(sample, logic)
+            except Exception as e:
+                logger.warning("Logique %s match %s: %s", logic, sample.match_id, e)
+                xg = None
+            if xg is not None:
+                logic_xg[i, j] = xg
+
+    return TrainingSet(
+        apex_home=apex_home, apex_away=apex_away, logic_xg=logic_xg,
+        outcomes=np.array([s.outcome for s in samples], dtype=int)
+    )
+
+
+def build_training_set(
+    backtester: Backtester,
+    competitions: Optional[Iterable[str]] = None,
+    seasons: Optional[Iterable[int]] = None
+) -> TrainingSet:
+    """
+    Jeu d'entraînement de toutes les unités, en cache (npz) par unité.
+
+    Args:
+        backtester: Backtester (son cache_dir sert aussi à ce cache)
+        competitions: Codes des compétitions (toutes si None)
+        seasons: Saisons (toutes si None)
+
+    Returns:
+        TrainingSet concaténé
+    """
+    parts = []
+    for competition, season in backtester.units(competitions, seasons):
+        path = None
+        if backtester.cache_dir:
+            key = hashlib.sha256(
+                f"{TRAINING_CACHE_VERSION}|{backtester.data_key(competition, season)}".encode()
+            ).hexdigest()[:16]
+            path = os.path.join(backtester.cache_dir, f"training_{competition}_{season}_{key}.npz")
+            if os.path.exists(path):
+                parts.append(TrainingSet.load(path))
+                continue
+        part = unit_training_set(backtester, competition, season)
+        if path:
+            os.makedirs(backtester.cache_dir, exist_ok=True)
+            part.save(path)
+        parts.append(part)
+    return TrainingSet.concatenate(parts)
+
+
+class OutcomeTable:
+    """
+    Métriques 1X2 pré-calculées sur une grille de buts attendus.
+
+    Une seule passe de score_matrices sur toute la grille; pour chaque case
+    on garde log P(issue), la somme des P² (Brier) et l'issue la plus
+    probable. Noter un lot revient ensuite à trois indexations.
+    """
+
+    def __init__(self, step: float = 0.05, max_expected: float = MAX_EXPECTED_GOALS):
+        self.step = step
+        grid = np.arange(0.0, max_expected + step / 2, step)
+        self.size = len(grid)
+        home, away = np.meshgrid(grid, grid, indexing="ij")
+        markets = derive_markets(score_matrices(home.ravel(), away.ravel()))
+        probs = np.stack([markets["home_win"], markets["draw"], markets["away_win"]], axis=1)
+        self.probs = probs  # (size², 3)
+        self.log_probs = np.log(np.clip(probs, _EPSILON, 1))
+        self.sum_squares = (probs ** 2).sum(axis=1)
+        self.best = probs.argmax(axis=1)
+
+    def index(self, home_expected: np.ndarray, away_expected: np.ndarray) -> np.ndarray:
+        """Case de la grille pour des tableaux de λ de même forme (λ arrondi au pas)."""
+        i = np.clip(np.rint(home_expected / self.step), 0, self.size - 1).astype(np.intp)
+        j = np.clip(np.rint(away_expected / self.step), 0, self.size - 1).astype(np.intp)
+        return i * self.size + j
+
+    def metrics(self, cells: np.ndarray, outcomes: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Métriques par vecteur de poids.
+
+        Args:
+            cells: Cases n×k (n matchs, k vecteurs de poids)
+            outcomes: Issues réelles (n)
+
+        Returns:
+            Dictionnaire {log_loss, brier, accuracy} de tableaux de k valeurs
+        """
+        if len(outcomes) == 0:
+            empty = np.full(cells.shape[1], np.nan)
+            return {"log_loss": empty, "brier": empty, "accuracy": empty}
+        outcome = outcomes[:, None]
+        p_outcome = self.probs[cells, outcome]
+        return {
+            "log_loss": -self.log_probs[cells, outcome].mean(axis=0),
+            # Σ (p - a)² = Σ p² - 2·p(issue) + 1
+            "brier": (self.sum_squares[cells] - 2 * p_outcome + 1).mean(axis=0),
+            "accuracy": (self.best[cells] == outcome).mean(axis=0),
+        }
+
+
+def apex_expected_goals(diff: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Score APEX-30 en fonction de l'écart de scores totaux (vectorisé).
+
+    Même règle que APEX30Service._generer_decision: à garder synchronisé.
+    """
+    gap = np.abs(diff)
+    strong = np.round(1.5 + gap * 0.3)
+    weak = np.round(np.maximum(0, 1.0 - gap * 0.2))
+    home = np.where(diff > 0, strong, np.where(diff < 0, weak, 1.0))
+    away = np.where(diff > 0, weak, np.where(diff < 0, strong, 1.0))
+    return np.clip(home, 0, 5), np.clip(away, 0, 5)
+
+
+def evaluate_weights(
+    data: TrainingSet, engine: str, weights: np.ndarray, table: OutcomeTable
+) -> Dict[str, np.ndarray]:
+    """
+    Note k vecteurs de poids d'un moteur sur tout l'historique.
+
+    Args:
+        data: Jeu d'entraînement
+        engine: "apex30" ou "multi_logic"
+        weights: Tableau k×d de poids
+        table: Table des probabilités 1X2
+
+    Returns:
+        Dictionnaire {log_loss, brier, accuracy} de tableaux de k valeurs
+    """
+    weights = np.atleast_2d(weights)
+    if engine == ENGINE_APEX30:
+        valid = ~np.isnan(data.apex_home).any(axis=1) & ~np.isnan(data.apex_away).any(axis=1)
+        diff = (data.apex_home[valid] - data.apex_away[valid]) @ weights.T
+        home, away = apex_expected_goals(diff)
+    elif engine == ENGINE_MULTI_LOGIC:
+        available = ~np.isnan(data.logic_xg[:, :, 0])
+        valid = available.any(axis=1)
+        mask = available[valid].astype(float)
+        xg = np.nan_to_num(data.logic_xg[valid])
+        total = mask @ weights.T
+        total = np.where(total > 0, total, np.nan)
+        home = np.nan_to_num((xg[:, :, 0] * mask) @ weights.T / total, nan=1.0)
+        away = np.nan_to_num((xg[:, :, 1] * mask) @ weights.T / total, nan=1.0)
+    else:
+        raise ValueError(f"Moteur inconnu: {engine}")
+    return table.metrics(table.index(home, away), data.outcomes[valid])
+
+
+# Données partagées par les processus du pool (chargées une fois par processus)
+_worker_state: Dict[str, object] = {}
+
+
+def _init_worker(data: TrainingSet, engine: str, step: float) -> None:
+    _worker_state.update(data=data, engine=engine, table=OutcomeTable(step))
+
+
+def _evaluate_in_worker(weights: np.ndarray) -> Dict[str, np.ndarray]:
+    return evaluate_weights(_worker_state["data"], _worker_state["engine"], weights, _worker_state["table"])
+
+
+@dataclass
+class OptimizationResult:
+    """Meilleurs poids trouvés et métriques associées."""
+    engine: str
+    objective: str
+    weights: Dict[str, float]
+    metrics: Dict[str, float]
+    baseline_metrics: Dict[str, float]
+    evaluated: int = 0
+    elapsed: float = 0.0
+    matches: int = 0
+    history: List[float] = field(default_factory=list)
+
+    @property
+    def rate(self) -> float:
+        """Vecteurs de poids évalués par seconde."""
+        return self.evaluated / self.elapsed if self.elapsed else 0.0
+
+
+class WeightOptimizer:
+    """Recherche des poids d'un moteur sur un jeu d'entraînement."""
+
+    def __init__(
+        self,
+        data: TrainingSet,
+        engine: str,
+        objective: str = "log_loss",
+        workers: int = 1,
+        batch_size: int = 500,
+        step: float = 0.05
+    ):
+        """
+        Initialise l'optimiseur.
+
+        Args:
+            data: Jeu d'entraînement
+            engine: "apex30" ou "multi_logic"
+            objective: Critère à optimiser ("log_loss", "brier" ou "accuracy")
+            workers: Nombre de processus pour noter les lots de poids
+            batch_size: Vecteurs de poids par lot
+            step: Pas de la grille des buts attendus
+        """
+        if engine not in WEIGHT_SET_ENGINES:
+            raise ValueError(f"Moteur inconnu: {engine}")
+        if objective not in OBJECTIVES:
+            raise ValueError(f"Critère inconnu: {objective}")
+        self.data = data
+        self.engine = engine
+        self.objective = objective
+        self.workers = workers
+        self.batch_size = batch_size
+        self.step = step
+        self.names = APEX_MODULES if engine == ENGINE_APEX30 else LOGICS
+        self.table = OutcomeTable(step)
+        self.evaluated = 0
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    def default_weights(self) -> np.ndarray:
+        """Poids actuellement codés en dur dans le moteur."""
+        from services.multi_logic_engine import MultiLogicPredictionEngine
+
+        defaults = (
+            APEX30Service.POIDS if self.engine == ENGINE_APEX30
+            else MultiLogicPredictionEngine.default_weights()
+        )
+        return np.array([defaults[name] for name in self.names], dtype=float)
+
+    def weights_vector(self, weights: Optional[Dict[str, float]]) -> np.ndarray:
+        """
+        Vecteur normalisé d'un jeu de poids nommés (défauts si absent ou clés différentes).
+
+        Args:
+            weights: Poids {nom: valeur}, ex: le jeu actif du moteur
+
+        Returns:
+            Vecteur de somme 1 dans l'ordre de self.names
+        """
+        if weights and set(weights) == set(self.names):
+            vector = np.array([weights[name] for name in self.names], dtype=float)
+        else:
+            if weights:
+                logger.warning("Poids de référence ignorés: clés différentes de %s", list(self.names))
+            vector = self.default_weights()
+        return vector / vector.sum()
+
+    # =========================================
+    # ÉVALUATION
+    # =========================================
+
+    def evaluate(self, weights: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Note un lot de vecteurs de poids (réparti sur le pool si workers > 1).
+
+        Args:
+            weights: Tableau k×d
+
+        Returns:
+            Dictionnaire {log_loss, brier, accuracy} de tableaux de k valeurs
+        """
+        weights = np.atleast_2d(weights)
+        self.evaluated += len(weights)
+        batches = [weights[i:i + self.batch_size] for i in range(0, len(weights), self.batch_size)]
+        if self._pool is not None and len(batches) > 1:
+            results = list(self._pool.map(_evaluate_in_worker, batches))
+        else:
+            results = [evaluate_weights(self.data, self.engine, b, self.table) for b in batches]
+        return {key: np.concatenate([r[key] for r in results]) for key in OBJECTIVES}
+
+    def _loss(self, metrics: Dict[str, np.ndarray]) -> np.ndarray:
+        loss = metrics[self.objective]
+        return -loss if self.objective == "accuracy" else loss
+
+    # =========================================
+    # RECHERCHE
+    # =========================================
+
+    def random_search(
+        self, n: int, rng: np.random.Generator, center: Optional[np.ndarray] = None,
+        concentration: float = 50.0
+    ) -> Tuple[np.ndarray, float]:
+        """
+        Recherche aléatoire sur le simplexe (poids positifs de somme 1).
+
+        Args:
+            n: Nombre de vecteurs tirés
+            rng: Générateur aléatoire
+            center: Si fourni, tirages concentrés autour de ce point
+            concentration: Concentration Dirichlet autour du centre
+
+        Returns:
+            Tuple (meilleurs poids, perte)
+        """
+        alpha = np.ones(len(self.names)) if center is None else 1e-3 + center * concentration
+        candidates = rng.dirichlet(alpha, size=n)
+        loss = self._loss(self.evaluate(candidates))
+        best = int(np.nanargmin(loss))
+        return candidates[best], float(loss[best])
+
+    def coordinate_descent(
+        self, start: np.ndarray, step: float = 0.05, min_step: float = 0.0025, max_rounds: int = 100
+    ) -> Tuple[np.ndarray, float]:
+        """
+        Descente par coordonnées: chaque poids ±step (renormalisé), pas divisé par 2 sans gain.
+
+        Les 2·d voisins d'un tour sont notés en un seul lot.
+
+        Args:
+            start: Point de départ
+            step: Pas initial
+            min_step: Pas minimal (arrêt)
+            max_rounds: Nombre maximal de tours
+
+        Returns:
+            Tuple (meilleurs poids, perte)
+        """
+        best = start / start.sum()
+        best_loss = float(self._loss(self.evaluate(best))[0])
+        for _ in range(max_rounds):
+            if step < min_step:
+                break
+            moves = np.vstack([np.eye(len(best)) * step, -np.eye(len(best)) * step])
+            neighbours = np.clip(best + moves, 0, None)
+            neighbours = neighbours[neighbours.sum(axis=1) > 0]
+            neighbours /= neighbours.sum(axis=1, keepdims=True)
+            loss = self._loss(self.evaluate(neighbours))
+            k = int(np.nanargmin(loss))
+            if loss[k] < best_loss - 1e-12:
+                best, best_loss = neighbours[k], float(loss[k])
+            else:
+                step /= 2
+        return best, best_loss
+
+    def optimize(
+        self, n_random: int = 5000, seed: int = 0, baseline: Optional[Dict[str, float]] = None
+    ) -> OptimizationResult:
+        """
+        Recherche complète: référence, tirages globaux, tirages locaux, puis descente.
+
+        Args:
+            n_random: Nombre de vecteurs tirés au hasard (moitié global, moitié local)
+            seed: Graine du générateur
+            baseline: Poids de référence (jeu actif); défauts du moteur si absent
+
+        Returns:
+            OptimizationResult
+        """
+        started = time.perf_counter()
+        self.evaluated = 0
+        rng = np.random.default_rng(seed)
+        if self.workers > 1:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers, initializer=_init_worker,
+                initargs=(self.data, self.engine, self.step)
+            )
+        try:
+            reference = self.weights_vector(baseline)
+            baseline_metrics = self.evaluate(reference)
+            best, best_loss = reference, float(self._loss(baseline_metrics)[0])
+            history = [best_loss]
+
+            for center in (None, best):
+                candidate, loss = self.random_search(max(1, n_random // 2), rng, center=center)
+                if loss < best_loss:
+                    best, best_loss = candidate, loss
+                history.append(best_loss)
+
+            best, best_loss = self.coordinate_descent(best)
+            history.append(best_loss)
+            best_metrics = self.evaluate(best)
+        finally:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
+
+        result = OptimizationResult(
+            engine=self.engine,
+            objective=self.objective,
+            weights={name: float(w) for name, w in zip(self.names, best)},
+            metrics={key: float(values[0]) for key, values in best_metrics.items()},
+            baseline_metrics={key: float(values[0]) for key, values in baseline_metrics.items()},
+            evaluated=self.evaluated,
+            elapsed=time.perf_counter() - started,
+            matches=len(self.data),
+            history=history,
+        )
+        logger.info(
+            "Optimisation %s (%s): %.4f -> %.4f, %d vecteurs (%.0f/s)",
+            self.engine, self.objective, history[0], best_loss, result.evaluated, result.rate
+        )
+        return result
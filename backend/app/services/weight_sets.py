@@ -0,0 +1,171 @@
+"""
+Jeux de poids versionnés des moteurs de prédiction.
+
+L'optimiseur (services.weight_optimizer) enregistre ses meilleurs poids
+comme WeightSet; APEX30Service et MultiLogicPredictionEngine chargent le
+jeu actif de leur moteur à l'exécution, avec repli sur leurs constantes.
+
+Le jeu actif est gardé en mémoire quelques minutes par processus: les
+services sont instanciés à chaque prédiction, sans requête supplémentaire.
+"""
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+import json
+import logging
+import time
+
+from sqlalchemy.orm import Session
+
+from models.weight_set import WeightSet
+
+logger = logging.getLogger(__name__)
+
+# Moteurs dont les poids sont optimisables
+ENGINE_APEX30 = "apex30"
+ENGINE_MULTI_LOGIC = "multi_logic"
+WEIGHT_SET_ENGINES = (ENGINE_APEX30, ENGINE_MULTI_LOGIC)
+
+# Durée de vie du cache du jeu actif (secondes)
+CACHE_TTL_SECONDS = 300
+
+_active_cache: Dict[str, tuple] = {}  # {moteur: (expiration, ActiveWeights | None)}
+
+
+@dataclass(frozen=True)
+class ActiveWeights:
+    """Poids actifs d'un moteur et leur version."""
+    version: str
+    weights: Dict[str, float]
+
+
+def invalidate_weights_cache() -> None:
+    """Vide le cache du processus (après activation d'un nouveau jeu)."""
+    _active_cache.clear()
+
+
+def get_active_weights(db: Optional[Session], engine: str) -> Optional[ActiveWeights]:
+    """
+    Jeu de poids actif d'un moteur (mis en cache CACHE_TTL_SECONDS).
+
+    Args:
+        db: Session SQLAlchemy (None = constantes par défaut)
+        engine: Nom du moteur (voir WEIGHT_SET_ENGINES)
+
+    Returns:
+        ActiveWeights ou None si aucun jeu n'est actif
+    """
+    if db is None:
+        return None
+    cached = _active_cache.get(engine)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+
+    active = None
+    try:
+        # Savepoint: un échec n'annule que la lecture, pas le travail en cours de l'appelant
+        with db.begin_nested():
+            row = db.query(WeightSet).filter(
+                WeightSet.engine == engine,
+                WeightSet.is_active.is_(True)
+            ).order_by(WeightSet.activated_at.desc()).first()
+        if row:
+            active = ActiveWeights(version=row.version, weights=json.loads(row.weights))
+    except Exception as e:
+        # Table absente (migration non appliquée) ou JSON invalide: constantes par défaut
+        logger.warning("Poids actifs %s indisponibles: %s", engine, e)
+
+    _active_cache[engine] = (time.monotonic() + CACHE_TTL_SECONDS, active)
+    return active
+
+
+def resolve_weights(
+    db: Optional[Session], engine: str, defaults: Dict[str, float]
+) -> ActiveWeights:
+    """
+    Poids à utiliser: le jeu actif s'il couvre exactement les mêmes clés, sinon les défauts.
+
+    Args:
+        db: Session SQLAlchemy
+        engine: Nom du moteur
+        defaults: Constantes du moteur
+
+    Returns:
+        ActiveWeights (version "default" pour les constantes)
+    """
+    active = get_active_weights(db, engine)
+    if active and set(active.weights) == set(defaults):
+        return active
+    if active:
+        logger.warning("Jeu de poids %s ignoré: clés différentes de %s", active.version, sorted(defaults))
+    return ActiveWeights(version="default", weights=dict(defaults))
+
+
+def save_weight_set(
+    db: Session,
+    engine: str,
+    weights: Dict[str, float],
+    objective: Optional[str] = None,
+    metrics: Optional[Dict] = None,
+    activate: bool = False
+) -> WeightSet:
+    """
+    Enregistre un nouveau jeu de poids versionné.
+
+    Args:
+        db: Session SQLAlchemy
+        engine: Nom du moteur
+        weights: Poids {nom: valeur}
+        objective: Critère optimisé
+        metrics: Métriques mesurées sur l'historique
+        activate: Activer immédiatement le jeu
+
+    Returns:
+        WeightSet créé
+    """
+    if engine not in WEIGHT_SET_ENGINES:
+        raise ValueError(f"Moteur inconnu: {engine}")
+    now = datetime.now(timezone.utc)
+    number = db.query(WeightSet).filter(WeightSet.engine == engine).count() + 1
+    weight_set = WeightSet(
+        engine=engine,
+        version=f"{engine}-v{number}-{now:%Y%m%d}",
+        weights=json.dumps({k: round(float(v), 6) for k, v in weights.items()}),
+        objective=objective,
+        metrics=json.dumps(metrics) if metrics is not None else None,
+    )
+    db.add(weight_set)
+    db.flush()
+    if activate:
+        activate_weight_set(db, weight_set)
+    db.commit()
+    return weight_set
+
+
+def activate_weight_set(db: Session, weight_set: WeightSet) -> WeightSet:
+    """
+    Active un jeu de poids (désactive les autres jeux du même moteur).
+
+    Args:
+        db: Session SQLAlchemy
+        weight_set: Jeu à activer
+
+    Returns:
+        Le jeu activé (non commité)
+    """
+    db.query(WeightSet).filter(
+        WeightSet.engine == weight_set.engine,
+        WeightSet.id != weight_set.id
+    ).update({WeightSet.is_active: False}, synchronize_session=False)
+    weight_set.is_active = True
+    weight_set.activated_at = datetime.now(timezone.utc)
+    invalidate_weights_cache()
+    return weight_set
+
+
+def list_weight_sets(db: Session, engine: Optional[str] = None) -> List[WeightSet]:
+    """Jeux de poids, du plus récent au plus ancien."""
+    query = db.query(WeightSet)
+    if engine:
+        query = query.filter(WeightSet.engine == engine)
+    return query.order_by(WeightSet.created_at.desc(), WeightSet.id.desc()).all()
@@ -5,6 +5,8 @@ import asyncio
 import logging
 from core.celery_app import celery_app
 from core.database import SessionLocal
+from services.competition_sync import CompetitionSyncService
+from services.history_stats import HistoryStatsService
 from services.match_sync import MatchSyncService
 from services.standing_sync import StandingSyncService
 from services.team_stats_service import TeamStatsService
@@ -46,6 +48,42 @@ def sync_daily_matches():
     finally:
         db.close()
 
+@celery_app.task
+def update_competitions():
+    """
+    Met à jour le catalogue des compétitions (saison en cours, emblèmes...).
+    """
+    logger.info("⚡ [Task] Démarrage update_competitions...")
+    db = SessionLocal()
+    try:
+        count = run_async(CompetitionSyncService(db).sync_competitions())
+        
+        logger.info(f"✅ [Task] update_competitions terminé: {count} compétitions.")
+        return f"{count} compétitions mises à jour"
+    except Exception as e:
+        logger.error(f"❌ [Task] Erreur update_competitions: {e}")
+        raise
+    finally:
+        db.close()
+
+@celery_app.task
+def rebuild_history_stats():
+    """
+    Reconstruit le cumul quotidien des statistiques de l'historique.
+    """
+    logger.info("⚡ [Task] Démarrage rebuild_history_stats...")
+    db = SessionLocal()
+    try:
+        count = HistoryStatsService(db).rebuild()
+        
+        logger.info(f"✅ [Task] rebuild_history_stats terminé: {count} lignes.")
+        return f"{count} lignes de cumul reconstruites"
+    except Exception as e:
+        logger.error(f"❌ [Task] Erreur rebuild_history_stats: {e}")
+        raise
+    finally:
+        db.close()
+
 @celery_app.task
 def update_standings():
     """
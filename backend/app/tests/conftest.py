@@ -7,7 +7,7 @@ from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
 from main import app
-from core.database import get_db
+from core.database import DatabaseRunner, get_db, get_db_runner
 from models.base import Base
 
 # Base de données SQLite en mémoire pour les tests
@@ -31,6 +31,19 @@ def override_get_db():
         db.close()
 
 
+def override_get_db_runner():
+    """Override de l'exécuteur: sessions de la DB de test, pool de threads."""
+    return DatabaseRunner(TestingSessionLocal)
+
+
+@pytest.fixture(autouse=True)
+def clear_response_cache():
+    """Cache de réponses vidé entre les tests (chaque test a sa propre base)."""
+    from core.cache import response_cache
+    response_cache.clear()
+    yield
+
+
 @pytest.fixture(scope="function")
 def db_session():
     """Crée les tables et retourne une session de test."""
@@ -45,6 +58,7 @@ def db_session():
 def client(db_session) -> Generator:
     """Client de test avec DB isolée."""
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_db_runner] = override_get_db_runner
     Base.metadata.create_all(bind=engine)
     
     with TestClient(app) as test_client:
@@ -2,7 +2,7 @@
 import pytest
 from fastapi.testclient import TestClient
 from main import app
-from core.database import get_db, Base, engine, SessionLocal
+from core.database import get_db, get_db_runner, DatabaseRunner, Base, engine, SessionLocal
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
@@ -25,6 +25,7 @@ def override_get_db():
         db.close()
 
 app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_db_runner] = lambda: DatabaseRunner(TestingSessionLocal)
 
 client = TestClient(app)
 
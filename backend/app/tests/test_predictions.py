@@ -6,8 +6,38 @@ Ce fichier teste les 3 logiques de prédiction:
 - Logique de Grand Frère (35%)
 - Ma Logique (30%)
 """
+import asyncio
+from datetime import datetime, timedelta
+
 import pytest
 from fastapi import status
+from sqlalchemy import event
+
+from models.match import Match
+from models.standing import Standing
+from services.multi_logic_engine import MultiLogicPredictionEngine
+
+
+def _seed_matches(db, count=3):
+    """Insère des matchs PL avec le classement des équipes."""
+    matches = []
+    for i in range(count):
+        home_id, away_id = 100 + 2 * i, 101 + 2 * i
+        for team_id, position in ((home_id, i + 1), (away_id, 20 - i)):
+            db.add(Standing(
+                competition_code="PL", season=2025, position=position,
+                team_id=team_id, team_name=f"Team {team_id}",
+                points=60 - position * 2
+            ))
+        match = Match(
+            competition_code="PL", home_team=f"Team {home_id}", home_team_id=home_id,
+            away_team=f"Team {away_id}", away_team_id=away_id,
+            match_date=datetime.now() + timedelta(days=1), status="SCHEDULED"
+        )
+        db.add(match)
+        matches.append(match)
+    db.commit()
+    return matches
 
 
 class TestCombinedPredictionEndpoint:
@@ -75,6 +105,55 @@ class TestCombinedPredictionEndpoint:
                     break  # Un seul test suffit
 
 
+class TestCombinedPredictionBatch:
+    """Tests pour le chargement groupé et /matches/predictions/combined."""
+    
+    def test_context_queries_independent_of_batch_size(self, db_session):
+        """Test: Le lot complet coûte un nombre fixe de requêtes (classements, stats, features, Elo)."""
+        matches = _seed_matches(db_session, count=3)
+        for m in matches:
+            db_session.refresh(m)  # Hors comptage: recharge après commit
+        engine = MultiLogicPredictionEngine(db_session)
+        engine.prediction_service._get_league_strength("PL", 2025)  # Cache des coefficients, hors comptage
+        statements = []
+        
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+        
+        bind = db_session.get_bind()
+        event.listen(bind, "before_cursor_execute", count)
+        try:
+            asyncio.run(engine.generate_combined_predictions(matches[:1]))
+            single_batch = len(statements)
+            statements.clear()
+            results = asyncio.run(engine.generate_combined_predictions(matches))
+        finally:
+            event.remove(bind, "before_cursor_execute", count)
+        
+        assert len(statements) == single_batch == 4
+        assert set(results) == {m.id for m in matches}
+        assert all(r is not None for r in results.values())
+    
+    def test_batch_matches_single_endpoint(self, client, db_session):
+        """Test: Le lot renvoie la même prédiction que l'endpoint unitaire."""
+        matches = _seed_matches(db_session, count=2)
+        ids = [m.id for m in matches]
+        
+        response = client.get("/api/v1/matches/predictions/combined", params={"ids": ids + [99999]})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["count"] == 2
+        assert data["missing"] == [99999]
+        
+        single = client.get(f"/api/v1/matches/{ids[0]}/prediction/combined").json()
+        assert data["predictions"][0] == single
+    
+    def test_batch_requires_ids(self, client):
+        """Test: 422 sans paramètre ids."""
+        response = client.get("/api/v1/matches/predictions/combined")
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
 class TestMatchesEndpoints:
     """Tests complets pour les endpoints matches."""
     
@@ -116,6 +195,307 @@ class TestMatchesEndpoints:
         """Test: 404 pour match inexistant."""
         response = client.get("/api/v1/matches/99999")
         assert response.status_code == status.HTTP_404_NOT_FOUND
+    
+    @pytest.mark.parametrize("url", ["/api/v1/matches", "/api/v1/matches/upcoming"])
+    def test_list_queries_independent_of_page_size(self, client, db_session, url):
+        """Test: Nombre de requêtes SQL constant quelle que soit la taille de la page."""
+        matches = _seed_matches(db_session, count=12)
+        statements = []
+        
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+        
+        bind = db_session.get_bind()
+        event.listen(bind, "before_cursor_execute", count)
+        try:
+            small = client.get(url, params={"limit": 2}).json()
+            small_count = len(statements)
+            statements.clear()
+            large = client.get(url, params={"limit": 12}).json()
+        finally:
+            event.remove(bind, "before_cursor_execute", count)
+        
+        assert small["count"] == 2 and large["count"] == len(matches)
+        assert len(statements) == small_count
+        # Classements résolus par la requête groupée
+        by_team = {m["home_team"]: m for m in large["matches"]}
+        assert by_team["Team 100"]["home_standing_position"] == 1
+        assert by_team["Team 100"]["away_standing_position"] == 20
+        assert by_team["Team 100"]["home_standing_points"] == 58
+    
+    def test_cursor_pagination_walks_all_matches(self, client, db_session):
+        """Test: Pages successives par curseur, sans doublon ni trou."""
+        matches = _seed_matches(db_session, count=7)
+        # Dates identiques deux à deux: l'id départage
+        start = datetime.now().replace(microsecond=0) + timedelta(days=1)
+        for i, match in enumerate(matches):
+            match.match_date = start + timedelta(days=i // 2)
+        db_session.commit()
+        
+        seen, cursor = [], None
+        for _ in range(10):
+            params = {"limit": 3, "competition": "PL"}
+            if cursor:
+                params["cursor"] = cursor
+            data = client.get("/api/v1/matches", params=params).json()
+            seen.extend((m["match_date"], m["id"]) for m in data["matches"])
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+        
+        ids = {m.id for m in matches}
+        ours = [key for key in seen if key[1] in ids]
+        assert sorted(key[1] for key in ours) == sorted(ids)
+        assert ours == sorted(ours, reverse=True)
+    
+    def test_compact_view_skips_heavy_columns(self, client, db_session):
+        """Test: view=compact ne lit ni ne sert les colonnes de texte."""
+        from models.prediction import ExpertPrediction
+        matches = _seed_matches(db_session, count=3)
+        for match in matches:
+            db_session.add(ExpertPrediction(
+                match_id=match.id, home_score_forecast=2, away_score_forecast=1, confidence=0.6,
+                analysis="x" * 2000, gf_verdict="y" * 500, ma_logique_analysis="{}", prob_home_win=0.5
+            ))
+        db_session.commit()
+        statements = []
+        
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+        
+        bind = db_session.get_bind()
+        event.listen(bind, "before_cursor_execute", count)
+        try:
+            compact = client.get("/api/v1/matches/upcoming", params={"view": "compact"})
+        finally:
+            event.remove(bind, "before_cursor_execute", count)
+        full = client.get("/api/v1/matches/upcoming")
+        
+        sql = " ".join(statements)
+        assert "gf_verdict" not in sql and "expert_predictions.analysis" not in sql
+        assert "standings" not in sql
+        match = compact.json()["matches"][0]
+        assert "home_standing_position" not in match
+        assert set(match["prediction"]) == {
+            "home_score_forecast", "away_score_forecast", "confidence", "bet_tip",
+            "prob_home_win", "prob_draw", "prob_away_win"
+        }
+        assert len(compact.content) < len(full.content) / 2
+    
+    def test_sparse_fieldset(self, client, db_session):
+        """Test: fields= ne sert que les champs demandés (id toujours inclus)."""
+        _seed_matches(db_session, count=2)
+        response = client.get(
+            "/api/v1/matches", params={"fields": "home_team,home_standing_position", "competition": "PL"}
+        )
+        assert response.status_code == status.HTTP_200_OK
+        matches = response.json()["matches"]
+        assert all(set(m) == {"id", "home_team", "home_standing_position"} for m in matches)
+        assert {m["home_standing_position"] for m in matches} == {1, 2}
+        
+        unknown = client.get("/api/v1/matches", params={"fields": "home_team,secret"})
+        assert unknown.status_code == status.HTTP_400_BAD_REQUEST
+        assert client.get("/api/v1/matches", params={"view": "tiny"}).status_code == status.HTTP_400_BAD_REQUEST
+    
+    @pytest.mark.parametrize("url", ["/api/v1/matches/upcoming", "/api/v1/matches/today"])
+    def test_async_runner_binds_naive_datetimes(self, client, tmp_path, url):
+        """Test: Via AsyncSession, aucune date avec fuseau liée (asyncpg la refuse sur une colonne naïve)."""
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from main import app
+        from models.base import Base
+        from core.database import DatabaseRunner, create_async_session_factory, get_db_runner
+        pytest.importorskip("aiosqlite")
+        pytest.importorskip("greenlet")
+        
+        url_db = f"sqlite:///{tmp_path / 'async_runner.db'}"
+        sync_engine = create_engine(url_db)
+        Base.metadata.create_all(sync_engine)
+        factory = sessionmaker(bind=sync_engine)
+        with factory() as db:
+            _seed_matches(db, count=2)[0].match_date = datetime.utcnow() + timedelta(minutes=5)
+            db.commit()
+        async_factory = create_async_session_factory(url_db)
+        aware = []
+        
+        def check_params(conn, cursor, statement, parameters, context, executemany):
+            # Valeurs Python avant conversion par le dialecte (SQLite les passe en texte)
+            for params in context.compiled_parameters:
+                aware.extend(v for v in params.values() if isinstance(v, datetime) and v.tzinfo is not None)
+        
+        event.listen(async_factory.kw["bind"].sync_engine, "before_cursor_execute", check_params)
+        app.dependency_overrides[get_db_runner] = lambda: DatabaseRunner(factory, async_factory)
+        response = client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["matches"]
+        assert aware == []
+    
+    def test_invalid_cursor(self, client):
+        """Test: Curseur mal formé rejeté."""
+        response = client.get("/api/v1/matches", params={"cursor": "pas-un-curseur"})
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+    
+    def test_history_scroll_mode(self, client, db_session):
+        """Test: Historique complet par curseur, plus récents d'abord."""
+        matches = _seed_matches(db_session, count=5)
+        for i, match in enumerate(matches):
+            match.status = "FINISHED"
+            match.score_home, match.score_away = 1, 0
+            match.match_date = datetime(2001, 1, 1) + timedelta(days=i)
+        db_session.commit()
+        
+        first = client.get("/api/v1/matches/history", params={"limit": 2, "competition": "PL"}).json()
+        assert first["date"] is None and first["count"] == 2
+        assert first["next_cursor"]
+        second = client.get(
+            "/api/v1/matches/history",
+            params={"limit": 2, "competition": "PL", "cursor": first["next_cursor"]}
+        ).json()
+        dates = [m["match_date"] for m in first["matches"] + second["matches"]]
+        assert dates == sorted(dates, reverse=True) and len(set(dates)) == 4
+        assert all(m["actual"] == {"home": 1, "away": 0, "winner": "home"} for m in first["matches"])
+
+
+    def test_history_date_range_stats_cover_whole_period(self, client, db_session):
+        """Test: Période date_from/date_to paginée, statistiques sur toute la période."""
+        from models.prediction import ExpertPrediction
+        matches = _seed_matches(db_session, count=4)
+        for i, match in enumerate(matches):
+            match.status = "FINISHED"
+            match.score_home, match.score_away = 1, 0
+            match.match_date = datetime(2002, 3, 1) + timedelta(days=7 * i)
+            db_session.add(ExpertPrediction(match_id=match.id, home_score_forecast=1, away_score_forecast=i % 2))
+        db_session.commit()
+        
+        params = {"date_from": "2002-03-01", "date_to": "2002-03-20", "limit": 2}
+        page = client.get("/api/v1/matches/history", params=params).json()
+        assert page["date_from"] == "2002-03-01" and page["date_to"] == "2002-03-20"
+        assert page["count"] == 2 and page["next_cursor"]
+        assert page["stats"]["total"] == 3  # 1er, 8 et 15 mars
+        assert page["stats"]["correct_winner"] == page["stats"]["correct_score"] == 2
+        
+        inverted = client.get("/api/v1/matches/history", params={"date_from": "2002-03-20", "date_to": "2002-03-01"})
+        assert inverted.status_code == status.HTTP_400_BAD_REQUEST
+
+
+class TestResponseCache:
+    """Tests du cache de réponses des listes de matchs."""
+    
+    def test_read_through_until_data_version_bump(self, client, db_session):
+        """Test: Deuxième lecture sans SQL, nouvelle version après une écriture."""
+        from core.cache import response_cache
+        from services.market_probabilities import MarketProbabilityService
+        from models.prediction import ExpertPrediction
+        matches = _seed_matches(db_session, count=2)
+        statements = []
+        
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+        
+        first = client.get("/api/v1/matches/upcoming").content
+        bind = db_session.get_bind()
+        event.listen(bind, "before_cursor_execute", count)
+        try:
+            assert client.get("/api/v1/matches/upcoming").content == first
+        finally:
+            event.remove(bind, "before_cursor_execute", count)
+        assert statements == []
+        
+        # Écriture d'un service (probabilités du marché): version incrémentée
+        matches[0].odds_home, matches[0].odds_draw, matches[0].odds_away = 2.0, 3.5, 4.0
+        db_session.add(ExpertPrediction(
+            match_id=matches[0].id, home_score_forecast=2, away_score_forecast=0,
+            prob_home_win=0.6, prob_draw=0.25, prob_away_win=0.15
+        ))
+        db_session.commit()
+        MarketProbabilityService(db_session).run()
+        refreshed = client.get("/api/v1/matches/upcoming").json()
+        assert any(m["prediction"] for m in refreshed["matches"])
+        
+        metrics = client.get("/api/v1/admin/cache/stats").json()
+        assert metrics["hits"] == 1 and metrics["misses"] == 2
+        assert metrics["hit_ratio"] == pytest.approx(1 / 3, abs=1e-3)
+        assert metrics["invalidations"] >= 1
+    
+    @pytest.mark.parametrize("url", ["/api/v1/matches/today", "/api/v1/matches/competitions/PL/standings"])
+    def test_etag_not_modified_without_sql(self, client, db_session, url):
+        """Test: If-None-Match à jour -> 304 sans requête SQL; nouvel ETag après une écriture."""
+        from core.cache import bump_data_version
+        matches = _seed_matches(db_session, count=2)
+        matches[0].match_date = datetime.now()
+        db_session.commit()
+        statements = []
+        
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+        
+        first = client.get(url)
+        assert first.status_code == status.HTTP_200_OK
+        tag = first.headers["etag"]
+        
+        bind = db_session.get_bind()
+        event.listen(bind, "before_cursor_execute", count)
+        try:
+            cached = client.get(url, headers={"If-None-Match": tag})
+        finally:
+            event.remove(bind, "before_cursor_execute", count)
+        assert cached.status_code == status.HTTP_304_NOT_MODIFIED
+        assert cached.content == b"" and cached.headers["etag"] == tag
+        assert statements == []
+        
+        bump_data_version()
+        refreshed = client.get(url, headers={"If-None-Match": tag})
+        assert refreshed.status_code == status.HTTP_200_OK
+        assert refreshed.headers["etag"] != tag
+        assert refreshed.json() == first.json()
+
+
+class TestLiveEvents:
+    """Tests du flux en direct des matchs (SSE)."""
+    
+    def test_stream_filtered_match_events(self, client):
+        """Test: Le flux /live ne transmet que les événements des matchs suivis."""
+        import json
+        from main import app
+        from core.events import match_events
+        
+        async def scenario():
+            # Appel ASGI direct: le TestClient attend la fin du corps (flux infini)
+            chunks, frame_received = [], asyncio.Event()
+            scope = {
+                "type": "http", "http_version": "1.1", "method": "GET", "scheme": "http",
+                "path": "/api/v1/matches/live", "raw_path": b"/api/v1/matches/live",
+                "query_string": b"match_id=5", "headers": [], "server": ("test", 80),
+                "client": ("test", 1234), "root_path": "",
+            }
+            
+            async def receive():
+                await frame_received.wait()
+                return {"type": "http.disconnect"}
+            
+            async def send(message):
+                if message["type"] == "http.response.start":
+                    chunks.append(dict(message["headers"])[b"content-type"])
+                elif message.get("body"):
+                    chunks.append(message["body"])
+                    if message["body"].startswith(b"retry"):
+                        match_events.publish("match", 6, "PL", {"score_home": 3})
+                        match_events.publish("match", 5, "PL", {"score_home": 1, "status": "IN_PLAY"})
+                    else:
+                        frame_received.set()
+            
+            await asyncio.wait_for(app(scope, receive, send), timeout=5)
+            return chunks
+        
+        content_type, retry, frame = asyncio.run(scenario())
+        assert content_type.startswith(b"text/event-stream") and retry == b"retry: 5000\n\n"
+        lines = frame.decode("utf-8").split("\n")
+        assert lines[0].startswith("id: ") and lines[1] == "event: match"
+        payload = json.loads(lines[2][len("data: "):])
+        assert payload["match_id"] == 5
+        assert payload["changes"] == {"score_home": 1, "status": "IN_PLAY"}
+        assert match_events.subscriber_count == 0
+        assert client.get("/api/v1/matches/live?match_id=abc").status_code == status.HTTP_400_BAD_REQUEST
 
 
 class TestStandingsEndpoints:
@@ -143,6 +523,257 @@ class TestStandingsEndpoints:
         assert response.status_code in [200, 404, 502]
 
 
+class TestSeasonProjections:
+    """Tests des projections de fin de saison (Monte Carlo)."""
+    
+    def _league(self, db):
+        """4 équipes, 2 matchs restants: Team 1 (+10 pts) assurée du titre."""
+        for team_id, points in ((1, 40), (2, 30), (3, 29), (4, 10)):
+            db.add(Standing(
+                competition_code="PL", season=2025, position=team_id, team_id=team_id,
+                team_name=f"Team {team_id}", points=points, played_games=20, goal_difference=0
+            ))
+        for home_id, away_id in ((2, 3), (1, 4)):
+            db.add(Match(
+                competition_code="PL", home_team=f"Team {home_id}", home_team_id=home_id,
+                away_team=f"Team {away_id}", away_team_id=away_id,
+                match_date=datetime(2026, 5, 10), status="SCHEDULED"
+            ))
+        db.commit()
+    
+    def test_projection_distribution(self, client, db_session):
+        """Test: Distributions cohérentes et issues certaines respectées."""
+        self._league(db_session)
+        
+        response = client.get("/api/v1/matches/competitions/PL/projections", params={"simulations": 4000})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["remaining_matches"] == 2
+        teams = {t["team_id"]: t for t in data["teams"]}
+        
+        for team in teams.values():
+            assert sum(team["position_probabilities"]) == pytest.approx(1.0, abs=1e-3)
+        assert teams[1]["title"] == 1.0
+        assert teams[4]["relegation"] == 1.0
+        # Team 2 (domicile, +1 pt) devance plus souvent Team 3
+        assert teams[2]["position_probabilities"][1] > teams[3]["position_probabilities"][1]
+        assert 30 < teams[2]["expected_points"] < 33
+    
+    def test_projection_cached_until_next_sync(self, client, db_session):
+        """Test: Même projection tant que le classement n'est pas resynchronisé."""
+        self._league(db_session)
+        url = "/api/v1/matches/competitions/PL/projections"
+        
+        first = client.get(url, params={"simulations": 2000}).json()
+        assert client.get(url, params={"simulations": 2000}).json() == first
+        
+        standing = db_session.query(Standing).filter_by(team_id=4).one()
+        standing.last_synced = datetime.now() + timedelta(minutes=1)
+        db_session.commit()
+        assert client.get(url, params={"simulations": 2000}).json()["generated_at"] != first["generated_at"]
+        
+        assert client.get("/api/v1/matches/competitions/XXX/projections").status_code == 404
+
+    def test_remaining_matches_bounded_by_season(self, client, db_session):
+        """Test: Match non joué de la saison précédente (février 2025) ignoré."""
+        self._league(db_session)
+        db_session.add(Match(
+            competition_code="PL", home_team="Team 3", home_team_id=3,
+            away_team="Team 4", away_team_id=4,
+            match_date=datetime(2025, 2, 15), status="SCHEDULED"
+        ))
+        db_session.commit()
+
+        response = client.get("/api/v1/matches/competitions/PL/projections", params={"simulations": 2000})
+        assert response.json()["remaining_matches"] == 2
+
+    def test_simulations_rounded_to_levels(self, client, db_session, monkeypatch):
+        """Test: Nombre de simulations arrondi à un niveau fixe, cache borné."""
+        from services import season_projection
+
+        assert season_projection.normalize_simulations(1000) == 5000
+        assert season_projection.normalize_simulations(5001) == 20000
+        assert season_projection.normalize_simulations(200000) == 50000
+
+        self._league(db_session)
+        url = "/api/v1/matches/competitions/PL/projections"
+        first = client.get(url, params={"simulations": 1500}).json()
+        assert first["simulations"] == 5000
+        assert client.get(url, params={"simulations": 4999}).json() == first
+
+        monkeypatch.setattr(season_projection, "PROJECTION_CACHE_SIZE", 1)
+        client.get(url, params={"simulations": 20000})
+        assert list(season_projection._projection_cache) == [("PL", 20000)]
+
+    def test_precompute_fills_cache(self, client, db_session, monkeypatch):
+        """Test: Précalcul multi-processus servi tel quel par l'API."""
+        from core.config import settings
+        from services import season_projection
+
+        self._league(db_session)
+        monkeypatch.setattr(settings, "projection_workers", 2)
+        season_projection.invalidate_projection_cache()
+
+        assert season_projection.SeasonProjectionService(db_session).precompute() == 1
+        cached = season_projection._projection_cache[("PL", season_projection.DEFAULT_SIMULATIONS)][1]
+        data = client.get("/api/v1/matches/competitions/PL/projections").json()
+        assert datetime.fromisoformat(data["generated_at"].replace("Z", "+00:00")) == cached.generated_at
+
+
+class TestKnockoutBracket:
+    """Tests du simulateur de phase à élimination directe."""
+    
+    def _quarter_finals(self, db):
+        """Quarts CL: 10 vs 11 terminé (3-0, 1-1), 12 vs 13 aller joué, 14/16 et 15/17 à jouer."""
+        legs = (
+            (10, 11, 3, 0, "FINISHED"), (11, 10, 1, 1, "FINISHED"),
+            (12, 13, 2, 0, "FINISHED"), (13, 12, None, None, "SCHEDULED"),
+            (14, 16, None, None, "SCHEDULED"), (15, 17, None, None, "SCHEDULED"),
+        )
+        for day, (home_id, away_id, home_goals, away_goals, match_status) in enumerate(legs):
+            db.add(Match(
+                competition_code="CL", stage="QUARTER_FINALS",
+                home_team=f"Team {home_id}", home_team_id=home_id,
+                away_team=f"Team {away_id}", away_team_id=away_id,
+                score_home=home_goals, score_away=away_goals,
+                match_date=datetime(2026, 4, 7 + day), status=match_status
+            ))
+        db.commit()
+    
+    def test_bracket_probabilities(self, client, db_session):
+        """Test: Confrontation terminée certaine, probabilités de titre sommant à 1."""
+        self._quarter_finals(db_session)
+        
+        response = client.get("/api/v1/matches/competitions/CL/bracket", params={"simulations": 4000})
+        assert response.status_code == 200
+        data = response.json()
+        assert data["simulations"] == 5000  # Niveau réellement simulé
+        assert data["stage"] == "QUARTER_FINALS"
+        assert data["stages"] == ["QUARTER_FINALS", "SEMI_FINALS", "FINAL", "WINNER"]
+        
+        ties = {frozenset((t["team_a_id"], t["team_b_id"])): t for t in data["ties"]}
+        finished = ties[frozenset((10, 11))]
+        assert finished["decided"] is True
+        assert finished["probability_a"] == (1.0 if finished["team_a_id"] == 10 else 0.0)
+        # 2-0 à l'aller: 12 largement favori
+        leader = ties[frozenset((12, 13))]
+        assert (leader["probability_a"] if leader["team_a_id"] == 12 else 1 - leader["probability_a"]) > 0.7
+        
+        teams = {t["team_id"]: t for t in data["teams"]}
+        assert teams[11]["reach"]["SEMI_FINALS"] == 0.0
+        assert teams[10]["reach"]["SEMI_FINALS"] == 1.0
+        assert sum(t["winner"] for t in data["teams"]) == pytest.approx(1.0, abs=1e-3)
+        assert sum(t["reach"]["FINAL"] for t in data["teams"]) == pytest.approx(2.0, abs=1e-3)
+    
+    def test_simulation_memoized_per_state(self, db_session):
+        """Test: État inchangé, simulation servie depuis le cache."""
+        from services.knockout_bracket import KnockoutBracketService, simulate_bracket
+        self._quarter_finals(db_session)
+        service = KnockoutBracketService(db_session)
+        
+        first = service.project("CL", simulations=1000)
+        hits = simulate_bracket.cache_info().hits
+        # Nombre demandé arrondi au même niveau: même entrée de cache
+        second = service.project("CL", simulations=3000)
+        assert simulate_bracket.cache_info().hits == hits + 1
+        assert second[1] is first[1]
+        
+        assert service.project("PL") is None
+
+
+class TestValueBets:
+    """Tests du scanner de value bets."""
+    
+    def _priced_matches(self, db):
+        """3 matchs à venir: issues à EV positive sur les deux premiers seulement."""
+        from models.prediction import ExpertPrediction
+        kickoff = datetime.now() + timedelta(days=1)
+        fixtures = (
+            ((2.5, 3.4, 3.0), (0.50, 0.25, 0.25)),  # Domicile: EV +0.25
+            ((1.9, 3.6, 4.5), (0.50, 0.30, 0.20)),  # Nul: EV +0.08
+            ((1.5, 4.0, 7.0), (0.60, 0.25, 0.14)),  # Aucune
+        )
+        for i, (odds, probabilities) in enumerate(fixtures):
+            match = Match(
+                competition_code="PL", home_team=f"Team {2 * i}", home_team_id=2 * i,
+                away_team=f"Team {2 * i + 1}", away_team_id=2 * i + 1,
+                match_date=kickoff, status="SCHEDULED",
+                odds_home=odds[0], odds_draw=odds[1], odds_away=odds[2]
+            )
+            db.add(match)
+            db.flush()
+            db.add(ExpertPrediction(
+                match_id=match.id, home_score_forecast=1, away_score_forecast=0,
+                prob_home_win=probabilities[0], prob_draw=probabilities[1], prob_away_win=probabilities[2]
+            ))
+        db.commit()
+    
+    def test_ranked_table(self, client, db_session):
+        """Test: Issues à EV positive classées, paginées et filtrées."""
+        from services.value_bets import ValueBetScanner
+        self._priced_matches(db_session)
+        
+        assert ValueBetScanner(db_session).refresh() == 2
+        assert ValueBetScanner(db_session).refresh() == 2  # Table remplacée, pas de doublons
+        
+        data = client.get("/api/v1/odds/value-bets").json()
+        assert data["total"] == 2
+        assert [(b["rank"], b["bet_type"]) for b in data["items"]] == [(1, "home"), (2, "draw")]
+        best = data["items"][0]
+        assert best["expected_value"] == pytest.approx(0.25)
+        assert best["value_percentage"] == pytest.approx(10.0)
+        assert best["is_value_bet"] is True
+        assert data["items"][1]["is_value_bet"] is False  # 2.2 points de value < seuil
+        
+        page = client.get("/api/v1/odds/value-bets", params={"limit": 1, "offset": 1}).json()
+        assert page["total"] == 2 and [b["rank"] for b in page["items"]] == [2]
+        assert client.get("/api/v1/odds/value-bets", params={"value_only": True}).json()["total"] == 1
+        assert client.get("/api/v1/odds/value-bets", params={"competition": "SA"}).json()["total"] == 0
+    
+    def test_portfolio_endpoint(self, client, db_session):
+        """Test: Mises de Kelly sur les value bets, dans les limites de bankroll."""
+        from services.value_bets import ValueBetScanner
+        self._priced_matches(db_session)
+        ValueBetScanner(db_session).refresh()
+        
+        response = client.post("/api/v1/odds/portfolio", json={
+            "bankroll": 1000, "kelly_fraction": 0.5, "max_stake": 0.1, "max_exposure": 0.2
+        })
+        assert response.status_code == 200
+        data = response.json()
+        assert data["candidates"] == 2
+        assert data["stakes"][0]["bet_type"] == "home"
+        # Kelly complet domicile: (1.5 * 0.5 - 0.5) / 1.5 = 1/6, soit 8.3% en demi-Kelly
+        assert data["stakes"][0]["stake"] == pytest.approx(83.3, abs=3.0)
+        assert 0 < data["total_stake"] <= 200
+        assert data["expected_profit"] > 0
+        
+        assert client.post("/api/v1/odds/portfolio", json={"kelly_fraction": 2}).status_code == 422
+
+    def test_blend_as_model_input(self, db_session, monkeypatch):
+        """Test: MARKET_BLEND_MODEL_INPUT, le mélange modèle/marché remplace le modèle en entrée."""
+        from core.config import settings
+        from models.prediction import ExpertPrediction
+        from models.value_bet import ValueBet
+        from services.market_probabilities import MarketProbabilityService
+        from services.value_bets import ValueBetScanner
+        self._priced_matches(db_session)
+        MarketProbabilityService(db_session).run(market_weight=0.5)
+
+        ValueBetScanner(db_session).refresh()
+        model_only = {(b.match_id, b.bet_type): b.probability for b in db_session.query(ValueBet)}
+
+        monkeypatch.setattr(settings, "market_blend_model_input", True)
+        ValueBetScanner(db_session).refresh()
+        blended = {(b.match_id, b.bet_type): b.probability for b in db_session.query(ValueBet)}
+
+        home = db_session.query(ExpertPrediction).order_by(ExpertPrediction.match_id).first()
+        key = (home.match_id, "home")
+        assert model_only[key] == pytest.approx(home.prob_home_win)
+        assert blended[key] == pytest.approx(home.blend_prob_home, abs=1e-4)
+        assert blended[key] < model_only[key]  # Rapproché du marché
+
+
 class TestTeamStatsEndpoint:
     """Tests pour les endpoints team stats."""
     
@@ -178,6 +809,28 @@ class TestCompetitionsEndpoint:
         if response.status_code == 200:
             data = response.json()
             assert "competitions" in data
+    
+    def test_catalogue_served_from_database(self, client, db_session):
+        """Test: Catalogue en base servi sans appel à l'API externe."""
+        from unittest.mock import AsyncMock, patch
+        from models.competition import Competition
+        db_session.add_all([
+            Competition(external_id=2021, code="PL", name="Premier League", area="England",
+                        type="LEAGUE", current_season=2403, current_matchday=24),
+            Competition(external_id=2015, code="FL1", name="Ligue 1", area="France", type="LEAGUE"),
+        ])
+        db_session.commit()
+        
+        with patch("services.competition_sync.football_data_service.get_competitions",
+                   new=AsyncMock(side_effect=AssertionError("appel API"))):
+            listing = client.get("/api/v1/matches/competitions")
+            detail = client.get("/api/v1/matches/competitions/pl")
+            missing = client.get("/api/v1/matches/competitions/XX")
+        
+        assert listing.status_code == status.HTTP_200_OK
+        assert [c["code"] for c in listing.json()["competitions"]] == ["FL1", "PL"]
+        assert detail.json()["current_matchday"] == 24 and detail.json()["id"] == 2021
+        assert missing.status_code == status.HTTP_404_NOT_FOUND
 
 
 class TestH2HEndpoint:
@@ -4,23 +4,40 @@ Tests unitaires pour les services de prédiction.
 Ce fichier teste les fonctions individuelles des services:
 - PredictionService
 - MultiLogicPredictionEngine
+- FeatureStore
+- ImportantMatchIndex
+- LeagueCoefficientService
+- TeamRatingService
+- MarketProbabilityService
+- Portefeuille de Kelly
+- Cache de réponses
 """
+from datetime import datetime, timedelta
+
 import pytest
 from unittest.mock import Mock, patch, MagicMock
+from models.match import Match
+from models.team_feature import TeamFeatureSnapshot
 from services.prediction_service import PredictionService
 from services.multi_logic_engine import MultiLogicPredictionEngine, LogicResult
+from services.feature_store import FeatureStore, TeamFeatures
+from services.important_matches import ImportantMatchIndex
 
 
 class TestPredictionServiceUnit:
     """Tests unitaires pour PredictionService."""
     
     def test_league_strength_values(self):
-        """Test: Valeurs de force des championnats."""
+        """Test: Valeurs de force des championnats (sans clé écrasée)."""
         ps = PredictionService(db=None)
         
         assert ps.LEAGUE_STRENGTH["PL"] == 1.0
-        assert ps.LEAGUE_STRENGTH["FL1"] == 0.8
-        assert ps.LEAGUE_STRENGTH["BL1"] == 0.9
+        assert ps.LEAGUE_STRENGTH["FL1"] == 0.85
+        assert ps.LEAGUE_STRENGTH["BL1"] == 0.92
+        # Les championnats mineurs ont leur propre code
+        assert ps.LEAGUE_STRENGTH["CL"] == 1.0
+        assert ps.LEAGUE_STRENGTH["EKS"] == 0.65
+        assert ps.LEAGUE_STRENGTH["CFL"] == 0.42
     
     def test_get_league_strength_known(self):
         """Test: Force d'un championnat connu."""
@@ -28,13 +45,14 @@ class TestPredictionServiceUnit:
         
         assert ps._get_league_strength("PL") == 1.0
         assert ps._get_league_strength("SA") == 0.9
+        assert ps._get_league_strength("EL", season=2025) == 0.9
     
     def test_get_league_strength_unknown(self):
-        """Test: Force d'un championnat inconnu (défaut 0.75)."""
+        """Test: Force d'un championnat inconnu (défaut 0.50)."""
         ps = PredictionService(db=None)
         
-        assert ps._get_league_strength("UNKNOWN") == 0.75
-        assert ps._get_league_strength("XXX") == 0.75
+        assert ps._get_league_strength("UNKNOWN") == 0.5
+        assert ps._get_league_strength("XXX") == 0.5
     
     def test_calculate_form_score_empty(self):
         """Test: Forme vide retourne 0.5."""
@@ -84,6 +102,35 @@ class TestPredictionServiceUnit:
         # Devrait être renforcé (1.5x)
         assert adv == ps.HOME_ADVANTAGE * 1.5
 
+    def test_logic_forecast_consensus(self):
+        """Test: Consensus = moyenne des 3 logiques pondérée par la confiance."""
+        ps = PredictionService(db=None)
+
+        forecast = ps.logic_forecast(0.8, 0.4, 1.0, 0.7, 0.3, 1.8, 1.1, home_h2h=0.6, away_h2h=0.3)
+        assert forecast.papa_xg == ps._expected_goals(0.8, 0.4, 1.8, 1.1)
+        assert forecast.papa_confidence == pytest.approx(0.7)
+        assert forecast.ma_logique_xg == ps._expected_goals(0.7, 0.3, 1.8, 1.1)
+        weights = (forecast.papa_confidence, forecast.grand_frere_confidence, forecast.ma_logique_confidence)
+        xgs = (forecast.papa_xg, forecast.grand_frere_xg, forecast.ma_logique_xg)
+        for i in (0, 1):
+            expected = sum(w * xg[i] for w, xg in zip(weights, xgs)) / sum(weights)
+            assert forecast.expected_goals[i] == pytest.approx(expected)
+        assert forecast.confidence == pytest.approx(sum(weights) / 3)
+
+    def test_logic_forecast_apex_and_rotation(self):
+        """Test: La décision APEX-30 remplace le repli forme, la rotation affaiblit Papa."""
+        ps = PredictionService(db=None)
+
+        decision = {'home_goals': 3, 'away_goals': 0, 'confiance_pct': 0.65}
+        forecast = ps.logic_forecast(
+            0.8, 0.4, 1.0, 0.7, 0.3, 1.8, 1.1, apex_decision=decision,
+            rotation=(0.9, 1.0), papa_confidence_factor=0.85
+        )
+        assert forecast.ma_logique_xg == (3.0, 0.0)
+        assert forecast.ma_logique_confidence == 0.65
+        assert forecast.papa_xg == ps._expected_goals(0.8 * 0.9, 0.4, 1.8, 1.1)
+        assert forecast.papa_confidence == pytest.approx(0.7 * 0.85)
+
 
 class TestMultiLogicEngineUnit:
     """Tests unitaires pour MultiLogicPredictionEngine."""
@@ -145,3 +192,1062 @@ class TestLogicResultDataclass:
         
         total = result.home_win_prob + result.draw_prob + result.away_win_prob
         assert abs(total - 1.0) < 0.01  # Tolérance pour arrondis
+
+
+def _finished(match_id, home_id, away_id, score_home, score_away, date, competition="PL"):
+    """Construit un match terminé (non persisté)."""
+    return Match(
+        id=match_id, competition_code=competition,
+        home_team=f"Team {home_id}", home_team_id=home_id,
+        away_team=f"Team {away_id}", away_team_id=away_id,
+        score_home=score_home, score_away=score_away,
+        match_date=date, status="FINISHED"
+    )
+
+
+class TestFeatureStore:
+    """Tests pour le feature store point-in-time."""
+    
+    START = datetime(2025, 9, 1, 15, 0)
+    
+    def test_apply_match_incremental(self):
+        """Test: Les compteurs et la forme évoluent match après match."""
+        features = TeamFeatures(team_id=1)
+        features = features.apply_match(_finished(1, 1, 2, 2, 0, self.START))
+        features = features.apply_match(_finished(2, 3, 1, 1, 1, self.START + timedelta(days=7)))
+        
+        assert features.played == 2
+        assert (features.wins, features.draws, features.losses) == (1, 1, 0)
+        assert features.form == "D,W"  # Plus récent en premier
+        assert features.home_points == 3 and features.away_points == 1
+        assert features.avg_goals_scored == 1.5
+        assert features.form_score == pytest.approx(4 / 6)
+    
+    def test_new_season_resets_counters_keeps_form(self):
+        """Test: Changement de saison = compteurs à zéro, forme conservée."""
+        features = TeamFeatures(team_id=1).apply_match(_finished(1, 1, 2, 1, 0, datetime(2025, 5, 20)))
+        features = features.apply_match(_finished(2, 1, 2, 0, 1, datetime(2025, 8, 15)))
+        
+        assert features.season == 2025
+        assert features.played == 1
+        assert features.form == "L,W"
+    
+    def test_point_in_time_read_has_no_future_data(self, db_session):
+        """Test: Une lecture à la date T ignore les matchs joués à partir de T."""
+        store = FeatureStore(db_session)
+        for i in range(3):
+            match = _finished(i + 1, 1, 2, 1 + i, 0, self.START + timedelta(days=7 * i))
+            db_session.add(match)
+            store.record_match(match)
+        db_session.commit()
+        
+        at = self.START + timedelta(days=7)
+        features = store.latest_before([1, 2], at)
+        assert features[1].played == 1
+        assert features[2].form == "L"
+        
+        upcoming = Match(
+            id=10, competition_code="PL", home_team="Team 1", home_team_id=1,
+            away_team="Team 2", away_team_id=2, match_date=at, status="SCHEDULED"
+        )
+        home, away = store.for_matches([upcoming])[10]
+        assert home.played == 1 and away.played == 1
+    
+    def test_late_match_rebuilds_team_history(self, db_session):
+        """Test: Un match arrivé en retard donne le même état qu'une reconstruction."""
+        store = FeatureStore(db_session)
+        late = _finished(1, 1, 2, 0, 3, self.START)
+        recent = _finished(2, 1, 3, 2, 2, self.START + timedelta(days=7))
+        db_session.add_all([late, recent])
+        store.record_match(recent)
+        store.record_match(late)
+        db_session.commit()
+        
+        incremental = store.latest_before([1], self.START + timedelta(days=30))[1]
+        store.rebuild()
+        rebuilt = store.latest_before([1], self.START + timedelta(days=30))[1]
+        
+        assert incremental.form == rebuilt.form == "D,L"
+        assert incremental.played == rebuilt.played == 2
+        assert db_session.query(TeamFeatureSnapshot).count() == 4
+
+
+class TestImportantMatchIndex:
+    """Tests pour la détection groupée des matchs importants."""
+    
+    DAY = datetime(2025, 10, 18, 15, 0)
+    
+    def _seed(self, db_session):
+        cl_before = _finished(1, 1, 9, 2, 1, self.DAY - timedelta(days=3), competition="CL")
+        cl_before.competition_name = "UEFA Champions League"
+        el_after = Match(
+            id=2, competition_code="EL", competition_name="UEFA Europa League",
+            home_team="Team 8", home_team_id=8, away_team="Team 2", away_team_id=2,
+            match_date=self.DAY + timedelta(days=2), status="SCHEDULED"
+        )
+        league_after = Match(
+            id=3, competition_code="PL", home_team="Team 1", home_team_id=1,
+            away_team="Team 3", away_team_id=3,
+            match_date=self.DAY + timedelta(days=1), status="SCHEDULED"
+        )
+        db_session.add_all([cl_before, el_after, league_after])
+        db_session.commit()
+    
+    def test_upcoming_and_recent_lookups(self, db_session):
+        """Test: Les recherches reproduisent les fenêtres ±3 jours."""
+        self._seed(db_session)
+        index = ImportantMatchIndex.load(db_session, [self.DAY])
+        
+        recent = index.recent(1, self.DAY)
+        assert recent["opponent"] == "Team 9"
+        assert recent["days_ago"] == 3
+        assert recent["score"] == "2-1"
+        assert index.upcoming(1, self.DAY) is None  # Match PL ignoré
+        
+        upcoming = index.upcoming(2, self.DAY)
+        assert upcoming["competition"] == "UEFA Europa League"
+        assert upcoming["days_until"] == 2
+        assert index.upcoming(2, self.DAY, days=1) is None
+    
+    def test_prediction_service_uses_prefetched_index(self, db_session):
+        """Test: Après prefetch, les 4 vérifications par match ne font aucune requête."""
+        self._seed(db_session)
+        service = PredictionService(db_session)
+        fixtures = [Match(match_date=self.DAY), Match(match_date=self.DAY - timedelta(hours=3))]
+        service.prefetch_important_matches(fixtures)
+        
+        with patch.object(db_session, "query", side_effect=AssertionError("requête inattendue")):
+            for fixture in fixtures:
+                assert service._check_recent_important_match(1, fixture.match_date) is not None
+                assert service._check_upcoming_important_match(2, fixture.match_date) is not None
+                assert service._check_recent_important_match(2, fixture.match_date) is None
+                assert service._check_upcoming_important_match(1, fixture.match_date) is None
+
+
+class TestPredictionFingerprint:
+    """Tests pour l'invalidation des prédictions par empreinte des entrées."""
+    
+    @staticmethod
+    def _standings(home_points):
+        return {"standings": [{"table": [
+            {"position": 1, "team": {"id": 1}, "points": home_points, "playedGames": 10,
+             "goalsFor": 20, "goalsAgainst": 8, "form": "W,W,D"},
+            {"position": 2, "team": {"id": 2}, "points": 18, "playedGames": 10,
+             "goalsFor": 15, "goalsAgainst": 10, "form": "L,W,D"},
+        ]}]}
+    
+    def _recompute(self, db_session, match, home_points):
+        from unittest.mock import AsyncMock
+        import asyncio
+        
+        api_down = AsyncMock(return_value={"success": False})
+        with patch("services.prediction_service.football_data_service") as fd, \
+                patch("services.prediction_service.api_football_service") as af:
+            fd.get_standings = AsyncMock(return_value=self._standings(home_points))
+            fd.get_team_matches = AsyncMock(return_value={"matches": []})
+            af.get_h2h_by_names = api_down
+            af.get_team_injuries = api_down
+            af.get_team_last_matches = api_down
+            af.get_team_standings_position = api_down
+            return asyncio.run(PredictionService(db_session).recompute_predictions([match]))
+    
+    def test_unchanged_inputs_are_skipped(self, db_session):
+        """Test: Sans changement d'entrées, le recalcul ne réécrit rien."""
+        match = Match(
+            competition_code="PL", home_team="Team 1", home_team_id=1,
+            away_team="Team 2", away_team_id=2,
+            match_date=datetime(2025, 10, 18, 15, 0), status="SCHEDULED"
+        )
+        db_session.add(match)
+        db_session.commit()
+        
+        assert self._recompute(db_session, match, 25)["created"] == 1
+        prediction = match.expert_prediction
+        fingerprint = prediction.input_fingerprint
+        assert len(fingerprint) == 64
+        assert prediction.model_version == PredictionService.MODEL_VERSION
+        
+        assert self._recompute(db_session, match, 25)["unchanged"] == 1
+        
+        report = self._recompute(db_session, match, 28)
+        assert report["updated"] == 1
+        db_session.refresh(prediction)
+        assert prediction.input_fingerprint != fingerprint
+
+    def test_unchanged_inputs_skip_model(self, db_session):
+        """Test: Empreinte inchangée, aucune logique ni matrice de scores calculée."""
+        from services.apex30_service import APEX30Service
+        match = Match(
+            competition_code="PL", home_team="Team 1", home_team_id=1,
+            away_team="Team 2", away_team_id=2,
+            match_date=datetime(2025, 10, 18, 15, 0), status="SCHEDULED"
+        )
+        db_session.add(match)
+        db_session.commit()
+        assert self._recompute(db_session, match, 25)["created"] == 1
+
+        with patch("services.prediction_service.match_markets") as markets, \
+                patch.object(APEX30Service, "analyser_match") as apex:
+            assert self._recompute(db_session, match, 25)["unchanged"] == 1
+        markets.assert_not_called()
+        apex.assert_not_called()
+
+    def test_derived_refresh_failure_keeps_batch(self, db_session):
+        """Test: Échec des value bets après commit, le lot reste un succès."""
+        match = Match(
+            competition_code="PL", home_team="Team 1", home_team_id=1,
+            away_team="Team 2", away_team_id=2,
+            match_date=datetime(2025, 10, 18, 15, 0), status="SCHEDULED"
+        )
+        db_session.add(match)
+        db_session.commit()
+
+        with patch("services.value_bets.ValueBetScanner.refresh", side_effect=RuntimeError("db down")):
+            report = self._recompute(db_session, match, 25)
+        assert report["created"] == 1 and report["errors"] == 0
+        assert match.expert_prediction is not None
+
+    def test_errors_report_match_messages(self, db_session):
+        """Test: Chaque échec est compté et décrit par match."""
+        match = Match(
+            competition_code="PL", home_team="Team 1", home_team_id=1,
+            away_team="Team 2", away_team_id=2,
+            match_date=datetime(2025, 10, 18, 15, 0), status="SCHEDULED"
+        )
+        db_session.add(match)
+        db_session.commit()
+
+        with patch.object(PredictionService, "logic_forecast", side_effect=RuntimeError("boom")):
+            report = self._recompute(db_session, match, 25)
+        assert report["errors"] == 1
+        assert report["error_messages"] == ["Team 1 vs Team 2: boom"]
+
+
+class TestScoreMatrix:
+    """Tests de la matrice de scores Poisson / Dixon-Coles."""
+    
+    def test_matrix_is_a_distribution(self):
+        """Test: La matrice somme à 1 et les issues 1X2 aussi."""
+        from services.score_matrix import match_markets
+        
+        markets = match_markets(1.6, 1.1)
+        
+        assert markets.matrix.sum() == pytest.approx(1.0)
+        assert markets.home_win + markets.draw + markets.away_win == pytest.approx(1.0)
+        assert 0 < markets.over_2_5 < 1
+        assert 0 < markets.btts < 1
+        assert markets.expected_home_goals == pytest.approx(1.6, abs=0.05)
+    
+    def test_batch_matches_single(self):
+        """Test: Un lot donne les mêmes marchés que le calcul match par match."""
+        import numpy as np
+        from services.score_matrix import score_matrices, derive_markets, match_markets
+        
+        home = np.array([0.4, 1.2, 2.8])
+        away = np.array([1.9, 1.0, 0.3])
+        matrices = score_matrices(home, away)
+        markets = derive_markets(matrices)
+        
+        assert matrices.shape == (3, 11, 11)
+        for k in range(3):
+            single = match_markets(home[k], away[k])
+            assert markets["home_win"][k] == pytest.approx(single.home_win)
+            assert (markets["home_goals"][k], markets["away_goals"][k]) == single.score
+    
+    def test_score_follows_most_likely_outcome(self):
+        """Test: Le score retenu est cohérent avec l'issue 1X2 la plus probable."""
+        from services.score_matrix import match_markets
+        
+        strong_home = match_markets(2.6, 0.6)
+        assert strong_home.home_win > strong_home.away_win
+        assert strong_home.home_goals > strong_home.away_goals
+        
+        # Un λ de 0.4 arrondi donnait 0: la matrice reste une vraie distribution
+        low = match_markets(0.4, 0.4)
+        assert low.draw > max(low.home_win, low.away_win)
+        assert low.score == (0, 0)
+
+
+class TestBacktester:
+    """Tests du backtest hors-ligne (rejeu point-in-time)."""
+    
+    def _season(self, db_session):
+        """Deux tours d'un mini-championnat à 4 équipes (saison 2024)."""
+        fixtures = [(1, 2), (3, 4), (1, 3), (2, 4), (1, 4), (2, 3),
+                    (2, 1), (4, 3), (3, 1), (4, 2), (4, 1), (3, 2)]
+        start = datetime(2024, 8, 10, 15, 0)
+        for k, (home, away) in enumerate(fixtures):
+            match = _finished(k + 1, home, away, 2 if home < away else 0, 1, start + timedelta(days=7 * (k // 2)))
+            match.odds_home, match.odds_draw, match.odds_away = 2.0, 3.4, 3.8
+            db_session.add(match)
+        db_session.commit()
+    
+    def test_samples_are_point_in_time(self, db_session):
+        """Test: Chaque match ne voit que les résultats antérieurs."""
+        from services.backtest import Backtester
+        
+        self._season(db_session)
+        samples = Backtester(db_session).build_samples("PL", 2024)
+        
+        assert [s.match_id for s in samples] == list(range(1, 13))
+        # Journée 1: aucune donnée, même pour le match joué à la même heure
+        assert samples[0].home_features is None
+        assert samples[1].home_features is None and samples[1].home_position is None
+        # Match 3 (Team 1 vs Team 3): une victoire 2-1 de Team 1 connue, pas plus
+        assert samples[2].home_features.played == 1
+        assert samples[2].home_features.form == "W"
+        # Match retour 2 vs 1: H2H aller déjà joué
+        assert samples[6].h2h == (0, 1, 0)
+    
+    def test_run_reports_metrics_and_uses_cache(self, db_session, tmp_path):
+        """Test: Métriques calculées par moteur, échantillons relus depuis le cache."""
+        from services.backtest import Backtester, ENGINES
+        
+        self._season(db_session)
+        backtester = Backtester(db_session, cache_dir=str(tmp_path))
+        report = backtester.run(competitions=["PL"])
+        
+        assert list(report.units) == [("PL", 2024)]
+        totals = report.totals
+        assert set(totals) == set(ENGINES)
+        for metrics in totals.values():
+            if metrics.predictions:
+                assert 0 <= metrics.accuracy <= 1
+                assert 0 <= metrics.brier <= 2
+                assert metrics.log_loss > 0
+                assert metrics.bets == metrics.predictions
+        assert totals["prediction_service"].predictions == 12
+        assert len(list(tmp_path.iterdir())) == 1
+        
+        with patch.object(Backtester, "build_samples", side_effect=AssertionError("cache ignoré")):
+            assert backtester.load_samples("PL", 2024)[0].match_id == 1
+
+
+class TestWeightOptimizer:
+    """Tests de l'optimiseur de poids et des jeux de poids versionnés."""
+    
+    def _training_set(self, n=300, seed=1):
+        """Historique synthétique: seul le 1er module APEX et Papa sont informatifs."""
+        import numpy as np
+        from services.weight_optimizer import TrainingSet
+        
+        rng = np.random.default_rng(seed)
+        outcomes = rng.choice([0, 2], size=n)
+        sign = np.where(outcomes == 0, 1.0, -1.0)
+        apex_home = rng.uniform(0, 10, size=(n, 10))
+        apex_away = rng.uniform(0, 10, size=(n, 10))
+        apex_home[:, 0] = 5 + 4 * sign
+        apex_away[:, 0] = 5 - 4 * sign
+        logic_xg = np.empty((n, 3, 2))
+        logic_xg[:, 0] = np.stack([1.2 + sign, 1.2 - sign], axis=1)   # Papa: juste
+        logic_xg[:, 1] = np.stack([1.2 - sign, 1.2 + sign], axis=1)   # Grand Frère: inversé
+        logic_xg[:, 2] = 1.2                                           # Ma Logique: neutre
+        return TrainingSet(apex_home=apex_home, apex_away=apex_away, logic_xg=logic_xg, outcomes=outcomes)
+    
+    def test_optimizer_finds_informative_weights(self):
+        """Test: Les poids optimisés battent les défauts et privilégient le signal."""
+        from services.weight_optimizer import WeightOptimizer
+        
+        data = self._training_set()
+        
+        apex = WeightOptimizer(data, "apex30").optimize(n_random=2000)
+        assert apex.metrics["log_loss"] < apex.baseline_metrics["log_loss"]
+        assert max(apex.weights, key=apex.weights.get) == "ifp"
+        assert sum(apex.weights.values()) == pytest.approx(1.0)
+        assert apex.evaluated > 2000
+        
+        blend = WeightOptimizer(data, "multi_logic", objective="brier").optimize(n_random=500)
+        assert blend.metrics["brier"] < blend.baseline_metrics["brier"]
+        assert blend.weights["papa"] > blend.weights["grand_frere"]
+
+    def test_baseline_is_the_given_weight_set(self):
+        """Test: La référence comparée est le jeu fourni (jeu actif), pas les défauts."""
+        import numpy as np
+        from services.weight_optimizer import WeightOptimizer
+
+        data = self._training_set()
+        optimizer = WeightOptimizer(data, "multi_logic")
+        active = {"papa": 0.9, "grand_frere": 0.05, "ma_logique": 0.05}
+
+        expected = optimizer.evaluate(optimizer.weights_vector(active))
+        result = optimizer.optimize(n_random=200, baseline=active)
+        assert result.baseline_metrics["log_loss"] == pytest.approx(float(expected["log_loss"][0]))
+        defaults = optimizer.evaluate(optimizer.default_weights() / optimizer.default_weights().sum())
+        assert result.baseline_metrics["log_loss"] != pytest.approx(float(defaults["log_loss"][0]))
+
+        # Clés différentes: repli sur les défauts
+        assert np.allclose(optimizer.weights_vector({"papa": 1.0}), optimizer.weights_vector(None))
+
+    def test_active_weight_set_is_loaded_by_engines(self, db_session):
+        """Test: Le jeu actif remplace les constantes, les autres restent inactifs."""
+        from services.apex30_service import APEX30Service
+        from services.weight_sets import save_weight_set, invalidate_weights_cache
+        
+        invalidate_weights_cache()
+        assert APEX30Service(db_session).poids == APEX30Service.POIDS
+        
+        weights = {module: 0.1 for module in APEX30Service.POIDS}
+        first = save_weight_set(db_session, "apex30", weights, activate=True)
+        assert APEX30Service(db_session).poids_version == first.version
+        
+        blend = {"papa": 0.5, "grand_frere": 0.2, "ma_logique": 0.3}
+        save_weight_set(db_session, "multi_logic", blend, activate=True)
+        engine = MultiLogicPredictionEngine(db_session)
+        assert engine.weights == blend
+        
+        # Jeu incomplet: ignoré, repli sur les constantes
+        invalid = save_weight_set(db_session, "apex30", {"ifp": 1.0}, activate=True)
+        db_session.refresh(first)
+        assert not first.is_active and invalid.is_active
+        assert APEX30Service(db_session).poids == APEX30Service.POIDS
+        invalidate_weights_cache()
+
+    def test_lookup_failure_keeps_caller_work(self, tmp_path):
+        """Test: Table absente, la lecture échoue sans annuler le travail en cours de la session."""
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from services.weight_sets import get_active_weights, invalidate_weights_cache
+
+        engine = create_engine(f"sqlite:///{tmp_path / 'partial.db'}")
+        Match.__table__.create(engine)  # weight_sets non migrée
+        db = sessionmaker(bind=engine)()
+        db.add(Match(competition_code="PL", home_team="A", away_team="B", match_date=datetime(2026, 5, 1), status="SCHEDULED"))
+        db.flush()
+
+        invalidate_weights_cache()
+        assert get_active_weights(db, "apex30") is None
+        invalidate_weights_cache()
+        db.commit()
+        assert db.query(Match).count() == 1
+        db.close()
+
+
+class TestLeagueCoefficients:
+    """Tests de l'ajustement de la force des championnats sur les matchs européens."""
+    
+    def _season(self, db_session):
+        """Clubs 1-2 en FL1, 3-4 en PL; les clubs PL gagnent toutes les confrontations CL."""
+        start = datetime(2025, 8, 16, 15, 0)
+        match_id = 1
+        for home, away, competition in [(1, 2, "FL1"), (3, 4, "PL")]:
+            db_session.add(_finished(match_id, home, away, 1, 1, start, competition))
+            match_id += 1
+        for k, (home, away, score) in enumerate([(1, 3, (0, 2)), (4, 2, (3, 0)), (3, 1, (1, 0)), (2, 4, (1, 1))]):
+            db_session.add(_finished(match_id, home, away, *score, start + timedelta(days=30 + 7 * k), "CL"))
+            match_id += 1
+        db_session.commit()
+    
+    def test_refresh_fits_and_serves_strength(self, db_session):
+        """Test: Les résultats européens déplacent les forces, servies par PredictionService."""
+        from models.league_coefficient import LeagueCoefficient
+        from services.league_coefficients import LeagueCoefficientService, invalidate_league_cache
+        
+        self._season(db_session)
+        assert LeagueCoefficientService(db_session).refresh() == 2
+        db_session.commit()
+        
+        rows = {r.league_code: r for r in db_session.query(LeagueCoefficient).filter_by(season=2025)}
+        assert rows["PL"].matches == rows["FL1"].matches == 4
+        assert rows["FL1"].strength < 0.85
+        assert rows["PL"].rating > 1500 + 0.25 * 600
+        
+        ps = PredictionService(db_session)
+        assert ps._get_league_strength("FL1", season=2025) == rows["FL1"].strength
+        # Saison suivante sans données: dernière saison ajustée
+        assert ps._get_league_strength("FL1", season=2026) == rows["FL1"].strength
+        # Saison antérieure ou sans saison: valeur a priori
+        assert ps._get_league_strength("FL1", season=2024) == 0.85
+        assert ps._get_league_strength("FL1") == 0.85
+        
+        # Réajustement idempotent (upsert)
+        LeagueCoefficientService(db_session).refresh()
+        assert db_session.query(LeagueCoefficient).count() == 2
+        invalidate_league_cache()
+
+    def test_lookup_failure_keeps_caller_work(self, tmp_path):
+        """Test: Table absente, la lecture échoue sans annuler le travail en cours de la session."""
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from services.league_coefficients import fitted_league_strength, invalidate_league_cache
+
+        engine = create_engine(f"sqlite:///{tmp_path / 'partial.db'}")
+        Match.__table__.create(engine)  # league_coefficients non migrée
+        db = sessionmaker(bind=engine)()
+        db.add(Match(competition_code="PL", home_team="A", away_team="B", match_date=datetime(2026, 5, 1), status="SCHEDULED"))
+        db.flush()
+
+        invalidate_league_cache()
+        assert fitted_league_strength(db, "PL", 2025) is None
+        invalidate_league_cache()
+        db.commit()
+        assert db.query(Match).count() == 1
+        db.close()
+
+
+class TestTeamRatings:
+    """Tests du classement Elo des équipes."""
+    
+    START = datetime(2025, 8, 16, 15, 0)
+    
+    def _matches(self):
+        """Team 1 bat Team 2 puis Team 3; Team 2 et Team 3 font nul."""
+        return [
+            _finished(1, 1, 2, 3, 0, self.START),
+            _finished(2, 3, 1, 0, 1, self.START + timedelta(days=7)),
+            _finished(3, 2, 3, 1, 1, self.START + timedelta(days=14)),
+        ]
+    
+    def test_incremental_matches_rebuild(self, db_session):
+        """Test: La mise à jour match par match donne le même Elo que la reconstruction."""
+        from models.team_rating import TeamRatingHistory
+        from services.team_ratings import TeamRatingService, initial_rating
+        
+        matches = self._matches()
+        db_session.add_all(matches)
+        db_session.commit()
+        
+        service = TeamRatingService(db_session)
+        assert [service.record_match(m) for m in matches] == [2, 2, 2]
+        assert service.record_match(matches[0]) == 0  # Idempotent
+        incremental = service.current([1, 2, 3])
+        
+        assert service.rebuild() == 6
+        assert service.current([1, 2, 3]) == pytest.approx(incremental)
+        assert db_session.query(TeamRatingHistory).count() == 6
+        
+        # Somme nulle, vainqueur au-dessus de l'Elo de départ du championnat
+        assert sum(incremental.values()) == pytest.approx(3 * initial_rating("PL"))
+        assert incremental[1] > initial_rating("PL") > incremental[2]
+
+    def test_late_match_replays_affected_teams(self, db_session):
+        """Test: Un match arrivé en retard donne le même Elo et historique que la reconstruction."""
+        from models.team_rating import TeamRatingHistory
+        from services.team_ratings import TeamRatingService
+
+        matches = self._matches() + [_finished(4, 4, 5, 2, 0, self.START + timedelta(days=10))]
+        db_session.add_all(matches)
+        db_session.commit()
+
+        service = TeamRatingService(db_session)
+        for m in (matches[0], matches[2], matches[3]):
+            service.record_match(m)
+        untouched = service.current([4, 5])
+        # Match 2 (Team 3 vs Team 1) synchronisé après le match 3: Team 2 rejouée par ricochet
+        assert service.record_match(matches[1]) == 4
+        assert service.current([4, 5]) == untouched
+
+        def snapshot():
+            rows = db_session.query(
+                TeamRatingHistory.team_id, TeamRatingHistory.match_id, TeamRatingHistory.rating
+            ).order_by(TeamRatingHistory.team_id, TeamRatingHistory.match_id)
+            return [(team_id, match_id, pytest.approx(rating)) for team_id, match_id, rating in rows]
+
+        incremental, history = service.current([1, 2, 3, 4, 5]), snapshot()
+        service.rebuild()
+        assert service.current([1, 2, 3, 4, 5]) == pytest.approx(incremental)
+        assert snapshot() == history
+
+    def test_as_of_lookups(self, db_session):
+        """Test: Les lectures point-in-time ne voient que les matchs antérieurs."""
+        from services.team_ratings import TeamRatingService
+        
+        matches = self._matches()
+        db_session.add_all(matches)
+        db_session.commit()
+        service = TeamRatingService(db_session)
+        service.rebuild()
+        
+        assert service.ratings_before([1, 2], matches[0].match_date) == {}
+        after_first = service.ratings_before([1, 2, 3], matches[1].match_date)
+        assert set(after_first) == {1, 2}
+        
+        upcoming = _finished(4, 1, 3, 0, 0, self.START + timedelta(days=21))
+        by_match = service.for_matches([matches[1], upcoming])
+        assert by_match[matches[1].id] == (None, pytest.approx(after_first[1]))
+        current = service.current([1, 3])
+        assert by_match[upcoming.id] == (pytest.approx(current[1]), pytest.approx(current[3]))
+    
+    def test_blend_strength_favours_rating_early(self):
+        """Test: L'Elo pèse tout en début de saison, puis le classement prend le relais."""
+        from services.team_ratings import blend_strength, rating_strength, BASE_RATING
+        
+        assert rating_strength(BASE_RATING) == pytest.approx(0.5)
+        assert blend_strength(0.9, None, 5) == 0.9
+        assert blend_strength(None, None) == 0.5
+        assert blend_strength(0.9, BASE_RATING, 0) == pytest.approx(0.5)
+        assert blend_strength(0.9, BASE_RATING, 30) == pytest.approx(0.3 * 0.5 + 0.7 * 0.9)
+
+
+class TestMarketProbabilities:
+    """Tests des probabilités implicites du marché (cotes sans marge)."""
+    
+    ODDS = [[1.5, 4.2, 6.5], [2.6, 3.3, 2.9], [1.12, 9.0, 21.0]]
+    
+    def test_margin_removal_methods(self):
+        """Test: Probabilités normalisées, marge reportée sur les outsiders."""
+        import numpy as np
+        from services.market_probabilities import implied_probabilities, MARGIN_METHODS
+        
+        odds = np.array(self.ODDS)
+        proportional = (1 / odds) / (1 / odds).sum(axis=1, keepdims=True)
+        for method in MARGIN_METHODS:
+            probabilities = implied_probabilities(odds, method)
+            assert probabilities.sum(axis=1) == pytest.approx(np.ones(3))
+            # Biais favori-outsider: le favori vaut plus que la normalisation simple
+            assert probabilities[2, 0] > proportional[2, 0]
+            assert probabilities[2, 2] < proportional[2, 2]
+        
+        # Cotes sans marge: inchangées
+        fair = 1 / np.array([[0.5, 0.3, 0.2]])
+        assert implied_probabilities(fair, "shin") == pytest.approx(np.array([[0.5, 0.3, 0.2]]))
+        with pytest.raises(ValueError):
+            implied_probabilities(odds, "basic")
+    
+    def test_stage_runs_matchday_in_fixed_statements(self, db_session):
+        """Test: Une journée complète coûte une lecture et une mise à jour groupée."""
+        from sqlalchemy import event
+        from models.prediction import ExpertPrediction
+        from services.market_probabilities import MarketProbabilityService
+        
+        kickoff = datetime.now() + timedelta(days=2)
+        for i in range(100):  # 10 championnats x 10 matchs
+            db_session.add(Match(
+                id=i + 1, competition_code="PL", home_team=f"Team {2 * i}", home_team_id=2 * i,
+                away_team=f"Team {2 * i + 1}", away_team_id=2 * i + 1, match_date=kickoff, status="SCHEDULED",
+                odds_home=None if i == 0 else 2.1, odds_draw=3.4, odds_away=3.6, odds_updated_at=kickoff
+            ))
+            db_session.add(ExpertPrediction(
+                match_id=i + 1, home_score_forecast=1, away_score_forecast=0,
+                prob_home_win=0.5, prob_draw=0.3, prob_away_win=0.2
+            ))
+        db_session.commit()
+        statements = []
+        
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+        
+        bind = db_session.get_bind()
+        event.listen(bind, "before_cursor_execute", count)
+        try:
+            report = MarketProbabilityService(db_session).run(method="shin", market_weight=0.5)
+        finally:
+            event.remove(bind, "before_cursor_execute", count)
+        
+        assert report == {"updated": 99, "skipped": 0}
+        assert len([s for s in statements if s.lstrip().upper().startswith(("SELECT", "UPDATE"))]) == 2
+        
+        priced = db_session.query(ExpertPrediction).filter_by(match_id=2).one()
+        assert priced.market_method == "shin"
+        assert priced.market_prob_home + priced.market_prob_draw + priced.market_prob_away == pytest.approx(1.0, abs=1e-3)
+        assert priced.market_overround == pytest.approx(1 / 2.1 + 1 / 3.4 + 1 / 3.6 - 1, abs=1e-4)
+        assert priced.blend_prob_home == pytest.approx((0.5 + priced.market_prob_home) / 2, abs=1e-3)
+        assert db_session.query(ExpertPrediction).filter_by(match_id=1).one().market_prob_home is None
+
+
+class TestKellyPortfolio:
+    """Tests de l'optimiseur de mises de Kelly."""
+    
+    def test_single_bet_matches_closed_form(self):
+        """Test: Un pari seul retrouve f* = (bp - q) / b, puis la fraction de Kelly."""
+        from services.kelly_portfolio import PortfolioBet, scenario_returns, optimize_kelly
+        
+        returns = scenario_returns([PortfolioBet(1, "home", 3.0, 0.5)], scenarios=100000)
+        full = optimize_kelly(returns, kelly_fraction=1.0, max_stake=1.0, max_exposure=1.0)
+        assert full.fractions[0] == pytest.approx(0.25, abs=0.01)
+        quarter = optimize_kelly(returns, kelly_fraction=0.25, max_stake=1.0, max_exposure=1.0)
+        assert quarter.fractions[0] == pytest.approx(full.fractions[0] / 4, abs=1e-4)
+    
+    def test_simultaneous_bets_respect_constraints(self):
+        """Test: Plafonds respectés, issues exclusives d'un même match non cumulées."""
+        import time
+        import numpy as np
+        from services.kelly_portfolio import PortfolioBet, scenario_returns, optimize_kelly
+        
+        rng = np.random.default_rng(7)
+        bets = []
+        for match_id in range(100):  # Week-end complet
+            probabilities = rng.dirichlet([4, 3, 3])
+            odds = 1.08 / probabilities * rng.uniform(0.85, 1.0, 3)
+            bets += [
+                PortfolioBet(match_id, bet_type, float(o), float(p))
+                for bet_type, o, p in zip(("home", "draw", "away"), odds, probabilities) if p * o > 1
+            ]
+        
+        start = time.perf_counter()
+        result = optimize_kelly(scenario_returns(bets), kelly_fraction=0.5, max_stake=0.03, max_exposure=0.3)
+        assert time.perf_counter() - start < 2.0
+        assert result.fractions.min() >= 0
+        assert result.fractions.max() <= 0.03 + 1e-9
+        assert result.fractions.sum() <= 0.3 + 1e-9
+        assert result.expected_growth > 0
+        
+        # Deux issues du même match: jamais gagnantes ensemble
+        returns = scenario_returns([PortfolioBet(1, "home", 2.5, 0.45), PortfolioBet(1, "away", 4.0, 0.3)])
+        assert not np.any((returns[:, 0] > 0) & (returns[:, 1] > 0))
+        assert (returns[:, 0] > 0).mean() == pytest.approx(0.45, abs=0.02)
+
+
+class TestResponseCache:
+    """Tests du cache LRU de réponses."""
+    
+    def test_lru_eviction_ttl_and_version(self):
+        """Test: Éviction LRU, expiration et clés liées à la version des données."""
+        from core.cache import ResponseCache
+        
+        cache = ResponseCache(max_entries=2, ttl_seconds=60)
+        calls = []
+        
+        def build(value):
+            calls.append(value)
+            return {"value": value}
+        
+        assert cache.cached_json("r", {"p": 1}, lambda: build(1)).body == b'{"value":1}'
+        cache.cached_json("r", {"p": 1}, lambda: build(1))
+        cache.cached_json("r", {"p": 2}, lambda: build(2))
+        cache.cached_json("r", {"p": 3}, lambda: build(3))  # Évince p=1
+        cache.cached_json("r", {"p": 1}, lambda: build(1))
+        assert calls == [1, 2, 3, 1]
+        
+        cache.bump_version()
+        assert cache.key("r", {"p": 2}) != "pronoscore:response:v0:r?p=2"
+        cache.cached_json("r", {"p": 2}, lambda: build(2))
+        assert calls[-1] == 2
+        
+        expired = ResponseCache(max_entries=2, ttl_seconds=0)
+        expired.cached_json("r", {}, lambda: build(4))
+        expired.cached_json("r", {}, lambda: build(4))
+        assert calls[-2:] == [4, 4]
+        assert ResponseCache(max_entries=1, redis_url="redis://127.0.0.1:1/0").metrics()["redis"] is False
+
+
+class TestFastJSON:
+    """Tests de la sérialisation JSON rapide."""
+    
+    def test_same_output_as_standard_encoder(self):
+        """Test: dumps() produit le même JSON que jsonable_encoder + json.dumps."""
+        import json
+        from fastapi.encoders import jsonable_encoder
+        from core.responses import FastJSONResponse, dumps
+        from schemas.match import PredictionCompact
+        
+        payload = {
+            "date": datetime(2026, 2, 1, 20, 45),
+            "by_competition": {"PL": {"total": 3, "name": "Premier League"}, 2: None},
+            "prediction": PredictionCompact(home_score_forecast=2, away_score_forecast=1, confidence=0.6),
+            "rate": 0.125,
+            "name": "Olympique Lyonnais — Saint-Étienne",
+        }
+        expected = json.loads(json.dumps(jsonable_encoder(payload)))
+        assert json.loads(dumps(payload)) == expected
+        assert dumps(payload["prediction"]) == payload["prediction"].model_dump_json().encode("utf-8")
+        # Octets pré-sérialisés servis tels quels
+        assert FastJSONResponse(b'{"cached":true}').body == b'{"cached":true}'
+
+
+class TestDatabaseRunner:
+    """Tests de l'exécution des requêtes hors de la boucle d'événements."""
+    
+    @pytest.mark.parametrize("use_async_driver", [False, True])
+    def test_concurrent_requests_do_not_serialize(self, tmp_path, use_async_driver):
+        """Test: Requêtes lentes concurrentes exécutées en parallèle, boucle libre."""
+        import asyncio
+        import time
+        from sqlalchemy import create_engine, event, text
+        from sqlalchemy.orm import sessionmaker
+        from core.database import DatabaseRunner, create_async_session_factory
+        
+        url = f"sqlite:///{tmp_path / 'runner.db'}"
+        
+        def add_wait(conn, record):
+            # Latence d'un aller-retour vers une base distante
+            conn.create_function("db_wait", 1, lambda ms: time.sleep(ms / 1000) or 0)
+        
+        sync_engine = create_engine(url)
+        event.listen(sync_engine, "connect", add_wait)
+        async_factory = None
+        if use_async_driver:
+            pytest.importorskip("aiosqlite")
+            pytest.importorskip("greenlet")
+            async_factory = create_async_session_factory(url)
+            event.listen(async_factory.kw["bind"].sync_engine, "connect", add_wait)
+        runner = DatabaseRunner(sessionmaker(bind=sync_engine), async_factory)
+        
+        async def scenario():
+            start = time.perf_counter()
+            results = await asyncio.gather(*[
+                runner.run(lambda db: db.execute(text("SELECT db_wait(50) + 1")).scalar()) for _ in range(6)
+            ])
+            return results, time.perf_counter() - start
+        
+        results, elapsed = asyncio.run(scenario())
+        assert results == [1] * 6
+        assert elapsed < 0.2  # 0.3 s si les requêtes s'enchaînaient
+
+    def test_blocking_work_runs_off_loop(self, tmp_path):
+        """Test: run_blocking exécute le calcul hors du thread de la boucle, même en asynchrone."""
+        import asyncio
+        import threading
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from core.database import DatabaseRunner, create_async_session_factory
+
+        pytest.importorskip("aiosqlite")
+        pytest.importorskip("greenlet")
+        url = f"sqlite:///{tmp_path / 'runner.db'}"
+        runner = DatabaseRunner(sessionmaker(bind=create_engine(url)), create_async_session_factory(url))
+
+        async def scenario():
+            loop_thread = threading.get_ident()
+            on_loop = await runner.run(lambda db: threading.get_ident() == loop_thread)
+            off_loop = await runner.run_blocking(lambda db: threading.get_ident() != loop_thread)
+            return on_loop, off_loop
+
+        assert asyncio.run(scenario()) == (True, True)
+
+
+class TestMatchEvents:
+    """Tests de la diffusion en direct des changements de matchs."""
+    
+    def test_filters_threads_and_slow_subscribers(self):
+        """Test: Filtres compétition/match, publication depuis un thread, file pleine ignorée."""
+        import asyncio
+        import threading
+        from core.events import MatchEventBroadcaster
+        
+        broadcaster = MatchEventBroadcaster(queue_size=1)
+        
+        async def scenario():
+            league = broadcaster.subscribe(competitions=["pl"])
+            single = broadcaster.subscribe(match_ids=[7])
+            # Publication depuis un thread de travail (pool de threads, tâche de synchro)
+            worker = threading.Thread(target=broadcaster.publish, args=("match", 7, "PL", {"score_home": 1}))
+            worker.start()
+            worker.join()
+            broadcaster.publish("odds", 8, "FL1", {"odds_home": 2.1})
+            await asyncio.sleep(0)
+            received = (await league.get(), await single.get())
+            broadcaster.publish("match", 9, "PL", {"status": "IN_PLAY"})
+            broadcaster.publish("match", 9, "PL", {"status": "PAUSED"})
+            await asyncio.sleep(0)
+            broadcaster.unsubscribe(single)
+            return received, league.queue.qsize()
+        
+        (league_event, single_event), pending = asyncio.run(scenario())
+        assert league_event["match_id"] == single_event["match_id"] == 7
+        assert league_event["changes"] == {"score_home": 1}
+        assert pending == 1
+        metrics = broadcaster.metrics()
+        assert metrics["published"] == 4 and metrics["dropped"] == 1
+        assert metrics["subscribers"] == 1 and metrics["redis"] is False
+
+    def test_listener_survives_bad_messages_and_disconnects(self, monkeypatch):
+        """Test: Message invalide ignoré, coupure Redis suivie d'une reconnexion."""
+        import json
+        from core import events
+        from core.events import MatchEventBroadcaster
+
+        monkeypatch.setattr(events, "RECONNECT_DELAY", 0.01)
+        broadcaster = MatchEventBroadcaster()
+        remote = json.dumps({"origin": "other", "event": {"id": "x", "type": "match", "match_id": 1}})
+
+        class FakePubSub:
+            def __init__(self, messages):
+                self.messages = messages
+
+            def subscribe(self, channel):
+                pass
+
+            def get_message(self, timeout):
+                if not self.messages:
+                    broadcaster._stopping.set()
+                    return None
+                message = self.messages.pop(0)
+                if isinstance(message, Exception):
+                    raise message
+                return message
+
+            def close(self):
+                pass
+
+        connections = [
+            FakePubSub([{"data": "not json"}, ConnectionError("connection lost")]),
+            FakePubSub([{"data": remote}]),
+        ]
+
+        class FakeRedis:
+            def pubsub(self, **kwargs):
+                return connections.pop(0)
+
+        broadcaster._redis = FakeRedis()
+        broadcaster._listen()
+        assert connections == []
+        assert broadcaster.stats["remote"] == 1
+
+    def test_sync_publishes_score_diffs_after_commit(self, db_session):
+        """Test: La synchro diffuse les changements de score/statut, pas les champs inchangés."""
+        from unittest.mock import patch
+        from models.match import Match
+        from services.match_sync import MatchSyncService
+        
+        match = Match(
+            external_id=4242, competition_code="PL", home_team="Arsenal", away_team="Chelsea",
+            match_date=datetime(2026, 2, 1, 20, 0), status="IN_PLAY", score_home=0, score_away=0
+        )
+        db_session.add(match)
+        db_session.commit()
+        data = {
+            "external_id": 4242, "competition_code": "PL", "home_team": "Arsenal", "away_team": "Chelsea",
+            "match_date": datetime(2026, 2, 1, 20, 0), "status": "IN_PLAY", "score_home": 1, "score_away": 0,
+        }
+        
+        service = MatchSyncService(db_session)
+        with patch("services.match_sync.publish_match_event") as publish:
+            service._upsert_match(data)
+            service._upsert_match(dict(data, score_home=1))
+            assert publish.call_count == 0  # Rien avant le commit
+            db_session.commit()
+            service._publish_live_changes()
+        publish.assert_called_once_with("match", match.id, "PL", {"score_home": 1})
+
+
+class TestCompetitionSync:
+    """Tests du catalogue des compétitions."""
+    
+    def test_sync_upserts_tier_one_and_standings_refresh_matchday(self, db_session):
+        """Test: Synchro limitée aux compétitions suivies, journée mise à jour par les classements."""
+        import asyncio
+        from unittest.mock import AsyncMock, patch
+        from services.competition_sync import CompetitionSyncService
+        from services.standing_sync import StandingSyncService
+        
+        catalogue = {"competitions": [
+            {"id": 2021, "code": "PL", "name": "Premier League", "area": {"name": "England"},
+             "type": "LEAGUE", "currentSeason": {"id": 2403, "currentMatchday": 20}},
+            {"id": 2001, "code": "XYZ", "name": "Hors catalogue"},
+        ]}
+        standings = {
+            "competition": {"code": "PL", "name": "Premier League"},
+            "season": {"id": 2403, "currentMatchday": 21},
+            "standings": [{"table": [{"position": 1, "team": {"id": 57, "name": "Arsenal"}, "points": 50}]}],
+        }
+        service = CompetitionSyncService(db_session)
+        with patch("services.competition_sync.football_data_service.get_competitions",
+                   new=AsyncMock(return_value=catalogue)):
+            assert asyncio.run(service.sync_competitions()) == 1
+            assert asyncio.run(service.sync_competitions()) == 1  # Mise à jour, pas de doublon
+        with patch("services.standing_sync.football_data_service.get_standings",
+                   new=AsyncMock(return_value=standings)):
+            asyncio.run(StandingSyncService(db_session).sync_standings("PL"))
+        
+        competitions = service.get_competitions()
+        assert [c.code for c in competitions] == ["PL"]
+        assert competitions[0].area == "England" and competitions[0].current_matchday == 21
+        assert not service.is_stale()
+
+    def test_concurrent_first_requests_sync_once(self, tmp_path):
+        """Test: Requêtes simultanées sur un catalogue vide, une seule synchronisation."""
+        import asyncio
+        import threading
+        from unittest.mock import patch
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from controllers.matches_controller import get_competitions
+        from models.base import Base
+
+        engine = create_engine(f"sqlite:///{tmp_path / 'catalogue.db'}")
+        Base.metadata.create_all(bind=engine)
+        factory = sessionmaker(bind=engine)
+        calls = []
+
+        async def slow_catalogue():
+            calls.append(1)
+            await asyncio.sleep(0.1)
+            return {"competitions": [{"id": 2021, "code": "PL", "name": "Premier League"}]}
+
+        results = []
+
+        def request():
+            # Comme DatabaseRunner.run_async: une boucle et une session par requête
+            db = factory()
+            try:
+                results.append(asyncio.run(get_competitions(db)).count)
+            finally:
+                db.close()
+
+        with patch("services.competition_sync.football_data_service.get_competitions", new=slow_catalogue):
+            threads = [threading.Thread(target=request) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        assert len(calls) == 1
+        assert results == [1, 1, 1, 1]
+
+
+class TestHistoryStats:
+    """Tests des agrégats SQL de réussite et du cumul quotidien."""
+    
+    def _seed(self, db_session):
+        from models.match import Match
+        from models.prediction import ExpertPrediction
+        
+        # (jour, compétition, score réel, score prédit)
+        fixtures = [
+            (1, "PL", (2, 1), (1, 0)),   # vainqueur
+            (1, "PL", (3, 1), (3, 1)),   # score exact (+ vainqueur, +2.5)
+            (1, "FL1", (0, 0), (2, 1)),  # raté, -2.5 correct
+            (2, "PL", (1, 1), (1, 1)),   # score exact
+            (3, "FL1", (0, 2), (2, 2)),  # raté
+        ]
+        matches = []
+        for i, (day, code, actual, predicted) in enumerate(fixtures):
+            match = Match(
+                external_id=9000 + i, competition_code=code, competition_name=code,
+                home_team=f"H{i}", away_team=f"A{i}", status="FINISHED",
+                match_date=datetime(2025, 9, day, 20, 0), score_home=actual[0], score_away=actual[1]
+            )
+            db_session.add(match)
+            db_session.flush()
+            db_session.add(ExpertPrediction(
+                match_id=match.id, home_score_forecast=predicted[0], away_score_forecast=predicted[1]
+            ))
+            matches.append(match)
+        db_session.commit()
+        return matches
+    
+    def test_sql_aggregates_match_python_rules(self, db_session):
+        """Test: Agrégats SQL identiques aux règles de réussite par match."""
+        from datetime import date
+        from controllers.matches_controller import history_entry
+        from services.history_stats import HistoryStatsService
+        matches = self._seed(db_session)
+        
+        stats = HistoryStatsService(db_session).stats(date(2025, 9, 1), date(2025, 9, 3))
+        entries = [history_entry(m)["success"] for m in matches]
+        assert stats["total"] == 5
+        assert stats["correct_winner"] == sum(e["winner"] for e in entries) == 3
+        assert stats["correct_score"] == sum(e["score"] for e in entries) == 2
+        assert stats["correct_goals"] == sum(e["goals"] for e in entries)
+        assert stats["by_competition"]["PL"] == {"total": 3, "correct": 3, "name": "PL"}
+        assert HistoryStatsService(db_session).stats(date(2025, 9, 2), date(2025, 9, 2))["total"] == 1
+    
+    def test_rollup_matches_live_and_refreshes_days(self, db_session):
+        """Test: Même résultat via le cumul; un jour recalculé après correction de score."""
+        from datetime import date
+        from services.history_stats import HistoryStatsService
+        matches = self._seed(db_session)
+        service = HistoryStatsService(db_session)
+        live = service.stats(date(2025, 9, 1), date(2025, 9, 3))
+        
+        assert service.refresh_days([date(2025, 9, 1)]) == 0  # Cumul pas encore construit
+        assert service.rebuild() == 4
+        assert service.rolled_until() == date(2025, 9, 3)
+        assert service.stats(date(2025, 9, 1), date(2025, 9, 3)) == live
+        assert service.stats(None, None) == live
+        
+        matches[2].score_home, matches[2].score_away = 2, 1
+        db_session.commit()
+        assert service.stats(date(2025, 9, 1), date(2025, 9, 1))["correct_winner"] == 2  # Cumul périmé
+        service.refresh_days([date(2025, 9, 1)])
+        assert service.stats(date(2025, 9, 1), date(2025, 9, 1))["correct_score"] == 2